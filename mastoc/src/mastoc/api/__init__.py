@@ -3,6 +3,7 @@
 from mastoc.api.client import StoktAPI, StoktConfig
 from mastoc.api.railway_client import MastocAPI, RailwayConfig
 from mastoc.api.models import Climb, Hold, Face, HoldType
+from mastoc.api.async_client import AsyncStoktAPI, AsyncMastocAPI, get_async_runner
 
 __all__ = [
     # Stokt (legacy)
@@ -11,6 +12,10 @@ __all__ = [
     # Railway (nouveau)
     "MastocAPI",
     "RailwayConfig",
+    # Clients async (httpx optionnel)
+    "AsyncStoktAPI",
+    "AsyncMastocAPI",
+    "get_async_runner",
     # Modèles
     "Climb",
     "Hold",
@@ -0,0 +1,525 @@
+"""
+Clients HTTP asynchrones (asyncio) pour Stokt et mastoc-api.
+
+Les clients synchrones (StoktAPI, MastocAPI) restent l'API de référence.
+Les versions async les enveloppent : elles partagent leur configuration,
+leur authentification (token Stokt, JWT / API Key Railway) et leurs
+fonctions de parsing, mais passent par un `httpx.AsyncClient` unique :
+- pool de connexions partagé avec keep-alive, HTTP/2 optionnel ;
+- nombre de requêtes simultanées borné par un sémaphore ;
+- timeout par classe d'appel (lecture, liste volumineuse, social).
+
+Les chemins à fort fan-out (compteurs sociaux, pages de climbs, listes)
+sont implémentés nativement. Toute autre méthode du client synchrone reste
+accessible en async : elle est exécutée dans un thread (parité fonctionnelle).
+
+Pour le code synchrone (GUI, workers), `get_async_runner().run(coro)`
+exécute une coroutine sur une boucle d'événements partagée.
+
+Nécessite httpx (`pip install mastoc[async]`).
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+from mastoc.api.client import StoktAPI, StoktAPIError, AuthenticationError as StoktAuthError
+from mastoc.api.models import Climb, Comment, Effort, Face, Like, ClimbList, ListItem
+from mastoc.api.railway_client import (
+    MastocAPI,
+    MastocAPIError,
+    AuthenticationError as RailwayAuthError,
+)
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Timeouts (secondes) par classe d'appel
+DEFAULT_TIMEOUTS = {
+    "read": 30.0,     # ressource unitaire
+    "bulk": 120.0,    # pages volumineuses (climbs, setup de face)
+    "social": 15.0,   # sends / comments / likes
+}
+
+
+def httpx_available() -> bool:
+    """True si httpx est installé (clients async utilisables)."""
+    return httpx is not None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class AsyncRunner:
+    """
+    Boucle d'événements dans un thread démon, partagée par l'application.
+
+    Permet au code synchrone de lancer des coroutines sans créer une
+    boucle (et donc un pool de connexions) par appel.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Boucle d'événements (démarrée à la demande)."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, daemon=True, name="mastoc-async"
+                )
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Planifie une coroutine ; retourne un Future thread-safe."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Exécute une coroutine et attend son résultat (wrapper synchrone)."""
+        return self.submit(coro).result(timeout)
+
+
+_runner: Optional[AsyncRunner] = None
+
+
+def get_async_runner() -> AsyncRunner:
+    """Retourne l'AsyncRunner global."""
+    global _runner
+    if _runner is None:
+        _runner = AsyncRunner()
+    return _runner
+
+
+class _AsyncClientBase:
+    """Transport httpx commun aux clients Stokt et Railway."""
+
+    # Exceptions du client synchrone enveloppé
+    api_error = Exception
+    auth_error = Exception
+
+    def __init__(
+        self,
+        sync_client,
+        max_concurrency: int = 8,
+        http2: bool = False,
+        timeouts: Optional[dict] = None,
+        transport=None,
+    ):
+        """
+        Args:
+            sync_client: Client synchrone enveloppé (config, auth, parsing)
+            max_concurrency: Requêtes simultanées maximum
+            http2: Active HTTP/2 si le paquet h2 est installé
+            timeouts: Surcharge de DEFAULT_TIMEOUTS par classe d'appel
+            transport: Transport httpx (tests)
+        """
+        if httpx is None:
+            raise ImportError("httpx est requis pour les clients async (pip install httpx)")
+        self.sync = sync_client
+        self.max_concurrency = max_concurrency
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 demandé mais h2 absent, utilisation de HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self._transport = transport
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bound_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _ensure_client(self) -> "httpx.AsyncClient":
+        """
+        Crée le client httpx (et le sémaphore) pour la boucle courante.
+
+        Un client lié à une autre boucle est remplacé, puis fermé pour
+        libérer son pool de connexions.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._bound_loop is loop:
+            return self._client
+
+        old = self._client
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            headers=dict(self.sync.session.headers),
+            transport=self._transport,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bound_loop = loop
+        client = self._client
+        if old is not None:
+            try:
+                await old.aclose()
+            except Exception as e:
+                # Connexions liées à l'ancienne boucle (éventuellement fermée)
+                logger.debug(f"Fermeture de l'ancien client httpx: {e}")
+        return client
+
+    async def _auth_headers(self) -> dict:
+        """Headers d'authentification du client synchrone."""
+        raise NotImplementedError
+
+    def _check_status(self, response: "httpx.Response"):
+        """Traduit les statuts HTTP en exceptions du client synchrone."""
+        raise NotImplementedError
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        call_class: str = "read",
+        **kwargs,
+    ) -> "httpx.Response":
+        """Requête HTTP bornée par le sémaphore, avec le timeout de sa classe."""
+        client = await self._ensure_client()
+        headers = kwargs.pop("headers", {}) or {}
+        headers.update(await self._auth_headers())
+        url = endpoint if endpoint.startswith("http") else self.sync._url(endpoint)
+
+        async with self._semaphore:
+            try:
+                response = await client.request(
+                    method.upper(),
+                    url,
+                    headers=headers,
+                    timeout=self.timeouts.get(call_class, self.timeouts["read"]),
+                    **kwargs,
+                )
+            except httpx.TimeoutException as e:
+                raise self.api_error(f"Timeout ({call_class}) sur {endpoint}") from e
+            except httpx.HTTPError as e:
+                raise self.api_error(f"Erreur réseau sur {endpoint}: {e}") from e
+
+        self._check_status(response)
+        return response
+
+    async def gather(self, *coros, return_exceptions: bool = False) -> list:
+        """asyncio.gather (la concurrence reste bornée par le sémaphore)."""
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+
+    def __getattr__(self, name: str):
+        """
+        Parité : une méthode non implémentée nativement est exécutée
+        dans un thread via le client synchrone.
+        """
+        if name.startswith("_") or name == "sync":
+            raise AttributeError(name)
+        attr = getattr(self.sync, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def wrapper(*args, **kwargs):
+            return await asyncio.to_thread(attr, *args, **kwargs)
+
+        return wrapper
+
+    async def aclose(self):
+        """Ferme le pool de connexions."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+class AsyncStoktAPI(_AsyncClientBase):
+    """
+    Client Stokt asynchrone.
+
+    Usage:
+        async with AsyncStoktAPI(stokt_api) as api:
+            stats = await api.get_climbs_social_stats(climb_ids)
+    """
+
+    api_error = StoktAPIError
+    auth_error = StoktAuthError
+
+    def __init__(self, sync_client: Optional[StoktAPI] = None, **kwargs):
+        super().__init__(sync_client or StoktAPI(), **kwargs)
+
+    async def _auth_headers(self) -> dict:
+        # Token Stokt en mémoire : pas d'E/S
+        return self.sync._auth_headers()
+
+    def _check_status(self, response: "httpx.Response"):
+        if response.status_code == 401:
+            raise StoktAuthError("Token invalide ou expiré")
+        if response.status_code == 429:
+            # Même forme qu'une erreur requests (voir social_refresh.is_throttled)
+            import requests
+
+            error = requests.HTTPError(f"429 Too Many Requests: {response.url}")
+            error.response = response
+            raise error
+        if response.is_error:
+            raise StoktAPIError(f"HTTP {response.status_code} sur {response.url}")
+
+    # =========================================================================
+    # Climbs / faces
+    # =========================================================================
+
+    async def get_face_setup(self, face_id: str) -> Face:
+        """GET api/faces/{face_id}/setup"""
+        response = await self._request("get", f"api/faces/{face_id}/setup", "bulk")
+        return Face.from_api(response.json())
+
+    async def get_all_gym_climbs(self, gym_id: str, max_age: int = 9999, callback=None) -> list[Climb]:
+        """
+        Climbs d'un gym avec pagination automatique.
+
+        Stokt pagine par URL `next` : les pages sont chaînées, mais le
+        parsing d'une page chevauche le téléchargement de la suivante.
+        """
+        response = await self._request(
+            "get", f"api/gyms/{gym_id}/climbs", "bulk", params={"max_age": max_age}
+        )
+        data = response.json()
+        total = data.get("count", 0)
+        all_climbs = [Climb.from_api(c) for c in data.get("results", [])]
+        if callback:
+            callback(len(all_climbs), total)
+
+        next_url = data.get("next")
+        while next_url:
+            response = await self._request("get", next_url, "bulk")
+            data = response.json()
+            all_climbs.extend(Climb.from_api(c) for c in data.get("results", []))
+            next_url = data.get("next")
+            if callback:
+                callback(len(all_climbs), total)
+
+        return all_climbs
+
+    # =========================================================================
+    # Social
+    # =========================================================================
+
+    async def get_climb_sends(self, climb_id: str, limit: int = 20) -> list[Effort]:
+        """GET api/climbs/{climbId}/latest-sends"""
+        response = await self._request(
+            "get", f"api/climbs/{climb_id}/latest-sends", "social", params={"limit": limit}
+        )
+        return [Effort.from_api(e) for e in response.json()]
+
+    async def get_climb_comments(self, climb_id: str, limit: int = 20) -> list[Comment]:
+        """GET api/climbs/{climbId}/comments"""
+        response = await self._request(
+            "get", f"api/climbs/{climb_id}/comments", "social", params={"limit": limit}
+        )
+        return [Comment.from_api(c) for c in response.json()]
+
+    async def get_climb_likes(self, climb_id: str) -> list[Like]:
+        """GET api/climbs/{climbId}/likes"""
+        response = await self._request("get", f"api/climbs/{climb_id}/likes", "social")
+        return [Like.from_api(lk) for lk in response.json()]
+
+    async def get_climb_social(self, climb_id: str, limit: int = 20) -> tuple:
+        """
+        Sends, comments et likes d'un climb, récupérés en parallèle.
+
+        Returns:
+            Tuple (sends, comments, likes) ; chaque élément est soit le
+            résultat, soit l'exception levée pour cette partie.
+        """
+        return tuple(await self.gather(
+            self.get_climb_sends(climb_id, limit=limit),
+            self.get_climb_comments(climb_id, limit=limit),
+            self.get_climb_likes(climb_id),
+            return_exceptions=True,
+        ))
+
+    async def get_climb_social_stats(self, climb_id: str) -> dict:
+        """Compteurs sociaux d'un climb (3 requêtes en parallèle)."""
+        sends, comments, likes = await self.gather(
+            self.get_climb_sends(climb_id, limit=9999),
+            self.get_climb_comments(climb_id, limit=9999),
+            self.get_climb_likes(climb_id),
+        )
+        return {
+            "climbed_by": len(sends),
+            "total_likes": len(likes),
+            "total_comments": len(comments),
+        }
+
+    async def get_climbs_social_stats(self, climb_ids: list[str]) -> dict[str, Any]:
+        """
+        Compteurs sociaux de plusieurs climbs (fan-out borné).
+
+        Returns:
+            Dict climb_id -> stats, ou l'exception levée pour ce climb
+        """
+        results = await self.gather(
+            *(self.get_climb_social_stats(cid) for cid in climb_ids),
+            return_exceptions=True,
+        )
+        return dict(zip(climb_ids, results))
+
+    # =========================================================================
+    # Listes
+    # =========================================================================
+
+    async def get_user_lists(self, user_id: str, ordering: str = "-dateModified") -> list[ClimbList]:
+        """GET api/users/lists/{userId}/personal"""
+        response = await self._request(
+            "get", f"api/users/lists/{user_id}/personal", params={"ordering": ordering}
+        )
+        return [ClimbList.from_api(lst) for lst in response.json()]
+
+    async def get_list_items(self, list_id: str, **filters) -> list[ListItem]:
+        """GET api/lists/{listId}/items (mêmes filtres que StoktAPI.get_list_items)."""
+        params = StoktAPI._list_items_params(**filters)
+        response = await self._request("get", f"api/lists/{list_id}/items", "bulk", params=params)
+        return StoktAPI._list_items_from_api(response.json())
+
+    async def get_lists_items(self, list_ids: list[str]) -> dict[str, list[ListItem]]:
+        """Items de plusieurs listes, chargés en parallèle."""
+        results = await self.gather(*(self.get_list_items(lid) for lid in list_ids))
+        return dict(zip(list_ids, results))
+
+
+class AsyncMastocAPI(_AsyncClientBase):
+    """
+    Client mastoc-api (Railway) asynchrone.
+
+    Partage le cache de validateurs ETag du client synchrone.
+    """
+
+    api_error = MastocAPIError
+    auth_error = RailwayAuthError
+
+    def __init__(self, sync_client: Optional[MastocAPI] = None, **kwargs):
+        super().__init__(sync_client or MastocAPI(), **kwargs)
+
+    async def _auth_headers(self) -> dict:
+        # Le JWT peut être renouvelé (requête + écriture du fichier de
+        # tokens) : hors de la boucle d'événements
+        return await asyncio.to_thread(self.sync._get_auth_headers)
+
+    def _check_status(self, response: "httpx.Response"):
+        if response.status_code == 401:
+            raise RailwayAuthError("Non authentifié (JWT ou API Key invalide)")
+        if response.status_code == 403:
+            raise RailwayAuthError("Accès refusé")
+        if response.is_error:
+            raise MastocAPIError(f"HTTP {response.status_code} sur {response.url}")
+
+    async def _get_json_conditional(
+        self, endpoint: str, params: Optional[dict] = None, call_class: str = "read"
+    ):
+        """
+        GET conditionnel (If-None-Match), comme MastocAPI._get_json_conditional.
+
+        Le cache de validateurs peut être une base SQLite : ses accès
+        passent par un thread.
+        """
+        validators = self.sync.validators
+        key = validators.make_key(endpoint, params)
+        headers = await asyncio.to_thread(validators.conditional_headers, key)
+
+        response = await self._request("get", endpoint, call_class, params=params, headers=headers)
+        if response.status_code == 304:
+            cached = await asyncio.to_thread(validators.get, key)
+            if cached is not None:
+                return cached["data"]
+            response = await self._request("get", endpoint, call_class, params=params)
+
+        data = MastocAPI._json(response)
+        await asyncio.to_thread(
+            validators.store,
+            key,
+            data,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return data
+
+    async def get_climbs(self, **filters) -> tuple[list[Climb], int]:
+        """GET /api/climbs (mêmes filtres que MastocAPI.get_climbs)."""
+        params = MastocAPI._climbs_params(**filters)
+        # Pages filtrées : trop variables pour le cache de validateurs
+        response = await self._request("get", "api/climbs", "bulk", params=params)
+        data = MastocAPI._json(response)
+        climbs = [self.sync._climb_from_railway(c) for c in data.get("results", [])]
+        return climbs, data.get("count", 0)
+
+    async def get_all_climbs(
+        self,
+        face_id: Optional[str] = None,
+        since_created_at=None,
+        callback=None,
+        page_size: int = 500,
+    ) -> list[Climb]:
+        """
+        Tous les climbs : la première page donne le total, les suivantes
+        sont demandées en parallèle.
+        """
+        filters = {"face_id": face_id, "since_created_at": since_created_at, "page_size": page_size}
+        first, total = await self.get_climbs(page=1, **filters)
+        if callback:
+            callback(len(first), total)
+
+        pages = -(-total // page_size)
+        loaded = len(first)
+
+        async def fetch(page: int) -> list[Climb]:
+            nonlocal loaded
+            climbs, _ = await self.get_climbs(page=page, **filters)
+            loaded += len(climbs)
+            if callback:
+                callback(loaded, total)
+            return climbs
+
+        rest = await self.gather(*(fetch(p) for p in range(2, pages + 1)))
+        all_climbs = list(first)
+        for climbs in rest:
+            all_climbs.extend(climbs)
+        return all_climbs
+
+    async def get_holds(self, face_id: str) -> list:
+        """GET /api/holds?face_id={face_id}"""
+        data = await self._get_json_conditional("api/holds", {"face_id": face_id}, "bulk")
+        return [self.sync._hold_from_railway(h) for h in data.get("results", [])]
+
+    async def get_face_setup(self, face_id: str) -> Face:
+        """GET /api/faces/{face_id}/setup"""
+        data = await self._get_json_conditional(f"api/faces/{face_id}/setup", None, "bulk")
+        return self.sync._face_from_railway(data)
+
+    async def get_hold_annotations_batch(self, hold_ids: list[int]) -> dict:
+        """POST /api/holds/annotations/batch"""
+        from mastoc.api.models import AnnotationData
+
+        response = await self._request(
+            "post", "api/holds/annotations/batch", "bulk", json={"hold_ids": hold_ids}
+        )
+        data = MastocAPI._json(response)
+        return {
+            int(hold_id): AnnotationData.from_api(annotation)
+            for hold_id, annotation in data.get("annotations", {}).items()
+        }
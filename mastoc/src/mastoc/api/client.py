@@ -688,6 +688,31 @@ class StoktAPI:
         Returns:
             Liste des items
         """
+        params = self._list_items_params(
+            page_size=page_size,
+            exclude_mine=exclude_mine,
+            grade_from=grade_from,
+            grade_to=grade_to,
+            ordering=ordering,
+            tags=tags,
+            search=search,
+            show_circuit_only=show_circuit_only,
+        )
+        response = self._request("get", f"api/lists/{list_id}/items", params=params)
+        return self._list_items_from_api(response.json())
+
+    @staticmethod
+    def _list_items_params(
+        page_size: int = 1000,
+        exclude_mine: bool = False,
+        grade_from: Optional[str] = None,
+        grade_to: Optional[str] = None,
+        ordering: Optional[str] = None,
+        tags: Optional[str] = None,
+        search: Optional[str] = None,
+        show_circuit_only: bool = False
+    ) -> dict:
+        """Paramètres de GET api/lists/{listId}/items (partagés avec le client async)."""
         params = {"page_size": page_size}
         if exclude_mine:
             params["exclude_mine"] = "true"
@@ -703,10 +728,11 @@ class StoktAPI:
             params["search"] = search
         if show_circuit_only:
             params["show_circuit_only"] = "true"
+        return params
 
-        response = self._request("get", f"api/lists/{list_id}/items", params=params)
-        data = response.json()
-        # L'API retourne {results: [...]} ou directement [...]
+    @staticmethod
+    def _list_items_from_api(data) -> list[ListItem]:
+        """Parse les items d'une liste ({results: [...]} ou directement [...])."""
         items = data.get("results", data) if isinstance(data, dict) else data
         return [ListItem.from_api(item) for item in items]
 
@@ -0,0 +1,227 @@
+"""
+Cache des validateurs HTTP (ETag / Last-Modified) pour les GET conditionnels.
+
+Chaque entrée associe une requête (endpoint + paramètres) à ses validateurs
+et aux données décodées correspondantes. Quand le serveur répond 304, le
+client réutilise les données stockées sans retélécharger le corps.
+
+Réservé aux ressources stables (setup de face, prises, tuiles) : les pages
+de listes filtrées changent trop pour en profiter. Le cache est borné en
+nombre d'entrées et en taille ; au-delà, les entrées les moins récemment
+utilisées sont supprimées. Persisté, il tient une ligne SQLite par entrée
+(aucune réécriture globale à chaque réponse).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+VALIDATORS_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS http_validators (
+    key TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    data TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_http_validators_last_used ON http_validators(last_used);
+"""
+
+
+class ValidatorCache:
+    """
+    Validateurs + données par clé de requête.
+
+    En mémoire par défaut ; si `path` est fourni, les entrées sont
+    persistées dans une base SQLite pour survivre aux redémarrages.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """
+        Args:
+            path: Base SQLite de persistance (None = mémoire uniquement)
+            max_entries: Nombre maximal d'entrées
+            max_bytes: Taille maximale des données stockées (JSON encodé)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, tuple[dict, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._ready = path is None
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[dict] = None) -> str:
+        """Clé stable pour un endpoint et ses paramètres."""
+        if not params:
+            return endpoint
+        query = "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{endpoint}?{query}"
+
+    # =========================================================================
+    # Stockage SQLite
+    # =========================================================================
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connexion à la base (schéma créé au premier accès, commit puis fermeture)."""
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        try:
+            if not self._ready:
+                conn.executescript(VALIDATORS_SCHEMA_SQL)
+                self._ready = True
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict_db(self, conn: sqlite3.Connection):
+        """Supprime les entrées les moins récemment utilisées au-delà des bornes."""
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_validators"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM http_validators ORDER BY last_used"
+        ).fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM http_validators WHERE key = ?", evicted)
+
+    def _evict_memory(self):
+        total = sum(size for _, size in self._memory.values())
+        while self._memory and (len(self._memory) > self.max_entries or total > self.max_bytes):
+            _, (_, size) = self._memory.popitem(last=False)
+            total -= size
+
+    # =========================================================================
+    # API
+    # =========================================================================
+
+    def get(self, key: str) -> Optional[dict]:
+        """Retourne {etag, last_modified, data} ou None."""
+        with self._lock:
+            if self.path is None:
+                entry = self._memory.get(key)
+                if entry is None:
+                    return None
+                self._memory.move_to_end(key)
+                return entry[0]
+
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT etag, last_modified, data FROM http_validators WHERE key = ?",
+                        (key,),
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    conn.execute(
+                        "UPDATE http_validators SET last_used = ? WHERE key = ?",
+                        (time.time(), key),
+                    )
+                return {"etag": row[0], "last_modified": row[1], "data": json.loads(row[2])}
+            except (sqlite3.Error, json.JSONDecodeError) as e:
+                logger.warning(f"Cache de validateurs illisible, ignoré: {e}")
+                return None
+
+    def conditional_headers(self, key: str) -> dict:
+        """Headers If-None-Match / If-Modified-Since pour une clé."""
+        entry = self.get(key)
+        if not entry:
+            return {}
+        if entry.get("etag"):
+            return {"If-None-Match": entry["etag"]}
+        if entry.get("last_modified"):
+            return {"If-Modified-Since": entry["last_modified"]}
+        return {}
+
+    def store(
+        self,
+        key: str,
+        data: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """
+        Enregistre les validateurs d'une réponse 200 (ignorée sans validateur,
+        ou si les données dépassent à elles seules la taille maximale).
+        """
+        if not etag and not last_modified:
+            return
+        encoded = json.dumps(data)
+        size = len(encoded)
+        with self._lock:
+            if size > self.max_bytes:
+                self._discard(key)
+                return
+
+            if self.path is None:
+                self._memory[key] = (
+                    {"etag": etag, "last_modified": last_modified, "data": data}, size
+                )
+                self._memory.move_to_end(key)
+                self._evict_memory()
+                return
+
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        """INSERT OR REPLACE INTO http_validators
+                           (key, etag, last_modified, data, size, last_used)
+                           VALUES (?, ?, ?, ?, ?, ?)""",
+                        (key, etag, last_modified, encoded, size, time.time()),
+                    )
+                    self._evict_db(conn)
+            except sqlite3.Error as e:
+                logger.warning(f"Impossible d'écrire le cache de validateurs: {e}")
+
+    def _discard(self, key: str):
+        """Supprime une entrée (verrou tenu par l'appelant)."""
+        if self.path is None:
+            self._memory.pop(key, None)
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM http_validators WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"Impossible d'écrire le cache de validateurs: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self.path is None:
+                return len(self._memory)
+            with self._connect() as conn:
+                return conn.execute("SELECT COUNT(*) FROM http_validators").fetchone()[0]
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            self._memory.clear()
+            if self.path is not None and self.path.exists():
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM http_validators")
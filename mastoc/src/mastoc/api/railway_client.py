@@ -5,13 +5,16 @@ Ce client remplace StoktAPI pour les opérations de lecture/écriture
 sur le serveur Railway personnel.
 """
 
+import json
 import requests
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 from pathlib import Path
 
 from mastoc.api.models import Climb, Hold, Face, ClimbHold, HoldType, Grade, ClimbSetter
+from mastoc.api.http_cache import ValidatorCache
+from mastoc.api.wire_format import COLUMNAR_MEDIA_TYPE, from_columnar, is_columnar
 
 
 @dataclass
@@ -20,6 +23,10 @@ class RailwayConfig:
     base_url: str = "https://mastoc-production.up.railway.app"
     api_key: Optional[str] = None
     timeout: int = 30
+    # Fichier de persistance des validateurs ETag (None = en mémoire)
+    validator_cache_path: Optional[Path] = None
+    # Demande le format colonnaire (listes volumineuses ~2x plus petites)
+    compact_format: bool = False
 
 
 class MastocAPIError(Exception):
@@ -46,6 +53,7 @@ class MastocAPI:
         self.config = config or RailwayConfig()
         self.session = requests.Session()
         self._auth_manager = auth_manager
+        self.validators = ValidatorCache(self.config.validator_cache_path)
         self._update_headers()
 
     def set_auth_manager(self, auth_manager):
@@ -54,9 +62,12 @@ class MastocAPI:
 
     def _update_headers(self):
         """Met à jour les headers de session."""
+        accept = "application/json"
+        if self.config.compact_format:
+            accept = f"{COLUMNAR_MEDIA_TYPE}, application/json;q=0.9"
         headers = {
             "Content-Type": "application/json",
-            "Accept": "application/json",
+            "Accept": accept,
         }
         if self.config.api_key:
             headers["X-API-Key"] = self.config.api_key
@@ -116,6 +127,44 @@ class MastocAPI:
         response.raise_for_status()
         return response
 
+    @staticmethod
+    def _json(response: requests.Response):
+        """Décode le corps JSON (standard ou colonnaire selon Content-Type)."""
+        data = response.json()
+        if is_columnar(response.headers.get("Content-Type")):
+            return from_columnar(data)
+        return data
+
+    def _get_json_conditional(self, endpoint: str, params: Optional[dict] = None):
+        """
+        GET conditionnel : envoie If-None-Match si la ressource est connue.
+
+        Sur 304, retourne les données stockées avec les validateurs ;
+        sur 200, stocke les nouveaux validateurs et retourne le JSON.
+        """
+        key = ValidatorCache.make_key(endpoint, params)
+        headers = self.validators.conditional_headers(key)
+
+        response = self._request("get", endpoint, params=params, headers=headers)
+
+        if response.status_code == 304:
+            cached = self.validators.get(key)
+            if cached is not None:
+                return cached["data"]
+            # Pas de données locales : redemander sans condition
+            response = self._request("get", endpoint, params=params)
+
+        data = self._json(response)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        self.validators.store(
+            key,
+            data,
+            etag=etag if isinstance(etag, str) else None,
+            last_modified=last_modified if isinstance(last_modified, str) else None,
+        )
+        return data
+
     # =========================================================================
     # Health & Stats
     # =========================================================================
@@ -132,7 +181,7 @@ class MastocAPI:
             timeout=self.config.timeout
         )
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     def get_stats(self) -> dict:
         """
@@ -142,7 +191,7 @@ class MastocAPI:
             Statistiques de la base (counts par entité)
         """
         response = self._request("get", "api/sync/stats")
-        return response.json()
+        return self._json(response)
 
     # =========================================================================
     # Climbs
@@ -158,6 +207,10 @@ class MastocAPI:
         source: Optional[str] = None,
         since_created_at: Optional[datetime] = None,
         local_only: bool = False,
+        hold_ids: Optional[list[int]] = None,
+        hold_match: str = "all",
+        sort_by: Optional[str] = None,
+        sort_desc: bool = False,
         page: int = 1,
         page_size: int = 50,
     ) -> tuple[list[Climb], int]:
@@ -173,12 +226,58 @@ class MastocAPI:
             source: Filtrer par source ("stokt", "mastoc")
             since_created_at: Retourne uniquement les climbs créés après cette date
             local_only: Si True, retourne uniquement les climbs locaux (stokt_id=NULL)
+            hold_ids: Filtrer par prises (identifiants de holds_list)
+            hold_match: "all" = toutes les prises, "any" = au moins une
+            sort_by: Tri serveur (date_created, grade, name, climbed_by, likes)
+            sort_desc: Tri décroissant
             page: Page (1-indexed)
             page_size: Nombre par page (max 500)
 
         Returns:
             Tuple (climbs, total_count)
         """
+        params = self._climbs_params(
+            face_id=face_id,
+            grade_min=grade_min,
+            grade_max=grade_max,
+            setter_id=setter_id,
+            search=search,
+            source=source,
+            since_created_at=since_created_at,
+            local_only=local_only,
+            hold_ids=hold_ids,
+            hold_match=hold_match,
+            sort_by=sort_by,
+            sort_desc=sort_desc,
+            page=page,
+            page_size=page_size,
+        )
+        # Pages filtrées : trop variables pour le cache de validateurs
+        data = self._json(self._request("get", "api/climbs", params=params))
+
+        climbs = [self._climb_from_railway(c) for c in data.get("results", [])]
+        total = data.get("count", 0)
+
+        return climbs, total
+
+    @staticmethod
+    def _climbs_params(
+        face_id: Optional[str] = None,
+        grade_min: Optional[str] = None,
+        grade_max: Optional[str] = None,
+        setter_id: Optional[str] = None,
+        search: Optional[str] = None,
+        source: Optional[str] = None,
+        since_created_at: Optional[datetime] = None,
+        local_only: bool = False,
+        hold_ids: Optional[list[int]] = None,
+        hold_match: str = "all",
+        sort_by: Optional[str] = None,
+        sort_desc: bool = False,
+        page: int = 1,
+        page_size: int = 50,
+    ) -> dict:
+        """Paramètres de requête de GET /api/climbs (partagés avec le client async)."""
         params = {
             "page": page,
             "page_size": page_size,
@@ -199,14 +298,14 @@ class MastocAPI:
             params["since_created_at"] = since_created_at.isoformat()
         if local_only:
             params["local_only"] = "true"
-
-        response = self._request("get", "api/climbs", params=params)
-        data = response.json()
-
-        climbs = [self._climb_from_railway(c) for c in data.get("results", [])]
-        total = data.get("count", 0)
-
-        return climbs, total
+        if hold_ids:
+            params["holds"] = ",".join(str(h) for h in hold_ids)
+            params["hold_match"] = hold_match
+        if sort_by:
+            params["sort_by"] = sort_by
+        if sort_desc:
+            params["sort_desc"] = "true"
+        return params
 
     def get_all_climbs(
         self,
@@ -259,7 +358,7 @@ class MastocAPI:
             Climb
         """
         response = self._request("get", f"api/climbs/{climb_id}")
-        return self._climb_from_railway(response.json())
+        return self._climb_from_railway(self._json(response))
 
     def get_climb_by_stokt_id(self, stokt_id: str) -> Climb:
         """
@@ -272,7 +371,7 @@ class MastocAPI:
             Climb
         """
         response = self._request("get", f"api/climbs/by-stokt-id/{stokt_id}")
-        return self._climb_from_railway(response.json())
+        return self._climb_from_railway(self._json(response))
 
     def create_climb(
         self,
@@ -317,7 +416,31 @@ class MastocAPI:
             data["description"] = description
 
         response = self._request("post", "api/climbs", json=data)
-        return self._climb_from_railway(response.json())
+        return self._climb_from_railway(self._json(response))
+
+    def create_climbs_batch(self, climbs: list[dict]) -> list[dict]:
+        """
+        POST /api/climbs/batch
+
+        Crée plusieurs climbs en une requête (file d'attente hors-ligne).
+
+        Args:
+            climbs: Données au format de create_climb, avec un client_ref
+                optionnel repris dans le résultat
+
+        Returns:
+            Liste ordonnée de {client_ref, climb (Climb ou None), error}
+        """
+        response = self._request("post", "api/climbs/batch", json={"climbs": climbs})
+        results = []
+        for item in self._json(response).get("results", []):
+            climb = item.get("climb")
+            results.append({
+                "client_ref": item.get("client_ref"),
+                "climb": self._climb_from_railway(climb) if climb else None,
+                "error": item.get("error"),
+            })
+        return results
 
     def update_climb(
         self,
@@ -356,7 +479,7 @@ class MastocAPI:
             data["is_project"] = is_project
 
         response = self._request("patch", f"api/climbs/{climb_id}", json=data)
-        return self._climb_from_railway(response.json())
+        return self._climb_from_railway(self._json(response))
 
     def delete_climb(self, climb_id: str) -> bool:
         """
@@ -382,8 +505,7 @@ class MastocAPI:
         Returns:
             Liste des holds
         """
-        response = self._request("get", "api/holds", params={"face_id": face_id})
-        data = response.json()
+        data = self._get_json_conditional("api/holds", params={"face_id": face_id})
 
         holds = [self._hold_from_railway(h) for h in data.get("results", [])]
         return holds
@@ -402,13 +524,14 @@ class MastocAPI:
             Liste des faces (id, holds_count, climbs_count, etc.)
         """
         response = self._request("get", "api/faces")
-        return response.json()
+        return self._json(response)
 
     def get_face_setup(self, face_id: str) -> Face:
         """
         GET /api/faces/{face_id}/setup
 
         Récupère une face avec tous ses holds et leur configuration.
+        Requête conditionnelle : un setup inchangé coûte un 304.
 
         Args:
             face_id: ID de la face
@@ -416,8 +539,33 @@ class MastocAPI:
         Returns:
             Face avec les holds
         """
-        response = self._request("get", f"api/faces/{face_id}/setup")
-        return self._face_from_railway(response.json())
+        data = self._get_json_conditional(f"api/faces/{face_id}/setup")
+        return self._face_from_railway(data)
+
+    def get_face_tiles(self, face_id: str) -> dict:
+        """
+        GET /api/faces/{face_id}/tiles
+
+        Descripteur de la pyramide de tuiles de la photo (voir core/tiles).
+        Requête conditionnelle : la pyramide est générée une fois par photo.
+
+        Args:
+            face_id: ID de la face
+
+        Returns:
+            Descripteur (version, dimensions, niveaux, gabarit d'URL)
+        """
+        return self._get_json_conditional(f"api/faces/{face_id}/tiles")
+
+    def get_face_tile(self, tile_path: str) -> bytes:
+        """
+        GET d'une tuile (chemin issu du gabarit d'URL du descripteur).
+
+        Returns:
+            Contenu JPEG de la tuile
+        """
+        response = self._request("get", tile_path.lstrip("/"))
+        return response.content
 
     def _face_from_railway(self, data: dict) -> Face:
         """Convertit une face Railway en modèle Face."""
@@ -433,19 +581,7 @@ class MastocAPI:
             )
 
         # Convertir les holds
-        holds = []
-        for h in data.get("holds", []):
-            holds.append(Hold(
-                id=h.get("id", 0),
-                area=h.get("area", 0) or 0,
-                polygon_str=h.get("polygon_str", ""),
-                touch_polygon_str=h.get("touch_polygon_str", ""),
-                path_str=h.get("path_str", ""),
-                centroid_str=h.get("centroid_str", "0 0"),
-                center_tape_str=h.get("center_tape_str", ""),
-                right_tape_str=h.get("right_tape_str", ""),
-                left_tape_str=h.get("left_tape_str", ""),
-            ))
+        holds = [self._setup_hold_from_railway(h) for h in data.get("holds", [])]
 
         return Face(
             id=str(data.get("id", "")),
@@ -457,6 +593,21 @@ class MastocAPI:
             holds=holds,
         )
 
+    @staticmethod
+    def _setup_hold_from_railway(h: dict) -> Hold:
+        """Convertit un hold du setup d'une face en modèle Hold."""
+        return Hold(
+            id=h.get("id", 0),
+            area=h.get("area", 0) or 0,
+            polygon_str=h.get("polygon_str", ""),
+            touch_polygon_str=h.get("touch_polygon_str", ""),
+            path_str=h.get("path_str", ""),
+            centroid_str=h.get("centroid_str", "0 0"),
+            center_tape_str=h.get("center_tape_str", ""),
+            right_tape_str=h.get("right_tape_str", ""),
+            left_tape_str=h.get("left_tape_str", ""),
+        )
+
     # =========================================================================
     # Conversion des données Railway vers modèles
     # =========================================================================
@@ -537,7 +688,103 @@ class MastocAPI:
             climbs_synced (avec stokt_id), climbs_local (sans stokt_id)
         """
         response = self._request("get", "api/sync/stats")
-        return response.json()
+        return self._json(response)
+
+    def get_changes(
+        self,
+        cursor: int = 0,
+        limit: int = 500,
+        face_id: Optional[str] = None,
+    ) -> dict:
+        """
+        GET /api/sync/changes
+
+        Récupère les modifications (créations, mises à jour, suppressions)
+        postérieures au curseur.
+
+        Args:
+            cursor: Dernier numéro de séquence déjà appliqué
+            limit: Nombre maximum d'entrées du journal
+            face_id: Filtrer par face
+
+        Returns:
+            Dict avec changes (liste de {seq, entity_type, entity_id, action,
+            climb: Climb | None}), cursor (à repasser) et has_more
+        """
+        params = {"cursor": cursor, "limit": limit}
+        if face_id:
+            params["face_id"] = face_id
+
+        response = self._request("get", "api/sync/changes", params=params)
+        data = self._json(response)
+
+        changes = []
+        for entry in data.get("changes", []):
+            climb_data = entry.get("climb")
+            changes.append({
+                "seq": entry.get("seq", 0),
+                "entity_type": entry.get("entity_type", ""),
+                "entity_id": str(entry.get("entity_id", "")),
+                "action": entry.get("action", ""),
+                "climb": self._climb_from_railway(climb_data) if climb_data else None,
+            })
+
+        return {
+            "changes": changes,
+            "cursor": data.get("cursor", cursor),
+            "has_more": data.get("has_more", False),
+        }
+
+    def export_face(self, face_id: str) -> Iterator[tuple[str, object]]:
+        """
+        GET /api/sync/export/face/{face_id}
+
+        Export complet d'une face, lu en flux (NDJSON) : la mémoire ne
+        dépend pas du nombre de climbs.
+
+        Args:
+            face_id: ID de la face
+
+        Yields:
+            (type, valeur) dans l'ordre du serveur : ("snapshot", {face_id,
+            cursor}), ("face", Face sans prises), ("hold", Hold)*,
+            ("setter", ClimbSetter)*, ("climb", Climb)*, ("end", {counts})
+
+        Raises:
+            MastocAPIError: Si le flux s'arrête avant la ligne "end"
+        """
+        response = self._request("get", f"api/sync/export/face/{face_id}", stream=True)
+        with response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                record = json.loads(line)
+                kind = record.pop("type", None)
+                if kind == "face":
+                    yield kind, self._face_from_railway(record)
+                elif kind == "hold":
+                    yield kind, self._setup_hold_from_railway(record)
+                elif kind == "setter":
+                    yield kind, ClimbSetter(id=str(record.get("id", "")),
+                                            full_name=record.get("full_name", ""))
+                elif kind == "climb":
+                    yield kind, self._climb_from_railway(record)
+                elif kind == "snapshot":
+                    yield kind, record
+                elif kind == "end":
+                    yield kind, record
+                    return
+        raise MastocAPIError(f"Export de la face {face_id} interrompu")
+
+    def get_changes_head(self) -> int:
+        """
+        GET /api/sync/changes/head
+
+        Returns:
+            Numéro de séquence courant du journal des modifications
+        """
+        response = self._request("get", "api/sync/changes/head")
+        return self._json(response).get("cursor", 0)
 
     # =========================================================================
     # Hold Annotations (ADR-008)
@@ -558,7 +805,7 @@ class MastocAPI:
         from mastoc.api.models import AnnotationData
 
         response = self._request("get", f"api/holds/{hold_id}/annotations")
-        return AnnotationData.from_api(response.json())
+        return AnnotationData.from_api(self._json(response))
 
     def set_hold_annotation(
         self,
@@ -597,7 +844,7 @@ class MastocAPI:
             data["notes"] = notes
 
         response = self._request("put", f"api/holds/{hold_id}/annotations", json=data)
-        annotation = HoldAnnotation.from_api(response.json())
+        annotation = HoldAnnotation.from_api(self._json(response))
         annotation.hold_id = hold_id
         return annotation
 
@@ -617,6 +864,62 @@ class MastocAPI:
         self._request("delete", f"api/holds/{hold_id}/annotations")
         return True
 
+    def get_wall_annotations(
+        self,
+        face_id: str,
+        updated_since: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 500,
+    ) -> dict:
+        """
+        GET /api/holds/annotations/face/{face_id}
+
+        Annotations de toutes les prises annotées d'un mur (une page).
+
+        Args:
+            face_id: ID de la face
+            updated_since: server_time d'un appel précédent (None = instantané complet)
+            page: Numéro de page
+            page_size: Prises par page (max 1000)
+
+        Returns:
+            Dict {annotations: list de dicts bruts (stockables tels quels,
+            cf. AnnotationData.from_api), count, server_time}
+        """
+        params = {"page": page, "page_size": page_size}
+        if updated_since:
+            params["updated_since"] = updated_since
+        response = self._request(
+            "get", f"api/holds/annotations/face/{face_id}", params=params
+        )
+        data = self._json(response)
+        return {
+            "annotations": data.get("annotations", []),
+            "count": data.get("count", 0),
+            "server_time": data.get("server_time"),
+        }
+
+    def write_hold_annotations(self, items: list[dict]) -> dict:
+        """
+        POST /api/holds/annotations/bulk
+
+        Applique un lot d'écritures d'annotations (file d'attente hors-ligne).
+        Requiert authentification JWT.
+
+        Args:
+            items: Liste de {hold_id, grip_type, condition, difficulty, notes}
+                ou {hold_id, delete: True}
+
+        Returns:
+            Dict {applied, errors: {hold_id: message}}
+        """
+        response = self._request("post", "api/holds/annotations/bulk", json={"items": items})
+        data = self._json(response)
+        return {
+            "applied": data.get("applied", 0),
+            "errors": {int(k): v for k, v in data.get("errors", {}).items()},
+        }
+
     def get_hold_annotations_batch(self, hold_ids: list[int]) -> dict[int, "AnnotationData"]:
         """
         POST /api/holds/annotations/batch
@@ -636,7 +939,7 @@ class MastocAPI:
             "api/holds/annotations/batch",
             json={"hold_ids": hold_ids}
         )
-        data = response.json()
+        data = self._json(response)
 
         result = {}
         for hold_id_str, annotation_data in data.get("annotations", {}).items():
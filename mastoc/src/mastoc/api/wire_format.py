@@ -0,0 +1,34 @@
+"""
+Décodage du format de transfert compact (JSON colonnaire) de mastoc-api.
+
+Le serveur peut encoder les listes d'objets homogènes sous la forme
+{"__columns__": [...], "__rows__": [[...], ...]} quand le client annonce
+`Accept: application/vnd.mastoc.columnar+json`. Ce module reconstruit
+la représentation standard (liste de dicts).
+"""
+
+from typing import Any
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.mastoc.columnar+json"
+
+
+def from_columnar(value: Any) -> Any:
+    """Reconstruit récursivement les listes de dicts encodées en colonnes."""
+    if isinstance(value, dict):
+        if set(value.keys()) == {"__columns__", "__rows__"}:
+            columns = value["__columns__"]
+            return [
+                {c: from_columnar(v) for c, v in zip(columns, row)}
+                for row in value["__rows__"]
+            ]
+        return {k: from_columnar(v) for k, v in value.items()}
+
+    if isinstance(value, list):
+        return [from_columnar(item) for item in value]
+
+    return value
+
+
+def is_columnar(content_type: Any) -> bool:
+    """True si le Content-Type annonce le format colonnaire."""
+    return isinstance(content_type, str) and content_type.startswith(COLUMNAR_MEDIA_TYPE)
@@ -4,19 +4,24 @@ Chargeur asynchrone pour les annotations de prises.
 ADR-008 : Hold Annotations (Annotations Crowd-Sourcées).
 
 Les annotations (consensus + annotation utilisateur) sont chargées en arrière-plan
-pour ne jamais bloquer l'interface.
+pour ne jamais bloquer l'interface. WallAnnotationStore conserve en base
+locale les annotations de tout un mur (modes de coloration de l'overlay).
 """
 
-from typing import Optional, Callable
-from threading import Thread, Lock
-from queue import Queue
-import time
+import logging
+from pathlib import Path
+from threading import Thread
+from typing import Callable, Optional
 
 from mastoc.api.railway_client import MastocAPI, AuthenticationError
 from mastoc.api.models import AnnotationData, HoldConsensus
+from mastoc.core.prefetch import PrefetchingLoader
+from mastoc.db import Database, AnnotationRepository
 
+logger = logging.getLogger(__name__)
 
-class AnnotationLoader:
+
+class AnnotationLoader(PrefetchingLoader):
     """
     Charge les annotations de prises en arrière-plan.
 
@@ -26,68 +31,27 @@ class AnnotationLoader:
         loader.load(hold_id)  # Non bloquant
     """
 
-    def __init__(self, api: MastocAPI, cache_ttl: int = 600):
+    def __init__(
+        self,
+        api: MastocAPI,
+        cache_ttl: int = 600,
+        max_entries: int = 2000,
+        cache_path: Optional[Path] = None,
+        workers: int = 3,
+    ):
         """
         Args:
             api: Client API mastoc (Railway)
             cache_ttl: Durée de vie du cache en secondes (défaut: 10 min)
+            max_entries: Nombre de prises gardées en cache (LRU)
+            cache_path: Base SQLite pour réutiliser le cache hors-ligne
+            workers: Chargements simultanés (prise courante + préchargements)
         """
+        super().__init__(cache_ttl, max_entries=max_entries, cache_path=cache_path, workers=workers)
         self.api = api
-        self.cache_ttl = cache_ttl
-
-        # Cache: hold_id -> (AnnotationData, timestamp)
-        self._cache: dict[int, tuple[AnnotationData, float]] = {}
-        self._cache_lock = Lock()
-
-        # Queue de requêtes
-        self._queue: Queue[int] = Queue()
-        self._current_hold_id: Optional[int] = None
-
-        # Callbacks
-        self.on_data_loaded: Optional[Callable[[AnnotationData], None]] = None
-        self.on_error: Optional[Callable[[int, str], None]] = None
-
-        # Thread de chargement
-        self._worker: Optional[Thread] = None
-        self._running = False
-
-    def start(self):
-        """Démarre le worker de chargement."""
-        if self._running:
-            return
-        self._running = True
-        self._worker = Thread(target=self._worker_loop, daemon=True)
-        self._worker.start()
-
-    def stop(self):
-        """Arrête le worker."""
-        self._running = False
-        self._queue.put(-1)  # Signal d'arrêt
-        if self._worker:
-            self._worker.join(timeout=2)
-
-    def load(self, hold_id: int):
-        """
-        Demande le chargement des annotations pour une prise.
-
-        Non bloquant. Les données seront livrées via on_data_loaded.
-        Si les données sont en cache et valides, elles sont retournées immédiatement.
-        """
-        self._current_hold_id = hold_id
-
-        # Vérifier le cache
-        cached = self._get_cached(hold_id)
-        if cached:
-            if self.on_data_loaded:
-                self.on_data_loaded(cached)
-            return
-
-        # Ajouter à la queue
-        self._queue.put(hold_id)
 
-        # Démarrer le worker si nécessaire
-        if not self._running:
-            self.start()
+    def _fetch(self, hold_id: int) -> AnnotationData:
+        return self._fetch_annotation_data(hold_id)
 
     def load_batch(self, hold_ids: list[int]):
         """
@@ -113,70 +77,6 @@ class AnnotationLoader:
             if self.on_error:
                 self.on_error(0, f"Batch load error: {e}")
 
-    def _get_cached(self, hold_id: int) -> Optional[AnnotationData]:
-        """Retourne les données du cache si valides."""
-        with self._cache_lock:
-            if hold_id in self._cache:
-                data, timestamp = self._cache[hold_id]
-                if time.time() - timestamp < self.cache_ttl:
-                    return data
-                else:
-                    del self._cache[hold_id]
-        return None
-
-    def _set_cached(self, hold_id: int, data: AnnotationData):
-        """Ajoute des données au cache."""
-        with self._cache_lock:
-            self._cache[hold_id] = (data, time.time())
-
-    def get_cached(self, hold_id: int) -> Optional[AnnotationData]:
-        """
-        Retourne les données du cache (sans vérifier l'expiration).
-
-        Utile pour l'affichage UI quand on veut les données même périmées.
-        """
-        with self._cache_lock:
-            if hold_id in self._cache:
-                data, _ = self._cache[hold_id]
-                return data
-        return None
-
-    def invalidate(self, hold_id: int):
-        """Invalide le cache pour une prise."""
-        with self._cache_lock:
-            if hold_id in self._cache:
-                del self._cache[hold_id]
-
-    def clear_cache(self):
-        """Vide tout le cache."""
-        with self._cache_lock:
-            self._cache.clear()
-
-    def _worker_loop(self):
-        """Boucle principale du worker."""
-        while self._running:
-            try:
-                hold_id = self._queue.get(timeout=1)
-                if hold_id == -1:
-                    break
-
-                # Si l'utilisateur a changé de prise, ignorer cette requête
-                if hold_id != self._current_hold_id:
-                    continue
-
-                # Charger les données
-                data = self._fetch_annotation_data(hold_id)
-
-                # Si toujours la prise actuelle, livrer les données
-                if hold_id == self._current_hold_id:
-                    self._set_cached(hold_id, data)
-                    if self.on_data_loaded:
-                        self.on_data_loaded(data)
-
-            except Exception:
-                # Timeout de la queue, continuer
-                pass
-
     def _fetch_annotation_data(self, hold_id: int) -> AnnotationData:
         """Récupère les annotations depuis l'API."""
         try:
@@ -200,6 +100,108 @@ class AnnotationLoader:
             )
 
 
+class WallAnnotationStore:
+    """
+    Annotations de toutes les prises d'un mur, persistées localement.
+
+    get() lit la base locale (instantané, hors-ligne) ; refresh() complète
+    depuis l'API : instantané complet la première fois, puis uniquement
+    les prises modifiées depuis le dernier appel (updated_since).
+
+    Usage:
+        store = WallAnnotationStore(api, db)
+        overlay.set_annotation_data(store.get(face_id))
+        store.refresh_async(face_id, on_done=overlay.set_annotation_data)
+    """
+
+    SYNCED_AT_KEY = "annotations_synced_at:{face_id}"
+
+    def __init__(self, api: MastocAPI, db: Database, page_size: int = 500):
+        """
+        Args:
+            api: Client API mastoc (Railway)
+            db: Base locale
+            page_size: Prises par requête
+        """
+        self.api = api
+        self.db = db
+        self.repo = AnnotationRepository(db)
+        self.page_size = page_size
+
+    @staticmethod
+    def _hold_key(item: dict) -> int:
+        """Identifiant client d'une prise (stokt_id, comme MastocAPI._hold_from_railway)."""
+        return item.get("hold_stokt_id") or item["hold_id"]
+
+    @staticmethod
+    def _to_annotation_data(hold_id: int, item: dict) -> AnnotationData:
+        data = AnnotationData.from_api(item)
+        data.hold_id = hold_id
+        data.consensus.hold_id = hold_id
+        if data.user_annotation:
+            data.user_annotation.hold_id = hold_id
+        return data
+
+    def get(self, face_id: str) -> dict[int, AnnotationData]:
+        """Annotations du mur depuis la base locale (sans réseau)."""
+        return {
+            hold_id: self._to_annotation_data(hold_id, item)
+            for hold_id, item in self.repo.get_wall_annotations(face_id).items()
+        }
+
+    def refresh(self, face_id: str, full: bool = False) -> dict[int, AnnotationData]:
+        """
+        Met à jour l'instantané local depuis l'API.
+
+        Args:
+            face_id: ID de la face
+            full: Forcer un instantané complet
+
+        Returns:
+            Annotations du mur après mise à jour
+        """
+        key = self.SYNCED_AT_KEY.format(face_id=face_id)
+        since = None if full else self.db.get_metadata(key)
+
+        items: dict[int, dict] = {}
+        server_time = None
+        page = 1
+        while True:
+            data = self.api.get_wall_annotations(
+                face_id, updated_since=since, page=page, page_size=self.page_size
+            )
+            # L'heure de la première page : rien de ce qui change pendant
+            # la pagination n'est perdu au prochain delta
+            server_time = server_time or data["server_time"]
+            for item in data["annotations"]:
+                items[self._hold_key(item)] = item
+            if page * self.page_size >= data["count"]:
+                break
+            page += 1
+
+        self.repo.save_wall_annotations(face_id, items, replace=since is None)
+        if server_time:
+            self.db.set_metadata(key, server_time)
+        return self.get(face_id)
+
+    def refresh_async(
+        self,
+        face_id: str,
+        on_done: Optional[Callable[[dict[int, AnnotationData]], None]] = None,
+    ):
+        """refresh() en arrière-plan ; hors-ligne, l'instantané local reste servi."""
+        def run():
+            try:
+                annotations = self.refresh(face_id)
+            except Exception as e:
+                logger.info(f"Annotations du mur non rafraîchies: {e}")
+                return
+            if on_done:
+                on_done(annotations)
+
+        Thread(target=run, daemon=True).start()
+
+
 class AnnotationLoaderSync:
     """
     Version synchrone du loader pour les cas simples.
@@ -2,19 +2,80 @@
 Gestionnaire d'assets (images) pour mastoc.
 
 Télécharge et cache les images localement dans ~/.mastoc/images/
+(murs depuis Stokt, avatars mastoc en miniatures à la taille affichée).
+
+Le cache est borné en taille : au-delà, les fichiers les moins récemment
+utilisés sont supprimés. prefetch() télécharge une liste d'images en
+parallèle (par exemple après une synchronisation) pour que l'interface
+fonctionne ensuite hors-ligne.
 """
 
 import hashlib
+import json
 import logging
+import os
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Optional
+
+from requests.adapters import HTTPAdapter
+
+from mastoc.core.config import AppConfig
 
 logger = logging.getLogger(__name__)
 
 # URL de base Stokt pour les images (les images sont publiques)
 STOKT_MEDIA_URL = "https://www.sostokt.com/media"
 
+# Avatars servis par le serveur mastoc, en miniatures (côtés en px)
+MASTOC_AVATAR_PREFIX = "/api/users/"
+AVATAR_SIZES = (32, 64, 128, 256)
+DEFAULT_AVATAR_SIZE = 64
+AVATAR_TIMEOUT = 15  # secondes (quelques Ko)
+
+# Taille maximale du cache (défaut, voir AppConfig.asset_cache_max_mb)
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Téléchargements simultanés de prefetch (et connexions gardées par hôte)
+PREFETCH_WORKERS = 8
+
+VALIDATORS_SUFFIX = ".validators.json"
+
+# Callback de progression : (current, total, message)
+ProgressCallback = Callable[[int, int, str], None]
+
+
+def avatar_size(display_px: float, device_pixel_ratio: float = 1.0) -> int:
+    """
+    Taille de miniature à demander pour un affichage donné.
+
+    Plus petite taille servie couvrant les pixels physiques affichés (la
+    plus grande au-delà).
+    """
+    needed = display_px * device_pixel_ratio
+    for size in AVATAR_SIZES:
+        if size >= needed:
+            return size
+    return AVATAR_SIZES[-1]
+
+
+@dataclass
+class PrefetchResult:
+    """Bilan d'un prefetch."""
+    downloaded: int = 0
+    not_modified: int = 0
+    cached: int = 0
+    failed: int = 0
+    bytes_downloaded: int = 0
+    evicted: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.downloaded + self.not_modified + self.cached + self.failed
+
 
 class AssetManager:
     """
@@ -22,28 +83,48 @@ class AssetManager:
 
     Télécharge les images depuis Stokt et les cache localement.
     Le cache est dans ~/.mastoc/images/ avec un hash du chemin comme nom de fichier.
+    Les validateurs HTTP (ETag, Last-Modified) sont stockés à côté de chaque
+    image pour revalider par GET conditionnel.
+
+    Chaque accès rafraîchit la date de modification du fichier : au-delà de
+    max_cache_bytes, les fichiers les plus anciens sont supprimés (LRU).
     """
 
-    def __init__(self, cache_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        server_url: Optional[str] = None,
+        max_cache_bytes: Optional[int] = DEFAULT_MAX_CACHE_BYTES,
+    ):
         """
         Args:
             cache_dir: Répertoire de cache (défaut: ~/.mastoc/images/)
+            server_url: Serveur mastoc des avatars (défaut: URL Railway)
+            max_cache_bytes: Taille maximale du cache (None = illimitée)
         """
         self.cache_dir = cache_dir or (Path.home() / ".mastoc" / "images")
+        self.server_url = server_url or AppConfig.railway_url
+        self.max_cache_bytes = max_cache_bytes
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+        # Taille du cache, calculée au premier besoin puis tenue à jour
+        self._cache_bytes: Optional[int] = None
 
     @property
     def session(self) -> requests.Session:
-        """Session HTTP réutilisable."""
+        """Session HTTP réutilisable (connexions partagées entre threads)."""
         if self._session is None:
             self._session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=PREFETCH_WORKERS)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
             self._session.headers.update({
                 "User-Agent": "mastoc/1.0",
             })
         return self._session
 
-    def _get_cache_path(self, remote_path: str) -> Path:
+    def _get_cache_path(self, remote_path: str, ext: Optional[str] = None) -> Path:
         """
         Génère le chemin de cache local pour un chemin distant.
 
@@ -51,12 +132,13 @@ class AssetManager:
 
         Args:
             remote_path: Chemin relatif de l'image (ex: "CACHE/images/walls/.../face.jpg")
+            ext: Extension imposée (chemins sans extension, ex: URL d'API)
 
         Returns:
             Chemin local du fichier caché
         """
         # Extraire l'extension
-        ext = Path(remote_path).suffix or ".jpg"
+        ext = ext or Path(remote_path).suffix or ".jpg"
 
         # Hash du chemin pour éviter les caractères spéciaux
         path_hash = hashlib.md5(remote_path.encode()).hexdigest()
@@ -75,6 +157,71 @@ class AssetManager:
         """
         return f"{STOKT_MEDIA_URL}/{remote_path}"
 
+    def _get_validators_path(self, cache_path: Path) -> Path:
+        """Fichier des validateurs HTTP associé à un fichier caché."""
+        return cache_path.with_name(f"{cache_path.name}{VALIDATORS_SUFFIX}")
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """Écrit via un fichier temporaire : jamais de fichier partiel en cache."""
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _load_validators(self, cache_path: Path) -> dict:
+        """Charge les validateurs stockés pour un fichier caché."""
+        validators_path = self._get_validators_path(cache_path)
+        if not validators_path.exists():
+            return {}
+        try:
+            return json.loads(validators_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_validators(self, cache_path: Path, response) -> None:
+        """Stocke l'ETag / Last-Modified d'une réponse à côté du fichier."""
+        validators = {}
+        for header, key in (("ETag", "etag"), ("Last-Modified", "last_modified")):
+            value = response.headers.get(header)
+            if isinstance(value, str):
+                validators[key] = value
+
+        validators_path = self._get_validators_path(cache_path)
+        if validators:
+            self._write_atomic(validators_path, json.dumps(validators).encode("utf-8"))
+        elif validators_path.exists():
+            validators_path.unlink(missing_ok=True)
+
+    def _conditional_headers(self, cache_path: Path) -> dict:
+        """Headers If-None-Match / If-Modified-Since pour revalider un fichier."""
+        if not cache_path.exists():
+            return {}
+        validators = self._load_validators(cache_path)
+        if validators.get("etag"):
+            return {"If-None-Match": validators["etag"]}
+        if validators.get("last_modified"):
+            return {"If-Modified-Since": validators["last_modified"]}
+        return {}
+
+    def _face_target(self, picture_path: str) -> tuple[str, Path, float]:
+        """(URL, fichier en cache, timeout) d'une image de face."""
+        return self._get_remote_url(picture_path), self._get_cache_path(picture_path), 60
+
+    def _avatar_target(self, avatar_path: str, size: int) -> tuple[str, Path, float]:
+        """(URL, fichier en cache, timeout) d'un avatar."""
+        if not avatar_path.startswith(MASTOC_AVATAR_PREFIX):
+            # Avatar Stokt : même logique que pour les images de face
+            return self._face_target(avatar_path)
+
+        size = avatar_size(size)
+        separator = "&" if "?" in avatar_path else "?"
+        sized_path = f"{avatar_path}{separator}size={size}"
+        return (
+            f"{self.server_url.rstrip('/')}{sized_path}",
+            self._get_cache_path(sized_path, ext=".webp"),
+            AVATAR_TIMEOUT,
+        )
+
     def get_face_image(self, picture_path: str, force_download: bool = False) -> Optional[Path]:
         """
         Récupère l'image d'une face (mur).
@@ -83,7 +230,8 @@ class AssetManager:
 
         Args:
             picture_path: Chemin de l'image (ex: "CACHE/images/walls/.../face.jpg")
-            force_download: Force le re-téléchargement même si en cache
+            force_download: Revalide le fichier en cache (GET conditionnel si
+                des validateurs sont connus, téléchargement complet sinon)
 
         Returns:
             Chemin local de l'image, ou None si échec
@@ -92,44 +240,218 @@ class AssetManager:
             logger.warning("picture_path est vide")
             return None
 
-        cache_path = self._get_cache_path(picture_path)
+        return self._fetch(*self._face_target(picture_path), force_download)
 
+    def _fetch(
+        self, url: str, cache_path: Path, timeout: float, force_download: bool
+    ) -> Optional[Path]:
+        """Fichier en cache, sinon téléchargé (ou revalidé si force_download)."""
+        path, _, _ = self._download(url, cache_path, timeout, force_download)
+        self._enforce_limit()
+        return path
+
+    def _download(
+        self, url: str, cache_path: Path, timeout: float, force_download: bool
+    ) -> tuple[Optional[Path], str, int]:
+        """
+        Télécharge ou revalide un fichier.
+
+        Returns:
+            (chemin ou None, statut, octets téléchargés) ; statut parmi
+            "cached", "not_modified", "downloaded", "failed"
+        """
         # Vérifier le cache
         if cache_path.exists() and not force_download:
             logger.debug(f"Image en cache: {cache_path}")
-            return cache_path
+            self._touch(cache_path)
+            return cache_path, "cached", 0
 
         # Télécharger
-        url = self._get_remote_url(picture_path)
         logger.info(f"Téléchargement image: {url}")
 
         try:
-            response = self.session.get(url, timeout=60)
+            headers = self._conditional_headers(cache_path)
+            response = self.session.get(url, timeout=timeout, headers=headers)
+
+            if response.status_code == 304 and cache_path.exists():
+                logger.debug(f"Image inchangée (304): {cache_path}")
+                self._touch(cache_path)
+                return cache_path, "not_modified", 0
+
             response.raise_for_status()
 
             # Sauvegarder
-            cache_path.write_bytes(response.content)
+            previous = cache_path.stat().st_size if cache_path.exists() else 0
+            self._write_atomic(cache_path, response.content)
+            self._save_validators(cache_path, response)
+            self._add_cache_bytes(len(response.content) - previous)
             logger.info(f"Image sauvegardée: {cache_path} ({len(response.content)} bytes)")
 
-            return cache_path
+            return cache_path, "downloaded", len(response.content)
 
         except requests.RequestException as e:
             logger.error(f"Erreur téléchargement {url}: {e}")
-            return None
-
-    def get_user_avatar(self, avatar_path: str, force_download: bool = False) -> Optional[Path]:
+            return None, "failed", 0
+
+    def get_user_avatar(
+        self,
+        avatar_path: str,
+        force_download: bool = False,
+        size: int = DEFAULT_AVATAR_SIZE,
+    ) -> Optional[Path]:
         """
         Récupère l'avatar d'un utilisateur.
 
+        Les avatars mastoc (/api/users/<id>/avatar?v=...) sont demandés à
+        la taille d'affichage : le serveur renvoie une miniature WebP de
+        quelques Ko. L'URL étant versionnée, le fichier en cache ne change
+        jamais. Les avatars Stokt sont téléchargés tels quels.
+
         Args:
             avatar_path: Chemin de l'avatar
             force_download: Force le re-téléchargement
+            size: Côté affiché en pixels physiques (voir avatar_size)
 
         Returns:
             Chemin local de l'avatar, ou None si échec
         """
-        # Même logique que pour les images de face
-        return self.get_face_image(avatar_path, force_download)
+        if not avatar_path:
+            return self.get_face_image(avatar_path, force_download)
+        return self._fetch(*self._avatar_target(avatar_path, size), force_download)
+
+    # =========================================================================
+    # Prefetch
+    # =========================================================================
+
+    def prefetch(
+        self,
+        face_pictures: Iterable[str] = (),
+        avatars: Iterable[str] = (),
+        avatar_px: int = DEFAULT_AVATAR_SIZE,
+        revalidate: bool = False,
+        workers: int = PREFETCH_WORKERS,
+        callback: Optional[ProgressCallback] = None,
+    ) -> PrefetchResult:
+        """
+        Télécharge en parallèle des images de faces et des avatars.
+
+        Les fichiers déjà en cache ne sont pas retéléchargés ; avec
+        revalidate, ils sont revalidés par GET conditionnel (un 304 ne
+        transfère rien). Le cache est ramené à sa taille maximale à la fin.
+
+        Args:
+            face_pictures: Chemins d'images de faces
+            avatars: Chemins d'avatars (Stokt ou mastoc)
+            avatar_px: Côté affiché des avatars (voir avatar_size)
+            revalidate: Revalide aussi les fichiers en cache
+            workers: Téléchargements simultanés
+            callback: Fonction (current, total, message) pour la progression
+
+        Returns:
+            Bilan (téléchargés, inchangés, déjà en cache, échecs)
+        """
+        targets: dict[Path, tuple[str, Path, float]] = {}
+        for path in face_pictures:
+            if path:
+                target = self._face_target(path)
+                targets.setdefault(target[1], target)
+        for path in avatars:
+            if path:
+                target = self._avatar_target(path, avatar_px)
+                targets.setdefault(target[1], target)
+
+        result = PrefetchResult()
+        total = len(targets)
+        if callback:
+            callback(0, total, "Téléchargement des images...")
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="assets") as pool:
+            futures = [
+                pool.submit(self._download, url, cache_path, timeout, revalidate)
+                for url, cache_path, timeout in targets.values()
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                _, status, size = future.result()
+                setattr(result, status, getattr(result, status) + 1)
+                result.bytes_downloaded += size
+                if callback:
+                    callback(done, total, f"Images: {done}/{total}")
+
+        result.evicted = self._enforce_limit()
+        logger.info(
+            f"Prefetch: {result.downloaded} téléchargées, {result.not_modified} inchangées, "
+            f"{result.cached} en cache, {result.failed} échecs"
+        )
+        return result
+
+    # =========================================================================
+    # Taille du cache (LRU)
+    # =========================================================================
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Marque un fichier comme utilisé (ordre LRU)."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _cache_entries(self) -> list[tuple[float, int, Path]]:
+        """(dernier accès, taille validateurs compris, chemin) des fichiers en cache."""
+        entries = []
+        for f in self.cache_dir.iterdir():
+            if not f.is_file() or f.name.endswith((VALIDATORS_SUFFIX, ".tmp")):
+                continue
+            try:
+                stat = f.stat()
+            except FileNotFoundError:
+                continue
+            size = stat.st_size
+            validators = self._get_validators_path(f)
+            if validators.exists():
+                size += validators.stat().st_size
+            entries.append((stat.st_mtime, size, f))
+        return entries
+
+    def _add_cache_bytes(self, delta: int) -> None:
+        with self._lock:
+            if self._cache_bytes is not None:
+                self._cache_bytes += delta
+
+    def _enforce_limit(self) -> int:
+        """Supprime les fichiers les moins récents si le cache dépasse sa taille."""
+        if self.max_cache_bytes is None:
+            return 0
+        with self._lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = sum(size for _, size, _ in self._cache_entries())
+            if self._cache_bytes <= self.max_cache_bytes:
+                return 0
+        return self.evict(self.max_cache_bytes)
+
+    def evict(self, max_bytes: int) -> int:
+        """
+        Ramène le cache à max_bytes en supprimant les fichiers les moins
+        récemment utilisés.
+
+        Returns:
+            Nombre de fichiers supprimés
+        """
+        with self._lock:
+            entries = sorted(self._cache_entries())
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in entries:
+                if total <= max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                self._get_validators_path(path).unlink(missing_ok=True)
+                total -= size
+                evicted += 1
+            self._cache_bytes = total
+        if evicted:
+            logger.info(f"Cache: {evicted} fichiers supprimés (LRU)")
+        return evicted
 
     def is_cached(self, remote_path: str) -> bool:
         """Vérifie si une image est en cache."""
@@ -153,10 +475,12 @@ class AssetManager:
             Nombre de fichiers supprimés
         """
         count = 0
-        for f in self.cache_dir.glob("*"):
-            if f.is_file():
-                f.unlink()
-                count += 1
+        with self._lock:
+            for f in self.cache_dir.glob("*"):
+                if f.is_file():
+                    f.unlink()
+                    count += 1
+            self._cache_bytes = 0
         logger.info(f"Cache vidé: {count} fichiers supprimés")
         return count
 
@@ -169,5 +493,26 @@ def get_asset_manager() -> AssetManager:
     """Retourne l'instance globale du gestionnaire d'assets."""
     global _asset_manager
     if _asset_manager is None:
-        _asset_manager = AssetManager()
+        config = AppConfig.load()
+        _asset_manager = AssetManager(
+            server_url=config.railway_url,
+            max_cache_bytes=config.asset_cache_max_mb * 1024 * 1024,
+        )
     return _asset_manager
+
+
+def prefetch_offline_assets(
+    db, manager: Optional[AssetManager] = None, callback: Optional[ProgressCallback] = None
+) -> PrefetchResult:
+    """
+    Précharge les images de toutes les faces et les avatars des setters de
+    la base locale (après une synchronisation), pour un usage hors-ligne.
+    """
+    from mastoc.db.repository import ClimbRepository, HoldRepository
+
+    manager = manager or get_asset_manager()
+    return manager.prefetch(
+        face_pictures=HoldRepository(db).get_face_picture_paths(),
+        avatars=ClimbRepository(db).get_setter_avatars(),
+        callback=callback,
+    )
@@ -5,13 +5,20 @@ Permet d'utiliser soit l'API Stokt (legacy) soit l'API Railway (mastoc-api)
 de manière transparente.
 """
 
+import logging
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional, Callable
 from pathlib import Path
 
 from mastoc.api.models import Climb, Hold, Face, Wall
+from mastoc.core.backend_health import BackendHealth
+from mastoc.core.read_cache import ReadThroughCache
+
+logger = logging.getLogger(__name__)
 
 
 class BackendSource(Enum):
@@ -38,6 +45,22 @@ class BackendConfig:
     fallback_to_stokt: bool = True  # Si Railway échoue, essayer Stokt
     timeout: int = 30
 
+    # Persistance des validateurs ETag Railway (None = en mémoire)
+    validator_cache_path: Optional[Path] = None
+    # Format colonnaire compact pour les listes Railway
+    compact_format: bool = False
+
+    # Cache local des lectures unitaires (climb, holds, setup de face)
+    read_cache_path: Optional[Path] = None  # None = en mémoire
+    read_cache_ttl: float = 300
+
+    # Sélection selon la santé observée (latence, erreurs, disjoncteur)
+    auto_select: bool = True
+    # Lecture doublée vers le secondaire si le principal dépasse son p95
+    hedge_reads: bool = True
+    hedge_delay_default: float = 2.0  # tant que le p95 n'est pas connu
+    hedge_delay_min: float = 0.2
+
 
 ProgressCallback = Callable[[int, int], None]
 
@@ -116,6 +139,8 @@ class RailwayBackend(BackendInterface):
             base_url=config.railway_url,
             api_key=config.railway_api_key,
             timeout=config.timeout,
+            validator_cache_path=config.validator_cache_path,
+            compact_format=config.compact_format,
         ))
         # Face ID par défaut (Montoboard)
         self._default_face_id: Optional[str] = None
@@ -397,6 +422,17 @@ class BackendSwitch:
         # Accéder au backend spécifique si besoin
         if backend.source == BackendSource.STOKT:
             backend.stokt.get_climb_sends(climb_id)
+
+    get_climb, get_holds et get_face_setup passent par un cache local
+    read-through (voir ReadThroughCache) : entrées fraîches servies sans
+    appel réseau, requêtes identiques simultanées fusionnées, entrées
+    périmées rafraîchies en arrière-plan.
+
+    Les lectures suivent la santé observée de chaque backend (voir
+    BackendHealth) : un backend dont le disjoncteur est ouvert passe en
+    second, et une lecture idempotente est doublée vers le secondaire si
+    le principal dépasse son p95 (requête "hedged"), pour ne pas attendre
+    le timeout complet lors d'un démarrage à froid du serveur Railway.
     """
 
     def __init__(self, config: Optional[BackendConfig] = None):
@@ -404,6 +440,11 @@ class BackendSwitch:
 
         self._railway: Optional[RailwayBackend] = None
         self._stokt: Optional[StoktBackend] = None
+        self.cache = ReadThroughCache(
+            self.config.read_cache_path, ttl=self.config.read_cache_ttl
+        )
+        self.health = {source: BackendHealth() for source in BackendSource}
+        self._hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="backend-hedge")
 
         # Initialiser le backend principal
         self._init_backends()
@@ -453,52 +494,50 @@ class BackendSwitch:
         page_size: int = 50,
     ) -> tuple[list[Climb], int]:
         """Récupère les climbs avec pagination."""
-        try:
-            return self.primary.get_climbs(face_id, page, page_size)
-        except Exception as e:
-            if self._can_fallback():
-                return self._fallback.get_climbs(face_id, page, page_size)
-            raise
+        return self._read("get_climbs", face_id, page, page_size, hedge=True)
 
     def get_all_climbs(
         self,
         face_id: Optional[str] = None,
         callback: Optional[ProgressCallback] = None,
     ) -> list[Climb]:
-        """Récupère tous les climbs."""
-        try:
-            return self.primary.get_all_climbs(face_id, callback)
-        except Exception as e:
-            if self._can_fallback():
-                return self._fallback.get_all_climbs(face_id, callback)
-            raise
+        """Récupère tous les climbs (pas de requête doublée : téléchargement long)."""
+        return self._read("get_all_climbs", face_id, callback)
+
+    def _cache_key(self, kind: str, entity_id: str) -> str:
+        """Clé de cache (la source fait partie de la clé)."""
+        return f"{self.config.source.value}:{kind}:{entity_id}"
 
     def get_climb(self, climb_id: str) -> Climb:
-        """Récupère un climb par ID."""
-        try:
-            return self.primary.get_climb(climb_id)
-        except Exception as e:
-            if self._can_fallback():
-                return self._fallback.get_climb(climb_id)
-            raise
+        """Récupère un climb par ID (via le cache local)."""
+        return self.cache.get(
+            self._cache_key("climb", climb_id),
+            lambda: self._fetch_climb(climb_id),
+        )
+
+    def _fetch_climb(self, climb_id: str) -> Climb:
+        # Pas de requête doublée : Stokt télécharge tout le gym pour un climb
+        return self._read("get_climb", climb_id)
 
     def get_holds(self, face_id: str) -> list[Hold]:
-        """Récupère les holds d'une face."""
-        try:
-            return self.primary.get_holds(face_id)
-        except Exception as e:
-            if self._can_fallback():
-                return self._fallback.get_holds(face_id)
-            raise
+        """Récupère les holds d'une face (via le cache local)."""
+        return self.cache.get(
+            self._cache_key("holds", face_id),
+            lambda: self._fetch_holds(face_id),
+        )
+
+    def _fetch_holds(self, face_id: str) -> list[Hold]:
+        return self._read("get_holds", face_id, hedge=True)
 
     def get_face_setup(self, face_id: str) -> Face:
-        """Récupère une face avec ses holds."""
-        try:
-            return self.primary.get_face_setup(face_id)
-        except Exception as e:
-            if self._can_fallback():
-                return self._fallback.get_face_setup(face_id)
-            raise
+        """Récupère une face avec ses holds (via le cache local)."""
+        return self.cache.get(
+            self._cache_key("face_setup", face_id),
+            lambda: self._fetch_face_setup(face_id),
+        )
+
+    def _fetch_face_setup(self, face_id: str) -> Face:
+        return self._read("get_face_setup", face_id, hedge=True)
 
     def create_climb(
         self,
@@ -521,6 +560,84 @@ class BackendSwitch:
             is_private=is_private,
         )
 
+    # =========================================================================
+    # Sélection et requêtes doublées
+    # =========================================================================
+
+    def _ordered_backends(self) -> tuple[BackendInterface, Optional[BackendInterface]]:
+        """
+        (principal, secondaire) pour une lecture.
+
+        Le secondaire n'existe que si le fallback est possible. Avec
+        auto_select, un principal dont le disjoncteur refuse l'appel cède
+        la place au secondaire s'il est sain ; après le délai de
+        refroidissement, une seule lecture sert d'essai au principal.
+        """
+        primary = self.primary
+        secondary = self._fallback if self._can_fallback() else None
+        if (
+            secondary is not None
+            and self.config.auto_select
+            and not self.health[primary.source].allow_request()
+            and not self.health[secondary.source].is_open
+        ):
+            return secondary, primary
+        return primary, secondary
+
+    def _timed(self, backend: BackendInterface, method: str, *args):
+        """Appelle une méthode du backend en alimentant son suivi de santé."""
+        health = self.health[backend.source]
+        start = time.monotonic()
+        try:
+            result = getattr(backend, method)(*args)
+        except Exception:
+            health.record_failure()
+            raise
+        health.record_success(time.monotonic() - start)
+        return result
+
+    def _hedge_delay(self, backend: BackendInterface) -> float:
+        """Délai avant de doubler la requête : p95 observé, borné."""
+        p95 = self.health[backend.source].p95()
+        if p95 is None:
+            return self.config.hedge_delay_default
+        return max(self.config.hedge_delay_min, p95)
+
+    def _read(self, method: str, *args, hedge: bool = False):
+        """Lecture idempotente : principal, puis secondaire (fallback ou hedge)."""
+        primary, secondary = self._ordered_backends()
+        if secondary is None:
+            return self._timed(primary, method, *args)
+
+        if not (hedge and self.config.hedge_reads):
+            try:
+                return self._timed(primary, method, *args)
+            except Exception as e:
+                logger.info(f"{method} via {primary.source.value} échoué ({e}), fallback")
+                return self._timed(secondary, method, *args)
+
+        first = self._hedge_pool.submit(self._timed, primary, method, *args)
+        try:
+            return first.result(timeout=self._hedge_delay(primary))
+        except FuturesTimeout:
+            logger.info(f"{method} lent sur {primary.source.value}, requête doublée")
+        except Exception as e:
+            logger.info(f"{method} via {primary.source.value} échoué ({e}), fallback")
+            return self._timed(secondary, method, *args)
+
+        second = self._hedge_pool.submit(self._timed, secondary, method, *args)
+        error = None
+        for future in as_completed([first, second]):
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+        raise error
+
+    def health_status(self) -> dict:
+        """Santé observée de chaque backend."""
+        return {source.value: health.snapshot() for source, health in self.health.items()}
+
     def _can_fallback(self) -> bool:
         """Vérifie si le fallback est possible."""
         if not self.config.fallback_to_stokt:
@@ -0,0 +1,133 @@
+"""
+Suivi de santé des backends (latence, erreurs, disjoncteur).
+
+Chaque backend a un BackendHealth alimenté par BackendSwitch à chaque
+appel : latence lissée (EWMA), taux d'erreur lissé, fenêtre glissante pour
+le p95 et disjoncteur (circuit breaker) qui écarte le backend après
+plusieurs échecs consécutifs, le temps d'un délai de refroidissement.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class BackendHealth:
+    """
+    Santé observée d'un backend.
+
+    Disjoncteur : fermé tant que les appels réussissent ; ouvert après
+    `failure_threshold` échecs consécutifs ; semi-ouvert à l'issue de
+    `cooldown` secondes. En semi-ouvert, allow_request() n'admet qu'un seul
+    appel d'essai à la fois : son succès referme le disjoncteur, son échec
+    le rouvre aussitôt pour un nouveau délai.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        window: int = 50,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.ewma_latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self._state = CLOSED
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float):
+        """Enregistre un appel réussi et sa durée (secondes)."""
+        with self._lock:
+            self._latencies.append(latency)
+            if self.ewma_latency is None:
+                self.ewma_latency = latency
+            else:
+                self.ewma_latency += self.alpha * (latency - self.ewma_latency)
+            self.error_rate *= 1 - self.alpha
+            self.consecutive_failures = 0
+            self._state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """
+        Enregistre un échec ; ouvre le disjoncteur au-delà du seuil, ou
+        immédiatement si l'appel d'essai du semi-ouvert échoue.
+        """
+        with self._lock:
+            self.error_rate += self.alpha * (1 - self.error_rate)
+            self.consecutive_failures += 1
+            if (
+                self._state == HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self._state = OPEN
+                self._open_until = self._clock() + self.cooldown
+                self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """
+        Admet ou non un appel vers le backend.
+
+        Fermé : toujours. Ouvert : jamais avant la fin du délai ; ensuite
+        le premier appelant passe en semi-ouvert et obtient l'essai, les
+        autres sont refusés jusqu'à son résultat.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._clock() < self._open_until:
+                return False
+            if self._probe_in_flight:
+                return False
+            self._state = HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    @property
+    def state(self) -> str:
+        """closed, open ou half_open (délai écoulé : un essai est admissible)."""
+        with self._lock:
+            if self._state == OPEN and self._clock() >= self._open_until:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True si le disjoncteur écarte le backend (aucun appel admis)."""
+        with self._lock:
+            if self._state == OPEN:
+                return self._clock() < self._open_until
+            return self._probe_in_flight
+
+    def p95(self) -> Optional[float]:
+        """95e centile des latences récentes (None si trop peu d'échantillons)."""
+        with self._lock:
+            if len(self._latencies) < 5:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def snapshot(self) -> dict:
+        """État courant (affichage / logs)."""
+        return {
+            "ewma_latency": self.ewma_latency,
+            "p95": self.p95(),
+            "error_rate": round(self.error_rate, 3),
+            "consecutive_failures": self.consecutive_failures,
+            "circuit_open": self.is_open,
+            "circuit_state": self.state,
+        }
@@ -24,6 +24,9 @@ class AppConfig:
     railway_api_key: Optional[str] = None
     railway_url: str = "https://mastoc-production.up.railway.app"
 
+    # Cache d'images (~/.mastoc/images), taille maximale en Mo
+    asset_cache_max_mb: int = 512
+
     # Stokt (token expire, donc on ne le persiste pas)
     # stokt_token n'est pas persisté volontairement
 
@@ -50,6 +53,7 @@ class AppConfig:
                 source=data.get("source", "stokt"),
                 railway_api_key=data.get("railway_api_key"),
                 railway_url=data.get("railway_url", "https://mastoc-production.up.railway.app"),
+                asset_cache_max_mb=data.get("asset_cache_max_mb", 512),
             )
             logger.info(f"Configuration chargée depuis {config_path}")
             logger.debug(f"  Source: {config.source}")
@@ -75,6 +79,7 @@ class AppConfig:
                 "source": self.source,
                 "railway_api_key": self.railway_api_key,
                 "railway_url": self.railway_url,
+                "asset_cache_max_mb": self.asset_cache_max_mb,
             }
 
             with open(config_path, "w", encoding="utf-8") as f:
@@ -0,0 +1,411 @@
+"""
+File d'attente des écritures (outbox) persistée dans la base locale.
+
+Les écritures (likes, bookmarks, annotations de prises, créations de
+climbs) sont enregistrées localement puis envoyées par lots dès que le
+réseau est disponible. L'interface reste immédiate et fonctionne
+hors-ligne.
+
+Les intentions redondantes sont fusionnées à l'enregistrement :
+- like/unlike (et bookmark) : seule la valeur finale compte ; un aller-retour
+  qui ramène à l'état du serveur annule l'intention ;
+- annotations : les modifications successives d'une prise sont fusionnées
+  champ par champ, une suppression remplace tout.
+
+Les annotations et créations de climbs partent en lots vers mastoc-api
+(POST /api/holds/annotations/bulk, POST /api/climbs/batch). Likes et
+bookmarks sont gérés par Stokt, sans endpoint de lot : une requête par
+intention nette.
+"""
+
+import logging
+import threading
+import uuid
+from typing import Callable, Optional
+
+import requests
+
+from mastoc.api.client import AuthenticationError as StoktAuthenticationError
+from mastoc.api.models import Climb
+from mastoc.api.railway_client import AuthenticationError as MastocAuthenticationError
+from mastoc.db import Database, OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+TOGGLE_KINDS = ("like", "bookmark")
+ANNOTATION_FIELDS = ("grip_type", "condition", "difficulty", "notes")
+
+
+class TransientError(Exception):
+    """Échec temporaire : les intentions restent en file, sans compter d'échec."""
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    True si l'erreur justifie de réessayer plus tard sans pénalité.
+
+    Réseau indisponible, authentification manquante (l'utilisateur peut se
+    reconnecter), 429 et erreurs serveur 5xx.
+    """
+    if isinstance(error, (
+        requests.ConnectionError,
+        requests.Timeout,
+        StoktAuthenticationError,
+        MastocAuthenticationError,
+        TransientError,
+    )):
+        return True
+    response = getattr(error, "response", None)
+    if isinstance(error, requests.HTTPError) and response is not None:
+        return response.status_code == 429 or response.status_code >= 500
+    return False
+
+
+class Outbox:
+    """
+    Écritures en attente d'envoi.
+
+    Usage:
+        outbox = Outbox(db, mastoc_api=railway_api, stokt_api=stokt_api)
+        outbox.record_like(climb_id, liked=True, previous=False)
+        outbox.start_background(interval=30)   # envoi dès que possible
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        mastoc_api=None,
+        stokt_api=None,
+        batch_size: int = 100,
+        max_attempts: int = 5,
+    ):
+        """
+        Args:
+            db: Base locale (table outbox)
+            mastoc_api: Client mastoc-api (annotations, créations de climbs)
+            stokt_api: Client Stokt (likes, bookmarks)
+            batch_size: Éléments par requête de lot
+            max_attempts: Échecs définitifs tolérés avant abandon d'une intention
+        """
+        self.repo = OutboxRepository(db)
+        self.mastoc_api = mastoc_api
+        self.stokt_api = stokt_api
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+        # Valeurs de like/bookmark en cours d'envoi : (kind, climb_id) -> valeur
+        self._inflight: dict[tuple[str, str], bool] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Callbacks
+        self.on_climb_created: Optional[Callable[[str, Climb], None]] = None
+        self.on_dropped: Optional[Callable[[dict, str], None]] = None
+
+    # =========================================================================
+    # Enregistrement
+    # =========================================================================
+
+    def record_like(self, climb_id: str, liked: bool, previous: bool):
+        """Enregistre l'état de like voulu ; `previous` est l'état affiché avant l'action."""
+        self._record_toggle("like", climb_id, liked, previous)
+
+    def record_bookmark(self, climb_id: str, bookmarked: bool, previous: bool):
+        """Enregistre l'état de bookmark voulu."""
+        self._record_toggle("bookmark", climb_id, bookmarked, previous)
+
+    def _record_toggle(self, kind: str, climb_id: str, value: bool, previous: bool):
+        """
+        Fusionne un toggle : `base` mémorise l'état du serveur lors de la
+        première action, l'intention disparaît si la valeur y revient.
+        """
+        with self._lock:
+            entry = self.repo.get(kind, climb_id)
+            base = entry["payload"]["base"] if entry else previous
+            if value == base and (kind, climb_id) not in self._inflight:
+                self.repo.discard(kind, climb_id)
+            else:
+                self.repo.put(kind, climb_id, {"value": value, "base": base})
+        self._wake.set()
+
+    def record_annotation(
+        self,
+        hold_id: int,
+        grip_type: Optional[str] = None,
+        condition: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        notes: Optional[str] = None,
+    ):
+        """
+        Enregistre une modification d'annotation (mêmes règles que
+        MastocAPI.set_hold_annotation : None conserve, "" efface).
+        """
+        values = {"grip_type": grip_type, "condition": condition,
+                  "difficulty": difficulty, "notes": notes}
+        fields = {k: v for k, v in values.items() if v is not None}
+        with self._lock:
+            entry = self.repo.get("annotation", hold_id)
+            if entry is None:
+                payload = fields
+            elif entry["payload"].get("delete"):
+                # Suppression puis saisie : repartir d'une annotation vide
+                payload = {**{k: "" for k in ANNOTATION_FIELDS}, **fields}
+            else:
+                payload = {**entry["payload"], **fields}
+            self.repo.put("annotation", hold_id, payload)
+        self._wake.set()
+
+    def record_annotation_delete(self, hold_id: int):
+        """Enregistre la suppression d'une annotation (remplace les modifications)."""
+        with self._lock:
+            self.repo.put("annotation", hold_id, {"delete": True})
+        self._wake.set()
+
+    def record_climb(
+        self,
+        face_id: str,
+        name: str,
+        holds_list: str,
+        grade_font: Optional[str] = None,
+        grade_ircra: Optional[float] = None,
+        feet_rule: Optional[str] = None,
+        description: Optional[str] = None,
+        is_private: bool = False,
+    ) -> str:
+        """
+        Enregistre la création d'un climb sur mastoc-api.
+
+        Returns:
+            Identifiant local (client_ref), repris par on_climb_created
+        """
+        client_ref = uuid.uuid4().hex
+        data = {
+            "face_id": face_id,
+            "name": name,
+            "holds_list": holds_list,
+            "grade_font": grade_font,
+            "grade_ircra": grade_ircra,
+            "feet_rule": feet_rule,
+            "description": description,
+            "is_private": is_private,
+        }
+        with self._lock:
+            self.repo.put("climb", client_ref, {k: v for k, v in data.items() if v is not None})
+        self._wake.set()
+        return client_ref
+
+    def pending_count(self) -> int:
+        """Nombre d'intentions en attente."""
+        return self.repo.count()
+
+    def pending_value(self, kind: str, climb_id: str) -> Optional[bool]:
+        """Valeur de like/bookmark en attente pour un climb (None si aucune)."""
+        entry = self.repo.get(kind, climb_id)
+        return entry["payload"]["value"] if entry else None
+
+    # =========================================================================
+    # Envoi
+    # =========================================================================
+
+    def flush(self) -> dict:
+        """
+        Envoie les intentions en attente.
+
+        S'arrête sur une erreur temporaire (réseau, auth, 429/5xx) : les
+        intentions restent en file. Une erreur définitive incrémente le
+        compteur d'échecs ; au-delà de max_attempts l'intention est abandonnée.
+
+        Returns:
+            Dict avec {sent, failed, dropped, remaining, offline}
+        """
+        result = {"sent": 0, "failed": 0, "dropped": 0, "remaining": 0, "offline": False}
+        with self._flush_lock:
+            for step in (self._flush_climbs, self._flush_annotations, self._flush_toggles):
+                try:
+                    step(result)
+                except Exception as e:
+                    if not is_transient(e):
+                        raise
+                    logger.info(f"Envoi différé ({step.__name__}): {e}")
+                    result["offline"] = True
+        result["remaining"] = self.pending_count()
+        return result
+
+    def _chunks(self, entries: list[dict]):
+        """Découpe une liste d'intentions en lots."""
+        for start in range(0, len(entries), self.batch_size):
+            yield entries[start:start + self.batch_size]
+
+    def _fail(self, entries: list[dict], error: str, result: dict):
+        """Échec définitif : compte la tentative, abandonne au-delà du seuil."""
+        self.repo.mark_failed(entries, error)
+        result["failed"] += len(entries)
+        for entry in entries:
+            if entry["attempts"] + 1 >= self.max_attempts:
+                self._drop(entry, error, result)
+
+    def _drop(self, entry: dict, error: str, result: dict):
+        """Abandonne une intention que le serveur ne pourra jamais accepter."""
+        logger.warning(f"Écriture abandonnée ({entry['kind']} {entry['target']}): {error}")
+        self.repo.discard(entry["kind"], entry["target"])
+        result["dropped"] += 1
+        if self.on_dropped:
+            self.on_dropped(entry, error)
+
+    def _flush_climbs(self, result: dict):
+        """Crée les climbs en attente via POST /api/climbs/batch."""
+        entries = self.repo.pending("climb")
+        if not entries:
+            return
+        if self.mastoc_api is None:
+            raise TransientError("client mastoc-api non configuré")
+
+        for chunk in self._chunks(entries):
+            by_ref = {e["target"]: e for e in chunk}
+            try:
+                results = self.mastoc_api.create_climbs_batch(
+                    [{**e["payload"], "client_ref": e["target"]} for e in chunk]
+                )
+            except Exception as e:
+                if is_transient(e):
+                    raise
+                self._fail(chunk, str(e), result)
+                continue
+
+            for item in results:
+                entry = by_ref.get(item["client_ref"])
+                if entry is None:
+                    continue
+                if item["climb"] is None:
+                    # Face inconnue du serveur : inutile de réessayer
+                    self._drop(entry, item["error"] or "création refusée", result)
+                    continue
+                self.repo.remove_sent([entry])
+                result["sent"] += 1
+                if self.on_climb_created:
+                    self.on_climb_created(entry["target"], item["climb"])
+
+    def _flush_annotations(self, result: dict):
+        """Envoie les annotations en attente via POST /api/holds/annotations/bulk."""
+        entries = self.repo.pending("annotation")
+        if not entries:
+            return
+        if self.mastoc_api is None:
+            raise TransientError("client mastoc-api non configuré")
+
+        for chunk in self._chunks(entries):
+            items = [{"hold_id": int(e["target"]), **e["payload"]} for e in chunk]
+            try:
+                response = self.mastoc_api.write_hold_annotations(items)
+            except Exception as e:
+                if is_transient(e):
+                    raise
+                self._fail(chunk, str(e), result)
+                continue
+
+            errors = response["errors"]
+            rejected = [e for e in chunk if int(e["target"]) in errors]
+            for entry in rejected:
+                # Prise inconnue du serveur : inutile de réessayer
+                self._drop(entry, errors[int(entry["target"])], result)
+            accepted = [e for e in chunk if int(e["target"]) not in errors]
+            self.repo.remove_sent(accepted)
+            result["sent"] += len(accepted)
+
+    def _flush_toggles(self, result: dict):
+        """Envoie likes et bookmarks à Stokt (une requête par intention nette)."""
+        entries = [e for e in self.repo.pending() if e["kind"] in TOGGLE_KINDS]
+        if not entries:
+            return
+        if self.stokt_api is None:
+            raise TransientError("client Stokt non configuré")
+
+        for entry in entries:
+            kind, climb_id = entry["kind"], entry["target"]
+            value = entry["payload"]["value"]
+            if value == entry["payload"]["base"]:
+                self.repo.remove_sent([entry])
+                continue
+
+            with self._lock:
+                self._inflight[(kind, climb_id)] = value
+            try:
+                self._send_toggle(kind, climb_id, value)
+            except Exception as e:
+                with self._lock:
+                    del self._inflight[(kind, climb_id)]
+                if is_transient(e):
+                    raise
+                self._fail([entry], str(e), result)
+                continue
+
+            with self._lock:
+                del self._inflight[(kind, climb_id)]
+                if self.repo.remove_sent([entry]) == 0:
+                    # Modifiée pendant l'envoi : le serveur est maintenant à `value`
+                    current = self.repo.get(kind, climb_id)
+                    if current is not None:
+                        if current["payload"]["value"] == value:
+                            self.repo.discard(kind, climb_id)
+                        else:
+                            self.repo.put(kind, climb_id, {
+                                "value": current["payload"]["value"], "base": value
+                            })
+            result["sent"] += 1
+
+    def _send_toggle(self, kind: str, climb_id: str, value: bool):
+        """Appel Stokt correspondant à une intention de like/bookmark."""
+        if kind == "bookmark":
+            self.stokt_api.bookmark_climb(climb_id, add=value)
+        elif value:
+            self.stokt_api.like_climb(climb_id)
+        else:
+            self.stokt_api.unlike_climb(climb_id)
+
+    # =========================================================================
+    # Mode continu
+    # =========================================================================
+
+    def flush_soon(self):
+        """Demande un envoi au thread d'arrière-plan (sans attendre)."""
+        self._wake.set()
+
+    def start_background(self, interval: float = 30):
+        """
+        Lance l'envoi continu dans un thread démon.
+
+        Un envoi est tenté à chaque nouvelle intention, et toutes les
+        `interval` secondes tant que la file n'est pas vide (retour du réseau).
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                self._wake.wait(interval)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                if not self.pending_count():
+                    continue
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.warning(f"Envoi de la file d'attente: {e}")
+
+        self._thread = threading.Thread(target=loop, daemon=True, name="outbox")
+        self._thread.start()
+
+    def stop(self):
+        """Arrête l'envoi continu."""
+        self._stop.set()
+        self._wake.set()
+
+    @property
+    def is_running(self) -> bool:
+        """True si l'envoi continu est actif."""
+        return self._thread is not None and self._thread.is_alive()
@@ -0,0 +1,164 @@
+"""
+Base des chargeurs en arrière-plan avec préchargement.
+
+Un chargeur livre les données de l'élément courant via un callback et
+précharge ses voisins (mode parcours) avec un petit pool de threads. Le
+cache est borné (LRU), persistable en SQLite pour un usage hors-ligne et
+servi en stale-while-revalidate : une donnée périmée est affichée tout de
+suite puis remplacée dès que la version fraîche arrive.
+"""
+
+import logging
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from mastoc.core.read_cache import ReadThroughCache
+
+logger = logging.getLogger(__name__)
+
+
+class FetchFailed(Exception):
+    """Chargement en échec ; `data` porte le message d'erreur à afficher."""
+
+    def __init__(self, data: Any):
+        super().__init__(getattr(data, "error", None) or "chargement échoué")
+        self.data = data
+
+
+class PrefetchingLoader:
+    """
+    Chargeur asynchrone avec cache LRU et préchargement des voisins.
+
+    Les sous-classes implémentent `_fetch(item_id)`, qui retourne une
+    donnée dont l'attribut `loaded` indique le succès.
+    """
+
+    def __init__(
+        self,
+        cache_ttl: int,
+        max_entries: int = 200,
+        cache_path: Optional[Path] = None,
+        workers: int = 3,
+    ):
+        """
+        Args:
+            cache_ttl: Durée (s) pendant laquelle une donnée est considérée fraîche
+            max_entries: Taille maximale du cache
+            cache_path: Base SQLite de persistance (None = mémoire uniquement)
+            workers: Chargements simultanés (élément courant + préchargements)
+        """
+        self.cache_ttl = cache_ttl
+        self.cache = ReadThroughCache(
+            cache_path, ttl=cache_ttl, max_refresh_workers=workers, max_entries=max_entries
+        )
+        self._current_id: Optional[Hashable] = None
+
+        # Callbacks
+        self.on_data_loaded: Optional[Callable[[Any], None]] = None
+        self.on_error: Optional[Callable[[Any, str], None]] = None
+
+    def _fetch(self, item_id) -> Any:
+        raise NotImplementedError
+
+    @staticmethod
+    def _key(item_id) -> str:
+        return str(item_id)
+
+    # =========================================================================
+    # Cache
+    # =========================================================================
+
+    def _get_cached(self, item_id):
+        """Retourne les données du cache si fraîches."""
+        entry = self.cache.peek(self._key(item_id))
+        if entry is None or not entry[1]:
+            return None
+        return entry[0]
+
+    def _set_cached(self, item_id, data):
+        """Ajoute des données au cache."""
+        self.cache.put(self._key(item_id), data)
+
+    def get_cached(self, item_id):
+        """
+        Retourne les données du cache (sans vérifier l'expiration).
+
+        Utile pour l'affichage UI quand on veut les données même périmées.
+        """
+        entry = self.cache.peek(self._key(item_id))
+        return entry[0] if entry is not None else None
+
+    def invalidate(self, item_id):
+        """Invalide le cache pour un élément."""
+        self.cache.discard(self._key(item_id))
+
+    def clear_cache(self):
+        """Vide tout le cache."""
+        self.cache.invalidate()
+
+    # =========================================================================
+    # Chargement
+    # =========================================================================
+
+    def start(self):
+        """Conservé pour compatibilité : le pool démarre à la demande."""
+
+    def stop(self):
+        """Oublie l'élément courant (plus aucune livraison)."""
+        self._current_id = None
+
+    def load(self, item_id):
+        """
+        Demande les données d'un élément.
+
+        Non bloquant. Une donnée en cache (même périmée) est livrée
+        immédiatement ; si elle est absente ou périmée, la version fraîche
+        est livrée via on_data_loaded à son arrivée.
+        """
+        self._current_id = item_id
+        entry = self.cache.peek(self._key(item_id))
+        if entry is not None:
+            data, fresh = entry
+            self._deliver(item_id, data)
+            if fresh:
+                return
+        self._schedule(item_id).add_done_callback(
+            lambda future: self._on_loaded(item_id, future, had_cached=entry is not None)
+        )
+
+    def prefetch(self, item_ids: Iterable):
+        """Précharge des éléments (absents ou périmés) sans rien livrer."""
+        for item_id in item_ids:
+            entry = self.cache.peek(self._key(item_id))
+            if entry is None or not entry[1]:
+                self._schedule(item_id)
+
+    def _schedule(self, item_id) -> Future:
+        """Chargement en arrière-plan, partagé avec un chargement en cours."""
+        return self.cache.refresh_async(self._key(item_id), lambda: self._fetch_or_raise(item_id))
+
+    def _fetch_or_raise(self, item_id):
+        """
+        Charge un élément. Un échec, même partiel, n'est pas mis en cache
+        et ne remplace pas l'entrée existante.
+        """
+        data = self._fetch(item_id)
+        if not getattr(data, "loaded", True) or getattr(data, "error", None):
+            raise FetchFailed(data)
+        return data
+
+    def _on_loaded(self, item_id, future: Future, had_cached: bool):
+        """Livre le résultat d'un chargement si l'élément est toujours courant."""
+        error = future.exception()
+        if error is None:
+            self._deliver(item_id, future.result())
+        elif not had_cached and isinstance(error, FetchFailed):
+            self._deliver(item_id, error.data)
+        elif not had_cached:
+            logger.warning(f"Chargement de {item_id} échoué: {error}")
+
+    def _deliver(self, item_id, data):
+        """Appelle on_data_loaded pour l'élément courant uniquement."""
+        if item_id == self._current_id and self.on_data_loaded:
+            self.on_data_loaded(data)
@@ -0,0 +1,270 @@
+"""
+Cache local en lecture (read-through) pour BackendSwitch.
+
+Les lectures unitaires (climb, holds, setup d'une face) sont servies depuis
+le cache tant qu'elles sont fraîches. Au-delà du TTL, l'entrée périmée est
+retournée immédiatement et rafraîchie en arrière-plan
+(stale-while-revalidate). Si le backend est injoignable, l'entrée en cache
+est servie quel que soit son âge.
+
+Les requêtes identiques simultanées sont fusionnées : un seul appel
+réseau, le résultat est partagé par tous les demandeurs.
+
+Les entrées sont persistées dans une base SQLite dédiée (optionnelle) ;
+la version du format est vérifiée à la lecture pour ignorer les entrées
+écrites par une version incompatible des modèles. Le nombre d'entrées
+peut être borné (éviction LRU en mémoire, plus anciennes en base).
+"""
+
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter quand les dataclasses de mastoc.api.models changent
+CACHE_FORMAT_VERSION = 1
+
+CACHE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS read_cache (
+    key TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    payload BLOB NOT NULL
+);
+"""
+
+
+class ReadThroughCache:
+    """
+    Cache read-through avec TTL, fusion des requêtes et rafraîchissement
+    en arrière-plan.
+
+    Usage:
+        cache = ReadThroughCache(path, ttl=300)
+        face = cache.get("railway:face_setup:abc", lambda: api.get_face_setup("abc"))
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: float = 300,
+        max_refresh_workers: int = 2,
+        max_entries: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: Base SQLite de persistance (None = mémoire uniquement)
+            ttl: Durée (s) pendant laquelle une entrée est servie sans appel réseau
+            max_refresh_workers: Threads de rafraîchissement en arrière-plan
+            max_entries: Nombre maximal d'entrées conservées (None = illimité)
+            clock: Horloge (tests)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(
+            max_workers=max_refresh_workers, thread_name_prefix="read-cache"
+        )
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                conn.executescript(CACHE_SCHEMA_SQL)
+
+    # =========================================================================
+    # Stockage
+    # =========================================================================
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connexion à la base de cache (commit puis fermeture)."""
+        conn = sqlite3.connect(self.path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _load(self, key: str) -> Optional[tuple[float, Any]]:
+        """(fetched_at, valeur) depuis la mémoire puis la base."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is not None or self.path is None:
+            return entry
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT version, fetched_at, payload FROM read_cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache local illisible: {e}")
+            return None
+        if row is None or row[0] != CACHE_FORMAT_VERSION:
+            return None
+        try:
+            entry = (row[1], pickle.loads(row[2]))
+        except Exception as e:
+            logger.warning(f"Entrée de cache invalide ({key}): {e}")
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: tuple[float, Any]):
+        """Place une entrée en tête du cache mémoire (éviction LRU)."""
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._memory) > self.max_entries:
+                    self._memory.popitem(last=False)
+
+    def _store(self, key: str, value: Any):
+        """Enregistre une valeur fraîche."""
+        entry = (self._clock(), value)
+        self._remember(key, entry)
+        if self.path is None:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """INSERT INTO read_cache (key, version, fetched_at, payload)
+                       VALUES (?, ?, ?, ?)
+                       ON CONFLICT(key) DO UPDATE SET
+                           version = excluded.version,
+                           fetched_at = excluded.fetched_at,
+                           payload = excluded.payload""",
+                    (key, CACHE_FORMAT_VERSION, entry[0], pickle.dumps(value)),
+                )
+                if self.max_entries is not None:
+                    conn.execute(
+                        """DELETE FROM read_cache WHERE key NOT IN (
+                               SELECT key FROM read_cache
+                               ORDER BY fetched_at DESC LIMIT ?)""",
+                        (self.max_entries,)
+                    )
+        except (sqlite3.Error, pickle.PicklingError) as e:
+            logger.warning(f"Impossible d'écrire le cache local: {e}")
+
+    # =========================================================================
+    # Lecture
+    # =========================================================================
+
+    def _claim(self, key: str) -> tuple[Future, bool]:
+        """
+        Réserve (ou rejoint) l'appel réseau en cours pour une clé.
+
+        Returns:
+            (future, owner) : owner est True si l'appelant doit exécuter
+            le loader lui-même
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _run(self, key: str, loader: Callable[[], Any], future: Future):
+        """Exécute le loader et publie le résultat aux demandeurs."""
+        try:
+            value = loader()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            self._store(key, value)
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def peek(self, key: str) -> Optional[tuple[Any, bool]]:
+        """
+        Lit une entrée sans appel réseau.
+
+        Returns:
+            (valeur, fraîche) ou None si la clé est absente
+        """
+        entry = self._load(key)
+        if entry is None:
+            return None
+        fetched_at, value = entry
+        return value, self._clock() - fetched_at < self.ttl
+
+    def put(self, key: str, value: Any):
+        """Enregistre une valeur obtenue hors du cache."""
+        self._store(key, value)
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Retourne la valeur d'une clé, via le cache ou le loader.
+
+        - entrée fraîche : servie sans appel réseau ;
+        - entrée périmée : servie, rafraîchie en arrière-plan ;
+        - absente : appel réseau (fusionné avec les appels identiques) ;
+        - échec réseau avec une entrée en cache : l'entrée est servie.
+        """
+        entry = self._load(key)
+        if entry is not None:
+            fetched_at, value = entry
+            if self._clock() - fetched_at >= self.ttl:
+                self.refresh_async(key, loader)
+            return value
+
+        future, owner = self._claim(key)
+        if owner:
+            self._run(key, loader, future)
+        return future.result()
+
+    def refresh_async(self, key: str, loader: Callable[[], Any]) -> Future:
+        """
+        Rafraîchit une clé en arrière-plan (sans doublon).
+
+        Returns:
+            Future du chargement (partagé si un appel est déjà en cours)
+        """
+        future, owner = self._claim(key)
+        if not owner:
+            return future
+
+        def task():
+            self._run(key, loader, future)
+            if future.exception() is not None:
+                logger.info(f"Rafraîchissement de {key} échoué: {future.exception()}")
+
+        self._refresher.submit(task)
+        return future
+
+    def discard(self, key: str):
+        """Supprime une entrée précise."""
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.path is not None:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM read_cache WHERE key = ?", (key,))
+
+    def invalidate(self, prefix: str = ""):
+        """Supprime les entrées dont la clé commence par `prefix` (tout si vide)."""
+        with self._lock:
+            for key in [k for k in self._memory if k.startswith(prefix)]:
+                del self._memory[key]
+        if self.path is not None:
+            with self._connect() as conn:
+                conn.execute(
+                    "DELETE FROM read_cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+                )
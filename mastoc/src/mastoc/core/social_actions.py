@@ -4,13 +4,16 @@ Service pour les actions sociales (like, bookmark, comment).
 Gère les appels API et l'état local pour une expérience réactive.
 """
 
-from typing import Optional, Callable
+from typing import TYPE_CHECKING, Optional, Callable
 from dataclasses import dataclass, field
 from threading import Thread
 
 from mastoc.api.client import StoktAPI, AuthenticationError
 from mastoc.api.models import Comment
 
+if TYPE_CHECKING:
+    from mastoc.core.outbox import Outbox
+
 
 @dataclass
 class UserClimbState:
@@ -28,11 +31,14 @@ class SocialActionsService:
     - Bookmark/unbookmark
     - Post/delete comment
 
-    Les actions sont exécutées en arrière-plan avec callbacks.
+    Les actions sont exécutées en arrière-plan avec callbacks. Avec une
+    outbox, like et bookmark sont appliqués immédiatement à l'état local
+    et envoyés plus tard (fonctionne hors-ligne).
     """
 
-    def __init__(self, api: StoktAPI):
+    def __init__(self, api: StoktAPI, outbox: Optional["Outbox"] = None):
         self.api = api
+        self.outbox = outbox
 
         # Cache de l'état utilisateur: climb_id -> UserClimbState
         self._states: dict[str, UserClimbState] = {}
@@ -50,14 +56,30 @@ class SocialActionsService:
         return self._states[climb_id]
 
     def set_initial_state(self, climb_id: str, liked: bool, bookmarked: bool):
-        """Initialise l'état depuis les données de l'API."""
+        """
+        Initialise l'état depuis les données de l'API.
+
+        Les intentions encore en file d'attente priment sur l'état du serveur.
+        """
+        if self.outbox is not None:
+            pending_like = self.outbox.pending_value("like", climb_id)
+            pending_bookmark = self.outbox.pending_value("bookmark", climb_id)
+            liked = liked if pending_like is None else pending_like
+            bookmarked = bookmarked if pending_bookmark is None else pending_bookmark
         self._states[climb_id] = UserClimbState(liked=liked, bookmarked=bookmarked)
 
     def toggle_like(self, climb_id: str):
-        """Toggle le like (async)."""
+        """Toggle le like (async, ou via l'outbox si configurée)."""
         state = self.get_state(climb_id)
         new_value = not state.liked
 
+        if self.outbox is not None:
+            self.outbox.record_like(climb_id, new_value, previous=state.liked)
+            state.liked = new_value
+            if self.on_like_changed:
+                self.on_like_changed(climb_id, new_value)
+            return
+
         def do_like():
             try:
                 if new_value:
@@ -79,10 +101,17 @@ class SocialActionsService:
         Thread(target=do_like, daemon=True).start()
 
     def toggle_bookmark(self, climb_id: str):
-        """Toggle le bookmark (async)."""
+        """Toggle le bookmark (async, ou via l'outbox si configurée)."""
         state = self.get_state(climb_id)
         new_value = not state.bookmarked
 
+        if self.outbox is not None:
+            self.outbox.record_bookmark(climb_id, new_value, previous=state.bookmarked)
+            state.bookmarked = new_value
+            if self.on_bookmark_changed:
+                self.on_bookmark_changed(climb_id, new_value)
+            return
+
         def do_bookmark():
             try:
                 self.api.bookmark_climb(climb_id, add=new_value)
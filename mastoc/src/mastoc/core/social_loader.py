@@ -2,17 +2,17 @@
 Chargeur asynchrone pour les données sociales.
 
 Les données sociales (sends, comments, likes) sont chargées en arrière-plan
-pour ne jamais bloquer la navigation entre les blocs.
+pour ne jamais bloquer la navigation entre les blocs ; les blocs voisins
+sont préchargés pour un affichage immédiat en mode parcours.
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, Callable
-from threading import Thread, Lock
-from queue import Queue
-import time
+from pathlib import Path
+from typing import Optional
 
 from mastoc.api.client import StoktAPI, AuthenticationError
 from mastoc.api.models import Effort, Comment, Like
+from mastoc.core.prefetch import PrefetchingLoader
 
 
 @dataclass
@@ -26,133 +26,48 @@ class SocialData:
     error: Optional[str] = None
 
 
-class SocialLoader:
+class SocialLoader(PrefetchingLoader):
     """
     Charge les données sociales en arrière-plan.
 
     Usage:
         loader = SocialLoader(api)
         loader.on_data_loaded = lambda data: update_ui(data)
-        loader.load(climb_id)  # Non bloquant
+        loader.load(climb_id)              # Non bloquant
+        loader.prefetch([next_id, prev_id])  # Voisins en mode parcours
     """
 
-    def __init__(self, api: StoktAPI, cache_ttl: int = 300):
+    def __init__(
+        self,
+        api: StoktAPI,
+        cache_ttl: int = 300,
+        async_api=None,
+        max_entries: int = 200,
+        cache_path: Optional[Path] = None,
+        workers: int = 3,
+    ):
         """
         Args:
             api: Client API Stokt
             cache_ttl: Durée de vie du cache en secondes (défaut: 5 min)
+            async_api: AsyncStoktAPI optionnel ; sends, comments et likes
+                sont alors chargés en parallèle
+            max_entries: Nombre de climbs gardés en cache (LRU)
+            cache_path: Base SQLite pour réutiliser le cache hors-ligne
+            workers: Chargements simultanés (climb courant + voisins)
         """
+        super().__init__(cache_ttl, max_entries=max_entries, cache_path=cache_path, workers=workers)
         self.api = api
-        self.cache_ttl = cache_ttl
-
-        # Cache: climb_id -> (SocialData, timestamp)
-        self._cache: dict[str, tuple[SocialData, float]] = {}
-        self._cache_lock = Lock()
-
-        # Queue de requêtes
-        self._queue: Queue[str] = Queue()
-        self._current_climb_id: Optional[str] = None
-
-        # Callback quand les données sont chargées
-        self.on_data_loaded: Optional[Callable[[SocialData], None]] = None
-        self.on_error: Optional[Callable[[str, str], None]] = None
-
-        # Thread de chargement
-        self._worker: Optional[Thread] = None
-        self._running = False
-
-    def start(self):
-        """Démarre le worker de chargement."""
-        if self._running:
-            return
-        self._running = True
-        self._worker = Thread(target=self._worker_loop, daemon=True)
-        self._worker.start()
-
-    def stop(self):
-        """Arrête le worker."""
-        self._running = False
-        self._queue.put(None)  # Signal d'arrêt
-        if self._worker:
-            self._worker.join(timeout=2)
-
-    def load(self, climb_id: str):
-        """
-        Demande le chargement des données sociales pour un climb.
-
-        Non bloquant. Les données seront livrées via on_data_loaded.
-        Si les données sont en cache et valides, elles sont retournées immédiatement.
-        """
-        self._current_climb_id = climb_id
-
-        # Vérifier le cache
-        cached = self._get_cached(climb_id)
-        if cached:
-            if self.on_data_loaded:
-                self.on_data_loaded(cached)
-            return
-
-        # Ajouter à la queue
-        self._queue.put(climb_id)
-
-        # Démarrer le worker si nécessaire
-        if not self._running:
-            self.start()
-
-    def _get_cached(self, climb_id: str) -> Optional[SocialData]:
-        """Retourne les données du cache si valides."""
-        with self._cache_lock:
-            if climb_id in self._cache:
-                data, timestamp = self._cache[climb_id]
-                if time.time() - timestamp < self.cache_ttl:
-                    return data
-                else:
-                    del self._cache[climb_id]
-        return None
-
-    def _set_cached(self, climb_id: str, data: SocialData):
-        """Ajoute des données au cache."""
-        with self._cache_lock:
-            self._cache[climb_id] = (data, time.time())
-
-    def invalidate(self, climb_id: str):
-        """Invalide le cache pour un climb."""
-        with self._cache_lock:
-            if climb_id in self._cache:
-                del self._cache[climb_id]
-
-    def clear_cache(self):
-        """Vide tout le cache."""
-        with self._cache_lock:
-            self._cache.clear()
-
-    def _worker_loop(self):
-        """Boucle principale du worker."""
-        while self._running:
-            try:
-                climb_id = self._queue.get(timeout=1)
-                if climb_id is None:
-                    break
-
-                # Si l'utilisateur a changé de climb, ignorer cette requête
-                if climb_id != self._current_climb_id:
-                    continue
-
-                # Charger les données
-                data = self._fetch_social_data(climb_id)
+        self.async_api = async_api
 
-                # Si toujours le climb actuel, livrer les données
-                if climb_id == self._current_climb_id:
-                    self._set_cached(climb_id, data)
-                    if self.on_data_loaded:
-                        self.on_data_loaded(data)
-
-            except Exception:
-                # Timeout de la queue, continuer
-                pass
+    def _fetch(self, climb_id: str) -> SocialData:
+        return self._fetch_social_data(climb_id)
 
     def _fetch_social_data(self, climb_id: str) -> SocialData:
         """Récupère les données sociales depuis l'API."""
+        if self.async_api is not None:
+            return self._fetch_social_data_async(climb_id)
+
         data = SocialData(climb_id=climb_id)
 
         try:
@@ -189,6 +104,31 @@ class SocialLoader:
 
         return data
 
+    def _fetch_social_data_async(self, climb_id: str) -> SocialData:
+        """Récupère sends, comments et likes en parallèle (client async)."""
+        from mastoc.api.async_client import get_async_runner
+
+        data = SocialData(climb_id=climb_id)
+        results = get_async_runner().run(self.async_api.get_climb_social(climb_id, limit=20))
+
+        errors = []
+        for label, attr, result in zip(
+            ("Sends", "Comments", "Likes"), ("sends", "comments", "likes"), results
+        ):
+            if isinstance(result, AuthenticationError):
+                data.error = f"Auth: {result}"
+                if self.on_error:
+                    self.on_error(climb_id, str(result))
+                return data
+            if isinstance(result, Exception):
+                errors.append(f"{label}: {result}")
+            else:
+                setattr(data, attr, result)
+
+        data.error = "; ".join(errors) or None
+        data.loaded = True
+        return data
+
 
 class SocialLoaderSync:
     """
@@ -0,0 +1,350 @@
+"""
+Rafraîchissement des compteurs sociaux (sends, likes, comments) depuis Stokt.
+
+Remplace la boucle séquentielle à 1 req/s par :
+- quelques requêtes concurrentes, cadencées par un token bucket dont le
+  débit s'adapte aux réponses 429 (baisse multiplicative, hausse additive) ;
+- une file priorisée : climbs jamais ou anciennement rafraîchis d'abord,
+  pondérés par la popularité (climbed_by) et la consultation récente ;
+- des écritures par lots, qui servent aussi de point de reprise
+  (table climb_social_refresh) ;
+- un mode continu en arrière-plan.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import requests
+
+from mastoc.db import Database, ClimbRepository
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int, str], None]
+
+# Ancienneté attribuée à un climb jamais rafraîchi (heures)
+NEVER_REFRESHED_HOURS = 24 * 365
+# Fenêtre pendant laquelle une consultation augmente la priorité
+RECENT_VIEW_WINDOW = timedelta(days=7)
+RECENT_VIEW_BOOST = 4.0
+
+
+class TokenBucket:
+    """
+    Limiteur de débit à jetons, adaptatif (AIMD).
+
+    `rate` jetons par seconde, au plus `capacity` en réserve. Sur un 429,
+    le débit est divisé par deux et les acquisitions sont suspendues
+    (Retry-After si fourni) ; chaque succès le remonte de `increase`.
+    Un débit None désactive la limitation.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        capacity: float = 2.0,
+        min_rate: float = 0.2,
+        max_rate: Optional[float] = None,
+        increase: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.increase = increase
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._last = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Ajoute les jetons accumulés depuis le dernier appel."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Attend qu'un jeton soit disponible et le consomme.
+
+        Returns:
+            False si `stop_event` a été levé pendant l'attente
+        """
+        if self.rate is None:
+            return True
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return False
+            else:
+                self._sleep(delay)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """Réponse 429 : divise le débit et suspend les acquisitions."""
+        if self.rate is None:
+            return
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self._blocked_until = max(self._blocked_until, now + pause)
+        logger.info(f"Rate limit Stokt: débit réduit à {self.rate:.2f} climbs/s")
+
+    def on_success(self):
+        """Requête réussie : remonte progressivement le débit."""
+        if self.rate is None:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Retry-After (secondes) d'une erreur 429, ou None."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttled(error: Exception) -> bool:
+    """True si l'erreur est une réponse 429 Too Many Requests."""
+    response = getattr(error, "response", None)
+    return (
+        isinstance(error, requests.HTTPError)
+        and response is not None
+        and response.status_code == 429
+    )
+
+
+class SocialRefresher:
+    """
+    Rafraîchit les compteurs sociaux de tous les climbs, par priorité.
+
+    Usage:
+        refresher = SocialRefresher(api, db)
+        result = refresher.run(callback=on_progress)   # bloquant
+        refresher.start_background(interval=3600)      # continu
+    """
+
+    LAST_RUN_KEY = "social_refresh_last_run"
+
+    def __init__(
+        self,
+        api,
+        db: Database,
+        workers: int = 3,
+        rate: Optional[float] = 2.0,
+        max_rate: Optional[float] = 6.0,
+        batch_size: int = 25,
+        max_age: Optional[timedelta] = timedelta(days=7),
+        max_retries: int = 3,
+    ):
+        """
+        Args:
+            api: Client Stokt (get_climb_social_stats)
+            db: Base locale
+            workers: Requêtes simultanées
+            rate: Débit initial en climbs/s (None = illimité)
+            max_rate: Débit maximal atteint par la hausse additive
+            batch_size: Climbs par transaction d'écriture
+            max_age: Âge au-delà duquel un compteur est à rafraîchir
+                (None = tout rafraîchir)
+            max_retries: Nouvelles tentatives après un 429
+        """
+        self.api = api
+        self.db = db
+        self.climb_repo = ClimbRepository(db)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(
+            rate,
+            capacity=max(1.0, float(workers)),
+            max_rate=max(rate, max_rate) if rate is not None and max_rate else rate,
+        )
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # =========================================================================
+    # Priorité
+    # =========================================================================
+
+    @staticmethod
+    def priority(entry: dict, now: datetime) -> float:
+        """Score de priorité : ancienneté x popularité x consultation récente."""
+        refreshed_at = entry.get("refreshed_at")
+        if refreshed_at:
+            age = now - datetime.fromisoformat(refreshed_at)
+            staleness = max(age.total_seconds() / 3600, 0.0)
+        else:
+            staleness = NEVER_REFRESHED_HOURS
+
+        score = staleness * (1 + math.log1p(entry.get("climbed_by") or 0))
+
+        viewed_at = entry.get("viewed_at")
+        if viewed_at and now - datetime.fromisoformat(viewed_at) < RECENT_VIEW_WINDOW:
+            score *= RECENT_VIEW_BOOST
+        return score
+
+    def pending_climbs(self, now: Optional[datetime] = None) -> list[dict]:
+        """Climbs à rafraîchir, du plus prioritaire au moins prioritaire."""
+        now = now or datetime.now()
+        entries = self.climb_repo.get_social_refresh_state()
+        if self.max_age is not None:
+            threshold = (now - self.max_age).isoformat()
+            entries = [
+                e for e in entries
+                if not e["refreshed_at"] or e["refreshed_at"] < threshold
+            ]
+        entries.sort(key=lambda e: self.priority(e, now), reverse=True)
+        return entries
+
+    # =========================================================================
+    # Exécution
+    # =========================================================================
+
+    def _fetch(self, climb_id: str) -> Optional[dict]:
+        """Récupère les compteurs d'un climb (None si arrêt demandé)."""
+        if not self.bucket.acquire(self._stop):
+            return None
+        return self.api.get_climb_social_stats(climb_id)
+
+    def run(
+        self,
+        callback: Optional[ProgressCallback] = None,
+        limit: Optional[int] = None,
+    ) -> dict:
+        """
+        Rafraîchit les climbs en attente.
+
+        Le callback est appelé depuis le thread appelant ; s'il lève une
+        exception (ex: InterruptedError pour annuler), les résultats déjà
+        reçus sont écrits avant de la propager.
+
+        Args:
+            callback: Fonction (current, total, message) pour la progression
+            limit: Nombre max de climbs traités (None = tous)
+
+        Returns:
+            Dict avec {total, updated, errors}
+        """
+        if not self.is_running:
+            self._stop.clear()
+        queue = deque(self.pending_climbs())
+        if limit is not None:
+            queue = deque(list(queue)[:limit])
+        total = len(queue)
+        updated = 0
+        processed = 0
+        errors: list[str] = []
+        retries: dict[str, int] = {}
+        batch: dict[str, dict] = {}
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="social-refresh")
+        pending = {}
+        try:
+            while (queue or pending) and not self._stop.is_set():
+                while queue and len(pending) < self.workers:
+                    entry = queue.popleft()
+                    pending[pool.submit(self._fetch, entry["id"])] = entry
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry = pending.pop(future)
+                    climb_id = entry["id"]
+                    try:
+                        stats = future.result()
+                    except Exception as e:
+                        if is_throttled(e) and retries.get(climb_id, 0) < self.max_retries:
+                            retries[climb_id] = retries.get(climb_id, 0) + 1
+                            self.bucket.on_throttled(_retry_after(e))
+                            queue.append(entry)
+                            continue
+                        errors.append(f"{climb_id}: {e}")
+                    else:
+                        if stats is None:
+                            continue
+                        self.bucket.on_success()
+                        batch[climb_id] = stats
+                        updated += 1
+                        if len(batch) >= self.batch_size:
+                            self.climb_repo.update_social_counts_batch(batch)
+                            batch = {}
+
+                    processed += 1
+                    if callback:
+                        callback(processed, total, f"Refresh {entry['name'][:30]}...")
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.climb_repo.update_social_counts_batch(batch)
+            self.db.set_metadata(self.LAST_RUN_KEY, datetime.now().isoformat())
+
+        if callback:
+            callback(total, total, f"Terminé: {updated}/{total} mis à jour")
+
+        return {"total": total, "updated": updated, "errors": errors}
+
+    # =========================================================================
+    # Mode continu
+    # =========================================================================
+
+    def start_background(self, interval: float = 3600):
+        """
+        Lance le rafraîchissement continu dans un thread démon.
+
+        Chaque passe traite les climbs périmés, puis attend `interval`
+        secondes (ou l'appel à stop()).
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    result = self.run()
+                    if result["total"]:
+                        logger.info(
+                            f"Refresh social: {result['updated']}/{result['total']} mis à jour"
+                        )
+                except Exception as e:
+                    logger.warning(f"Refresh social en arrière-plan: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name="social-refresh")
+        self._thread.start()
+
+    def stop(self):
+        """Interrompt le rafraîchissement (passe en cours et mode continu)."""
+        self._stop.set()
+
+    @property
+    def is_running(self) -> bool:
+        """True si le mode continu est actif."""
+        return self._thread is not None and self._thread.is_alive()
@@ -4,12 +4,15 @@ Synchronisation entre l'API Stokt et la base de données locale.
 Gère le téléchargement initial et les mises à jour incrémentales.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Callable, Optional
 
+import requests
+
 from mastoc.api.client import StoktAPI, AuthenticationError, MONTOBOARD_GYM_ID
 from mastoc.db import Database, ClimbRepository, HoldRepository
 from mastoc.api.models import Climb
+from mastoc.core.social_refresh import SocialRefresher
 
 
 class SyncResult:
@@ -18,6 +21,7 @@ class SyncResult:
     def __init__(self):
         self.climbs_added = 0
         self.climbs_updated = 0
+        self.climbs_deleted = 0
         self.holds_added = 0
         self.errors: list[str] = []
         self.success = True
@@ -29,7 +33,8 @@ class SyncResult:
     def __repr__(self):
         return (
             f"SyncResult(mode={self.mode}, added={self.climbs_added}, updated={self.climbs_updated}, "
-            f"holds={self.holds_added}, downloaded={self.climbs_downloaded}, success={self.success})"
+            f"deleted={self.climbs_deleted}, holds={self.holds_added}, "
+            f"downloaded={self.climbs_downloaded}, success={self.success})"
         )
 
 
@@ -300,44 +305,53 @@ class SyncManager:
     def refresh_all_social_counts(
         self,
         callback: Optional[ProgressCallback] = None,
-        delay_seconds: float = 1.0
+        delay_seconds: Optional[float] = None,
+        workers: int = 3,
+        max_age_days: Optional[int] = 7,
     ) -> dict:
         """
-        Rafraîchit les compteurs sociaux de tous les climbs.
+        Rafraîchit les compteurs sociaux des climbs périmés, par priorité.
+
+        Voir SocialRefresher : requêtes concurrentes cadencées par un token
+        bucket adaptatif, écritures par lots, reprise après interruption
+        (les climbs rafraîchis depuis moins de `max_age_days` sont ignorés).
 
         Args:
             callback: Fonction (current, total, message) pour la progression
-            delay_seconds: Délai entre chaque requête (throttling)
+            delay_seconds: Délai initial entre deux climbs (None = débit
+                par défaut, 0 = sans limitation)
+            workers: Requêtes simultanées
+            max_age_days: Âge max d'un compteur (None = tout rafraîchir)
 
         Returns:
             Dict avec {total, updated, errors}
         """
-        import time
-
-        climbs = self.climb_repo.get_all_climbs()
-        total = len(climbs)
-        updated = 0
-        errors = []
-
-        for i, climb in enumerate(climbs):
-            try:
-                if callback:
-                    callback(i, total, f"Refresh {climb.name[:30]}...")
-
-                self.refresh_social_counts(climb.id)
-                updated += 1
-
-                # Throttling pour éviter le rate limiting
-                if i < total - 1:
-                    time.sleep(delay_seconds)
+        refresher = self.social_refresher(
+            delay_seconds=delay_seconds, workers=workers, max_age_days=max_age_days
+        )
+        return refresher.run(callback=callback)
 
-            except Exception as e:
-                errors.append(f"{climb.id}: {e}")
+    def social_refresher(
+        self,
+        delay_seconds: Optional[float] = None,
+        workers: int = 3,
+        max_age_days: Optional[int] = 7,
+    ) -> SocialRefresher:
+        """Construit un SocialRefresher sur cette base (ex: mode continu)."""
+        kwargs = {}
+        if delay_seconds is not None:
+            kwargs["rate"] = 1 / delay_seconds if delay_seconds > 0 else None
+        return SocialRefresher(
+            self.api,
+            self.db,
+            workers=workers,
+            max_age=timedelta(days=max_age_days) if max_age_days is not None else None,
+            **kwargs,
+        )
 
-        if callback:
-            callback(total, total, f"Terminé: {updated}/{total} mis à jour")
 
-        return {"total": total, "updated": updated, "errors": errors}
+class _ExportUnavailable(Exception):
+    """Le serveur ne propose pas l'export NDJSON des faces."""
 
 
 class RailwaySyncManager:
@@ -346,6 +360,15 @@ class RailwaySyncManager:
     # Face ID par défaut pour Montoboard
     DEFAULT_FACE_ID = "61b42d14-c629-434a-8827-801512151a18"
 
+    # Clé sync_metadata du curseur du flux de modifications
+    CHANGE_CURSOR_KEY = "change_cursor"
+
+    # Taille de page du flux de modifications
+    CHANGES_PAGE_SIZE = 500
+
+    # Lignes d'export écrites par transaction SQLite
+    EXPORT_BATCH_SIZE = 500
+
     def __init__(self, api, db: Database):
         """
         Args:
@@ -380,7 +403,11 @@ class RailwaySyncManager:
         """
         Synchronisation complète depuis Railway.
 
-        Ordre : climbs d'abord, puis prises (pour extraire les face_id).
+        Lit l'export NDJSON de chaque face (/api/sync/export/face) au fil
+        de l'eau et l'écrit par lots : la mémoire reste constante quelle
+        que soit la taille du catalogue. Un serveur sans export est
+        synchronisé à l'ancienne (liste paginée des climbs puis setup des
+        faces).
 
         Args:
             face_id: ID de la face à synchroniser (optionnel)
@@ -398,68 +425,182 @@ class RailwaySyncManager:
                     callback(0, 0, "Suppression des données existantes...")
                 self.db.clear_all()
 
-            # 1. Récupérer les climbs d'ABORD (pour extraire les face_id)
-            if callback:
-                callback(0, 0, "Récupération des climbs...")
+            try:
+                change_cursor = self._sync_full_export(face_id, result, callback)
+            except _ExportUnavailable:
+                change_cursor = self._sync_full_legacy(face_id, result, callback)
 
-            def climb_progress(current, total):
-                if callback:
-                    callback(current, total, f"Téléchargement climbs: {current}/{total}")
+            # Mettre à jour la date de sync et le curseur
+            self.db.set_last_sync()
+            self._save_change_cursor(change_cursor)
 
-            all_climbs = self.api.get_all_climbs(face_id=face_id, callback=climb_progress)
-            result.climbs_downloaded = len(all_climbs)
+            # Statistiques finales
+            result.total_climbs_local = self.db.get_climb_count()
 
             if callback:
-                callback(0, len(all_climbs), f"Sauvegarde de {len(all_climbs)} climbs...")
+                callback(1, 1, f"Sync terminée: {result.climbs_added} climbs, "
+                               f"{result.holds_added} prises")
 
-            # 2. Sauvegarder les climbs
-            for i, climb in enumerate(all_climbs):
-                self.climb_repo.save_climb(climb)
-                result.climbs_added += 1
-                if callback and i % 50 == 0:
-                    callback(i, len(all_climbs), f"Sauvegarde climbs: {i}/{len(all_climbs)}")
+        except Exception as e:
+            result.success = False
+            result.errors.append(f"Erreur: {e}")
 
-            # 3. Extraire les face_id uniques des climbs
-            if face_id:
-                face_ids = {face_id}
-            else:
-                face_ids = {c.face_id for c in all_climbs if c.face_id}
-                # Fallback sur le face_id par défaut si aucun trouvé
-                if not face_ids:
-                    face_ids = {self.DEFAULT_FACE_ID}
+        return result
+
+    def _sync_full_export(
+        self,
+        face_id: Optional[str],
+        result: SyncResult,
+        callback: Optional[ProgressCallback] = None,
+    ) -> Optional[int]:
+        """
+        Sync complète par export NDJSON, face par face.
+
+        Returns:
+            Curseur du flux de modifications à rejouer ensuite : le plus
+            petit des curseurs des instantanés (chaque face est cohérente
+            à son propre curseur).
 
-            # 4. Récupérer les prises pour chaque face
+        Raises:
+            _ExportUnavailable: Si le serveur ne propose pas l'export
+        """
+        face_ids = [face_id] if face_id else [str(f["id"]) for f in self.api.get_faces()]
+        cursors = []
+
+        for i, fid in enumerate(face_ids):
             if callback:
-                callback(0, len(face_ids), f"Récupération des prises ({len(face_ids)} face(s))...")
+                callback(i, len(face_ids), f"Export face {fid[:8]}...")
+            try:
+                cursor = self._save_export(fid, result, callback)
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                # Ancien serveur : l'export n'existe pas (rien n'a été écrit)
+                if i == 0 and status in (404, 405):
+                    raise _ExportUnavailable() from e
+                raise
+            if cursor is not None:
+                cursors.append(cursor)
+
+        return min(cursors) if cursors else None
+
+    def _save_export(
+        self,
+        face_id: str,
+        result: SyncResult,
+        callback: Optional[ProgressCallback] = None,
+    ) -> Optional[int]:
+        """
+        Écrit l'export d'une face par lots de EXPORT_BATCH_SIZE lignes.
 
-            for i, fid in enumerate(face_ids):
+        Returns:
+            Curseur de l'instantané exporté
+        """
+        cursor = None
+        total = 0
+        batches = {"hold": [], "setter": [], "climb": []}
+
+        def flush(kind):
+            batch = batches[kind]
+            if not batch:
+                return
+            if kind == "hold":
+                self.hold_repo.save_holds(batch, face_id)
+                result.holds_added += len(batch)
+            elif kind == "setter":
+                self.climb_repo.save_setters(batch)
+            else:
+                self.climb_repo.save_climbs(batch)
+                result.climbs_downloaded += len(batch)
+                result.climbs_added += len(batch)
                 if callback:
-                    callback(i, len(face_ids), f"Prises face {fid[:8]}...")
-                try:
-                    face = self.api.get_face_setup(fid)
-                    # Sauvegarder la face complète (avec picture_name) et ses holds
-                    self.hold_repo.save_face(face)
-                    result.holds_added += len(face.holds)
-                    if callback:
-                        callback(i + 1, len(face_ids), f"Face {fid[:8]}: {len(face.holds)} prises")
-                except Exception as e:
-                    result.errors.append(f"Erreur prises face {fid}: {e}")
+                    callback(result.climbs_added, total,
+                             f"Sauvegarde climbs: {result.climbs_added}/{total}")
+            batches[kind] = []
+
+        for kind, value in self.api.export_face(face_id):
+            if kind == "snapshot":
+                cursor = value.get("cursor")
+            elif kind == "face":
+                total += value.total_climbs
+                self.hold_repo.save_face(value)
+            elif kind in batches:
+                # Les lignes arrivent groupées par type
+                for other in batches:
+                    if other != kind:
+                        flush(other)
+                batches[kind].append(value)
+                if len(batches[kind]) >= self.EXPORT_BATCH_SIZE:
+                    flush(kind)
+        for kind in batches:
+            flush(kind)
+        return cursor
+
+    def _sync_full_legacy(
+        self,
+        face_id: Optional[str],
+        result: SyncResult,
+        callback: Optional[ProgressCallback] = None,
+    ) -> Optional[int]:
+        """
+        Sync complète sans export (ancien serveur).
 
-            # 5. Mettre à jour la date de sync
-            self.db.set_last_sync()
+        Ordre : climbs d'abord, puis prises (pour extraire les face_id).
 
-            # 6. Statistiques finales
-            result.total_climbs_local = self.db.get_climb_count()
+        Returns:
+            Curseur du flux de modifications lu avant le téléchargement
+        """
+        # Position du flux de modifications AVANT le téléchargement :
+        # ce qui change pendant la sync sera rejoué à la prochaine sync.
+        change_cursor = self._fetch_change_head()
 
+        # 1. Récupérer les climbs d'ABORD (pour extraire les face_id)
+        if callback:
+            callback(0, 0, "Récupération des climbs...")
+
+        def climb_progress(current, total):
             if callback:
-                callback(len(face_ids), len(face_ids),
-                        f"Sync terminée: {result.climbs_added} climbs, {result.holds_added} prises")
+                callback(current, total, f"Téléchargement climbs: {current}/{total}")
 
-        except Exception as e:
-            result.success = False
-            result.errors.append(f"Erreur: {e}")
+        all_climbs = self.api.get_all_climbs(face_id=face_id, callback=climb_progress)
+        result.climbs_downloaded = len(all_climbs)
 
-        return result
+        if callback:
+            callback(0, len(all_climbs), f"Sauvegarde de {len(all_climbs)} climbs...")
+
+        # 2. Sauvegarder les climbs
+        for i, climb in enumerate(all_climbs):
+            self.climb_repo.save_climb(climb)
+            result.climbs_added += 1
+            if callback and i % 50 == 0:
+                callback(i, len(all_climbs), f"Sauvegarde climbs: {i}/{len(all_climbs)}")
+
+        # 3. Extraire les face_id uniques des climbs
+        if face_id:
+            face_ids = {face_id}
+        else:
+            face_ids = {c.face_id for c in all_climbs if c.face_id}
+            # Fallback sur le face_id par défaut si aucun trouvé
+            if not face_ids:
+                face_ids = {self.DEFAULT_FACE_ID}
+
+        # 4. Récupérer les prises pour chaque face
+        if callback:
+            callback(0, len(face_ids), f"Récupération des prises ({len(face_ids)} face(s))...")
+
+        for i, fid in enumerate(face_ids):
+            if callback:
+                callback(i, len(face_ids), f"Prises face {fid[:8]}...")
+            try:
+                face = self.api.get_face_setup(fid)
+                # Sauvegarder la face complète (avec picture_name) et ses holds
+                self.hold_repo.save_face(face)
+                result.holds_added += len(face.holds)
+                if callback:
+                    callback(i + 1, len(face_ids), f"Face {fid[:8]}: {len(face.holds)} prises")
+            except Exception as e:
+                result.errors.append(f"Erreur prises face {fid}: {e}")
+
+        return change_cursor
 
     def _calculate_since_date(self, last_sync: datetime, margin_days: int = 1) -> datetime:
         """
@@ -483,8 +624,11 @@ class RailwaySyncManager:
         """
         Synchronisation incrémentale depuis Railway.
 
-        Utilise since_created_at pour ne télécharger que les climbs
-        créés depuis la dernière synchronisation.
+        Rejoue le flux de modifications du serveur (/api/sync/changes)
+        depuis le curseur enregistré : créations, modifications et
+        suppressions exactes. Sans curseur (base synchronisée avant le
+        flux, ou serveur ancien), utilise since_created_at pour ne
+        télécharger que les climbs créés depuis la dernière synchronisation.
 
         Args:
             face_id: ID de la face à synchroniser (optionnel)
@@ -501,10 +645,16 @@ class RailwaySyncManager:
             # Pas de sync précédente, faire une sync complète
             return self.sync_full(face_id=face_id, callback=callback)
 
+        cursor = self.db.get_metadata(self.CHANGE_CURSOR_KEY)
+        if cursor is not None:
+            return self._sync_changes(int(cursor), face_id=face_id, callback=callback)
+
         # Calculer la date depuis laquelle récupérer (avec marge de sécurité)
         since_date = self._calculate_since_date(last_sync)
 
         try:
+            change_cursor = self._fetch_change_head()
+
             if callback:
                 callback(0, 0, f"Sync incrémentale depuis {since_date.strftime('%Y-%m-%d')}...")
 
@@ -545,6 +695,7 @@ class RailwaySyncManager:
 
             # Mettre à jour la date de sync
             self.db.set_last_sync()
+            self._save_change_cursor(change_cursor)
 
             # Statistiques finales
             result.total_climbs_local = self.db.get_climb_count()
@@ -559,6 +710,88 @@ class RailwaySyncManager:
 
         return result
 
+    def _fetch_change_head(self) -> Optional[int]:
+        """Lit la position courante du flux (None si le serveur ne le supporte pas)."""
+        try:
+            return self.api.get_changes_head()
+        except Exception:
+            return None
+
+    def _save_change_cursor(self, cursor: Optional[int]):
+        """Enregistre le curseur du flux de modifications."""
+        if cursor is not None:
+            self.db.set_metadata(self.CHANGE_CURSOR_KEY, str(cursor))
+
+    def _sync_changes(
+        self,
+        cursor: int,
+        face_id: Optional[str] = None,
+        callback: Optional[ProgressCallback] = None
+    ) -> SyncResult:
+        """
+        Applique le flux de modifications depuis le curseur.
+
+        Le curseur est enregistré après chaque page appliquée : une sync
+        interrompue reprend là où elle s'est arrêtée.
+        """
+        result = SyncResult()
+        result.mode = "incremental"
+
+        try:
+            if callback:
+                callback(0, 0, f"Sync incrémentale depuis la modification #{cursor}...")
+
+            while True:
+                page = self.api.get_changes(
+                    cursor=cursor,
+                    limit=self.CHANGES_PAGE_SIZE,
+                    face_id=face_id,
+                )
+
+                for change in page["changes"]:
+                    if change["entity_type"] != "climb":
+                        continue
+                    climb = change["climb"]
+                    if change["action"] == "delete" or climb is None:
+                        if self.climb_repo.delete_climb(change["entity_id"]):
+                            result.climbs_deleted += 1
+                        continue
+
+                    result.climbs_downloaded += 1
+                    if self.climb_repo.get_climb(climb.id) is None:
+                        result.climbs_added += 1
+                    else:
+                        result.climbs_updated += 1
+                    self.climb_repo.save_climb(climb)
+
+                cursor = page["cursor"]
+                self._save_change_cursor(cursor)
+
+                if callback:
+                    callback(
+                        result.climbs_downloaded, result.climbs_downloaded,
+                        f"Modifications appliquées jusqu'à #{cursor}"
+                    )
+
+                if not page["has_more"]:
+                    break
+
+            self.db.set_last_sync()
+            result.total_climbs_local = self.db.get_climb_count()
+
+            if callback:
+                total = result.climbs_added + result.climbs_updated + result.climbs_deleted
+                callback(total, total,
+                         f"Sync terminée: {result.climbs_added} ajoutés, "
+                         f"{result.climbs_updated} mis à jour, "
+                         f"{result.climbs_deleted} supprimés")
+
+        except Exception as e:
+            result.success = False
+            result.errors.append(f"Erreur: {e}")
+
+        return result
+
     def needs_sync(self) -> bool:
         """Vérifie si une synchronisation est nécessaire."""
         status = self.get_sync_status()
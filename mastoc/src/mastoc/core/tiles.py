@@ -0,0 +1,237 @@
+"""
+Tuiles des photos de murs (pyramide servie par mastoc-api).
+
+Le serveur découpe chaque photo de face en tuiles de 256 px à tous les
+niveaux de résolution (GET /api/faces/{id}/tiles). Pour afficher une zone
+de la photo à une échelle donnée, le client choisit le plus petit niveau
+assez net, ne télécharge que les tuiles qui couvrent la zone et les
+assemble. Les tuiles sont immuables (l'URL porte la version de la
+pyramide) : une fois en cache disque, elles ne sont jamais revalidées.
+
+Cache : ~/.mastoc/images/tiles/<version>/<niveau>/<col>_<row>.jpg
+"""
+
+import io
+import logging
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TileInfo:
+    """Descripteur de pyramide (réponse de /api/faces/{id}/tiles)."""
+    version: str
+    width: int
+    height: int
+    tile_size: int
+    max_level: int
+    format: str
+    url_template: str
+
+    @classmethod
+    def from_api(cls, data: dict) -> "TileInfo":
+        return cls(
+            version=data["version"],
+            width=data["width"],
+            height=data["height"],
+            tile_size=data["tile_size"],
+            max_level=data["max_level"],
+            format=data["format"],
+            url_template=data["url_template"],
+        )
+
+    def level_scale(self, level: int) -> float:
+        """Échelle d'un niveau par rapport à la photo d'origine."""
+        return 2.0 ** (level - self.max_level)
+
+    def level_size(self, level: int) -> tuple[int, int]:
+        """Dimensions de l'image au niveau donné."""
+        scale = 2 ** (self.max_level - level)
+        return max(1, math.ceil(self.width / scale)), max(1, math.ceil(self.height / scale))
+
+    def level_for_scale(self, scale: float) -> int:
+        """
+        Plus petit niveau au moins aussi net que l'affichage.
+
+        Args:
+            scale: Pixels affichés (physiques) par pixel de la photo
+        """
+        if scale <= 0:
+            return 0
+        level = self.max_level + math.ceil(math.log2(scale))
+        return max(0, min(self.max_level, level))
+
+    def tiles_for_region(
+        self, level: int, region: tuple[float, float, float, float]
+    ) -> list[tuple[int, int]]:
+        """
+        Tuiles (col, row) couvrant une zone de la photo.
+
+        Args:
+            level: Niveau de la pyramide
+            region: (x, y, largeur, hauteur) en pixels de la photo d'origine
+        """
+        x, y, w, h = region
+        scale = self.level_scale(level)
+        level_w, level_h = self.level_size(level)
+        cols = math.ceil(level_w / self.tile_size)
+        rows = math.ceil(level_h / self.tile_size)
+
+        first_col = max(0, int(x * scale // self.tile_size))
+        first_row = max(0, int(y * scale // self.tile_size))
+        last_col = min(cols - 1, math.ceil((x + w) * scale / self.tile_size) - 1)
+        last_row = min(rows - 1, math.ceil((y + h) * scale / self.tile_size) - 1)
+        return [
+            (col, row)
+            for row in range(first_row, last_row + 1)
+            for col in range(first_col, last_col + 1)
+        ]
+
+    def tile_url(self, level: int, col: int, row: int) -> str:
+        return self.url_template.format(level=level, col=col, row=row)
+
+
+class TileCache:
+    """
+    Cache disque des tuiles.
+
+    `fetch` reçoit le chemin d'une tuile (gabarit du descripteur rempli) et
+    renvoie son contenu, par exemple MastocAPI.get_face_tile.
+    """
+
+    def __init__(self, fetch: Callable[[str], bytes], cache_dir: Optional[Path] = None):
+        """
+        Args:
+            fetch: Téléchargement d'une tuile par son chemin
+            cache_dir: Répertoire de cache (défaut: ~/.mastoc/images/tiles/)
+        """
+        self.fetch = fetch
+        self.cache_dir = cache_dir or (Path.home() / ".mastoc" / "images" / "tiles")
+        self.downloads = 0
+
+    def tile_path(self, info: TileInfo, level: int, col: int, row: int) -> Path:
+        return self.cache_dir / info.version / str(level) / f"{col}_{row}.{info.format}"
+
+    def get_tile(self, info: TileInfo, level: int, col: int, row: int) -> Optional[Path]:
+        """
+        Tuile en cache, téléchargée si absente.
+
+        Returns:
+            Chemin local de la tuile, ou None si échec
+        """
+        path = self.tile_path(info, level, col, row)
+        if path.exists():
+            return path
+
+        try:
+            content = self.fetch(info.tile_url(level, col, row))
+        except Exception as e:
+            logger.error(f"Erreur téléchargement tuile {level}/{col}_{row}: {e}")
+            return None
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, path)  # atomique : jamais de tuile partielle en cache
+        self.downloads += 1
+        return path
+
+    def clear_version(self, version: str) -> int:
+        """
+        Supprime les tuiles d'une version (photo remplacée).
+
+        Returns:
+            Nombre de fichiers supprimés
+        """
+        root = self.cache_dir / version
+        if not root.is_dir():
+            return 0
+        count = 0
+        for path in sorted(root.rglob("*"), reverse=True):
+            if path.is_file():
+                path.unlink()
+                count += 1
+            else:
+                path.rmdir()
+        root.rmdir()
+        return count
+
+
+def render_region(
+    info: TileInfo,
+    cache: TileCache,
+    region: tuple[float, float, float, float],
+    scale: float,
+) -> Image.Image:
+    """
+    Image d'une zone de la photo, assemblée depuis les tuiles.
+
+    Args:
+        info: Descripteur de la pyramide
+        cache: Cache de tuiles
+        region: (x, y, largeur, hauteur) en pixels de la photo d'origine
+        scale: Pixels affichés par pixel de la photo
+
+    Returns:
+        Image RGB de taille (largeur * scale, hauteur * scale) ; une tuile
+        indisponible laisse sa zone noire
+    """
+    x, y, w, h = region
+    level = info.level_for_scale(scale)
+    level_scale = info.level_scale(level)
+    tile_size = info.tile_size
+
+    # Assemblage au niveau choisi, puis recadrage et mise à l'échelle
+    tiles = info.tiles_for_region(level, region)
+    if not tiles:
+        return Image.new("RGB", (max(1, round(w * scale)), max(1, round(h * scale))))
+    first_col = min(col for col, _ in tiles)
+    first_row = min(row for _, row in tiles)
+    last_col = max(col for col, _ in tiles)
+    last_row = max(row for _, row in tiles)
+
+    canvas = Image.new(
+        "RGB",
+        ((last_col - first_col + 1) * tile_size, (last_row - first_row + 1) * tile_size),
+    )
+    for col, row in tiles:
+        path = cache.get_tile(info, level, col, row)
+        if path is None:
+            continue
+        with Image.open(io.BytesIO(path.read_bytes())) as tile:
+            canvas.paste(
+                tile.convert("RGB"),
+                ((col - first_col) * tile_size, (row - first_row) * tile_size),
+            )
+
+    left = x * level_scale - first_col * tile_size
+    top = y * level_scale - first_row * tile_size
+    box = (
+        round(left),
+        round(top),
+        round(left + w * level_scale),
+        round(top + h * level_scale),
+    )
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return canvas.crop(box).resize(size, Image.Resampling.LANCZOS)
+
+
+def render_overview(
+    info: TileInfo, cache: TileCache, max_side: int
+) -> tuple[Image.Image, float]:
+    """
+    Photo entière, réduite pour tenir dans max_side px (jamais agrandie).
+
+    Returns:
+        (image, échelle) ; l'échelle convertit les coordonnées de la photo
+        d'origine (polygones des prises) en pixels de l'image
+    """
+    scale = min(1.0, max_side / max(info.width, info.height))
+    return render_region(info, cache, (0, 0, info.width, info.height), scale), scale
@@ -1,6 +1,17 @@
 """Stockage local SQLite pour climbs et prises."""
 
 from mastoc.db.database import Database
-from mastoc.db.repository import ClimbRepository, HoldRepository
+from mastoc.db.repository import (
+    ClimbRepository,
+    HoldRepository,
+    AnnotationRepository,
+    OutboxRepository,
+)
 
-__all__ = ["Database", "ClimbRepository", "HoldRepository"]
+__all__ = [
+    "Database",
+    "ClimbRepository",
+    "HoldRepository",
+    "AnnotationRepository",
+    "OutboxRepository",
+]
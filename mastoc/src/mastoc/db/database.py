@@ -114,6 +114,38 @@ CREATE TABLE IF NOT EXISTS climb_holds (
 
 -- Index pour recherche de climbs par prise
 CREATE INDEX IF NOT EXISTS idx_climb_holds_hold_id ON climb_holds(hold_id);
+
+-- État du rafraîchissement des compteurs sociaux (priorité + reprise)
+CREATE TABLE IF NOT EXISTS climb_social_refresh (
+    climb_id TEXT PRIMARY KEY,
+    refreshed_at TEXT,  -- dernier refresh réussi
+    viewed_at TEXT,     -- dernière consultation dans l'app
+    FOREIGN KEY (climb_id) REFERENCES climbs(id)
+);
+
+-- Instantané des annotations de prises par mur (consensus + mon annotation)
+CREATE TABLE IF NOT EXISTS hold_annotations (
+    hold_id INTEGER PRIMARY KEY,  -- même identifiant que holds.id
+    face_id TEXT NOT NULL,
+    data TEXT NOT NULL,           -- JSON renvoyé par l'API
+    synced_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_hold_annotations_face_id ON hold_annotations(face_id);
+
+-- File d'attente des écritures faites hors-ligne (likes, bookmarks,
+-- annotations, créations de climbs). Une seule intention par cible :
+-- les actions redondantes sont fusionnées à l'enregistrement.
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,       -- like, bookmark, annotation, climb
+    target TEXT NOT NULL,     -- climb_id, hold_id ou identifiant local du climb
+    payload TEXT NOT NULL,    -- JSON
+    created_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    UNIQUE (kind, target)
+);
 """
 
 
@@ -209,6 +241,8 @@ class Database:
         """Supprime toutes les données (pour réimport complet)."""
         with self.connection() as conn:
             conn.execute("DELETE FROM climb_holds")
+            conn.execute("DELETE FROM climb_social_refresh")
+            conn.execute("DELETE FROM hold_annotations")
             conn.execute("DELETE FROM climbs")
             conn.execute("DELETE FROM holds")
             conn.execute("DELETE FROM faces")
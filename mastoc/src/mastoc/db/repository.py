@@ -8,7 +8,7 @@ import json
 from datetime import datetime
 from typing import Optional
 
-from mastoc.api.models import Climb, Hold, Face, HoldType
+from mastoc.api.models import Climb, ClimbSetter, Hold, Face, HoldType
 from mastoc.db.database import Database
 
 
@@ -20,68 +20,102 @@ class ClimbRepository:
 
     def save_climb(self, climb: Climb):
         """Sauvegarde un climb en base."""
-        now = datetime.now().isoformat()
-
         with self.db.connection() as conn:
-            # Sauvegarder le setter si présent
-            setter_id = None
-            if climb.setter:
-                conn.execute(
-                    """INSERT INTO setters (id, full_name, avatar)
-                       VALUES (?, ?, ?)
-                       ON CONFLICT(id) DO UPDATE SET full_name = ?, avatar = ?""",
-                    (climb.setter.id, climb.setter.full_name, climb.setter.avatar,
-                     climb.setter.full_name, climb.setter.avatar)
-                )
-                setter_id = climb.setter.id
+            self._save_climb(conn, climb, datetime.now().isoformat())
 
-            # Sauvegarder le climb
+    def _save_climb(self, conn, climb: Climb, now: str):
+        """Upsert d'un climb (et de son setter, de ses prises) sur une connexion ouverte."""
+        # Sauvegarder le setter si présent
+        setter_id = None
+        if climb.setter:
             conn.execute(
-                """INSERT INTO climbs (
-                       id, name, holds_list, mirror_holds_list, feet_rule,
-                       face_id, wall_id, wall_name, setter_id, date_created,
-                       is_private, is_benchmark, climbed_by, total_likes,
-                       total_comments, has_symmetric, angle, is_angle_adjustable,
-                       circuit, tags, grade_ircra, grade_hueco, grade_font,
-                       grade_dankyu, updated_at
-                   ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                   ON CONFLICT(id) DO UPDATE SET
-                       name = ?, holds_list = ?, climbed_by = ?, total_likes = ?,
-                       total_comments = ?, updated_at = ?""",
-                (climb.id, climb.name, climb.holds_list, climb.mirror_holds_list,
-                 climb.feet_rule, climb.face_id, climb.wall_id, climb.wall_name,
-                 setter_id, climb.date_created, climb.is_private, climb.is_benchmark,
-                 climb.climbed_by, climb.total_likes, climb.total_comments,
-                 climb.has_symmetric, climb.angle, climb.is_angle_adjustable,
-                 climb.circuit, climb.tags,
-                 climb.grade.ircra if climb.grade else None,
-                 climb.grade.hueco if climb.grade else None,
-                 climb.grade.font if climb.grade else None,
-                 climb.grade.dankyu if climb.grade else None,
-                 now,
-                 # ON CONFLICT updates
-                 climb.name, climb.holds_list, climb.climbed_by, climb.total_likes,
-                 climb.total_comments, now)
+                """INSERT INTO setters (id, full_name, avatar)
+                   VALUES (?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET full_name = ?, avatar = ?""",
+                (climb.setter.id, climb.setter.full_name, climb.setter.avatar,
+                 climb.setter.full_name, climb.setter.avatar)
             )
+            setter_id = climb.setter.id
+
+        # Sauvegarder le climb
+        conn.execute(
+            """INSERT INTO climbs (
+                   id, name, holds_list, mirror_holds_list, feet_rule,
+                   face_id, wall_id, wall_name, setter_id, date_created,
+                   is_private, is_benchmark, climbed_by, total_likes,
+                   total_comments, has_symmetric, angle, is_angle_adjustable,
+                   circuit, tags, grade_ircra, grade_hueco, grade_font,
+                   grade_dankyu, updated_at
+               ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                   name = ?, holds_list = ?, climbed_by = ?, total_likes = ?,
+                   total_comments = ?, feet_rule = ?, is_private = ?,
+                   grade_ircra = ?, grade_hueco = ?, grade_font = ?,
+                   grade_dankyu = ?, updated_at = ?""",
+            (climb.id, climb.name, climb.holds_list, climb.mirror_holds_list,
+             climb.feet_rule, climb.face_id, climb.wall_id, climb.wall_name,
+             setter_id, climb.date_created, climb.is_private, climb.is_benchmark,
+             climb.climbed_by, climb.total_likes, climb.total_comments,
+             climb.has_symmetric, climb.angle, climb.is_angle_adjustable,
+             climb.circuit, climb.tags,
+             climb.grade.ircra if climb.grade else None,
+             climb.grade.hueco if climb.grade else None,
+             climb.grade.font if climb.grade else None,
+             climb.grade.dankyu if climb.grade else None,
+             now,
+             # ON CONFLICT updates
+             climb.name, climb.holds_list, climb.climbed_by, climb.total_likes,
+             climb.total_comments, climb.feet_rule, climb.is_private,
+             climb.grade.ircra if climb.grade else None,
+             climb.grade.hueco if climb.grade else None,
+             climb.grade.font if climb.grade else None,
+             climb.grade.dankyu if climb.grade else None,
+             now)
+        )
 
-            # Sauvegarder les liens climb <-> holds
-            conn.execute("DELETE FROM climb_holds WHERE climb_id = ?", (climb.id,))
-            for ch in climb.get_holds():
-                conn.execute(
-                    "INSERT OR IGNORE INTO climb_holds (climb_id, hold_id, hold_type) VALUES (?, ?, ?)",
-                    (climb.id, ch.hold_id, ch.hold_type.value)
-                )
+        # Sauvegarder les liens climb <-> holds
+        conn.execute("DELETE FROM climb_holds WHERE climb_id = ?", (climb.id,))
+        for ch in climb.get_holds():
+            conn.execute(
+                "INSERT OR IGNORE INTO climb_holds (climb_id, hold_id, hold_type) VALUES (?, ?, ?)",
+                (climb.id, ch.hold_id, ch.hold_type.value)
+            )
+
+    def delete_climb(self, climb_id: str) -> bool:
+        """
+        Supprime un climb et ses liens climb <-> holds.
+
+        Returns:
+            True si un climb a été supprimé
+        """
+        with self.db.connection() as conn:
+            conn.execute("DELETE FROM climb_holds WHERE climb_id = ?", (climb_id,))
+            conn.execute("DELETE FROM climb_social_refresh WHERE climb_id = ?", (climb_id,))
+            cursor = conn.execute("DELETE FROM climbs WHERE id = ?", (climb_id,))
+            return cursor.rowcount > 0
 
     def save_climbs(self, climbs: list[Climb], callback=None):
-        """Sauvegarde plusieurs climbs en base."""
+        """Sauvegarde plusieurs climbs en base (une transaction)."""
         total = len(climbs)
-        for i, climb in enumerate(climbs):
-            self.save_climb(climb)
-            if callback and (i + 1) % 100 == 0:
-                callback(i + 1, total)
+        now = datetime.now().isoformat()
+        with self.db.connection() as conn:
+            for i, climb in enumerate(climbs):
+                self._save_climb(conn, climb, now)
+                if callback and (i + 1) % 100 == 0:
+                    callback(i + 1, total)
         if callback:
             callback(total, total)
 
+    def save_setters(self, setters: list[ClimbSetter]):
+        """Sauvegarde des setters en base (une transaction)."""
+        with self.db.connection() as conn:
+            conn.executemany(
+                """INSERT INTO setters (id, full_name, avatar)
+                   VALUES (?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET full_name = excluded.full_name""",
+                [(s.id, s.full_name, s.avatar) for s in setters]
+            )
+
     def get_climb(self, climb_id: str) -> Optional[Climb]:
         """Récupère un climb par son ID."""
         with self.db.connection() as conn:
@@ -154,6 +188,14 @@ class ClimbRepository:
             )
             return [(row[0], row[1]) for row in cursor.fetchall()]
 
+    def get_setter_avatars(self) -> list[str]:
+        """Récupère les chemins d'avatars des setters (non vides)."""
+        with self.db.connection() as conn:
+            cursor = conn.execute(
+                "SELECT DISTINCT avatar FROM setters WHERE avatar IS NOT NULL AND avatar != ''"
+            )
+            return [row[0] for row in cursor.fetchall()]
+
     def update_social_counts(
         self,
         climb_id: str,
@@ -179,6 +221,62 @@ class ClimbRepository:
                 (climbed_by, total_likes, total_comments, now, climb_id)
             )
 
+    def update_social_counts_batch(self, counts: dict[str, dict]):
+        """
+        Met à jour les compteurs sociaux de plusieurs climbs en une transaction.
+
+        Marque aussi les climbs comme rafraîchis (reprise du refresh global).
+
+        Args:
+            counts: {climb_id: {climbed_by, total_likes, total_comments}}
+        """
+        if not counts:
+            return
+        now = datetime.now().isoformat()
+        with self.db.connection() as conn:
+            conn.executemany(
+                """UPDATE climbs
+                   SET climbed_by = ?, total_likes = ?, total_comments = ?, updated_at = ?
+                   WHERE id = ?""",
+                [
+                    (c["climbed_by"], c["total_likes"], c["total_comments"], now, climb_id)
+                    for climb_id, c in counts.items()
+                ]
+            )
+            conn.executemany(
+                """INSERT INTO climb_social_refresh (climb_id, refreshed_at)
+                   VALUES (?, ?)
+                   ON CONFLICT(climb_id) DO UPDATE SET refreshed_at = excluded.refreshed_at""",
+                [(climb_id, now) for climb_id in counts]
+            )
+
+    def mark_viewed(self, climb_id: str):
+        """Enregistre la consultation d'un climb (priorité du refresh social)."""
+        now = datetime.now().isoformat()
+        with self.db.connection() as conn:
+            conn.execute(
+                """INSERT INTO climb_social_refresh (climb_id, viewed_at)
+                   VALUES (?, ?)
+                   ON CONFLICT(climb_id) DO UPDATE SET viewed_at = excluded.viewed_at""",
+                (climb_id, now)
+            )
+
+    def get_social_refresh_state(self) -> list[dict]:
+        """
+        État de fraîcheur des compteurs sociaux de tous les climbs.
+
+        Returns:
+            Liste de {id, name, climbed_by, refreshed_at, viewed_at}
+            (dates en ISO ou None)
+        """
+        with self.db.connection() as conn:
+            cursor = conn.execute(
+                """SELECT c.id, c.name, c.climbed_by, r.refreshed_at, r.viewed_at
+                   FROM climbs c
+                   LEFT JOIN climb_social_refresh r ON r.climb_id = c.id"""
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
     def _row_to_climb(self, row: dict) -> Climb:
         """Convertit une ligne SQLite en Climb."""
         from mastoc.api.models import ClimbSetter, Grade
@@ -288,24 +386,34 @@ class HoldRepository:
     def save_hold(self, hold: Hold, face_id: str):
         """Sauvegarde une prise individuelle en base."""
         with self.db.connection() as conn:
-            cx, cy = hold.centroid
-            conn.execute(
-                """INSERT INTO holds (
-                       id, face_id, area, polygon_str, touch_polygon_str, path_str,
-                       centroid_x, centroid_y, top_polygon_str, center_tape_str,
-                       right_tape_str, left_tape_str
-                   ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                   ON CONFLICT(id) DO UPDATE SET
-                       face_id = ?, polygon_str = ?, centroid_x = ?, centroid_y = ?,
-                       center_tape_str = ?, right_tape_str = ?, left_tape_str = ?""",
-                (hold.id, face_id, hold.area, hold.polygon_str,
-                 hold.touch_polygon_str, hold.path_str, cx, cy,
-                 hold.top_polygon_str, hold.center_tape_str,
-                 hold.right_tape_str, hold.left_tape_str,
-                 # ON CONFLICT updates
-                 face_id, hold.polygon_str, cx, cy,
-                 hold.center_tape_str, hold.right_tape_str, hold.left_tape_str)
-            )
+            self._save_hold(conn, hold, face_id)
+
+    def save_holds(self, holds: list[Hold], face_id: str):
+        """Sauvegarde des prises d'une face en base (une transaction)."""
+        with self.db.connection() as conn:
+            for hold in holds:
+                self._save_hold(conn, hold, face_id)
+
+    def _save_hold(self, conn, hold: Hold, face_id: str):
+        """Upsert d'une prise sur une connexion ouverte."""
+        cx, cy = hold.centroid
+        conn.execute(
+            """INSERT INTO holds (
+                   id, face_id, area, polygon_str, touch_polygon_str, path_str,
+                   centroid_x, centroid_y, top_polygon_str, center_tape_str,
+                   right_tape_str, left_tape_str
+               ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                   face_id = ?, polygon_str = ?, centroid_x = ?, centroid_y = ?,
+                   center_tape_str = ?, right_tape_str = ?, left_tape_str = ?""",
+            (hold.id, face_id, hold.area, hold.polygon_str,
+             hold.touch_polygon_str, hold.path_str, cx, cy,
+             hold.top_polygon_str, hold.center_tape_str,
+             hold.right_tape_str, hold.left_tape_str,
+             # ON CONFLICT updates
+             face_id, hold.polygon_str, cx, cy,
+             hold.center_tape_str, hold.right_tape_str, hold.left_tape_str)
+        )
 
     def get_hold(self, hold_id: int) -> Optional[Hold]:
         """Récupère une prise par son ID."""
@@ -363,6 +471,25 @@ class HoldRepository:
                 return row["picture_name"]
             return None
 
+    def get_face_picture_paths(self) -> list[str]:
+        """Récupère les chemins des images de toutes les faces."""
+        with self.db.connection() as conn:
+            cursor = conn.execute(
+                "SELECT DISTINCT picture_name FROM faces WHERE picture_name IS NOT NULL"
+            )
+            return [row["picture_name"] for row in cursor.fetchall()]
+
+    def get_any_face_id(self) -> Optional[str]:
+        """Récupère l'ID de n'importe quelle face ayant une image (la première trouvée)."""
+        with self.db.connection() as conn:
+            cursor = conn.execute(
+                "SELECT id FROM faces WHERE picture_name IS NOT NULL LIMIT 1"
+            )
+            row = cursor.fetchone()
+            if row:
+                return row["id"]
+            return None
+
     def get_any_face_picture_path(self) -> Optional[str]:
         """Récupère le chemin de l'image de n'importe quelle face (la première trouvée)."""
         with self.db.connection() as conn:
@@ -404,3 +531,136 @@ class HoldRepository:
             has_symmetry=bool(row.get("has_symmetry")),
             holds=holds,
         )
+
+
+class AnnotationRepository:
+    """Instantané local des annotations de prises, par mur."""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def save_wall_annotations(self, face_id: str, items: dict[int, dict], replace: bool = False):
+        """
+        Enregistre les annotations d'un mur.
+
+        Args:
+            face_id: ID de la face
+            items: {hold_id: données API} ; une prise sans annotateur est
+                supprimée de l'instantané
+            replace: True pour un instantané complet (remplace celui du mur)
+        """
+        now = datetime.now().isoformat()
+        kept = {
+            hold_id: data for hold_id, data in items.items()
+            if data.get("consensus", {}).get("total_annotators") or data.get("user_annotation")
+        }
+        with self.db.connection() as conn:
+            if replace:
+                conn.execute("DELETE FROM hold_annotations WHERE face_id = ?", (face_id,))
+            else:
+                conn.executemany(
+                    "DELETE FROM hold_annotations WHERE hold_id = ?",
+                    [(hold_id,) for hold_id in items if hold_id not in kept]
+                )
+            conn.executemany(
+                """INSERT INTO hold_annotations (hold_id, face_id, data, synced_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(hold_id) DO UPDATE SET
+                       face_id = excluded.face_id,
+                       data = excluded.data,
+                       synced_at = excluded.synced_at""",
+                [(hold_id, face_id, json.dumps(data), now) for hold_id, data in kept.items()]
+            )
+
+    def get_wall_annotations(self, face_id: str) -> dict[int, dict]:
+        """Annotations d'un mur : {hold_id: données API}."""
+        with self.db.connection() as conn:
+            cursor = conn.execute(
+                "SELECT hold_id, data FROM hold_annotations WHERE face_id = ?", (face_id,)
+            )
+            return {row["hold_id"]: json.loads(row["data"]) for row in cursor.fetchall()}
+
+
+class OutboxRepository:
+    """Stockage des écritures en attente d'envoi (table outbox)."""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def get(self, kind: str, target: str) -> Optional[dict]:
+        """Intention en attente pour une cible, ou None."""
+        with self.db.connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM outbox WHERE kind = ? AND target = ?", (kind, str(target))
+            ).fetchone()
+            return self._row_to_entry(row) if row else None
+
+    def put(self, kind: str, target: str, payload: dict):
+        """Enregistre (ou remplace) l'intention d'une cible."""
+        now = datetime.now().isoformat()
+        with self.db.connection() as conn:
+            conn.execute(
+                """INSERT INTO outbox (kind, target, payload, created_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(kind, target) DO UPDATE SET
+                       payload = excluded.payload,
+                       last_error = NULL""",
+                (kind, str(target), json.dumps(payload, sort_keys=True), now)
+            )
+
+    def discard(self, kind: str, target: str):
+        """Supprime l'intention d'une cible."""
+        with self.db.connection() as conn:
+            conn.execute(
+                "DELETE FROM outbox WHERE kind = ? AND target = ?", (kind, str(target))
+            )
+
+    def remove_sent(self, entries: list[dict]) -> int:
+        """
+        Supprime des intentions envoyées, sauf si elles ont été modifiées
+        depuis leur lecture (la nouvelle version reste à envoyer).
+
+        Returns:
+            Nombre d'intentions supprimées
+        """
+        if not entries:
+            return 0
+        with self.db.connection() as conn:
+            cursor = conn.executemany(
+                "DELETE FROM outbox WHERE id = ? AND payload = ?",
+                [(e["id"], e["raw_payload"]) for e in entries]
+            )
+            return cursor.rowcount
+
+    def mark_failed(self, entries: list[dict], error: str):
+        """Incrémente le compteur d'échecs des intentions."""
+        if not entries:
+            return
+        with self.db.connection() as conn:
+            conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                [(error[:500], e["id"]) for e in entries]
+            )
+
+    def pending(self, kind: Optional[str] = None) -> list[dict]:
+        """Intentions en attente, dans l'ordre d'enregistrement."""
+        with self.db.connection() as conn:
+            if kind is None:
+                cursor = conn.execute("SELECT * FROM outbox ORDER BY id")
+            else:
+                cursor = conn.execute(
+                    "SELECT * FROM outbox WHERE kind = ? ORDER BY id", (kind,)
+                )
+            return [self._row_to_entry(row) for row in cursor.fetchall()]
+
+    def count(self) -> int:
+        """Nombre d'intentions en attente."""
+        with self.db.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def _row_to_entry(self, row) -> dict:
+        """Convertit une ligne SQLite (payload JSON décodé)."""
+        entry = dict(row)
+        entry["raw_payload"] = entry["payload"]
+        entry["payload"] = json.loads(entry["payload"])
+        return entry
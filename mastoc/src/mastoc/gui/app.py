@@ -32,6 +32,7 @@ from mastoc.core.backend import (
 )
 from mastoc.core.config import AppConfig
 from mastoc.core.assets import get_asset_manager
+from mastoc.core.tiles import TileCache, TileInfo, render_overview
 from mastoc.db import Database, ClimbRepository, HoldRepository
 
 
@@ -54,6 +55,9 @@ HOLD_COLORS = {
     HoldType.TOP: (255, 0, 0, 200),        # Rouge
 }
 
+# Plus grand côté de l'image du mur rendue depuis les tuiles (px)
+VIEWER_MAX_SIDE = 2048
+
 
 def get_db_path(source: BackendSource) -> Path:
     """Retourne le chemin de la base SQLite selon la source (ADR-006)."""
@@ -130,6 +134,7 @@ class ClimbViewerWidget(QWidget):
         self.climb = None
         self.holds_map = {}
         self.img_color = None
+        self.img_scale = 1.0  # pixels de l'image affichée par pixel de la photo
         self.hold_colors = {}
         self.img_item = None
 
@@ -225,14 +230,34 @@ class ClimbViewerWidget(QWidget):
         self.holds_map = holds_map
 
     def set_image(self, image_path: Path):
-        """Charge l'image du mur."""
+        """Charge l'image du mur (photo complète)."""
         if image_path and image_path.exists():
-            self.img_color = Image.open(image_path).convert('RGB')
+            self.set_picture(Image.open(image_path).convert('RGB'))
+        else:
+            self.set_picture(None)
+
+    def set_picture(self, image: Image.Image | None, scale: float = 1.0):
+        """
+        Définit l'image du mur, éventuellement réduite (rendu par tuiles).
+
+        Args:
+            image: Image RGB, ou None (affichage simple sans photo)
+            scale: Pixels de l'image par pixel de la photo d'origine
+        """
+        self.img_color = image
+        self.img_scale = scale
+        if image is not None:
             self.sliders_widget.show()
         else:
-            self.img_color = None
             self.sliders_widget.hide()
 
+    def _to_image(self, points: list[tuple[float, float]]) -> list[tuple[float, float]]:
+        """Coordonnées de la photo d'origine -> pixels de l'image affichée."""
+        return [(x * self.img_scale, y * self.img_scale) for x, y in points]
+
+    def _scaled_width(self) -> int:
+        return max(1, round(self.contour_width * self.img_scale))
+
     def show_climb(self, climb: Climb):
         """Affiche un climb."""
         self.climb = climb
@@ -251,7 +276,9 @@ class ClimbViewerWidget(QWidget):
             for ch in holds:
                 hold = self.holds_map.get(ch.hold_id)
                 if hold:
-                    self.hold_colors[ch.hold_id] = get_dominant_color(self.img_color, hold.centroid)
+                    self.hold_colors[ch.hold_id] = get_dominant_color(
+                        self.img_color, self._to_image([hold.centroid])[0]
+                    )
             self.update_image()
         else:
             self.draw_climb_simple()
@@ -303,6 +330,8 @@ class ClimbViewerWidget(QWidget):
         contours = Image.new('RGBA', self.img_color.size, (0, 0, 0, 0))
         contour_draw = ImageDraw.Draw(contours)
 
+        width = self._scaled_width()
+
         # Identifier les prises de départ
         climb_holds = self.climb.get_holds()
         start_holds = [ch for ch in climb_holds if ch.hold_type == HoldType.START]
@@ -311,7 +340,7 @@ class ClimbViewerWidget(QWidget):
             hold = self.holds_map.get(ch.hold_id)
             if not hold:
                 continue
-            points = parse_polygon_points(hold.polygon_str)
+            points = self._to_image(parse_polygon_points(hold.polygon_str))
             if len(points) < 3:
                 continue
 
@@ -322,22 +351,22 @@ class ClimbViewerWidget(QWidget):
 
             # Prise TOP : double contour écarté
             if ch.hold_type == HoldType.TOP:
-                contour_draw.polygon(points, outline=(*contour_color, 255), width=self.contour_width)
+                contour_draw.polygon(points, outline=(*contour_color, 255), width=width)
                 # Deuxième contour écarté (dilater les points depuis le centroïde)
-                cx, cy = hold.centroid
+                cx, cy = self._to_image([hold.centroid])[0]
                 scale_factor = 1.35  # 35% plus grand
                 expanded_points = [
                     (cx + (px - cx) * scale_factor, cy + (py - cy) * scale_factor)
                     for px, py in points
                 ]
-                contour_draw.polygon(expanded_points, outline=(*contour_color, 255), width=self.contour_width)
+                contour_draw.polygon(expanded_points, outline=(*contour_color, 255), width=width)
             # Prise FEET : contour NEON_BLUE (#31DAFF)
             elif ch.hold_type == HoldType.FEET:
                 # Contour cyan néon pour marquer les pieds obligatoires
                 NEON_BLUE = (49, 218, 255, 255)
-                contour_draw.polygon(points, outline=NEON_BLUE, width=self.contour_width)
+                contour_draw.polygon(points, outline=NEON_BLUE, width=width)
             else:
-                contour_draw.polygon(points, outline=(*contour_color, 255), width=self.contour_width)
+                contour_draw.polygon(points, outline=(*contour_color, 255), width=width)
 
         # Dessiner les lignes de tape pour les prises de départ
         self._draw_start_tapes(contour_draw, start_holds)
@@ -375,8 +404,8 @@ class ClimbViewerWidget(QWidget):
         line = parse_tape_line(tape_str)
         if not line:
             return
-        (x1, y1), (x2, y2) = line
-        draw.line([(x1, y1), (x2, y2)], fill=(255, 255, 255, 255), width=self.contour_width)
+        (x1, y1), (x2, y2) = self._to_image(list(line))
+        draw.line([(x1, y1), (x2, y2)], fill=(255, 255, 255, 255), width=self._scaled_width())
 
     def draw_climb_simple(self):
         """Dessine le climb sans image."""
@@ -456,6 +485,9 @@ class MastockApp(QMainWindow):
         )
         self.auth_manager.set_on_auth_change(self._on_auth_changed)
 
+        # Ancien cache de validateurs (fichier JSON unique, non borné)
+        (Path.home() / ".mastoc" / "http_validators.json").unlink(missing_ok=True)
+
         # Backend avec fallback Stokt → Railway
         self._current_source = BackendSource(self._app_config.source)
         self.backend = BackendSwitch(BackendConfig(
@@ -463,6 +495,9 @@ class MastockApp(QMainWindow):
             railway_api_key=self._app_config.railway_api_key,
             railway_url=self._app_config.railway_url,
             fallback_to_stokt=True,
+            validator_cache_path=Path.home() / ".mastoc" / "http_validators.db",
+            compact_format=True,
+            read_cache_path=Path.home() / ".mastoc" / "read_cache.db",
         ))
         # Alias pour compatibilité (widgets existants)
         if self._current_source == BackendSource.RAILWAY and self.backend.railway:
@@ -477,6 +512,8 @@ class MastockApp(QMainWindow):
             self.sync_manager = RailwaySyncManager(self.api, self.db)
         else:
             self.sync_manager = SyncManager(self.api, self.db)
+        # Refresh social continu (Stokt uniquement, activé via le menu Outils)
+        self._social_refresher = None
         self.holds_map = {}
 
         self.setWindowTitle("mastoc - Climb Viewer")
@@ -593,6 +630,11 @@ class MastockApp(QMainWindow):
         refresh_social_action.triggered.connect(self.refresh_all_social_stats)
         tools_menu.addAction(refresh_social_action)
 
+        self.background_social_action = QAction("Rafraîchir stats sociales en continu", self)
+        self.background_social_action.setCheckable(True)
+        self.background_social_action.toggled.connect(self.toggle_background_social_refresh)
+        tools_menu.addAction(self.background_social_action)
+
         # Menu Compte
         self.account_menu = menubar.addMenu("Compte")
 
@@ -644,6 +686,40 @@ class MastockApp(QMainWindow):
             logger.error(f"Erreur chargement image: {e}")
             return legacy_path if legacy_path.exists() else None
 
+    def _load_face_tiles(self) -> tuple[Image.Image, float] | None:
+        """
+        Rend la photo du mur depuis la pyramide de tuiles (Railway).
+
+        Seules les tuiles du niveau affiché sont téléchargées, puis gardées
+        dans le cache disque : la photo pleine résolution n'est ni
+        téléchargée ni décodée.
+
+        Returns:
+            (image réduite, échelle), ou None si les tuiles sont indisponibles
+        """
+        if self._current_source != BackendSource.RAILWAY:
+            return None
+        try:
+            face_id = HoldRepository(self.db).get_any_face_id()
+            if not face_id:
+                return None
+            info = TileInfo.from_api(self.api.get_face_tiles(face_id))
+            image, scale = render_overview(info, TileCache(self.api.get_face_tile), VIEWER_MAX_SIDE)
+            logger.info(f"Image rendue depuis les tuiles: {image.width}x{image.height}")
+            return image, scale
+        except Exception as e:
+            logger.warning(f"Tuiles indisponibles, utilisation de l'image complète: {e}")
+            return None
+
+    def _get_wall_image(self) -> Image.Image | None:
+        """Photo complète du mur (pictos), chargée à la première demande."""
+        if self.wall_image is None:
+            if self.image_path is None:
+                self.image_path = self._load_face_image()
+            if self.image_path and self.image_path.exists():
+                self.wall_image = PILImage.open(self.image_path).convert('RGB')
+        return self.wall_image
+
     def load_data(self):
         """Charge les données depuis la base de données."""
         # Charger les prises
@@ -652,12 +728,15 @@ class MastockApp(QMainWindow):
         self.holds_map = {h.id: h for h in holds}
         self.climb_viewer.set_holds_map(self.holds_map)
 
-        # Charger l'image du mur depuis le cache
-        self.image_path = self._load_face_image()
+        # Image du mur : tuiles si disponibles, sinon photo complète en cache
+        self.image_path = None
         self.wall_image = None
-        if self.image_path and self.image_path.exists():
+        tiled = self._load_face_tiles()
+        if tiled:
+            self.climb_viewer.set_picture(*tiled)
+        else:
+            self.image_path = self._load_face_image()
             self.climb_viewer.set_image(self.image_path)
-            self.wall_image = PILImage.open(self.image_path).convert('RGB')
 
         # Stats pictos
         picto_cache = self.climb_list.get_picto_cache()
@@ -675,6 +754,8 @@ class MastockApp(QMainWindow):
         logger.info(f"Climb selectionne: {climb.name} ({climb.grade.font if climb.grade else '?'})")
         self.climb_viewer.show_climb(climb)
         self.statusBar().showMessage(f"Climb: {climb.name}")
+        # Priorise ce climb pour le refresh des stats sociales
+        ClimbRepository(self.db).mark_viewed(climb.id)
 
     def _on_tab_changed(self, index: int):
         """Appele quand l'onglet change."""
@@ -780,7 +861,7 @@ class MastockApp(QMainWindow):
         """
         Rafraîchit les stats sociales de tous les climbs (TODO 18).
 
-        Utilise SyncManager.refresh_all_social_counts() avec throttling.
+        Utilise SocialRefresher (concurrence + rate limiting adaptatif).
         """
         # Vérifier que c'est le backend Stokt (Railway n'a pas cette fonction)
         if self._current_source != BackendSource.STOKT:
@@ -807,13 +888,23 @@ class MastockApp(QMainWindow):
                 return
 
         # Confirmation
-        climb_count = self.db.get_climb_count()
+        refresher = self.sync_manager.social_refresher()
+        climb_count = len(refresher.pending_climbs())
+        if climb_count == 0:
+            QMessageBox.information(
+                self, "Rafraîchir stats sociales",
+                "Les stats sociales de tous les climbs sont à jour."
+            )
+            return
+        rate = refresher.bucket.rate
         reply = QMessageBox.question(
             self, "Rafraîchir stats sociales",
             f"Cette opération va rafraîchir les stats sociales\n"
-            f"de {climb_count} climbs depuis Stokt.\n\n"
-            f"Cela peut prendre environ {climb_count} secondes\n"
-            f"(throttling 1 req/sec pour éviter le rate limiting).\n\n"
+            f"de {climb_count} climbs depuis Stokt (les plus consultés\n"
+            f"et les plus anciens d'abord).\n\n"
+            f"Durée estimée : {climb_count / rate / 60:.0f} min au plus\n"
+            f"(débit adapté automatiquement au rate limiting).\n"
+            f"Une interruption peut être reprise plus tard.\n\n"
             f"Continuer ?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
@@ -841,10 +932,7 @@ class MastockApp(QMainWindow):
                 raise InterruptedError("Annulé par l'utilisateur")
 
         try:
-            result = self.sync_manager.refresh_all_social_counts(
-                callback=on_progress,
-                delay_seconds=1.0
-            )
+            result = refresher.run(callback=on_progress)
 
             progress.close()
 
@@ -870,6 +958,25 @@ class MastockApp(QMainWindow):
             logger.error(f"Erreur refresh stats sociales: {e}")
             QMessageBox.warning(self, "Erreur", str(e))
 
+    def toggle_background_social_refresh(self, enabled: bool):
+        """Active/désactive le rafraîchissement continu des stats sociales."""
+        if self._social_refresher:
+            self._social_refresher.stop()
+            self._social_refresher = None
+
+        if enabled:
+            if self._current_source != BackendSource.STOKT or not self.api.is_authenticated():
+                self.statusBar().showMessage(
+                    "Refresh continu : connexion Stokt requise"
+                )
+                self.background_social_action.setChecked(False)
+                return
+            self._social_refresher = self.sync_manager.social_refresher()
+            self._social_refresher.start_background()
+            self.statusBar().showMessage("Refresh continu des stats sociales activé")
+        elif self.background_social_action.isChecked():
+            self.background_social_action.setChecked(False)
+
     def regenerate_pictos(self, force: bool = True):
         """Régénère tous les pictos."""
         climb_repo = ClimbRepository(self.db)
@@ -904,7 +1011,7 @@ class MastockApp(QMainWindow):
             picto_cache.generate_all(
                 all_climbs,
                 self.holds_map,
-                self.wall_image,
+                self._get_wall_image(),
                 progress_callback=on_progress,
                 force=force
             )
@@ -955,6 +1062,9 @@ class MastockApp(QMainWindow):
         elif source == BackendSource.RAILWAY and self.backend.railway:
             self.api = self.backend.railway.api
 
+        # Le refresh social continu est lié à l'ancienne base
+        self.toggle_background_social_refresh(False)
+
         # Basculer vers la base SQLite correspondante (ADR-006)
         self.db = Database(get_db_path(source))
         # Utiliser le bon SyncManager selon la source
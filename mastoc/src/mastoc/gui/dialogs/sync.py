@@ -2,6 +2,7 @@
 Dialog de synchronisation avec choix du mode (incrémental/complet).
 """
 
+import logging
 from datetime import datetime
 from typing import Optional
 
@@ -12,6 +13,10 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 
+from mastoc.core.assets import prefetch_offline_assets
+
+logger = logging.getLogger(__name__)
+
 
 class SyncWorker(QThread):
     """Worker thread pour la synchronisation."""
@@ -20,10 +25,11 @@ class SyncWorker(QThread):
     finished = pyqtSignal(object)  # SyncResult
     error = pyqtSignal(str)
 
-    def __init__(self, sync_manager, mode: str, parent=None):
+    def __init__(self, sync_manager, mode: str, parent=None, db=None):
         super().__init__(parent)
         self.sync_manager = sync_manager
         self.mode = mode
+        self.db = db
 
     def run(self):
         try:
@@ -35,10 +41,22 @@ class SyncWorker(QThread):
                 result = self.sync_manager.sync_full(
                     callback=lambda c, t, m: self.progress.emit(c, t, m)
                 )
+            if result.success and self.db is not None:
+                self.prefetch_assets()
             self.finished.emit(result)
         except Exception as e:
             self.error.emit(str(e))
 
+    def prefetch_assets(self):
+        """Images des murs et avatars des setters, pour l'usage hors-ligne."""
+        try:
+            prefetch_offline_assets(
+                self.db, callback=lambda c, t, m: self.progress.emit(c, t, m)
+            )
+        except Exception as e:
+            # Les images manquantes seront téléchargées à l'affichage
+            logger.warning(f"Préchargement des images échoué: {e}")
+
 
 class SyncDialog(QDialog):
     """
@@ -200,7 +218,7 @@ class SyncDialog(QDialog):
         self.full_radio.setEnabled(False)
 
         # Démarrer le worker
-        self.worker = SyncWorker(self.sync_manager, mode, self)
+        self.worker = SyncWorker(self.sync_manager, mode, self, db=self.db)
         self.worker.progress.connect(self.on_progress)
         self.worker.finished.connect(self.on_finished)
         self.worker.error.connect(self.on_error)
@@ -236,6 +254,9 @@ class SyncDialog(QDialog):
             if result.climbs_updated > 0:
                 details.append(f"Climbs mis à jour: {result.climbs_updated}")
 
+            if result.climbs_deleted > 0:
+                details.append(f"Climbs supprimés: {result.climbs_deleted}")
+
             if result.holds_added > 0:
                 details.append(f"Prises ajoutées: {result.holds_added}")
 
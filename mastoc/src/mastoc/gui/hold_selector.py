@@ -17,19 +17,21 @@ from PyQt6.QtWidgets import (
     QFrame, QStatusBar, QSlider, QRadioButton, QButtonGroup, QComboBox,
     QCheckBox, QScrollArea, QGroupBox, QDialog, QMessageBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QPixmap, QImage, QPainter
 from PIL import Image, ImageEnhance
 
-from mastoc.db import Database, HoldRepository
+from mastoc.db import Database, ClimbRepository, HoldRepository
 from mastoc.core.hold_index import HoldClimbIndex
 from mastoc.core.colormaps import Colormap, get_colormap_preview, get_colormap_display_name, get_all_colormaps
 from mastoc.core.social_loader import SocialLoader, SocialData
+from mastoc.core.annotation_loader import WallAnnotationStore
 from mastoc.gui.widgets.level_slider import LevelRangeSlider
 from mastoc.gui.widgets.hold_overlay import HoldOverlay, ColorMode
 from mastoc.gui.widgets.climb_renderer import render_climb
 from mastoc.gui.widgets.social_panel import SocialPanel
 from mastoc.api.client import StoktAPI
+from mastoc.api.async_client import AsyncStoktAPI, httpx_available
 from mastoc.core.backend import BackendSwitch, BackendConfig, BackendSource, MONTOBOARD_GYM_ID
 from mastoc.core.config import AppConfig
 from mastoc.core.assets import get_asset_manager
@@ -61,6 +63,9 @@ class ClimbListItem(QListWidgetItem):
 class HoldSelectorApp(QMainWindow):
     """Application de sélection de blocs par prises."""
 
+    # Annotations du mur rafraîchies en arrière-plan (dict hold_id -> AnnotationData)
+    wall_annotations_loaded = pyqtSignal(dict)
+
     def __init__(self):
         super().__init__()
         t0 = time.perf_counter()
@@ -108,7 +113,9 @@ class HoldSelectorApp(QMainWindow):
         self.backend: BackendSwitch | None = None
         self.api: StoktAPI | None = None  # Alias pour compatibilité
         self.social_loader: SocialLoader | None = None
+        self.annotation_store: WallAnnotationStore | None = None
         self._init_api()
+        self.wall_annotations_loaded.connect(self._on_wall_annotations_loaded)
 
         self.setWindowTitle("mastoc - Sélection par prises")
         self.setMinimumSize(1400, 900)
@@ -182,6 +189,7 @@ class HoldSelectorApp(QMainWindow):
             # Alias pour compatibilité selon la source
             if self._current_source == BackendSource.RAILWAY and self.backend.railway:
                 self.api = self.backend.railway.api
+                self.annotation_store = WallAnnotationStore(self.api, self.db)
                 logger.info("Backend Railway initialisé")
             elif self.backend.stokt:
                 self.api = self.backend.stokt.api
@@ -189,7 +197,13 @@ class HoldSelectorApp(QMainWindow):
                 if self.api and hasattr(self.api, 'get_user_profile'):
                     try:
                         self.api.get_user_profile()
-                        self.social_loader = SocialLoader(self.api)
+                        # Client async (httpx) : sends/comments/likes en parallèle
+                        async_api = AsyncStoktAPI(self.api) if httpx_available() else None
+                        self.social_loader = SocialLoader(
+                            self.api,
+                            async_api=async_api,
+                            cache_path=self._get_db_path().parent / "social_cache.db",
+                        )
                         self.social_loader.on_data_loaded = self._on_social_data_loaded
                         logger.info("Backend Stokt initialisé avec succès")
                     except Exception:
@@ -258,6 +272,10 @@ class HoldSelectorApp(QMainWindow):
         self.color_mode_combo.addItem("Niveau max", ColorMode.MAX_GRADE)
         self.color_mode_combo.addItem("Fréquence", ColorMode.FREQUENCY)
         self.color_mode_combo.addItem("Rareté", ColorMode.RARE)
+        if self.annotation_store:
+            self.color_mode_combo.addItem("Préhension", ColorMode.GRIP_TYPE)
+            self.color_mode_combo.addItem("État", ColorMode.CONDITION)
+            self.color_mode_combo.addItem("Difficulté", ColorMode.DIFFICULTY)
         self.color_mode_combo.currentIndexChanged.connect(self.on_color_mode_changed)
         mode_layout.addWidget(self.color_mode_combo, stretch=1)
         left_layout.addWidget(mode_row)
@@ -514,8 +532,23 @@ class HoldSelectorApp(QMainWindow):
         if mode:
             logger.info(f"Color mode changed to {mode.value}")
             self.hold_overlay.set_color_mode(mode)
+            if mode in (ColorMode.GRIP_TYPE, ColorMode.CONDITION, ColorMode.DIFFICULTY):
+                self._load_wall_annotations()
             self.update_display()
 
+    def _load_wall_annotations(self):
+        """Affiche l'instantané local des annotations puis le rafraîchit (delta)."""
+        face_id = self._get_face_id()
+        if not self.annotation_store or not face_id:
+            return
+        self.hold_overlay.set_annotation_data(self.annotation_store.get(face_id))
+        self.annotation_store.refresh_async(face_id, on_done=self.wall_annotations_loaded.emit)
+
+    def _on_wall_annotations_loaded(self, annotations: dict):
+        """Annotations du mur à jour (thread UI)."""
+        self.hold_overlay.set_annotation_data(annotations)
+        self.update_display()
+
     def on_colormap_changed(self, index: int):
         """Appelé quand la palette change."""
         cmap = self.palette_combo.currentData()
@@ -752,6 +785,12 @@ class HoldSelectorApp(QMainWindow):
         if self.social_loader:
             self.social_panel.set_loading(True)
             self.social_loader.load(climb.id)
+            # Précharge les voisins : navigation suivant/précédent instantanée
+            i = self.current_climb_index
+            neighbors = self.filtered_climbs[i + 1:i + 3] + self.filtered_climbs[max(i - 1, 0):i]
+            self.social_loader.prefetch(c.id for c in neighbors)
+            # Priorise ce climb pour le refresh des stats sociales
+            ClimbRepository(self.db).mark_viewed(climb.id)
 
     def prev_climb(self):
         """Passe au bloc précédent."""
@@ -449,6 +449,10 @@ class ClimbDetailWidget(QWidget):
             self.social_panel.set_loading(True)
 
         self.social_loader.load(self.climb.id)
+        # Précharge les voisins : navigation suivant/précédent instantanée
+        i = self.current_index
+        neighbors = self.climb_list[i + 1:i + 3] + self.climb_list[max(i - 1, 0):i]
+        self.social_loader.prefetch(c.id for c in neighbors if c.id != self.climb.id)
 
     def _on_social_data_loaded(self, data: SocialData):
         """Callback quand les données sociales sont chargées."""
@@ -4,17 +4,25 @@ Tests pour AnnotationLoader (TODO 12).
 Tests couverts :
 - AnnotationLoader : chargement async et cache
 - AnnotationLoaderSync : version synchrone
+- WallAnnotationStore : instantané local du mur et rafraîchissement delta
 """
 
 import pytest
+import tempfile
 import time
+from pathlib import Path
 from unittest.mock import Mock
 
+import requests
+
 from mastoc.api.models import (
     HoldAnnotation, HoldConsensus, AnnotationData,
     HoldGripType, HoldCondition, HoldRelativeDifficulty
 )
-from mastoc.core.annotation_loader import AnnotationLoader, AnnotationLoaderSync
+from mastoc.core.annotation_loader import (
+    AnnotationLoader, AnnotationLoaderSync, WallAnnotationStore
+)
+from mastoc.db import Database
 
 
 # =============================================================================
@@ -307,6 +315,34 @@ class TestAnnotationLoader:
         mock_api.get_hold_annotations_batch.assert_called_once_with([2, 3])
 
 
+    def test_invalidate_is_exact(self, mock_api):
+        """invalidate(1) ne touche pas la prise 12 (clés de même préfixe)."""
+        loader = AnnotationLoader(mock_api)
+        for hold_id in (1, 12):
+            loader._set_cached(hold_id, AnnotationData(
+                hold_id=hold_id, consensus=HoldConsensus(hold_id=hold_id), loaded=True
+            ))
+
+        loader.invalidate(1)
+
+        assert loader._get_cached(1) is None
+        assert loader._get_cached(12) is not None
+
+    def test_load_delivers_fetched_data(self, mock_api):
+        """Sans cache, load() livre le résultat du chargement en arrière-plan."""
+        loader = AnnotationLoader(mock_api)
+        delivered = []
+        loader.on_data_loaded = delivered.append
+
+        loader.load(123)
+        deadline = time.time() + 2
+        while not delivered and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert delivered[0].hold_id == 123
+        mock_api.get_hold_annotations.assert_called_once_with(123)
+
+
 class TestAnnotationLoaderSync:
     """Tests pour AnnotationLoaderSync."""
 
@@ -364,3 +400,95 @@ class TestAnnotationLoaderSync:
         assert len(result) == 2
         assert result[1].loaded is False
         assert result[2].loaded is False
+
+
+# =============================================================================
+# Tests WallAnnotationStore
+# =============================================================================
+
+def _wall_item(hold_id, stokt_id, grip_type="plat", annotators=1):
+    return {
+        "hold_id": hold_id,
+        "hold_stokt_id": stokt_id,
+        "consensus": {"grip_type": grip_type, "grip_type_votes": annotators,
+                      "total_annotators": annotators},
+        "user_annotation": None,
+    }
+
+
+def _wall_page(items, count=None, server_time="2026-01-01T00:00:00"):
+    return {
+        "annotations": items,
+        "count": len(items) if count is None else count,
+        "server_time": server_time,
+    }
+
+
+class TestWallAnnotationStore:
+    """Tests pour WallAnnotationStore."""
+
+    @pytest.fixture
+    def db(self):
+        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
+            db_path = Path(f.name)
+        yield Database(db_path)
+        db_path.unlink(missing_ok=True)
+
+    def test_full_then_delta(self, db):
+        api = Mock()
+        api.get_wall_annotations.return_value = _wall_page(
+            [_wall_item(1, 101), _wall_item(2, 102)]
+        )
+        store = WallAnnotationStore(api, db)
+
+        annotations = store.refresh("face-1")
+
+        assert set(annotations) == {101, 102}
+        assert annotations[101].consensus.grip_type == HoldGripType.PLAT
+        assert api.get_wall_annotations.call_args.kwargs["updated_since"] is None
+
+        # Delta : seule la prise modifiée est renvoyée
+        api.get_wall_annotations.return_value = _wall_page(
+            [_wall_item(2, 102, grip_type="bac")], server_time="2026-01-02T00:00:00"
+        )
+        annotations = store.refresh("face-1")
+
+        assert api.get_wall_annotations.call_args.kwargs["updated_since"] == "2026-01-01T00:00:00"
+        assert annotations[101].consensus.grip_type == HoldGripType.PLAT
+        assert annotations[102].consensus.grip_type == HoldGripType.BAC
+        assert db.get_metadata("annotations_synced_at:face-1") == "2026-01-02T00:00:00"
+
+    def test_delta_removes_deleted_annotations(self, db):
+        api = Mock()
+        api.get_wall_annotations.return_value = _wall_page([_wall_item(1, 101)])
+        store = WallAnnotationStore(api, db)
+        store.refresh("face-1")
+
+        api.get_wall_annotations.return_value = _wall_page([_wall_item(1, 101, annotators=0)])
+        assert store.refresh("face-1") == {}
+
+    def test_pagination(self, db):
+        api = Mock()
+        api.get_wall_annotations.side_effect = [
+            _wall_page([_wall_item(1, 101)], count=2),
+            _wall_page([_wall_item(2, 102)], count=2, server_time="later"),
+        ]
+        store = WallAnnotationStore(api, db, page_size=1)
+
+        assert set(store.refresh("face-1")) == {101, 102}
+        assert api.get_wall_annotations.call_count == 2
+        # L'heure retenue est celle de la première page
+        assert db.get_metadata("annotations_synced_at:face-1") == "2026-01-01T00:00:00"
+
+    def test_offline_keeps_local_snapshot(self, db):
+        api = Mock()
+        api.get_wall_annotations.return_value = _wall_page([_wall_item(1, 101)])
+        store = WallAnnotationStore(api, db)
+        store.refresh("face-1")
+
+        api.get_wall_annotations.side_effect = requests.ConnectionError("offline")
+        with pytest.raises(requests.ConnectionError):
+            store.refresh("face-1")
+
+        assert set(store.get("face-1")) == {101}
+        assert store.get("face-2") == {}
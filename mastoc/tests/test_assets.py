@@ -7,7 +7,7 @@ from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 import pytest
 
-from mastoc.core.assets import AssetManager, get_asset_manager, STOKT_MEDIA_URL
+from mastoc.core.assets import AssetManager, avatar_size, get_asset_manager, STOKT_MEDIA_URL
 
 
 class TestAssetManager:
@@ -208,6 +208,34 @@ class TestAssetManagerUserAvatar:
 
         assert result == cache_path
 
+    def test_mastoc_avatar_requests_thumbnail_size(self, tmp_path):
+        """Un avatar mastoc est demandé en miniature, à la taille affichée."""
+        manager = AssetManager(cache_dir=tmp_path, server_url="https://api.test/")
+        avatar_path = "/api/users/u1/avatar?v=abc"
+
+        mock_response = Mock(status_code=200, content=b"webp", headers={})
+        mock_session = Mock()
+        mock_session.get.return_value = mock_response
+        manager._session = mock_session
+
+        result = manager.get_user_avatar(avatar_path, size=48)
+
+        url = mock_session.get.call_args[0][0]
+        assert url == "https://api.test/api/users/u1/avatar?v=abc&size=64"
+        assert result.suffix == ".webp"
+        assert result.read_bytes() == b"webp"
+
+        # URL versionnée : la miniature en cache sert sans requête
+        assert manager.get_user_avatar(avatar_path, size=64) == result
+        assert mock_session.get.call_count == 1
+
+    def test_avatar_size_snaps_to_served_sizes(self):
+        """Taille servie couvrant les pixels physiques affichés."""
+        assert avatar_size(32) == 32
+        assert avatar_size(40) == 64
+        assert avatar_size(32, device_pixel_ratio=2.0) == 64
+        assert avatar_size(1000) == 256
+
 
 class TestAssetManagerCacheManagement:
     """Tests pour la gestion du cache."""
@@ -280,3 +308,172 @@ class TestGetAssetManager:
 
         # Cleanup
         assets_module._asset_manager = None
+
+
+class TestAssetManagerConditional:
+    """Tests de revalidation par ETag."""
+
+    def _response(self, status_code, content=b"", headers=None):
+        response = Mock()
+        response.status_code = status_code
+        response.content = content
+        response.headers = headers or {}
+        response.raise_for_status = Mock()
+        return response
+
+    def test_stores_validators_and_revalidates(self, tmp_path):
+        """L'ETag est stocké puis renvoyé ; un 304 conserve le fichier."""
+        manager = AssetManager(cache_dir=tmp_path)
+        remote_path = "CACHE/images/face.jpg"
+
+        mock_session = Mock()
+        mock_session.get.side_effect = [
+            self._response(200, b"image v1", {"ETag": '"abc"'}),
+            self._response(304),
+        ]
+        manager._session = mock_session
+
+        path = manager.get_face_image(remote_path)
+        assert mock_session.get.call_args.kwargs["headers"] == {}
+
+        result = manager.get_face_image(remote_path, force_download=True)
+
+        assert mock_session.get.call_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+        assert result == path
+        assert result.read_bytes() == b"image v1"
+
+
+class TestAssetManagerPrefetch:
+    """Tests du préchargement parallèle."""
+
+    def _session(self, payloads):
+        """Session factice : contenu par URL, 304 si If-None-Match connu."""
+        session = Mock()
+        session.calls = []
+
+        def get(url, timeout=None, headers=None):
+            session.calls.append((url, headers or {}))
+            response = Mock()
+            response.raise_for_status = Mock()
+            if headers and headers.get("If-None-Match") == f'"{url}"':
+                response.status_code = 304
+                response.headers = {}
+                return response
+            if url not in payloads:
+                import requests
+                response.status_code = 404
+                response.raise_for_status.side_effect = requests.HTTPError("404")
+                return response
+            response.status_code = 200
+            response.content = payloads[url]
+            response.headers = {"ETag": f'"{url}"'}
+            return response
+
+        session.get.side_effect = get
+        return session
+
+    def test_prefetch_faces_and_avatars(self, tmp_path):
+        """Images et avatars téléchargés, doublons fusionnés, écriture atomique."""
+        manager = AssetManager(cache_dir=tmp_path, server_url="https://api.example.com")
+        manager._session = self._session({
+            f"{STOKT_MEDIA_URL}/walls/a.jpg": b"a" * 10,
+            f"{STOKT_MEDIA_URL}/walls/b.jpg": b"b" * 20,
+            "https://api.example.com/api/users/u1/avatar?v=1&size=64": b"u" * 5,
+        })
+        progress = []
+
+        result = manager.prefetch(
+            face_pictures=["walls/a.jpg", "walls/b.jpg", "walls/a.jpg", ""],
+            avatars=["/api/users/u1/avatar?v=1", "walls/missing.jpg"],
+            callback=lambda current, total, message: progress.append((current, total)),
+        )
+
+        assert (result.downloaded, result.failed, result.cached) == (3, 1, 0)
+        assert result.bytes_downloaded == 35
+        assert result.total == 4
+        assert progress[0] == (0, 4) and progress[-1] == (4, 4)
+        assert manager.is_cached("walls/a.jpg")
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_prefetch_skips_cached_then_revalidates(self, tmp_path):
+        """Second passage : rien à télécharger ; revalidate : GET conditionnels (304)."""
+        manager = AssetManager(cache_dir=tmp_path)
+        manager._session = self._session({f"{STOKT_MEDIA_URL}/walls/a.jpg": b"a"})
+        manager.prefetch(face_pictures=["walls/a.jpg"])
+
+        result = manager.prefetch(face_pictures=["walls/a.jpg"])
+        assert result.cached == 1
+        assert len(manager._session.calls) == 1
+
+        result = manager.prefetch(face_pictures=["walls/a.jpg"], revalidate=True)
+        assert result.not_modified == 1
+        assert manager._session.calls[-1][1] == {
+            "If-None-Match": f'"{STOKT_MEDIA_URL}/walls/a.jpg"'
+        }
+
+    def test_prefetch_evicts_least_recently_used(self, tmp_path):
+        """Cache borné : les fichiers les moins récemment utilisés partent."""
+        import os
+
+        payloads = {f"{STOKT_MEDIA_URL}/walls/{name}.jpg": b"x" * 100 for name in "abc"}
+        manager = AssetManager(cache_dir=tmp_path, max_cache_bytes=10_000)
+        manager._session = self._session(payloads)
+        manager.prefetch(face_pictures=["walls/a.jpg", "walls/b.jpg", "walls/c.jpg"])
+
+        # a utilisé récemment, b et c anciens (b le plus ancien)
+        for name, age in (("a", 10), ("b", 300), ("c", 200)):
+            path = manager._get_cache_path(f"walls/{name}.jpg")
+            old = path.stat().st_mtime - age
+            os.utime(path, (old, old))
+        manager.get_face_image("walls/a.jpg")
+
+        # Place pour deux fichiers (validateurs compris)
+        entry_size = manager.get_cache_size() // 3
+        assert manager.evict(2 * entry_size) == 1
+        assert not manager.is_cached("walls/b.jpg")
+        assert not manager._get_validators_path(manager._get_cache_path("walls/b.jpg")).exists()
+        assert manager.is_cached("walls/a.jpg") and manager.is_cached("walls/c.jpg")
+
+    def test_download_enforces_limit(self, tmp_path):
+        """Un téléchargement qui dépasse la taille maximale déclenche l'éviction."""
+        import os
+
+        payloads = {f"{STOKT_MEDIA_URL}/walls/{name}.jpg": b"x" * 1000 for name in "ab"}
+        manager = AssetManager(cache_dir=tmp_path, max_cache_bytes=1500)
+        manager._session = self._session(payloads)
+
+        manager.get_face_image("walls/a.jpg")
+        path = manager._get_cache_path("walls/a.jpg")
+        old = path.stat().st_mtime - 60
+        os.utime(path, (old, old))
+        manager.get_face_image("walls/b.jpg")
+
+        assert not manager.is_cached("walls/a.jpg")
+        assert manager.is_cached("walls/b.jpg")
+        assert manager.get_cache_size() <= 1500
+
+
+class TestPrefetchOfflineAssets:
+    """Tests du préchargement depuis la base locale."""
+
+    def test_uses_local_faces_and_setters(self, tmp_path):
+        from mastoc.api.models import ClimbSetter, Face, FacePicture
+        from mastoc.core.assets import prefetch_offline_assets
+        from mastoc.db import ClimbRepository, Database, HoldRepository
+
+        db = Database(tmp_path / "mastoc.db")
+        HoldRepository(db).save_face(Face(
+            id="f1", gym="G", wall="W", is_active=True, total_climbs=0,
+            picture=FacePicture(name="walls/f1.jpg", width=10, height=10),
+            feet_rules_options=[], has_symmetry=False, holds=[],
+        ))
+        ClimbRepository(db).save_setters([
+            ClimbSetter(id="s1", full_name="S", avatar="/api/users/s1/avatar?v=2"),
+        ])
+
+        manager = Mock()
+        prefetch_offline_assets(db, manager=manager)
+
+        kwargs = manager.prefetch.call_args.kwargs
+        assert kwargs["face_pictures"] == ["walls/f1.jpg"]
+        assert kwargs["avatars"] == ["/api/users/s1/avatar?v=2"]
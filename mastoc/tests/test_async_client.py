@@ -0,0 +1,195 @@
+"""
+Tests pour les clients HTTP asynchrones.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from mastoc.api.async_client import AsyncStoktAPI, AsyncMastocAPI, get_async_runner
+from mastoc.api.client import StoktAPI, StoktAPIError, AuthenticationError as StoktAuthError
+from mastoc.api.railway_client import MastocAPI, RailwayConfig
+
+
+def _stokt(handler, **kwargs):
+    sync = StoktAPI()
+    sync.set_token("tok")
+    return AsyncStoktAPI(sync, transport=httpx.MockTransport(handler), **kwargs)
+
+
+class TestAsyncStoktAPI:
+    """Tests du client Stokt async."""
+
+    def test_social_stats_fan_out(self):
+        """Les trois requêtes sociales partent en parallèle, avec le token."""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            assert request.headers["Authorization"] == "Token tok"
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if request.url.path.endswith("/likes"):
+                return httpx.Response(200, json=[{"user": {"id": "u", "fullName": "A"}}])
+            return httpx.Response(200, json=[])
+
+        async def scenario():
+            async with _stokt(handler) as api:
+                return await api.get_climbs_social_stats(["c1", "c2"])
+
+        stats = asyncio.run(scenario())
+        assert stats["c1"] == {"climbed_by": 0, "total_likes": 1, "total_comments": 0}
+        assert peak > 1
+
+    def test_concurrency_limit(self):
+        """Le sémaphore borne le nombre de requêtes simultanées."""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, json=[])
+
+        async def scenario():
+            async with _stokt(handler, max_concurrency=2) as api:
+                await api.get_climbs_social_stats([f"c{i}" for i in range(5)])
+
+        asyncio.run(scenario())
+        assert peak == 2
+
+    def test_errors_mapped(self):
+        """401 -> AuthenticationError, autres erreurs -> StoktAPIError."""
+        def handler(request):
+            status = 401 if "likes" in request.url.path else 500
+            return httpx.Response(status)
+
+        async def scenario():
+            async with _stokt(handler) as api:
+                return await api.get_climb_social("c1")
+
+        sends, comments, likes = asyncio.run(scenario())
+        assert isinstance(sends, StoktAPIError)
+        assert isinstance(likes, StoktAuthError)
+
+    def test_sync_fallback_for_other_methods(self):
+        """Une méthode non native est exécutée via le client synchrone."""
+        api = AsyncStoktAPI(StoktAPI())
+        url = asyncio.run(api.get_face_image_url("CACHE/x.jpg"))
+        assert url.endswith("/media/CACHE/x.jpg")
+
+    def test_runner_sync_wrapper(self):
+        """get_async_runner().run exécute une coroutine depuis du code synchrone."""
+        async def handler(request):
+            return httpx.Response(200, json=[])
+
+        api = _stokt(handler)
+        assert get_async_runner().run(api.get_climb_sends("c1")) == []
+
+
+class TestAsyncMastocAPI:
+    """Tests du client Railway async."""
+
+    def test_get_all_climbs_parallel_pages(self):
+        """Les pages 2..n sont demandées après la première, résultat ordonné."""
+        pages = []
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            pages.append(page)
+            results = [{"id": f"c{page}-{i}", "name": "x", "holds_list": ""} for i in range(2)]
+            return httpx.Response(200, json={"results": results, "count": 5})
+
+        api = AsyncMastocAPI(
+            MastocAPI(RailwayConfig(api_key="k")), transport=httpx.MockTransport(handler)
+        )
+        climbs = asyncio.run(api.get_all_climbs(face_id="f", page_size=2))
+
+        assert pages[0] == 1
+        assert sorted(pages) == [1, 2, 3]
+        assert [c.id for c in climbs][:2] == ["c1-0", "c1-1"]
+        assert len(climbs) == 6
+
+    def test_conditional_get_shares_validators(self):
+        """Le client async réutilise le cache ETag du client synchrone."""
+        setup = {"id": "face-1", "holds": []}
+
+        def handler(request):
+            assert request.headers["X-API-Key"] == "k"
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=setup, headers={"ETag": '"v1"'})
+
+        api = AsyncMastocAPI(
+            MastocAPI(RailwayConfig(api_key="k")), transport=httpx.MockTransport(handler)
+        )
+
+        async def scenario():
+            first = await api.get_face_setup("face-1")
+            second = await api.get_face_setup("face-1")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first.id == second.id == "face-1"
+
+    def test_client_replaced_on_new_loop_is_closed(self):
+        """Un client lié à une boucle terminée est fermé quand il est remplacé."""
+        def handler(request):
+            return httpx.Response(200, json={"results": [], "count": 0})
+
+        api = AsyncMastocAPI(
+            MastocAPI(RailwayConfig(api_key="k")), transport=httpx.MockTransport(handler)
+        )
+
+        asyncio.run(api.get_climbs(page=1))
+        first = api._client
+        asyncio.run(api.get_climbs(page=1))
+
+        assert api._client is not first
+        assert first.is_closed
+        assert not api._client.is_closed
+
+    def test_auth_and_validator_io_off_event_loop(self):
+        """Tokens et cache de validateurs sont lus et écrits hors de la boucle."""
+        threads = {}
+
+        class RecordingAuth:
+            @property
+            def access_token(self):
+                threads["auth"] = threading.get_ident()
+                return "jwt"
+
+        sync = MastocAPI(RailwayConfig(api_key="k"))
+        sync._auth_manager = RecordingAuth()
+        validators = sync.validators
+        for name in ("conditional_headers", "store"):
+            method = getattr(validators, name)
+
+            def recording(*args, _method=method, _name=name, **kwargs):
+                threads[_name] = threading.get_ident()
+                return _method(*args, **kwargs)
+
+            setattr(validators, name, recording)
+
+        def handler(request):
+            assert request.headers["Authorization"] == "Bearer jwt"
+            return httpx.Response(200, json={"id": "face-1", "holds": []}, headers={"ETag": '"v1"'})
+
+        api = AsyncMastocAPI(sync, transport=httpx.MockTransport(handler))
+
+        async def scenario():
+            await api.get_face_setup("face-1")
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(scenario())
+        assert set(threads) == {"auth", "conditional_headers", "store"}
+        assert loop_thread not in threads.values()
@@ -2,6 +2,10 @@
 Tests pour BackendSwitch.
 """
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier, Event
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 
@@ -14,6 +18,8 @@ from mastoc.core.backend import (
     MONTOBOARD_GYM_ID,
 )
 from mastoc.api.models import Climb, Hold, Face
+from mastoc.core.backend_health import BackendHealth
+from mastoc.core.read_cache import ReadThroughCache
 
 
 class TestBackendConfig:
@@ -312,3 +318,263 @@ class TestBackendIntegration:
 
         holds = switch.get_holds("face-uuid")
         assert holds == []
+
+
+class TestReadThroughCache:
+    """Tests du cache local read-through."""
+
+    def test_fresh_entry_served_without_loader(self):
+        """Une entrée fraîche ne déclenche pas d'appel réseau."""
+        cache = ReadThroughCache(ttl=60)
+        loader = Mock(return_value="v1")
+        assert cache.get("k", loader) == "v1"
+        assert cache.get("k", loader) == "v1"
+        assert loader.call_count == 1
+
+    def test_stale_entry_refreshed_in_background(self):
+        """Une entrée périmée est servie puis rafraîchie en arrière-plan."""
+        now = {"t": 0.0}
+        cache = ReadThroughCache(ttl=10, clock=lambda: now["t"])
+        cache.get("k", lambda: "v1")
+
+        now["t"] = 11
+        refreshed = Event()
+
+        def loader():
+            refreshed.set()
+            return "v2"
+
+        assert cache.get("k", loader) == "v1"
+        assert refreshed.wait(2)
+        cache._refresher.shutdown(wait=True)
+        assert cache.get("k", loader) == "v2"
+
+    def test_stale_entry_served_when_backend_down(self):
+        """Le backend en échec ne masque pas l'entrée en cache."""
+        now = {"t": 0.0}
+        cache = ReadThroughCache(ttl=10, clock=lambda: now["t"])
+        cache.get("k", lambda: "v1")
+        now["t"] = 1000
+        assert cache.get("k", Mock(side_effect=ConnectionError("down"))) == "v1"
+
+    def test_concurrent_requests_coalesced(self):
+        """Des lectures simultanées de la même clé font un seul appel."""
+        cache = ReadThroughCache(ttl=60)
+        calls = []
+        release = Event()
+
+        def loader():
+            calls.append(1)
+            release.wait(2)
+            return "v"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(cache.get, "k", loader) for _ in range(4)]
+            time.sleep(0.05)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert results == ["v"] * 4
+        assert len(calls) == 1
+
+    def test_persistence_and_version(self, tmp_path):
+        """Les entrées survivent au redémarrage ; une autre version est ignorée."""
+        path = tmp_path / "cache.db"
+        ReadThroughCache(path).get("k", lambda: Face(id="f1", gym="g", wall="w", is_active=True,
+                                                        total_climbs=0, picture=None, holds=[]))
+        face = ReadThroughCache(path).get("k", Mock(side_effect=AssertionError))
+        assert face.id == "f1"
+
+        with patch("mastoc.core.read_cache.CACHE_FORMAT_VERSION", 99):
+            assert ReadThroughCache(path).get("k", lambda: "reloaded") == "reloaded"
+
+    def test_lru_bound(self, tmp_path):
+        """Au-delà de max_entries, l'entrée la moins récemment lue est évincée."""
+        now = {"t": 0.0}
+        cache = ReadThroughCache(tmp_path / "cache.db", max_entries=2, clock=lambda: now["t"])
+        for key in ("a", "b"):
+            now["t"] += 1
+            cache.put(key, key)
+        assert cache.peek("a") == ("a", True)  # "a" redevient la plus récente
+        now["t"] += 1
+        cache.put("c", "c")
+
+        assert set(cache._memory) == {"a", "c"}
+        with cache._connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM read_cache").fetchone()[0] == 2
+
+    def test_backend_switch_caches_face_setup(self):
+        """BackendSwitch ne redemande pas un setup de face déjà en cache."""
+        switch = BackendSwitch(BackendConfig(railway_api_key="test"))
+        face = Mock(spec=Face)
+        switch.railway._api.get_face_setup = Mock(return_value=face)
+
+        assert switch.get_face_setup("f1") is face
+        assert switch.get_face_setup("f1") is face
+        switch.railway._api.get_face_setup.assert_called_once_with("f1")
+
+
+class TestBackendHealth:
+    """Tests du suivi de santé des backends."""
+
+    def test_ewma_and_p95(self):
+        """EWMA lissée et p95 sur la fenêtre récente."""
+        health = BackendHealth(alpha=0.5)
+        assert health.p95() is None
+        for latency in [1.0, 1.0, 1.0, 1.0, 9.0]:
+            health.record_success(latency)
+        assert health.ewma_latency == pytest.approx(5.0)
+        assert health.p95() == 9.0
+
+    def test_circuit_breaker(self):
+        """Le disjoncteur s'ouvre après N échecs et se referme après un succès."""
+        now = {"t": 0.0}
+        health = BackendHealth(failure_threshold=2, cooldown=10, clock=lambda: now["t"])
+        health.record_failure()
+        assert not health.is_open
+        health.record_failure()
+        assert health.is_open
+
+        now["t"] = 11
+        assert not health.is_open  # semi-ouvert : un essai est permis
+        health.record_success(0.1)
+        assert health.consecutive_failures == 0
+
+    def test_half_open_probe_failure_reopens(self):
+        """Après le délai, l'échec de l'essai rouvre aussitôt le disjoncteur."""
+        now = {"t": 0.0}
+        health = BackendHealth(failure_threshold=2, cooldown=10, clock=lambda: now["t"])
+        health.record_failure()
+        health.record_failure()
+        assert not health.allow_request()
+
+        now["t"] = 11
+        assert health.state == "half_open"
+        assert health.allow_request()
+        assert not health.allow_request()  # un seul essai à la fois
+        health.record_failure()
+        assert health.is_open
+        assert health.state == "open"
+        assert not health.allow_request()
+
+        now["t"] = 22
+        assert health.allow_request()
+        health.record_success(0.1)
+        assert health.state == "closed"
+        assert health.allow_request()
+        assert health.allow_request()
+
+    def test_half_open_admits_one_concurrent_probe(self):
+        """Appelants simultanés après le délai : un seul essai admis."""
+        now = {"t": 0.0}
+        health = BackendHealth(failure_threshold=1, cooldown=10, clock=lambda: now["t"])
+        health.record_failure()
+        now["t"] = 11
+
+        callers = 16
+        barrier = Barrier(callers)
+
+        def call():
+            barrier.wait()
+            return health.allow_request()
+
+        with ThreadPoolExecutor(max_workers=callers) as pool:
+            admitted = list(pool.map(lambda _: call(), range(callers)))
+
+        assert admitted.count(True) == 1
+        assert health.is_open  # essai en cours : les autres restent écartés
+
+
+class TestBackendSwitchHedging:
+    """Tests de la sélection par santé et des requêtes doublées."""
+
+    def _switch(self, **kwargs):
+        config = BackendConfig(
+            source=BackendSource.RAILWAY,
+            railway_api_key="test",
+            stokt_token="stokt-token",
+            fallback_to_stokt=True,
+            **kwargs,
+        )
+        return BackendSwitch(config)
+
+    def test_hedged_read_when_primary_slow(self):
+        """Un principal lent est doublé par le secondaire, le plus rapide gagne."""
+        switch = self._switch(hedge_delay_default=0.05)
+        slow = Mock(spec=Face)
+        fast = Mock(spec=Face)
+
+        def slow_setup(face_id):
+            time.sleep(0.5)
+            return slow
+
+        switch.railway._api.get_face_setup = Mock(side_effect=slow_setup)
+        switch.stokt._api.get_face_setup = Mock(return_value=fast)
+
+        start = time.monotonic()
+        assert switch.get_face_setup("f1") is fast
+        assert time.monotonic() - start < 0.4
+
+    def test_no_hedge_when_disabled(self):
+        """Sans hedging, le principal lent est attendu."""
+        switch = self._switch(hedge_reads=False)
+        face = Mock(spec=Face)
+        switch.railway._api.get_face_setup = Mock(return_value=face)
+        switch.stokt._api.get_face_setup = Mock()
+
+        assert switch.get_face_setup("f1") is face
+        switch.stokt._api.get_face_setup.assert_not_called()
+
+    def test_open_circuit_prefers_secondary(self):
+        """Disjoncteur ouvert sur Railway : la lecture va directement à Stokt."""
+        switch = self._switch()
+        for _ in range(3):
+            switch.health[BackendSource.RAILWAY].record_failure()
+
+        switch.railway._api.get_holds = Mock()
+        switch.stokt._api.get_face_setup = Mock(return_value=Mock(holds=["h"]))
+
+        assert switch.get_holds("f1") == ["h"]
+        switch.railway._api.get_holds.assert_not_called()
+        assert switch.health_status()["railway"]["circuit_open"] is True
+
+    def test_half_open_single_probe_under_concurrent_reads(self):
+        """Délai écoulé : une lecture sert d'essai à Railway, les autres vont à Stokt."""
+        switch = self._switch(hedge_reads=False)
+        health = switch.health[BackendSource.RAILWAY]
+        for _ in range(3):
+            health.record_failure()
+        health._open_until = 0.0  # délai de refroidissement écoulé
+
+        release = Event()
+
+        def slow_probe(face_id):
+            release.wait(5)
+            return ["railway"]
+
+        switch.railway._api.get_holds = Mock(side_effect=slow_probe)
+        switch.stokt._api.get_face_setup = Mock(return_value=Mock(holds=["stokt"]))
+
+        readers = 8
+        barrier = Barrier(readers)
+
+        def read(i):
+            barrier.wait()
+            return switch.get_holds(f"f{i}")
+
+        with ThreadPoolExecutor(max_workers=readers) as pool:
+            futures = [pool.submit(read, i) for i in range(readers)]
+            # Les lectures écartées aboutissent pendant que l'essai est en cours
+            deadline = time.monotonic() + 5
+            while (
+                switch.stokt._api.get_face_setup.call_count < readers - 1
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.01)
+            release.set()
+            results = [f.result(timeout=5) for f in futures]
+
+        assert results.count(["railway"]) == 1
+        assert results.count(["stokt"]) == readers - 1
+        assert switch.railway._api.get_holds.call_count == 1
+        assert health.state == "closed"
@@ -132,6 +132,7 @@ class TestAppConfig:
             source="railway",
             railway_api_key="roundtrip-key",
             railway_url="https://roundtrip.example.com",
+            asset_cache_max_mb=64,
         )
 
         with patch.object(AppConfig, "get_config_path", return_value=config_path):
@@ -143,3 +144,4 @@ class TestAppConfig:
         assert config2.source == config1.source
         assert config2.railway_api_key == config1.railway_api_key
         assert config2.railway_url == config1.railway_url
+        assert config2.asset_cache_max_mb == 64
@@ -160,6 +160,14 @@ class TestClimbRepository:
         assert retrieved.setter is not None
         assert retrieved.setter.full_name == "John Doe"
 
+    def test_get_setter_avatars(self, temp_db, sample_climb):
+        """Avatars des setters, sans doublons ni vides."""
+        repo = ClimbRepository(temp_db)
+        repo.save_climb(sample_climb)
+        repo.save_setters([ClimbSetter(id="no-avatar", full_name="Jane", avatar="")])
+
+        assert repo.get_setter_avatars() == ["avatar.jpg"]
+
     def test_get_nonexistent_climb(self, temp_db):
         """Teste récupération d'un climb inexistant."""
         repo = ClimbRepository(temp_db)
@@ -325,6 +333,22 @@ class TestHoldRepository:
         assert face.picture.width == 2263
         assert len(face.holds) == 4
 
+    def test_get_face_picture_paths(self, temp_db, sample_face):
+        """Chemins des images de toutes les faces."""
+        repo = HoldRepository(temp_db)
+        assert repo.get_face_picture_paths() == []
+
+        repo.save_face(sample_face)
+        assert repo.get_face_picture_paths() == ["test.jpg"]
+
+    def test_get_any_face_id(self, temp_db, sample_face):
+        """ID d'une face ayant une image."""
+        repo = HoldRepository(temp_db)
+        assert repo.get_any_face_id() is None
+
+        repo.save_face(sample_face)
+        assert repo.get_any_face_id() == "test-face-id"
+
 
 class TestClimbHoldsRelation:
     def test_climb_holds_saved(self, temp_db, sample_climb, sample_face):
@@ -0,0 +1,81 @@
+"""
+Tests pour le cache des validateurs HTTP (api/http_cache.py).
+"""
+
+import pytest
+
+from mastoc.api.http_cache import ValidatorCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    """Fabrique de caches, en mémoire et persistés."""
+    def make(**kwargs):
+        path = tmp_path / "validators.db" if request.param == "sqlite" else None
+        return ValidatorCache(path, **kwargs)
+    return make
+
+
+class TestValidatorCache:
+    def test_store_and_get(self, make_cache):
+        cache = make_cache()
+        cache.store("api/holds?face_id=f", {"results": [1]}, etag='"v1"')
+
+        assert cache.get("api/holds?face_id=f")["data"] == {"results": [1]}
+        assert cache.conditional_headers("api/holds?face_id=f") == {"If-None-Match": '"v1"'}
+        assert cache.get("unknown") is None
+
+    def test_ignored_without_validator(self, make_cache):
+        cache = make_cache()
+        cache.store("k", {"a": 1})
+        assert cache.get("k") is None
+
+    def test_evicts_least_recently_used_entries(self, make_cache):
+        """Au-delà de max_entries, l'entrée la moins récemment lue part."""
+        cache = make_cache(max_entries=2)
+        cache.store("a", 1, etag='"a"')
+        cache.store("b", 2, etag='"b"')
+        cache.get("a")
+        cache.store("c", 3, etag='"c"')
+
+        assert cache.get("b") is None
+        assert cache.get("a")["data"] == 1
+        assert cache.get("c")["data"] == 3
+        assert len(cache) == 2
+
+    def test_bounded_by_bytes(self, make_cache):
+        """La taille totale des données reste sous max_bytes."""
+        cache = make_cache(max_bytes=250)
+        for i in range(5):
+            cache.store(f"k{i}", "x" * 100, etag=f'"{i}"')
+
+        assert len(cache) == 2
+        assert cache.get("k4") is not None and cache.get("k3") is not None
+
+    def test_oversized_entry_not_stored(self, make_cache):
+        """Une réponse plus grosse que le cache entier n'est pas gardée."""
+        cache = make_cache(max_bytes=50)
+        cache.store("big", "x" * 100, etag='"v"')
+        assert cache.get("big") is None
+
+    def test_clear(self, make_cache):
+        cache = make_cache()
+        cache.store("k", 1, etag='"v"')
+        cache.clear()
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+
+def test_persisted_one_row_per_entry(tmp_path):
+    """Entrées relues par une nouvelle instance ; une ligne par entrée."""
+    import sqlite3
+
+    path = tmp_path / "validators.db"
+    ValidatorCache(path).store("k1", {"a": 1}, etag='"1"')
+    ValidatorCache(path).store("k2", {"b": 2}, last_modified="Mon, 01 Jan 2026 00:00:00 GMT")
+
+    cache = ValidatorCache(path)
+    assert cache.get("k1")["data"] == {"a": 1}
+    assert cache.conditional_headers("k2") == {"If-Modified-Since": "Mon, 01 Jan 2026 00:00:00 GMT"}
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM http_validators").fetchone()[0] == 2
@@ -0,0 +1,193 @@
+"""Tests pour la file d'attente des écritures hors-ligne (outbox)."""
+
+import pytest
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import requests
+
+from mastoc.db import Database
+from mastoc.core.outbox import Outbox, is_transient
+from mastoc.api.client import AuthenticationError
+
+
+@pytest.fixture
+def temp_db():
+    """Crée une base de données temporaire pour les tests."""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
+        db_path = Path(f.name)
+    db = Database(db_path)
+    yield db
+    db_path.unlink(missing_ok=True)
+
+
+@pytest.fixture
+def mastoc_api():
+    api = Mock()
+    api.write_hold_annotations.return_value = {"applied": 0, "errors": {}}
+    api.create_climbs_batch.side_effect = lambda climbs: [
+        {"client_ref": c["client_ref"], "climb": Mock(id=f"id-{c['name']}"), "error": None}
+        for c in climbs
+    ]
+    return api
+
+
+@pytest.fixture
+def stokt_api():
+    return Mock()
+
+
+@pytest.fixture
+def outbox(temp_db, mastoc_api, stokt_api):
+    return Outbox(temp_db, mastoc_api=mastoc_api, stokt_api=stokt_api)
+
+
+class TestOutboxCollapse:
+    """Fusion des intentions redondantes."""
+
+    def test_like_toggles_cancel_out(self, outbox):
+        outbox.record_like("c1", True, previous=False)
+        outbox.record_like("c1", False, previous=True)
+        assert outbox.pending_count() == 0
+
+    def test_odd_number_of_toggles_keeps_final_value(self, outbox):
+        outbox.record_like("c1", True, previous=False)
+        outbox.record_like("c1", False, previous=True)
+        outbox.record_like("c1", True, previous=False)
+        assert outbox.pending_count() == 1
+        assert outbox.pending_value("like", "c1") is True
+
+    def test_like_and_bookmark_are_independent(self, outbox):
+        outbox.record_like("c1", True, previous=False)
+        outbox.record_bookmark("c1", True, previous=False)
+        assert outbox.pending_count() == 2
+
+    def test_annotation_edits_are_merged(self, outbox):
+        outbox.record_annotation(42, grip_type="plat")
+        outbox.record_annotation(42, condition="ok")
+        outbox.record_annotation(42, grip_type="reglette")
+
+        entry = outbox.repo.get("annotation", 42)
+        assert entry["payload"] == {"grip_type": "reglette", "condition": "ok"}
+        assert outbox.pending_count() == 1
+
+    def test_delete_replaces_edits(self, outbox):
+        outbox.record_annotation(42, grip_type="plat")
+        outbox.record_annotation_delete(42)
+        assert outbox.repo.get("annotation", 42)["payload"] == {"delete": True}
+
+    def test_edit_after_delete_clears_other_fields(self, outbox):
+        outbox.record_annotation_delete(42)
+        outbox.record_annotation(42, grip_type="bac")
+
+        payload = outbox.repo.get("annotation", 42)["payload"]
+        assert payload == {"grip_type": "bac", "condition": "", "difficulty": "", "notes": ""}
+
+    def test_persists_across_instances(self, temp_db, outbox):
+        outbox.record_like("c1", True, previous=False)
+        assert Outbox(temp_db).pending_value("like", "c1") is True
+
+
+class TestOutboxFlush:
+    """Envoi par lots."""
+
+    def test_flush_sends_batches(self, outbox, mastoc_api, stokt_api):
+        outbox.batch_size = 2
+        for hold_id in (1, 2, 3):
+            outbox.record_annotation(hold_id, grip_type="bac")
+        outbox.record_like("c1", True, previous=False)
+        outbox.record_bookmark("c2", False, previous=True)
+
+        result = outbox.flush()
+
+        assert result["sent"] == 5
+        assert result["remaining"] == 0
+        assert mastoc_api.write_hold_annotations.call_count == 2
+        first_batch = mastoc_api.write_hold_annotations.call_args_list[0][0][0]
+        assert first_batch == [
+            {"hold_id": 1, "grip_type": "bac"},
+            {"hold_id": 2, "grip_type": "bac"},
+        ]
+        stokt_api.like_climb.assert_called_once_with("c1")
+        stokt_api.bookmark_climb.assert_called_once_with("c2", add=False)
+
+    def test_flush_creates_climbs(self, outbox, mastoc_api):
+        created = []
+        outbox.on_climb_created = lambda ref, climb: created.append((ref, climb.id))
+        ref = outbox.record_climb("face-1", "Bloc A", "S1 T2", grade_font="6A")
+
+        result = outbox.flush()
+
+        assert result["sent"] == 1
+        sent = mastoc_api.create_climbs_batch.call_args[0][0]
+        assert sent == [{
+            "face_id": "face-1", "name": "Bloc A", "holds_list": "S1 T2",
+            "grade_font": "6A", "is_private": False, "client_ref": ref,
+        }]
+        assert created == [(ref, "id-Bloc A")]
+
+    def test_offline_keeps_entries(self, outbox, mastoc_api, stokt_api):
+        mastoc_api.write_hold_annotations.side_effect = requests.ConnectionError("offline")
+        stokt_api.like_climb.side_effect = requests.ConnectionError("offline")
+        outbox.record_annotation(1, grip_type="bac")
+        outbox.record_like("c1", True, previous=False)
+
+        result = outbox.flush()
+
+        assert result["offline"] is True
+        assert result["remaining"] == 2
+        assert outbox.repo.get("annotation", 1)["attempts"] == 0
+
+        mastoc_api.write_hold_annotations.side_effect = None
+        stokt_api.like_climb.side_effect = None
+        assert outbox.flush()["remaining"] == 0
+
+    def test_rejected_annotation_is_dropped(self, outbox, mastoc_api):
+        mastoc_api.write_hold_annotations.return_value = {
+            "applied": 1, "errors": {2: "Hold not found"}
+        }
+        dropped = []
+        outbox.on_dropped = lambda entry, error: dropped.append(entry["target"])
+        outbox.record_annotation(1, grip_type="bac")
+        outbox.record_annotation(2, grip_type="bac")
+
+        result = outbox.flush()
+
+        assert result["sent"] == 1
+        assert result["dropped"] == 1
+        assert dropped == ["2"]
+        assert outbox.pending_count() == 0
+
+    def test_permanent_error_dropped_after_max_attempts(self, outbox, stokt_api):
+        error = requests.HTTPError("bad request", response=Mock(status_code=400))
+        stokt_api.like_climb.side_effect = error
+        outbox.max_attempts = 2
+        outbox.record_like("c1", True, previous=False)
+
+        assert outbox.flush()["remaining"] == 1
+        result = outbox.flush()
+        assert result["dropped"] == 1
+        assert result["remaining"] == 0
+
+    def test_toggle_during_send_is_not_lost(self, outbox, stokt_api):
+        """Un unlike pendant l'envoi du like doit être renvoyé ensuite."""
+        def like(climb_id):
+            outbox.record_like(climb_id, False, previous=True)
+        stokt_api.like_climb.side_effect = like
+        outbox.record_like("c1", True, previous=False)
+
+        outbox.flush()
+        assert outbox.pending_value("like", "c1") is False
+
+        stokt_api.like_climb.side_effect = None
+        outbox.flush()
+        stokt_api.unlike_climb.assert_called_once_with("c1")
+        assert outbox.pending_count() == 0
+
+    def test_is_transient(self):
+        assert is_transient(requests.ConnectionError())
+        assert is_transient(AuthenticationError("expired"))
+        assert is_transient(requests.HTTPError(response=Mock(status_code=503)))
+        assert not is_transient(requests.HTTPError(response=Mock(status_code=404)))
+        assert not is_transient(ValueError())
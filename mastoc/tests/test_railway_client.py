@@ -2,8 +2,9 @@
 Tests pour MastocAPI (client Railway).
 """
 
+import json
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 from mastoc.api.railway_client import (
     MastocAPI,
@@ -12,6 +13,7 @@ from mastoc.api.railway_client import (
     AuthenticationError,
 )
 from mastoc.api.models import Climb, Hold
+from mastoc.api.wire_format import COLUMNAR_MEDIA_TYPE, from_columnar
 
 
 class TestMastocAPIConfig:
@@ -434,3 +436,291 @@ class TestMastocAPIGetAllClimbs:
             api.get_all_climbs(callback=callback)
             assert len(callback_calls) == 1
             assert callback_calls[0] == (1, 1)
+
+
+class TestMastocAPIChanges:
+    """Tests pour le flux de modifications."""
+
+    def test_get_changes(self):
+        """Test conversion d'une page du flux."""
+        api = MastocAPI(RailwayConfig(api_key="test-key"))
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        mock_response.json.return_value = {
+            "changes": [
+                {"seq": 3, "entity_type": "climb", "entity_id": "c1", "action": "update",
+                 "changed_at": "2025-12-20T10:00:00",
+                 "climb": {"id": "c1", "name": "Bloc", "holds_list": "S1 T2", "face_id": "f",
+                           "is_private": False, "climbed_by": 0, "total_likes": 0,
+                           "source": "mastoc"}},
+                {"seq": 4, "entity_type": "climb", "entity_id": "c2", "action": "delete",
+                 "changed_at": "2025-12-20T10:00:00", "climb": None},
+            ],
+            "cursor": 4,
+            "has_more": False,
+        }
+
+        with patch.object(api.session, "get", return_value=mock_response) as mock_get:
+            page = api.get_changes(cursor=2, face_id="f")
+
+            assert mock_get.call_args.kwargs["params"] == {"cursor": 2, "limit": 500, "face_id": "f"}
+            assert page["cursor"] == 4
+            assert page["has_more"] is False
+            assert isinstance(page["changes"][0]["climb"], Climb)
+            assert page["changes"][0]["climb"].name == "Bloc"
+            assert page["changes"][1]["climb"] is None
+
+    def test_get_changes_head(self):
+        """Test lecture du curseur courant."""
+        api = MastocAPI(RailwayConfig(api_key="test-key"))
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        mock_response.json.return_value = {"cursor": 42}
+
+        with patch.object(api.session, "get", return_value=mock_response):
+            assert api.get_changes_head() == 42
+
+    @staticmethod
+    def _ndjson_response(records):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.iter_lines.return_value = [json.dumps(r).encode() for r in records]
+        return mock_response
+
+    def test_export_face(self):
+        """Test lecture en flux de l'export NDJSON d'une face."""
+        api = MastocAPI(RailwayConfig(api_key="test-key"))
+        records = [
+            {"type": "snapshot", "face_id": "f", "cursor": 12},
+            {"type": "face", "id": "f", "total_climbs": 1, "feet_rules_options": []},
+            {"type": "hold", "id": 829279, "polygon_str": "0,0 1,1", "centroid_str": "1 2"},
+            {"type": "setter", "id": "s1", "full_name": "Ouvreur"},
+            {"type": "climb", "id": "c1", "name": "Bloc", "holds_list": "S829279",
+             "face_id": "f", "setter_id": "s1", "setter_name": "Ouvreur"},
+            {"type": "end", "counts": {"holds": 1, "setters": 1, "climbs": 1}},
+        ]
+
+        with patch.object(api.session, "get", return_value=self._ndjson_response(records)) as mock_get:
+            lines = list(api.export_face("f"))
+
+        assert mock_get.call_args.kwargs["stream"] is True
+        assert [kind for kind, _ in lines] == ["snapshot", "face", "hold", "setter", "climb", "end"]
+        assert lines[0][1]["cursor"] == 12
+        assert lines[1][1].holds == []
+        assert isinstance(lines[2][1], Hold) and lines[2][1].id == 829279
+        assert lines[3][1].full_name == "Ouvreur"
+        assert isinstance(lines[4][1], Climb) and lines[4][1].setter.full_name == "Ouvreur"
+
+    def test_export_face_truncated(self):
+        """Test un flux sans ligne de fin lève une erreur."""
+        api = MastocAPI(RailwayConfig(api_key="test-key"))
+        records = [{"type": "snapshot", "face_id": "f", "cursor": 12}]
+
+        with patch.object(api.session, "get", return_value=self._ndjson_response(records)):
+            with pytest.raises(MastocAPIError):
+                list(api.export_face("f"))
+
+
+
+class TestMastocAPIClimbFilters:
+    """Tests des filtres serveur de GET /api/climbs."""
+
+    def test_climbs_params_hold_set_and_sort(self):
+        params = MastocAPI._climbs_params(
+            grade_min="6A", hold_ids=[829279, 829528], hold_match="any",
+            sort_by="grade", sort_desc=True,
+        )
+        assert params["grade_min"] == "6A"
+        assert params["holds"] == "829279,829528"
+        assert params["hold_match"] == "any"
+        assert params["sort_by"] == "grade"
+        assert params["sort_desc"] == "true"
+
+    def test_climbs_params_defaults(self):
+        params = MastocAPI._climbs_params()
+        assert params == {"page": 1, "page_size": 50}
+
+
+class TestMastocAPIBatchWrites:
+    """Tests pour les écritures en lot (outbox)."""
+
+    def test_create_climbs_batch(self):
+        """Test conversion des résultats d'un lot de créations."""
+        api = MastocAPI(RailwayConfig(api_key="test-key"))
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        mock_response.json.return_value = {
+            "results": [
+                {"client_ref": "a", "error": None,
+                 "climb": {"id": "c1", "name": "Bloc", "holds_list": "S1 T2", "face_id": "f",
+                           "is_private": False, "climbed_by": 0, "total_likes": 0,
+                           "source": "mastoc"}},
+                {"client_ref": "b", "climb": None, "error": "Face not found"},
+            ]
+        }
+
+        with patch.object(api.session, "post", return_value=mock_response) as mock_post:
+            results = api.create_climbs_batch([{"client_ref": "a"}, {"client_ref": "b"}])
+
+            assert mock_post.call_args[0][0].endswith("/api/climbs/batch")
+            assert isinstance(results[0]["climb"], Climb)
+            assert results[0]["client_ref"] == "a"
+            assert results[1] == {"client_ref": "b", "climb": None, "error": "Face not found"}
+
+    def test_write_hold_annotations(self):
+        """Test lot d'annotations : clés d'erreur converties en int."""
+        api = MastocAPI(RailwayConfig(api_key="test-key"))
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        mock_response.json.return_value = {"applied": 1, "errors": {"7": "Hold not found"}}
+
+        with patch.object(api.session, "post", return_value=mock_response) as mock_post:
+            result = api.write_hold_annotations([{"hold_id": 1, "grip_type": "bac"}])
+
+            assert mock_post.call_args.kwargs["json"] == {
+                "items": [{"hold_id": 1, "grip_type": "bac"}]
+            }
+            assert result == {"applied": 1, "errors": {7: "Hold not found"}}
+
+    def test_get_wall_annotations_delta(self):
+        """Test lecture des annotations d'un mur avec updated_since."""
+        api = MastocAPI(RailwayConfig(api_key="test-key"))
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = Mock()
+        mock_response.headers = {}
+        mock_response.json.return_value = {
+            "face_id": "face-1",
+            "annotations": [{"hold_id": 3, "hold_stokt_id": 829001, "consensus": {}}],
+            "count": 1, "page": 1, "page_size": 500,
+            "server_time": "2026-01-01T00:00:00",
+        }
+
+        with patch.object(api.session, "get", return_value=mock_response) as mock_get:
+            result = api.get_wall_annotations("face-1", updated_since="2025-12-31T00:00:00")
+
+            assert mock_get.call_args[0][0].endswith("/api/holds/annotations/face/face-1")
+            assert mock_get.call_args.kwargs["params"]["updated_since"] == "2025-12-31T00:00:00"
+            assert result["count"] == 1
+            assert result["annotations"][0]["hold_stokt_id"] == 829001
+            assert result["server_time"] == "2026-01-01T00:00:00"
+
+
+class TestMastocAPIConditional:
+    """Tests des GET conditionnels (ETag)."""
+
+    SETUP = {"id": "face-1", "holds": [{"id": 1, "polygon_str": "0,0 1,1", "centroid_str": "0 0"}]}
+
+    def _response(self, status_code, data=None, etag=None):
+        response = Mock()
+        response.status_code = status_code
+        response.raise_for_status = Mock()
+        response.json.return_value = data
+        response.headers = {"ETag": etag} if etag else {}
+        return response
+
+    def test_face_setup_revalidated_with_etag(self):
+        """Le second appel envoie If-None-Match et réutilise les données sur 304."""
+        api = MastocAPI(RailwayConfig(api_key="test-key"))
+        responses = [self._response(200, self.SETUP, etag='"v1"'), self._response(304)]
+
+        with patch.object(api.session, "get", side_effect=responses) as mock_get:
+            first = api.get_face_setup("face-1")
+            second = api.get_face_setup("face-1")
+
+            assert "If-None-Match" not in mock_get.call_args_list[0].kwargs["headers"]
+            assert mock_get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+            assert len(second.holds) == len(first.holds) == 1
+
+    def test_validators_persisted(self, tmp_path):
+        """Les validateurs survivent à une nouvelle instance du client."""
+        path = tmp_path / "validators.db"
+        api = MastocAPI(RailwayConfig(api_key="k", validator_cache_path=path))
+        with patch.object(api.session, "get", return_value=self._response(200, self.SETUP, '"v1"')):
+            api.get_face_setup("face-1")
+
+        api2 = MastocAPI(RailwayConfig(api_key="k", validator_cache_path=path))
+        with patch.object(api2.session, "get", return_value=self._response(304)) as mock_get:
+            face = api2.get_face_setup("face-1")
+            assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+            assert face.id == "face-1"
+
+
+    def test_climb_pages_not_cached(self):
+        """Les pages de climbs ne passent pas par le cache de validateurs."""
+        api = MastocAPI(RailwayConfig(api_key="k"))
+        page = {"results": [], "count": 0}
+        responses = [self._response(200, page, etag='"p1"'), self._response(200, page, etag='"p1"')]
+
+        with patch.object(api.session, "get", side_effect=responses) as mock_get:
+            api.get_climbs(face_id="face-1")
+            api.get_climbs(face_id="face-1")
+
+            assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+            assert len(api.validators) == 0
+
+    def test_face_tiles_and_tile(self):
+        """Descripteur de tuiles (conditionnel) puis tuile par son chemin."""
+        api = MastocAPI(RailwayConfig(api_key="test-key"))
+        descriptor = {"version": "0123456789abcdef", "url_template": "/api/faces/tiles/x/{level}/{col}_{row}.jpg"}
+        tile = self._response(200)
+        tile.content = b"jpeg"
+        responses = [self._response(200, descriptor, etag='"0123456789abcdef"'), tile]
+
+        with patch.object(api.session, "get", side_effect=responses) as mock_get:
+            assert api.get_face_tiles("face-1") == descriptor
+            assert api.get_face_tile("/api/faces/tiles/x/3/0_1.jpg") == b"jpeg"
+
+            assert mock_get.call_args_list[0][0][0].endswith("/api/faces/face-1/tiles")
+            assert mock_get.call_args_list[1][0][0] == (
+                "https://mastoc-production.up.railway.app/api/faces/tiles/x/3/0_1.jpg"
+            )
+            assert mock_get.call_args_list[1].kwargs["headers"]["X-API-Key"] == "test-key"
+
+class TestMastocAPICompactFormat:
+    """Tests du format colonnaire compact."""
+
+    def test_accept_header(self):
+        """Le format colonnaire n'est demandé que si activé."""
+        assert MastocAPI(RailwayConfig()).session.headers["Accept"] == "application/json"
+        api = MastocAPI(RailwayConfig(compact_format=True))
+        assert api.session.headers["Accept"].startswith(COLUMNAR_MEDIA_TYPE)
+
+    def test_get_holds_columnar(self):
+        """Une réponse colonnaire est décodée en liste de dicts."""
+        api = MastocAPI(RailwayConfig(api_key="k", compact_format=True))
+        response = Mock()
+        response.status_code = 200
+        response.raise_for_status = Mock()
+        response.headers = {"Content-Type": COLUMNAR_MEDIA_TYPE}
+        response.json.return_value = {
+            "results": {
+                "__columns__": ["id", "polygon_str", "centroid_str"],
+                "__rows__": [[1, "0,0 1,1", "0 0"], [2, "2,2 3,3", "2 2"]],
+            },
+        }
+
+        with patch.object(api.session, "get", return_value=response):
+            holds = api.get_holds("face-1")
+
+        assert [h.id for h in holds] == [1, 2]
+
+    def test_from_columnar_nested(self):
+        """Les structures imbriquées sont reconstruites."""
+        data = {
+            "results": {"__columns__": ["a", "b"], "__rows__": [[1, [{"x": 1}]], [2, []]]},
+            "count": 2,
+        }
+        assert from_columnar(data) == {
+            "results": [{"a": 1, "b": [{"x": 1}]}, {"a": 2, "b": []}],
+            "count": 2,
+        }
@@ -250,6 +250,26 @@ class TestSocialLoader:
         assert data.loaded is True  # Toujours True car on continue malgré les erreurs
         assert "Sends" in data.error
 
+    def test_fetch_social_data_async(self, mock_api):
+        """Avec un client async, les trois parties sont chargées via get_climb_social."""
+        user = UserRef(id="u1", full_name="Test")
+
+        async def get_climb_social(climb_id, limit=20):
+            return ([Effort(id="e1", climb_id=climb_id, user=user, date="2025-01-01")],
+                    Exception("Timeout"),
+                    [])
+
+        async_api = Mock()
+        async_api.get_climb_social = get_climb_social
+
+        loader = SocialLoader(mock_api, async_api=async_api)
+        data = loader._fetch_social_data("c1")
+
+        assert data.loaded is True
+        assert len(data.sends) == 1
+        assert data.error == "Comments: Timeout"
+        mock_api.get_climb_sends.assert_not_called()
+
     def test_load_with_cache(self, mock_api):
         """Test que load() utilise le cache."""
         loader = SocialLoader(mock_api)
@@ -268,6 +288,82 @@ class TestSocialLoader:
         mock_api.get_climb_sends.assert_not_called()
 
 
+    def _wait(self, condition, timeout=2.0):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        assert condition()
+
+    def test_prefetch_makes_next_load_instant(self, mock_api):
+        """Un voisin préchargé est livré sans nouvel appel réseau."""
+        loader = SocialLoader(mock_api)
+        loader.prefetch(["c2", "c3"])
+        self._wait(lambda: loader._get_cached("c2") and loader._get_cached("c3"))
+        calls = mock_api.get_climb_sends.call_count
+
+        delivered = []
+        loader.on_data_loaded = delivered.append
+        loader.load("c2")
+
+        assert [d.climb_id for d in delivered] == ["c2"]
+        assert mock_api.get_climb_sends.call_count == calls == 2
+
+    def test_stale_data_served_then_refreshed(self, mock_api):
+        """Stale-while-revalidate : donnée périmée livrée puis remplacée."""
+        loader = SocialLoader(mock_api, cache_ttl=0)
+        loader._set_cached("c1", SocialData(climb_id="c1", loaded=True, error="old"))
+
+        delivered = []
+        loader.on_data_loaded = delivered.append
+        loader.load("c1")
+
+        assert delivered[0].error == "old"
+        self._wait(lambda: len(delivered) == 2)
+        assert delivered[1].error is None
+
+    def test_failed_refresh_keeps_stale_entry(self, mock_api):
+        """Un échec de chargement ne remplace pas la donnée en cache."""
+        from mastoc.api.client import AuthenticationError
+        mock_api.get_climb_sends.side_effect = AuthenticationError("expired")
+        loader = SocialLoader(mock_api, cache_ttl=0)
+        loader._set_cached("c1", SocialData(climb_id="c1", loaded=True))
+
+        delivered = []
+        loader.on_data_loaded = delivered.append
+        loader.load("c1")
+        self._wait(lambda: mock_api.get_climb_sends.called)
+        time.sleep(0.05)
+
+        assert len(delivered) == 1
+        assert loader.get_cached("c1").loaded is True
+
+    def test_only_current_climb_is_delivered(self, mock_api):
+        """Les chargements d'un climb quitté ne sont pas livrés."""
+        release = Event()
+        mock_api.get_climb_sends.side_effect = lambda climb_id, limit: release.wait(2) and []
+        loader = SocialLoader(mock_api)
+        delivered = []
+        loader.on_data_loaded = delivered.append
+        loader.load("c1")
+        loader.load("c2")
+        release.set()
+        self._wait(lambda: loader._get_cached("c1") and loader._get_cached("c2"))
+        time.sleep(0.05)
+
+        assert [d.climb_id for d in delivered] == ["c2"]
+
+    def test_cache_is_bounded_and_persisted(self, mock_api, tmp_path):
+        """Cache LRU borné, réutilisable après redémarrage (hors-ligne)."""
+        path = tmp_path / "social_cache.db"
+        loader = SocialLoader(mock_api, max_entries=2, cache_path=path)
+        for climb_id in ("c1", "c2", "c3"):
+            loader._set_cached(climb_id, SocialData(climb_id=climb_id, loaded=True))
+
+        reloaded = SocialLoader(mock_api, cache_path=path)
+        assert reloaded.get_cached("c1") is None
+        assert reloaded.get_cached("c3").climb_id == "c3"
+
+
 class TestSocialLoaderSync:
     """Tests pour SocialLoaderSync."""
 
@@ -413,3 +509,28 @@ class TestSocialActionsService:
         assert len(callback_results) == 1
         assert callback_results[0] == ("c1", True)
         assert service.get_state("c1").bookmarked is True
+
+    def test_toggle_like_with_outbox(self, mock_api):
+        """Avec une outbox, le like est immédiat et mis en file d'attente."""
+        outbox = Mock()
+        outbox.pending_value.return_value = None
+        service = SocialActionsService(mock_api, outbox=outbox)
+
+        callback_results = []
+        service.on_like_changed = lambda cid, val: callback_results.append((cid, val))
+        service.toggle_like("c1")
+
+        assert callback_results == [("c1", True)]
+        outbox.record_like.assert_called_once_with("c1", True, previous=False)
+        mock_api.like_climb.assert_not_called()
+
+    def test_initial_state_prefers_pending_outbox(self, mock_api):
+        """Une intention en attente prime sur l'état renvoyé par le serveur."""
+        outbox = Mock()
+        outbox.pending_value.side_effect = lambda kind, cid: True if kind == "like" else None
+        service = SocialActionsService(mock_api, outbox=outbox)
+
+        service.set_initial_state("c1", liked=False, bookmarked=False)
+
+        assert service.get_state("c1").liked is True
+        assert service.get_state("c1").bookmarked is False
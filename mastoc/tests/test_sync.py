@@ -1,6 +1,7 @@
 """Tests pour le module de synchronisation."""
 
 import pytest
+import requests
 import tempfile
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -9,7 +10,9 @@ from unittest.mock import Mock, patch
 from mastoc.db import Database, ClimbRepository, HoldRepository
 from mastoc.api.client import StoktAPI, AuthenticationError
 from mastoc.api.models import Climb, Hold, Face, Grade, ClimbSetter, FacePicture, Wall
-from mastoc.core.sync import SyncManager, SyncResult
+from mastoc.api.railway_client import MastocAPIError
+from mastoc.core.sync import SyncManager, SyncResult, RailwaySyncManager
+from mastoc.core.social_refresh import SocialRefresher, TokenBucket
 
 
 @pytest.fixture
@@ -458,3 +461,234 @@ class TestSocialRefresh:
         assert updated.climbed_by == 100
         assert updated.total_likes == 50
         assert updated.total_comments == 10
+
+    def test_refresh_resumes_and_prioritizes(self, temp_db, mock_api, sample_climbs, sample_face):
+        """Les climbs déjà rafraîchis sont ignorés ; les consultés passent en premier."""
+        HoldRepository(temp_db).save_face(sample_face)
+        climb_repo = ClimbRepository(temp_db)
+        for climb in sample_climbs:
+            climb_repo.save_climb(climb)
+
+        climb_repo.update_social_counts_batch(
+            {"climb-4": {"climbed_by": 8, "total_likes": 4, "total_comments": 0}}
+        )
+        climb_repo.mark_viewed("climb-0")
+
+        refresher = SocialRefresher(mock_api, temp_db, workers=1, rate=None)
+        order = [e["id"] for e in refresher.pending_climbs()]
+        assert "climb-4" not in order
+        assert order[0] == "climb-0"
+        # Puis par popularité (climbed_by = i * 2)
+        assert order[1:] == ["climb-3", "climb-2", "climb-1"]
+
+    def test_refresh_retries_after_429(self, temp_db, mock_api, sample_climbs, sample_face):
+        """Un 429 réduit le débit et le climb est retenté."""
+        HoldRepository(temp_db).save_face(sample_face)
+        ClimbRepository(temp_db).save_climb(sample_climbs[0])
+
+        throttled = requests.HTTPError(response=Mock(status_code=429, headers={"Retry-After": "0"}))
+        mock_api.get_climb_social_stats.side_effect = [
+            throttled,
+            {"climbed_by": 3, "total_likes": 1, "total_comments": 0},
+        ]
+
+        refresher = SocialRefresher(mock_api, temp_db, workers=1, rate=100.0)
+        result = refresher.run()
+
+        assert result == {"total": 1, "updated": 1, "errors": []}
+        assert refresher.bucket.rate < 100.0
+        assert ClimbRepository(temp_db).get_climb("climb-0").climbed_by == 3
+        assert refresher.pending_climbs() == []
+
+    def test_refresh_cancel_flushes_batch(self, temp_db, mock_api, sample_climbs, sample_face):
+        """Une annulation via le callback conserve les résultats déjà reçus."""
+        HoldRepository(temp_db).save_face(sample_face)
+        climb_repo = ClimbRepository(temp_db)
+        for climb in sample_climbs[:3]:
+            climb_repo.save_climb(climb)
+        mock_api.get_climb_social_stats.return_value = {
+            "climbed_by": 1, "total_likes": 1, "total_comments": 1
+        }
+
+        def cancel(current, total, message):
+            raise InterruptedError()
+
+        refresher = SocialRefresher(mock_api, temp_db, workers=1, rate=None)
+        with pytest.raises(InterruptedError):
+            refresher.run(callback=cancel)
+
+        assert len(refresher.pending_climbs()) == 2
+
+
+class TestTokenBucket:
+    """Tests du limiteur de débit adaptatif."""
+
+    def _bucket(self, **kwargs):
+        clock = {"now": 0.0}
+
+        def sleep(seconds):
+            clock["now"] += seconds
+
+        bucket = TokenBucket(clock=lambda: clock["now"], sleep=sleep, **kwargs)
+        return bucket, clock
+
+    def test_rate_limits_acquisitions(self):
+        """Au-delà de la réserve, les jetons arrivent au débit configuré."""
+        bucket, clock = self._bucket(rate=2.0, capacity=1.0)
+        for _ in range(5):
+            bucket.acquire()
+        assert clock["now"] == pytest.approx(2.0)
+
+    def test_throttled_halves_rate_and_pauses(self):
+        """Un 429 divise le débit et respecte Retry-After."""
+        bucket, clock = self._bucket(rate=4.0, capacity=1.0)
+        bucket.on_throttled(retry_after=5)
+        assert bucket.rate == 2.0
+        bucket.acquire()
+        assert clock["now"] >= 5
+
+    def test_success_increases_up_to_max(self):
+        """Les succès remontent le débit sans dépasser max_rate."""
+        bucket, _ = self._bucket(rate=1.0, max_rate=1.1, increase=0.5)
+        bucket.on_success()
+        assert bucket.rate == 1.1
+
+
+class TestRailwaySyncChanges:
+    """Tests de la sync incrémentale par flux de modifications (Railway)."""
+
+    @pytest.fixture
+    def railway_api(self):
+        api = Mock()
+        api.get_changes_head.return_value = 7
+        return api
+
+    @staticmethod
+    def _http_error(status: int) -> requests.HTTPError:
+        response = requests.Response()
+        response.status_code = status
+        return requests.HTTPError(response=response)
+
+    def test_sync_full_stores_cursor(self, temp_db, railway_api, sample_climbs, sample_face):
+        """Sans export (ancien serveur), la sync enregistre le curseur lu avant le téléchargement."""
+        railway_api.get_faces.return_value = [{"id": "face-id"}]
+        railway_api.export_face.side_effect = self._http_error(404)
+        railway_api.get_all_climbs.return_value = sample_climbs
+        railway_api.get_face_setup.return_value = sample_face
+
+        manager = RailwaySyncManager(railway_api, temp_db)
+        result = manager.sync_full()
+
+        assert result.success
+        assert temp_db.get_metadata(RailwaySyncManager.CHANGE_CURSOR_KEY) == "7"
+
+    def test_sync_full_from_export(self, temp_db, railway_api, sample_climbs, sample_face):
+        """La sync complète consomme l'export NDJSON par lots et garde le curseur de l'instantané."""
+        holds, sample_face.holds = sample_face.holds, []
+        setter = ClimbSetter(id="setter-1", full_name="Ouvreur")
+
+        def export(face_id):
+            yield "snapshot", {"face_id": face_id, "cursor": 42}
+            yield "face", sample_face
+            for hold in holds:
+                yield "hold", hold
+            yield "setter", setter
+            for climb in sample_climbs:
+                yield "climb", climb
+            yield "end", {"counts": {"holds": 3, "setters": 1, "climbs": 5}}
+
+        railway_api.get_faces.return_value = [{"id": "face-id"}]
+        railway_api.export_face.side_effect = export
+
+        manager = RailwaySyncManager(railway_api, temp_db)
+        manager.EXPORT_BATCH_SIZE = 2
+        result = manager.sync_full()
+
+        assert result.success, result.errors
+        railway_api.get_all_climbs.assert_not_called()
+        railway_api.get_face_setup.assert_not_called()
+        assert (result.climbs_added, result.holds_added) == (5, 3)
+        assert temp_db.get_climb_count() == 5
+        assert len(HoldRepository(temp_db).get_all_holds("face-id")) == 3
+        assert temp_db.get_metadata(RailwaySyncManager.CHANGE_CURSOR_KEY) == "42"
+
+    def test_sync_full_truncated_export(self, temp_db, railway_api, sample_face):
+        """Un export interrompu fait échouer la sync sans enregistrer de curseur."""
+        def export(face_id):
+            yield "snapshot", {"face_id": face_id, "cursor": 42}
+            yield "face", sample_face
+            raise MastocAPIError("Export de la face interrompu")
+
+        railway_api.export_face.side_effect = export
+
+        manager = RailwaySyncManager(railway_api, temp_db)
+        result = manager.sync_full(face_id="face-id")
+
+        assert not result.success
+        assert temp_db.get_metadata(RailwaySyncManager.CHANGE_CURSOR_KEY) is None
+
+    def test_sync_incremental_applies_changes(self, temp_db, railway_api, sample_climbs, sample_face):
+        """Créations, mises à jour et suppressions sont appliquées exactement."""
+        HoldRepository(temp_db).save_face(sample_face)
+        climb_repo = ClimbRepository(temp_db)
+        climb_repo.save_climbs(sample_climbs[:3])
+        temp_db.set_last_sync()
+        temp_db.set_metadata(RailwaySyncManager.CHANGE_CURSOR_KEY, "7")
+
+        updated = sample_climbs[0]
+        updated.name = "Renommé"
+        railway_api.get_changes.return_value = {
+            "changes": [
+                {"seq": 8, "entity_type": "climb", "entity_id": updated.id,
+                 "action": "update", "climb": updated},
+                {"seq": 9, "entity_type": "climb", "entity_id": sample_climbs[1].id,
+                 "action": "delete", "climb": None},
+                {"seq": 10, "entity_type": "climb", "entity_id": sample_climbs[4].id,
+                 "action": "create", "climb": sample_climbs[4]},
+            ],
+            "cursor": 10,
+            "has_more": False,
+        }
+
+        manager = RailwaySyncManager(railway_api, temp_db)
+        result = manager.sync_incremental()
+
+        assert result.success
+        railway_api.get_changes.assert_called_once_with(cursor=7, limit=500, face_id=None)
+        railway_api.get_all_climbs.assert_not_called()
+        assert (result.climbs_added, result.climbs_updated, result.climbs_deleted) == (1, 1, 1)
+        assert climb_repo.get_climb(updated.id).name == "Renommé"
+        assert climb_repo.get_climb(sample_climbs[1].id) is None
+        assert climb_repo.get_climb(sample_climbs[4].id) is not None
+        assert temp_db.get_metadata(RailwaySyncManager.CHANGE_CURSOR_KEY) == "10"
+
+    def test_sync_incremental_pages(self, temp_db, railway_api, sample_climbs):
+        """Le flux est suivi tant que has_more est vrai."""
+        temp_db.set_last_sync()
+        temp_db.set_metadata(RailwaySyncManager.CHANGE_CURSOR_KEY, "0")
+        railway_api.get_changes.side_effect = [
+            {"changes": [{"seq": 1, "entity_type": "climb", "entity_id": sample_climbs[0].id,
+                          "action": "create", "climb": sample_climbs[0]}],
+             "cursor": 1, "has_more": True},
+            {"changes": [], "cursor": 1, "has_more": False},
+        ]
+
+        manager = RailwaySyncManager(railway_api, temp_db)
+        result = manager.sync_incremental()
+
+        assert result.climbs_added == 1
+        assert railway_api.get_changes.call_count == 2
+        assert railway_api.get_changes.call_args.kwargs["cursor"] == 1
+
+    def test_sync_incremental_without_cursor_falls_back(self, temp_db, railway_api, sample_climbs):
+        """Sans curseur enregistré, la sync utilise since_created_at puis stocke le curseur."""
+        temp_db.set_last_sync()
+        railway_api.get_all_climbs.return_value = sample_climbs[:1]
+
+        manager = RailwaySyncManager(railway_api, temp_db)
+        result = manager.sync_incremental()
+
+        assert result.success
+        railway_api.get_changes.assert_not_called()
+        assert "since_created_at" in railway_api.get_all_climbs.call_args.kwargs
+        assert temp_db.get_metadata(RailwaySyncManager.CHANGE_CURSOR_KEY) == "7"
@@ -0,0 +1,174 @@
+"""
+Tests pour les tuiles des photos de murs (core/tiles.py).
+"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from mastoc.core.tiles import TileCache, TileInfo, render_overview, render_region
+
+
+# Photo 1000x1500 : niveau max 11 (ceil(log2(1500))), tuiles de 256 px
+DESCRIPTOR = {
+    "version": "0123456789abcdef",
+    "width": 1000,
+    "height": 1500,
+    "tile_size": 256,
+    "max_level": 11,
+    "format": "jpg",
+    "url_template": "/api/faces/tiles/0123456789abcdef/{level}/{col}_{row}.jpg",
+}
+
+
+@pytest.fixture
+def info():
+    return TileInfo.from_api(DESCRIPTOR)
+
+
+def _tile_bytes(color, size=(256, 256)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG", quality=95)
+    return buffer.getvalue()
+
+
+class FakeServer:
+    """Sert des tuiles unies : rouge au niveau max, bleu ailleurs."""
+
+    def __init__(self, info):
+        self.info = info
+        self.requested = []
+
+    def __call__(self, path):
+        self.requested.append(path)
+        level, name = path.rsplit("/", 2)[-2:]
+        col, row = (int(n) for n in name.removesuffix(".jpg").split("_"))
+        level = int(level)
+        level_w, level_h = self.info.level_size(level)
+        size = (
+            min(256, level_w - col * 256),
+            min(256, level_h - row * 256),
+        )
+        color = (255, 0, 0) if level == self.info.max_level else (0, 0, 255)
+        return _tile_bytes(color, size)
+
+
+class TestTileInfo:
+    """Tests pour le descripteur de pyramide."""
+
+    def test_level_size(self, info):
+        assert info.level_size(11) == (1000, 1500)
+        assert info.level_size(10) == (500, 750)
+        assert info.level_size(9) == (250, 375)
+        assert info.level_size(0) == (1, 1)
+
+    def test_level_for_scale(self, info):
+        """Plus petit niveau au moins aussi net que l'affichage."""
+        assert info.level_for_scale(1.0) == 11
+        assert info.level_for_scale(2.0) == 11  # pas plus net que l'origine
+        assert info.level_for_scale(0.5) == 10
+        assert info.level_for_scale(0.3) == 10
+        assert info.level_for_scale(0.25) == 9
+        assert info.level_for_scale(0.0) == 0
+
+    def test_tiles_for_region(self, info):
+        """Seules les tuiles qui recouvrent la zone."""
+        assert info.tiles_for_region(11, (0, 0, 256, 256)) == [(0, 0)]
+        assert info.tiles_for_region(11, (200, 200, 100, 100)) == [(0, 0), (1, 0), (0, 1), (1, 1)]
+        # Photo entière au niveau 10 : 2x3 tuiles
+        assert len(info.tiles_for_region(10, (0, 0, 1000, 1500))) == 6
+        # Zone débordant de la photo : bornée à la grille
+        assert info.tiles_for_region(11, (900, 1400, 500, 500)) == [(3, 5)]
+
+    def test_tile_url(self, info):
+        assert info.tile_url(9, 0, 1) == "/api/faces/tiles/0123456789abcdef/9/0_1.jpg"
+
+
+class TestTileCache:
+    """Tests pour le cache disque des tuiles."""
+
+    def test_downloaded_once(self, tmp_path, info):
+        """Une tuile en cache n'est plus téléchargée (immuable)."""
+        server = FakeServer(info)
+        cache = TileCache(server, cache_dir=tmp_path)
+
+        first = cache.get_tile(info, 11, 1, 2)
+        second = cache.get_tile(info, 11, 1, 2)
+
+        assert first == second == tmp_path / "0123456789abcdef" / "11" / "1_2.jpg"
+        assert server.requested == ["/api/faces/tiles/0123456789abcdef/11/1_2.jpg"]
+        assert cache.downloads == 1
+        assert not list(tmp_path.rglob("*.tmp"))
+
+    def test_fetch_error(self, tmp_path, info):
+        """Échec de téléchargement : None, rien en cache."""
+        def failing(path):
+            raise ConnectionError("offline")
+
+        cache = TileCache(failing, cache_dir=tmp_path)
+        assert cache.get_tile(info, 11, 0, 0) is None
+        assert not list(tmp_path.rglob("*.jpg"))
+
+    def test_clear_version(self, tmp_path, info):
+        cache = TileCache(FakeServer(info), cache_dir=tmp_path)
+        cache.get_tile(info, 11, 0, 0)
+        cache.get_tile(info, 10, 0, 0)
+
+        assert cache.clear_version(info.version) == 2
+        assert not (tmp_path / info.version).exists()
+        assert cache.clear_version(info.version) == 0
+
+
+class TestRenderRegion:
+    """Tests pour l'assemblage d'une zone."""
+
+    def test_zoomed_region_uses_full_resolution(self, tmp_path, info):
+        """Zoom 1:1 sur une petite zone : quelques tuiles du niveau max."""
+        server = FakeServer(info)
+        image = render_region(info, TileCache(server, tmp_path), (200, 200, 100, 100), 1.0)
+
+        assert image.size == (100, 100)
+        assert image.getpixel((50, 50))[0] > 200
+        assert len(server.requested) == 4
+        assert all("/11/" in path for path in server.requested)
+
+    def test_overview_uses_low_level(self, tmp_path, info):
+        """Photo entière réduite : tuiles d'un niveau bas uniquement."""
+        server = FakeServer(info)
+        image = render_region(info, TileCache(server, tmp_path), (0, 0, 1000, 1500), 0.2)
+
+        assert image.size == (200, 300)
+        assert image.getpixel((100, 150))[2] > 200
+        # Niveau 9 (250x375) : 1x2 tuiles au lieu de 4x6 au niveau max
+        assert sorted(server.requested) == [
+            "/api/faces/tiles/0123456789abcdef/9/0_0.jpg",
+            "/api/faces/tiles/0123456789abcdef/9/0_1.jpg",
+        ]
+
+    def test_missing_tile_left_black(self, tmp_path, info):
+        """Tuile indisponible : zone noire, pas d'exception."""
+        def failing(path):
+            raise ConnectionError("offline")
+
+        image = render_region(info, TileCache(failing, tmp_path), (0, 0, 100, 100), 1.0)
+        assert image.size == (100, 100)
+        assert image.getpixel((50, 50)) == (0, 0, 0)
+
+
+class TestRenderOverview:
+    """Tests pour la photo entière du visualiseur."""
+
+    def test_fits_max_side(self, tmp_path, info):
+        server = FakeServer(info)
+        image, scale = render_overview(info, TileCache(server, tmp_path), 300)
+
+        assert scale == 0.2
+        assert image.size == (200, 300)
+        assert all("/9/" in path for path in server.requested)
+
+    def test_never_upscaled(self, tmp_path, info):
+        image, scale = render_overview(info, TileCache(FakeServer(info), tmp_path), 4096)
+
+        assert scale == 1.0
+        assert image.size == (info.width, info.height)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latence de GET /api/climbs sur un grand catalogue.
+
+Remplit une base SQLite temporaire (50k climbs par défaut, avec ouvreurs)
+puis mesure, pour des pages en début, milieu et fin de catalogue :
+- pagination par numéro de page (offset) avec et sans compte total ;
+- pagination par curseur (after) ;
+et le nombre de requêtes SQL par page.
+
+Usage:
+    python scripts/bench_list_climbs.py [--climbs 50000] [--page-size 100]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+os.environ.pop("API_KEY", None)
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from mastoc_api.database import Base, get_async_db, get_db
+from mastoc_api.main import app
+from mastoc_api.models import Gym, Face, User, Climb
+
+
+def _setup_app():
+    """Branche l'app sur une base SQLite temporaire (piles sync et async)."""
+    path = os.path.join(tempfile.mkdtemp(prefix="mastoc-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_session_factory = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return engine, session_factory, TestClient(app)
+
+
+def seed(session_factory, n_climbs: int, n_setters: int = 200):
+    """Insère une face, des ouvreurs et n_climbs climbs."""
+    rng = random.Random(42)
+    with session_factory() as db:
+        gym = Gym(id=uuid.uuid4(), display_name="Bench")
+        face = Face(id=uuid.uuid4(), gym_id=gym.id, picture_path="bench.jpg")
+        setters = [
+            User(id=uuid.uuid4(), full_name=f"Ouvreur {i}") for i in range(n_setters)
+        ]
+        db.add_all([gym, face, *setters])
+        db.flush()
+
+        start = datetime(2020, 1, 1)
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "face_id": face.id,
+                "setter_id": rng.choice(setters).id,
+                "name": f"Bloc {i}",
+                "holds_list": "S1 O2 O3 T4",
+                "grade_font": "6A",
+                "grade_ircra": round(rng.uniform(10, 25), 1),
+                "source": "stokt",
+                "created_at": start + timedelta(minutes=i),
+            }
+            for i in range(n_climbs)
+        ]
+        for i in range(0, len(rows), 5000):
+            db.execute(insert(Climb), rows[i:i + 5000])
+        db.commit()
+
+
+def timed(client, params: dict, runs: int) -> tuple[float, dict]:
+    """Médiane (ms) de `runs` appels et dernière réponse."""
+    durations = []
+    data = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        response = client.get("/api/climbs", params=params)
+        durations.append((time.perf_counter() - t0) * 1000)
+        data = response.json()
+    return statistics.median(durations), data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--climbs", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    engine, session_factory, client = _setup_app()
+    t0 = time.perf_counter()
+    seed(session_factory, args.climbs)
+    print(f"Catalogue: {args.climbs} climbs ({time.perf_counter() - t0:.1f}s)\n")
+
+    statements = []
+    event.listen(Engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    size = args.page_size
+    last_page = (args.climbs + size - 1) // size
+    print(f"{'page':>8} {'offset+count':>14} {'offset':>10} {'curseur':>10} {'requêtes':>9}")
+    for page in (1, last_page // 2, last_page):
+        # Curseur de la page précédente (obtenu hors mesure)
+        cursor = None
+        if page > 1:
+            _, previous = timed(client, {"page": page - 1, "page_size": size,
+                                         "with_count": "false"}, 1)
+            cursor = previous["next_cursor"]
+
+        with_count, _ = timed(client, {"page": page, "page_size": size}, args.runs)
+        statements.clear()
+        offset, _ = timed(client, {"page": page, "page_size": size, "with_count": "false"}, 1)
+        queries = len(statements)
+        offset, _ = timed(client, {"page": page, "page_size": size, "with_count": "false"},
+                          args.runs)
+        params = {"page_size": size, "with_count": "false"}
+        if cursor:
+            params["after"] = cursor
+        keyset, data = timed(client, params, args.runs)
+        assert len(data["results"]) > 0
+
+        print(f"{page:>8} {with_count:>12.1f}ms {offset:>8.1f}ms {keyset:>8.1f}ms {queries:>9}")
+
+
+if __name__ == "__main__":
+    main()
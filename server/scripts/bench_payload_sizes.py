@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark: taille des réponses d'une synchronisation complète.
+
+Construit une salle synthétique (face + ~776 holds + ~1012 climbs) dans une
+base SQLite temporaire, rejoue la séquence de synchronisation du client
+(setup de la face, holds, toutes les pages de climbs) et affiche les octets
+transférés pour chaque combinaison format (json / colonnaire) x encodage
+(identity / gzip / brotli).
+
+Usage:
+    python scripts/bench_payload_sizes.py [--holds 776] [--climbs 1012]
+"""
+
+import argparse
+import gzip
+import os
+import random
+import sys
+import tempfile
+import uuid
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+os.environ.pop("API_KEY", None)
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from mastoc_api.database import Base, get_async_db, get_db
+from mastoc_api.main import app
+from mastoc_api.wire_format import COLUMNAR_MEDIA_TYPE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FORMATS = {"json": "application/json", "columnar": COLUMNAR_MEDIA_TYPE}
+
+
+def _setup_app():
+    """Branche l'app sur une base SQLite temporaire (piles sync et async)."""
+    path = os.path.join(tempfile.mkdtemp(prefix="mastoc-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_session_factory = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return TestClient(app)
+
+
+def _polygon(rng: random.Random, cx: float, cy: float) -> str:
+    """Polygone synthétique de 8 à 14 points autour d'un centre."""
+    points = []
+    for _ in range(rng.randint(8, 14)):
+        points.append(f"{cx + rng.uniform(-40, 40):.2f},{cy + rng.uniform(-40, 40):.2f}")
+    return " ".join(points)
+
+
+def seed(client: TestClient, n_holds: int, n_climbs: int) -> str:
+    """Crée la salle synthétique et retourne l'id Railway de la face."""
+    rng = random.Random(42)
+    gym_stokt_id = str(uuid.uuid4())
+    face_stokt_id = str(uuid.uuid4())
+    client.post("/api/sync/import/gym", json={"stokt_id": gym_stokt_id, "display_name": "Bench"})
+    client.post("/api/sync/import/face", json={
+        "stokt_id": face_stokt_id,
+        "gym_stokt_id": gym_stokt_id,
+        "picture_path": "CACHE/images/bench.jpg",
+        "picture_width": 2263,
+        "picture_height": 3000,
+    })
+
+    hold_ids = list(range(800000, 800000 + n_holds))
+    holds = []
+    for stokt_id in hold_ids:
+        cx, cy = rng.uniform(0, 2263), rng.uniform(0, 3000)
+        holds.append({
+            "stokt_id": stokt_id,
+            "face_stokt_id": face_stokt_id,
+            "polygon_str": _polygon(rng, cx, cy),
+            "centroid_x": round(cx, 2),
+            "centroid_y": round(cy, 2),
+            "area": round(rng.uniform(200, 6000), 1),
+            "center_tape_str": f"{cx:.1f} {cy:.1f} {cx + 30:.1f} {cy + 30:.1f}",
+        })
+    client.post("/api/sync/import/holds/batch", json={"holds": holds})
+
+    grades = ["4", "5A", "5B", "5C", "6A", "6A+", "6B", "6B+", "6C", "7A", "7B"]
+    climbs = []
+    for i in range(n_climbs):
+        selected = rng.sample(hold_ids, rng.randint(6, 16))
+        holds_list = " ".join(
+            ["S" + str(selected[0])]
+            + ["O" + str(h) for h in selected[1:-1]]
+            + ["T" + str(selected[-1])]
+        )
+        climbs.append({
+            "stokt_id": str(uuid.uuid4()),
+            "face_stokt_id": face_stokt_id,
+            "name": f"Bloc {i}",
+            "holds_list": holds_list,
+            "grade_font": rng.choice(grades),
+            "grade_ircra": round(rng.uniform(10, 25), 1),
+            "climbed_by": rng.randint(0, 120),
+            "total_likes": rng.randint(0, 40),
+        })
+    client.post("/api/sync/import/climbs/batch", json={"climbs": climbs})
+
+    return client.get("/api/faces").json()[0]["id"]
+
+
+def sync_bodies(client: TestClient, face_id: str, accept: str) -> list[bytes]:
+    """Corps bruts de la séquence de synchronisation complète."""
+    headers = {"Accept": accept, "Accept-Encoding": "identity"}
+    bodies = [
+        client.get(f"/api/faces/{face_id}/setup", headers=headers).content,
+        client.get("/api/holds", params={"face_id": face_id}, headers=headers).content,
+    ]
+    page = 1
+    while True:
+        response = client.get(
+            "/api/climbs",
+            params={"face_id": face_id, "page": page, "page_size": 100},
+            headers=headers,
+        )
+        bodies.append(response.content)
+        data = response.json()
+        if page * data["page_size"] >= data["count"]:
+            break
+        page += 1
+    return bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--holds", type=int, default=776)
+    parser.add_argument("--climbs", type=int, default=1012)
+    args = parser.parse_args()
+
+    client = _setup_app()
+    face_id = seed(client, args.holds, args.climbs)
+
+    encoders = {"identity": lambda b: b, "gzip": lambda b: gzip.compress(b, 6)}
+    if brotli is not None:
+        encoders["br"] = lambda b: brotli.compress(b, quality=4)
+
+    print(f"Salle: {args.holds} holds, {args.climbs} climbs\n")
+    print(f"{'format':<10} " + " ".join(f"{name:>12}" for name in encoders))
+    baseline = None
+    for fmt, accept in FORMATS.items():
+        bodies = sync_bodies(client, face_id, accept)
+        sizes = [sum(len(encode(b)) for b in bodies) for encode in encoders.values()]
+        baseline = baseline or sizes[0]
+        print(f"{fmt:<10} " + " ".join(f"{s:>12,}" for s in sizes))
+
+    print(f"\n(référence: json/identity = {baseline:,} octets, {len(bodies)} requêtes)")
+    if brotli is None:
+        print("brotli non installé : colonne br omise (pip install brotli)")
+
+
+if __name__ == "__main__":
+    main()
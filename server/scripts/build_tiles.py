@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Génération des pyramides de tuiles des photos de faces.
+
+Les pyramides sont générées au premier appel de GET /api/faces/{id}/tiles ;
+ce script les prépare à l'avance (après un import ou un changement de
+photo) pour que le premier visiteur n'attende pas le découpage.
+
+Usage:
+    python scripts/build_tiles.py
+    python scripts/build_tiles.py --face-id <uuid>
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy import select
+
+from mastoc_api.database import SessionLocal
+from mastoc_api.models import Face
+from mastoc_api.tiles import ensure_pyramid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build face picture tile pyramids")
+    parser.add_argument("--face-id", type=uuid.UUID, action="append", help="Limit to these faces")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        query = select(Face.id, Face.picture_path)
+        if args.face_id:
+            query = query.where(Face.id.in_(args.face_id))
+        faces = db.execute(query).all()
+
+    missing = 0
+    for face_id, picture_path in faces:
+        started = time.perf_counter()
+        pyramid = ensure_pyramid(picture_path)
+        if pyramid is None:
+            missing += 1
+            print(f"  {face_id} : photo introuvable ({picture_path})")
+            continue
+        print(
+            f"  {face_id} : {pyramid.width}x{pyramid.height}, "
+            f"{pyramid.max_level + 1} niveaux, version {pyramid.version} "
+            f"({time.perf_counter() - started:.1f}s)"
+        )
+
+    print(f"{len(faces) - missing}/{len(faces)} pyramide(s) prête(s)")
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,25 @@ Avec API Key (si configurée sur Railway):
     python scripts/init_from_stokt.py --token TOKEN --api-key YOUR_API_KEY
 
 Avec cache (évite de re-télécharger depuis Stokt):
-    python scripts/init_from_stokt.py --token TOKEN --api-key KEY --use-cache
+    python scripts/init_from_stokt.py --token TOKEN --api-key KEY --save-cache
+    python scripts/init_from_stokt.py --api-key KEY --use-cache
+
+Les lots (holds, setters, climbs) sont envoyés en parallèle (--concurrency
+requêtes en vol au plus) par un client httpx asynchrone. La taille des lots
+part de --batch-size puis s'ajuste à la latence observée : doublée tant
+qu'un lot répond en moins de la moitié de --target-latency, divisée par
+deux au-delà (ou en cas d'échec, avant nouvel essai).
+
+Chaque lot accepté est noté dans le cache (progress.json) : une exécution
+interrompue reprend où elle s'était arrêtée. --restart repart de zéro.
 """
 
 import argparse
+import asyncio
 import json
 import sys
+import time
+from dataclasses import asdict, dataclass, field, is_dataclass
 from pathlib import Path
 from datetime import datetime
 
@@ -26,6 +39,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent / "mastoc" / "src"))
 
 import httpx
 from mastoc.api.client import StoktAPI, MONTOBOARD_GYM_ID
+from mastoc.api.models import (
+    Climb, ClimbSetter, Face, FacePicture, Grade, GymSummary, Hold,
+)
 
 
 # Configuration
@@ -33,6 +49,14 @@ MASTOC_API_URL = "https://mastoc-production.up.railway.app"
 API_KEY_HEADER = "X-API-Key"
 CACHE_DIR = Path(__file__).parent / ".cache"
 
+# Envoi des lots
+DEFAULT_BATCH_SIZE = 200
+MIN_BATCH_SIZE = 25
+MAX_BATCH_SIZE = 2000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TARGET_LATENCY = 2.0  # secondes par lot
+MAX_ATTEMPTS = 4
+
 
 def get_cache_path(name: str) -> Path:
     """Retourne le chemin du fichier cache."""
@@ -40,28 +64,25 @@ def get_cache_path(name: str) -> Path:
     return CACHE_DIR / f"{name}.json"
 
 
+def _serializable(item):
+    """Objet du modèle (dataclass) -> dict JSON-compatible."""
+    if is_dataclass(item):
+        return asdict(item)
+    if hasattr(item, '__dict__'):
+        return {
+            k: v.__dict__ if hasattr(v, '__dict__') else v
+            for k, v in item.__dict__.items()
+        }
+    return item
+
+
 def save_to_cache(name: str, data: list):
     """Sauvegarde les données en cache."""
     cache_path = get_cache_path(name)
-
-    # Convertir les objets en dicts sérialisables
-    serializable = []
-    for item in data:
-        if hasattr(item, '__dict__'):
-            d = {}
-            for k, v in item.__dict__.items():
-                if hasattr(v, '__dict__'):
-                    d[k] = v.__dict__
-                else:
-                    d[k] = v
-            serializable.append(d)
-        else:
-            serializable.append(item)
-
     cache_data = {
         "timestamp": datetime.now().isoformat(),
         "count": len(data),
-        "data": serializable
+        "data": [_serializable(item) for item in data]
     }
     cache_path.write_text(json.dumps(cache_data, indent=2, default=str))
     print(f"  Cache sauvegardé: {cache_path} ({len(data)} items)")
@@ -78,112 +99,230 @@ def load_from_cache(name: str) -> list | None:
     return cache_data["data"]
 
 
-def import_gym(client: httpx.Client, gym_summary) -> str:
-    """Importe un gym."""
-    response = client.post(
-        f"{MASTOC_API_URL}/api/sync/import/gym",
-        json={
-            "stokt_id": MONTOBOARD_GYM_ID,
-            "display_name": gym_summary.display_name,
-            "location_string": gym_summary.location_string,
-        }
-    )
-    response.raise_for_status()
-    result = response.json()
-    print(f"  Gym: {result['status']} (id={result['id']})")
-    return result["id"]
-
-
-def import_face(client: httpx.Client, face, gym_stokt_id: str) -> str:
-    """Importe une face."""
-    picture_path = face.picture.name if face.picture else ""
-    picture_width = face.picture.width if face.picture else None
-    picture_height = face.picture.height if face.picture else None
-
-    response = client.post(
-        f"{MASTOC_API_URL}/api/sync/import/face",
-        json={
-            "stokt_id": str(face.id),
-            "gym_stokt_id": gym_stokt_id,
-            "picture_path": picture_path,
-            "picture_width": picture_width,
-            "picture_height": picture_height,
-            "feet_rules_options": face.feet_rules_options or [],
-            "has_symmetry": face.has_symmetry,
-        }
-    )
-    response.raise_for_status()
-    result = response.json()
-    print(f"  Face {face.id}: {result['status']}")
-    return result["id"]
-
-
-def import_holds(client: httpx.Client, holds: list, face_stokt_id: str) -> int:
-    """Importe les holds d'une face (version legacy)."""
-    count = 0
-    for hold in holds:
-        centroid = hold.centroid  # tuple (x, y)
-        response = client.post(
-            f"{MASTOC_API_URL}/api/sync/import/hold",
-            json={
-                "stokt_id": hold.id,
-                "face_stokt_id": face_stokt_id,
-                "polygon_str": hold.polygon_str,
-                "centroid_x": centroid[0],
-                "centroid_y": centroid[1],
-                "area": hold.area,
-                "path_str": hold.path_str,
-                "center_tape_str": hold.center_tape_str,
-                "right_tape_str": hold.right_tape_str,
-                "left_tape_str": hold.left_tape_str,
-            }
-        )
-        response.raise_for_status()
-        count += 1
-    return count
-
-
-def import_holds_batch(client: httpx.Client, holds: list, face_stokt_id: str) -> tuple[int, int, int]:
-    """Importe les holds d'une face en batch."""
-    batch_data = []
-    for hold in holds:
-        centroid = hold.centroid
-        batch_data.append({
-            "stokt_id": hold.id,
-            "face_stokt_id": face_stokt_id,
-            "polygon_str": hold.polygon_str,
-            "centroid_x": centroid[0],
-            "centroid_y": centroid[1],
-            "area": hold.area,
-            "path_str": hold.path_str,
-            "center_tape_str": hold.center_tape_str,
-            "right_tape_str": hold.right_tape_str,
-            "left_tape_str": hold.left_tape_str,
-        })
-
-    response = client.post(
-        f"{MASTOC_API_URL}/api/sync/import/holds/batch",
-        json={"holds": batch_data}
-    )
-    response.raise_for_status()
-    result = response.json()
-    return result["created"], result["updated"], result["errors"]
-
-
-def import_user(client: httpx.Client, user_id: str, full_name: str) -> str:
-    """Importe un user (setter)."""
-    response = client.post(
-        f"{MASTOC_API_URL}/api/sync/import/user",
-        json={
-            "stokt_id": user_id,
-            "full_name": full_name,
-        }
-    )
-    response.raise_for_status()
-    return response.json()["id"]
+def climb_from_cache(data: dict) -> Climb:
+    """Reconstruit un Climb sauvegardé par save_to_cache."""
+    setter = data.get("setter")
+    grade = data.get("grade")
+    return Climb(**{
+        **data,
+        "setter": ClimbSetter(**setter) if setter else None,
+        "grade": Grade(**grade) if grade else None,
+    })
+
+
+def face_from_cache(data: dict) -> Face:
+    """Reconstruit une Face (setup avec holds) sauvegardée par save_to_cache."""
+    picture = data.get("picture")
+    small_picture = data.get("small_picture")
+    return Face(**{
+        **data,
+        "picture": FacePicture(**picture) if picture else None,
+        "small_picture": FacePicture(**small_picture) if small_picture else None,
+        "holds": [Hold(**h) for h in data.get("holds", [])],
+    })
+
+
+class ImportProgress:
+    """
+    Clés (stokt_id) déjà importées, par type, persistées dans le cache.
+
+    Liée à l'URL cible : un cache de progression d'une autre instance
+    mastoc-api est ignoré.
+    """
+
+    def __init__(self, target: str, restart: bool = False):
+        self.target = target
+        self.path = get_cache_path("progress")
+        self._done: dict[str, set[str]] = {}
+        if not restart and self.path.exists():
+            saved = json.loads(self.path.read_text())
+            if saved.get("target") == target:
+                self._done = {kind: set(keys) for kind, keys in saved["done"].items()}
+
+    def done(self, kind: str) -> set[str]:
+        return self._done.setdefault(kind, set())
+
+    def mark(self, kind: str, keys) -> None:
+        """Note des clés importées et réécrit le fichier (atomiquement)."""
+        self.done(kind).update(keys)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "target": self.target,
+            "timestamp": datetime.now().isoformat(),
+            "done": {kind: sorted(keys) for kind, keys in self._done.items()},
+        }))
+        tmp.replace(self.path)
+
+
+class AdaptiveBatchSize:
+    """Taille de lot ajustée à la latence observée des requêtes."""
+
+    def __init__(self, initial: int, target_latency: float,
+                 minimum: int = MIN_BATCH_SIZE, maximum: int = MAX_BATCH_SIZE):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.size = max(minimum, min(maximum, initial))
+
+    def observe(self, batch_len: int, seconds: float) -> None:
+        """Double la taille sous la moitié de la cible, la divise par deux au-delà."""
+        if seconds > self.target_latency:
+            self.size = max(self.minimum, self.size // 2)
+        elif seconds < self.target_latency / 2 and batch_len >= self.size:
+            self.size = min(self.maximum, self.size * 2)
+
+    def failed(self) -> None:
+        self.size = max(self.minimum, self.size // 2)
+
+
+@dataclass
+class KindStats:
+    """Compteurs d'import d'un type d'entité."""
+    created: int = 0
+    updated: int = 0
+    errors: int = 0
+    skipped: int = 0
+    batches: int = 0
+    retries: int = 0
+    request_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    batch_sizes: list[int] = field(default_factory=list)
+
+
+@dataclass
+class Uploader:
+    """Envoi concurrent des lots vers mastoc-api."""
+    client: httpx.AsyncClient
+    concurrency: int
+    batch_size: int
+    target_latency: float
+    progress: ImportProgress
+    dry_run: bool = False
+    stats: dict[str, KindStats] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def post(self, endpoint: str, payload: dict) -> tuple[dict, float]:
+        """POST avec nouvel essai (backoff) ; retourne (réponse JSON, durée)."""
+        async with self.semaphore:
+            for attempt in range(MAX_ATTEMPTS):
+                t0 = time.perf_counter()
+                try:
+                    response = await self.client.post(f"{MASTOC_API_URL}{endpoint}", json=payload)
+                    response.raise_for_status()
+                    return response.json(), time.perf_counter() - t0
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code < 500 or attempt == MAX_ATTEMPTS - 1:
+                        raise
+                except httpx.TransportError:
+                    if attempt == MAX_ATTEMPTS - 1:
+                        raise
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        raise AssertionError("unreachable")
+
+    async def import_batches(self, kind: str, endpoint: str, rows: list[dict]) -> KindStats:
+        """
+        Importe `rows` par lots de taille adaptative, `concurrency` à la fois.
+
+        Les lignes déjà importées (progress) sont sautées ; chaque lot
+        accepté est noté, sauf ses lignes rejetées (row_errors).
+        """
+        stats = self.stats.setdefault(kind, KindStats())
+        done = self.progress.done(kind)
+        pending = [row for row in rows if str(row["stokt_id"]) not in done]
+        stats.skipped += len(rows) - len(pending)
+        if self.dry_run or not pending:
+            return stats
+
+        sizes = AdaptiveBatchSize(self.batch_size, self.target_latency)
+        position = 0
+        started = time.perf_counter()
+
+        async def worker():
+            nonlocal position
+            while position < len(pending):
+                # Boucle asyncio : pas de préemption entre lecture et avance
+                batch = pending[position:position + sizes.size]
+                position += len(batch)
+                result, seconds = await self._send(kind, endpoint, batch, sizes, stats)
+
+                rejected = {str(e["stokt_id"]) for e in result.get("row_errors", [])}
+                self.progress.mark(kind, [
+                    str(row["stokt_id"]) for row in batch
+                    if str(row["stokt_id"]) not in rejected
+                ])
+                stats.created += result["created"]
+                stats.updated += result["updated"]
+                stats.errors += result["errors"]
+                stats.batches += 1
+                stats.request_seconds += seconds
+                stats.batch_sizes.append(len(batch))
+                print(f"  {kind}: lot de {len(batch)} en {seconds:.2f}s "
+                      f"(+{result['created']} créés, {result['updated']} màj, "
+                      f"{result['errors']} err) -> prochain lot {sizes.size}")
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        stats.wall_seconds += time.perf_counter() - started
+        return stats
+
+    async def _send(self, kind, endpoint, batch, sizes, stats) -> tuple[dict, float]:
+        """Envoie un lot ; un lot trop lourd pour le serveur est coupé en deux."""
+        try:
+            result, seconds = await self.post(endpoint, {kind: batch})
+        except (httpx.HTTPStatusError, httpx.TransportError) as e:
+            too_large = isinstance(e, httpx.TransportError) or e.response.status_code in (413, 504)
+            if not too_large or len(batch) <= MIN_BATCH_SIZE:
+                raise
+            sizes.failed()
+            stats.retries += 1
+            half = len(batch) // 2
+            first, t1 = await self._send(kind, endpoint, batch[:half], sizes, stats)
+            second, t2 = await self._send(kind, endpoint, batch[half:], sizes, stats)
+            for error in second.get("row_errors", []):
+                error["index"] += half
+            return {
+                "created": first["created"] + second["created"],
+                "updated": first["updated"] + second["updated"],
+                "errors": first["errors"] + second["errors"],
+                "row_errors": first.get("row_errors", []) + second.get("row_errors", []),
+            }, t1 + t2
+        sizes.observe(len(batch), seconds)
+        return result, seconds
+
+    def report(self, total_seconds: float) -> None:
+        """Affiche le débit par type d'entité."""
+        print("\n=== Débit ===")
+        print(f"  {'type':<8} {'lignes':>7} {'ignorées':>8} {'lots':>5} {'taille moy.':>11} "
+              f"{'lat. moy.':>9} {'durée':>7} {'lignes/s':>9}")
+        for kind, stats in self.stats.items():
+            rows = stats.created + stats.updated + stats.errors
+            mean_size = rows / stats.batches if stats.batches else 0
+            mean_latency = stats.request_seconds / stats.batches if stats.batches else 0
+            rate = rows / stats.wall_seconds if stats.wall_seconds else 0
+            print(f"  {kind:<8} {rows:>7} {stats.skipped:>8} {stats.batches:>5} {mean_size:>11.0f} "
+                  f"{mean_latency:>8.2f}s {stats.wall_seconds:>6.1f}s {rate:>9.0f}")
+        print(f"  Total: {total_seconds:.1f}s (concurrence {self.concurrency})")
+
+
+def hold_row(hold: Hold, face_stokt_id: str) -> dict:
+    """Prépare les données d'un hold pour l'import."""
+    centroid = hold.centroid
+    return {
+        "stokt_id": hold.id,
+        "face_stokt_id": face_stokt_id,
+        "polygon_str": hold.polygon_str,
+        "centroid_x": centroid[0],
+        "centroid_y": centroid[1],
+        "area": hold.area,
+        "path_str": hold.path_str,
+        "center_tape_str": hold.center_tape_str,
+        "right_tape_str": hold.right_tape_str,
+        "left_tape_str": hold.left_tape_str,
+    }
 
 
-def prepare_climb_data(climb) -> dict:
+def prepare_climb_data(climb: Climb) -> dict:
     """Prépare les données d'un climb pour l'import."""
     grade_font = climb.grade.font if climb.grade else None
     grade_ircra = climb.grade.ircra if climb.grade else None
@@ -205,247 +344,198 @@ def prepare_climb_data(climb) -> dict:
     }
 
 
-def import_users_batch(client: httpx.Client, climbs: list) -> tuple[int, int, int]:
-    """Import les setters uniques par batch."""
-    # Collecter les setters uniques
+def setter_rows(climbs: list[Climb]) -> list[dict]:
+    """Setters uniques des climbs."""
     setters = {}
     for climb in climbs:
         if climb.setter and climb.setter.id not in setters:
             setters[climb.setter.id] = climb.setter.full_name
-
-    if not setters:
-        return 0, 0, 0
-
-    batch_data = [
+    return [
         {"stokt_id": str(sid), "full_name": name}
         for sid, name in setters.items()
     ]
 
-    response = client.post(
-        f"{MASTOC_API_URL}/api/sync/import/users/batch",
-        json={"users": batch_data}
-    )
-    response.raise_for_status()
-    result = response.json()
-    return result["created"], result["updated"], result["errors"]
-
-
-def import_climbs_batch(client: httpx.Client, climbs: list, batch_size: int = 50):
-    """Import les climbs par batch pour de meilleures performances."""
-    total_created = 0
-    total_updated = 0
-    total_errors = 0
-
-    # D'abord importer tous les setters en batch
-    u_created, u_updated, u_errors = import_users_batch(client, climbs)
-    print(f"  {u_created} setters créés, {u_updated} existants")
-
-    # Ensuite importer les climbs par batch
-    for i in range(0, len(climbs), batch_size):
-        batch = climbs[i:i + batch_size]
-        batch_data = [prepare_climb_data(c) for c in batch]
-
-        response = client.post(
-            f"{MASTOC_API_URL}/api/sync/import/climbs/batch",
-            json={"climbs": batch_data}
-        )
-        response.raise_for_status()
-        result = response.json()
 
-        total_created += result["created"]
-        total_updated += result["updated"]
-        total_errors += result["errors"]
+async def import_gym(uploader: Uploader, gym_summary: GymSummary) -> None:
+    """Importe le gym."""
+    result, _ = await uploader.post("/api/sync/import/gym", {
+        "stokt_id": MONTOBOARD_GYM_ID,
+        "display_name": gym_summary.display_name,
+        "location_string": gym_summary.location_string,
+    })
+    print(f"  Gym: {result['status']} (id={result['id']})")
 
-        print(f"  Batch {i // batch_size + 1}: +{result['created']} créés, {result['updated']} màj, {result['errors']} err")
 
-    return total_created, total_updated, total_errors
+async def import_face(uploader: Uploader, face: Face, gym_stokt_id: str) -> None:
+    """Importe une face (sans ses holds)."""
+    result, _ = await uploader.post("/api/sync/import/face", {
+        "stokt_id": str(face.id),
+        "gym_stokt_id": gym_stokt_id,
+        "picture_path": face.picture.name if face.picture else "",
+        "picture_width": face.picture.width if face.picture else None,
+        "picture_height": face.picture.height if face.picture else None,
+        "feet_rules_options": face.feet_rules_options or [],
+        "has_symmetry": face.has_symmetry,
+    })
+    print(f"  Face {face.id}: {result['status']} ({len(face.holds)} holds)")
+
+
+def fetch_gym_and_faces(stokt: StoktAPI) -> tuple[GymSummary, list[Face]]:
+    """Récupère le gym et le setup (avec holds) de chaque face depuis Stokt."""
+    gym_summary = stokt.get_gym_summary(MONTOBOARD_GYM_ID)
+    faces = [
+        stokt.get_face_setup(face.id)
+        for wall in stokt.get_gym_walls(MONTOBOARD_GYM_ID)
+        for face in wall.faces
+    ]
+    return gym_summary, faces
 
 
-def import_climb(client: httpx.Client, climb, face_stokt_id: str) -> str:
-    """Importe un climb (version legacy, préférer import_climbs_batch)."""
-    # Import du setter si présent
-    setter_stokt_id = None
-    if climb.setter:
-        try:
-            import_user(client, climb.setter.id, climb.setter.full_name)
-            setter_stokt_id = climb.setter.id
-        except Exception:
-            pass  # Ignorer les erreurs de setter
+def fetch_climbs(stokt: StoktAPI) -> list[Climb]:
+    """Récupère tous les climbs du gym depuis Stokt."""
+    def progress_callback(current, total):
+        print(f"  Récupération: {current}/{total}", end="\r")
 
-    # Extraire grade si présent
-    grade_font = climb.grade.font if climb.grade else None
-    grade_ircra = climb.grade.ircra if climb.grade else None
+    climbs = stokt.get_all_gym_climbs(MONTOBOARD_GYM_ID, callback=progress_callback)
+    print(f"\n{len(climbs)} climbs récupérés depuis Stokt")
+    return climbs
 
-    response = client.post(
-        f"{MASTOC_API_URL}/api/sync/import/climb",
-        json={
-            "stokt_id": str(climb.id),
-            "face_stokt_id": face_stokt_id,
-            "setter_stokt_id": setter_stokt_id,
-            "name": climb.name,
-            "holds_list": climb.holds_list,  # String brute
-            "grade_font": grade_font,
-            "grade_ircra": grade_ircra,
-            "feet_rule": climb.feet_rule,
-            "description": None,  # Pas dans le modèle actuel
-            "is_private": climb.is_private,
-            "climbed_by": climb.climbed_by or 0,
-            "total_likes": climb.total_likes or 0,
-            "date_created": climb.date_created if climb.date_created else None,
-        }
-    )
-    response.raise_for_status()
-    return response.json()["status"]
 
+def connect_stokt(args) -> StoktAPI:
+    print("=== Connexion à Stokt ===")
+    stokt = StoktAPI()
+    if args.token:
+        stokt.set_token(args.token)
+        print("Token configuré")
+    else:
+        stokt.login(args.username, args.password)
+        print(f"Connecté en tant que {args.username}")
+    return stokt
 
-def main():
-    parser = argparse.ArgumentParser(description="Import Stokt data to mastoc-api")
-    parser.add_argument("--username", help="Stokt username")
-    parser.add_argument("--password", help="Stokt password")
-    parser.add_argument("--token", help="Stokt token (alternative to username/password)")
-    parser.add_argument("--api-key", help="mastoc-api API Key (if auth enabled)")
-    parser.add_argument("--dry-run", action="store_true", help="Don't actually import")
-    parser.add_argument("--batch", action="store_true", default=True, help="Use batch imports (default)")
-    parser.add_argument("--no-batch", action="store_true", help="Disable batch imports (slow)")
-    parser.add_argument("--batch-size", type=int, default=50, help="Batch size for climbs (default: 50)")
-    parser.add_argument("--use-cache", action="store_true", help="Use cached data instead of fetching from Stokt")
-    parser.add_argument("--save-cache", action="store_true", help="Save fetched data to cache (for future --use-cache)")
-    parser.add_argument("--climbs-only", action="store_true", help="Only import climbs (skip gym/faces/holds)")
-    args = parser.parse_args()
 
-    use_batch = args.batch and not args.no_batch
+def load_sources(args, parser) -> tuple[GymSummary | None, list[Face], list[Climb]]:
+    """Données à importer, depuis le cache (--use-cache) ou Stokt."""
+    gym_summary, faces, climbs = None, [], None
 
-    # Si on utilise le cache, pas besoin de credentials Stokt
-    if not args.use_cache and not args.token and not (args.username and args.password):
-        parser.error("Either --token or --username/--password required (or use --use-cache)")
+    if args.use_cache:
+        print("=== Chargement du cache ===")
+        cached_climbs = load_from_cache("climbs")
+        if cached_climbs is not None:
+            climbs = [climb_from_cache(c) for c in cached_climbs]
+        if not args.climbs_only:
+            cached_gym = load_from_cache("gym")
+            cached_faces = load_from_cache("faces")
+            if cached_gym and cached_faces is not None:
+                gym_summary = GymSummary(**cached_gym[0])
+                faces = [face_from_cache(f) for f in cached_faces]
+
+    need_faces = not args.climbs_only and gym_summary is None
+    if need_faces or climbs is None:
+        if not args.token and not (args.username and args.password):
+            parser.error("Either --token or --username/--password required (or a complete --use-cache)")
+        stokt = connect_stokt(args)
+        if need_faces:
+            gym_summary, faces = fetch_gym_and_faces(stokt)
+            if args.save_cache:
+                save_to_cache("gym", [gym_summary])
+                save_to_cache("faces", faces)
+        if climbs is None:
+            climbs = fetch_climbs(stokt)
+            if args.save_cache:
+                save_to_cache("climbs", climbs)
 
-    # Client Stokt (sauf si cache-only)
-    stokt = None
-    if not args.use_cache or not args.climbs_only:
-        print("=== Connexion à Stokt ===")
-        stokt = StoktAPI()
+    return gym_summary, faces, climbs
 
-        if args.token:
-            stokt.set_token(args.token)
-            print("Token configuré")
-        elif args.username and args.password:
-            stokt.login(args.username, args.password)
-            print(f"Connecté en tant que {args.username}")
-    else:
-        print("=== Mode cache uniquement ===")
 
-    # Client mastoc-api (avec API Key si fournie)
+async def run(args, gym_summary, faces, climbs) -> None:
     headers = {}
     if args.api_key:
         headers[API_KEY_HEADER] = args.api_key
-        print(f"API Key configurée")
-    mastoc = httpx.Client(timeout=120, headers=headers)
-
-    # Vérifier que mastoc-api est accessible
-    print("\n=== Vérification mastoc-api ===")
-    health = mastoc.get(f"{MASTOC_API_URL}/health").json()
-    print(f"Status: {health['status']}, DB: {health['database']}")
-
-    if args.dry_run:
-        print("\n[DRY RUN] Aucune modification ne sera effectuée")
-
-    if use_batch:
-        print("\n[BATCH MODE] Import optimisé par lots")
-
-    if not args.climbs_only:
-        # 1. Import gym
-        print("\n=== Import Gym Montoboard ===")
-        gym_summary = stokt.get_gym_summary(MONTOBOARD_GYM_ID)
-        print(f"Gym: {gym_summary.display_name}")
-
-        if not args.dry_run:
-            import_gym(mastoc, gym_summary)
-
-        # 2. Import faces et holds
-        print("\n=== Import Faces et Holds ===")
-        walls = stokt.get_gym_walls(MONTOBOARD_GYM_ID)
-
-        total_holds = 0
-        for wall in walls:
-            for face in wall.faces:
-                print(f"\nFace {face.id}:")
-
-                # Récupérer le setup complet avec holds
-                face_setup = stokt.get_face_setup(face.id)
-                print(f"  {len(face_setup.holds)} holds")
-
-                if not args.dry_run:
-                    import_face(mastoc, face_setup, MONTOBOARD_GYM_ID)
-
-                    if use_batch:
-                        created, updated, errors = import_holds_batch(mastoc, face_setup.holds, str(face.id))
-                        print(f"  {created} créés, {updated} existants, {errors} erreurs")
-                        total_holds += created
-                    else:
-                        count = import_holds(mastoc, face_setup.holds, str(face.id))
-                        print(f"  {count} holds importés")
-                        total_holds += count
-
-        print(f"\nTotal: {total_holds} holds importés")
-    else:
-        print("\n[CLIMBS-ONLY] Skip gym/faces/holds")
+        print("API Key configurée")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=120, headers=headers, limits=limits) as client:
+        # Vérifier que mastoc-api est accessible
+        print("\n=== Vérification mastoc-api ===")
+        health = (await client.get(f"{MASTOC_API_URL}/health")).json()
+        print(f"Status: {health['status']}, DB: {health['database']}")
+
+        if args.dry_run:
+            print("\n[DRY RUN] Aucune modification ne sera effectuée")
+
+        progress = ImportProgress(MASTOC_API_URL, restart=args.restart)
+        uploader = Uploader(
+            client=client,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            target_latency=args.target_latency,
+            progress=progress,
+            dry_run=args.dry_run,
+        )
+        started = time.perf_counter()
+
+        if not args.climbs_only:
+            print("\n=== Import Gym et Faces ===")
+            print(f"Gym: {gym_summary.display_name}, {len(faces)} faces")
+            if not args.dry_run:
+                await import_gym(uploader, gym_summary)
+                await asyncio.gather(*(
+                    import_face(uploader, face, MONTOBOARD_GYM_ID) for face in faces
+                ))
+
+            print("\n=== Import Holds ===")
+            await uploader.import_batches("holds", "/api/sync/import/holds/batch", [
+                hold_row(hold, str(face.id)) for face in faces for hold in face.holds
+            ])
+        else:
+            print("\n[CLIMBS-ONLY] Skip gym/faces/holds")
 
-    # 3. Import climbs
-    print("\n=== Import Climbs ===")
+        # Les setters d'abord : les climbs y font référence
+        print(f"\n=== Import Setters et Climbs ({len(climbs)} climbs) ===")
+        await uploader.import_batches("users", "/api/sync/import/users/batch", setter_rows(climbs))
+        await uploader.import_batches(
+            "climbs", "/api/sync/import/climbs/batch", [prepare_climb_data(c) for c in climbs]
+        )
 
-    climbs = None
-    if args.use_cache:
-        climbs = load_from_cache("climbs")
-        if climbs is None:
-            print("  Pas de cache trouvé, récupération depuis Stokt...")
+        uploader.report(time.perf_counter() - started)
 
-    if climbs is None:
-        def progress_callback(current, total):
-            print(f"  Récupération: {current}/{total}", end="\r")
+        # Stats finales
+        print("\n=== Stats finales ===")
+        stats = (await client.get(f"{MASTOC_API_URL}/api/sync/stats")).json()
+        print(f"  Gyms: {stats['gyms']}")
+        print(f"  Faces: {stats['faces']}")
+        print(f"  Holds: {stats['holds']}")
+        print(f"  Climbs: {stats['climbs']}")
+        print(f"  Users: {stats['users']}")
 
-        climbs = stokt.get_all_gym_climbs(MONTOBOARD_GYM_ID, callback=progress_callback)
-        print(f"\n{len(climbs)} climbs récupérés depuis Stokt")
+    print("\n=== Import terminé ===")
 
-        if args.save_cache:
-            save_to_cache("climbs", climbs)
-    else:
-        print(f"{len(climbs)} climbs depuis le cache")
 
-    if not args.dry_run:
-        if use_batch:
-            created, updated, errors = import_climbs_batch(mastoc, climbs, args.batch_size)
-            print(f"\nRésultat: {created} créés, {updated} mis à jour, {errors} erreurs")
-        else:
-            created = 0
-            updated = 0
-            errors = 0
+def main():
+    global MASTOC_API_URL
 
-            for i, climb in enumerate(climbs):
-                try:
-                    status = import_climb(mastoc, climb, str(climb.face_id))
-                    if status == "created":
-                        created += 1
-                    else:
-                        updated += 1
-                except Exception as e:
-                    errors += 1
-                    print(f"  Erreur climb {climb.id}: {e}")
-
-                if (i + 1) % 50 == 0:
-                    print(f"  Progress: {i + 1}/{len(climbs)} (created={created}, updated={updated}, errors={errors})")
-
-            print(f"\nRésultat: {created} créés, {updated} mis à jour, {errors} erreurs")
-
-    # Stats finales
-    print("\n=== Stats finales ===")
-    stats = mastoc.get(f"{MASTOC_API_URL}/api/sync/stats").json()
-    print(f"  Gyms: {stats['gyms']}")
-    print(f"  Faces: {stats['faces']}")
-    print(f"  Holds: {stats['holds']}")
-    print(f"  Climbs: {stats['climbs']}")
-    print(f"  Users: {stats['users']}")
+    parser = argparse.ArgumentParser(description="Import Stokt data to mastoc-api")
+    parser.add_argument("--username", help="Stokt username")
+    parser.add_argument("--password", help="Stokt password")
+    parser.add_argument("--token", help="Stokt token (alternative to username/password)")
+    parser.add_argument("--api-key", help="mastoc-api API Key (if auth enabled)")
+    parser.add_argument("--url", default=MASTOC_API_URL, help=f"mastoc-api URL (default: {MASTOC_API_URL})")
+    parser.add_argument("--dry-run", action="store_true", help="Don't actually import")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Initial batch size, adapted to latency (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Max batches in flight (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--target-latency", type=float, default=DEFAULT_TARGET_LATENCY,
+                        help=f"Target seconds per batch (default: {DEFAULT_TARGET_LATENCY})")
+    parser.add_argument("--use-cache", action="store_true", help="Use cached data instead of fetching from Stokt")
+    parser.add_argument("--save-cache", action="store_true", help="Save fetched data to cache (for future --use-cache)")
+    parser.add_argument("--restart", action="store_true", help="Ignore progress of a previous interrupted run")
+    parser.add_argument("--climbs-only", action="store_true", help="Only import climbs (skip gym/faces/holds)")
+    args = parser.parse_args()
+    MASTOC_API_URL = args.url.rstrip("/")
 
-    print("\n=== Import terminé ===")
+    gym_summary, faces, climbs = load_sources(args, parser)
+    asyncio.run(run(args, gym_summary, faces, climbs))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Reconstruction / vérification des histogrammes de consensus (hold_consensus).
+
+Les histogrammes sont maintenus à chaque écriture d'annotation ; ce script
+les recalcule depuis hold_annotations (après un import ou une correction
+manuelle en base) ou vérifie qu'ils sont cohérents.
+
+Usage:
+    python scripts/rebuild_hold_consensus.py --check
+    python scripts/rebuild_hold_consensus.py
+    python scripts/rebuild_hold_consensus.py --hold-id 12 --hold-id 13
+"""
+
+import argparse
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mastoc_api.database import Base, engine, SessionLocal
+from mastoc_api.models.hold_consensus import rebuild_consensus, check_consensus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or check hold consensus histograms")
+    parser.add_argument("--check", action="store_true", help="Only report inconsistent holds")
+    parser.add_argument("--hold-id", type=int, action="append", help="Limit to these holds")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        mismatches = check_consensus(db, args.hold_id)
+        print(f"{len(mismatches)} prise(s) incohérente(s)")
+        for hold_id in mismatches[:20]:
+            print(f"  hold {hold_id}")
+
+        if args.check:
+            sys.exit(1 if mismatches else 0)
+
+        rows = rebuild_consensus(db, args.hold_id)
+        db.commit()
+        print(f"Reconstruit : {rows} ligne(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Miniatures d'avatars.
+
+Un avatar téléversé (jusqu'à 2 MB) est décodé une seule fois, recadré au
+carré puis réencodé en WebP à quelques tailles fixes (AVATAR_SIZES). Les
+clients l'affichent en 32-64 px : ils demandent la taille voulue
+(?size=) et reçoivent quelques Ko au lieu du fichier d'origine.
+
+Les fichiers d'un utilisateur sont rangés dans AVATAR_DIR/<user_id>/ et
+nommés <version>-<taille>.webp, la version étant dérivée du contenu.
+L'URL publiée (avatar_path) porte cette version (?v=) : une réponse
+demandée avec la version courante ne change jamais et peut être gardée
+indéfiniment par les clients et les proxys.
+"""
+
+import hashlib
+import io
+import os
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Dossier des avatars
+AVATAR_DIR = Path("/tmp/mastoc_avatars")
+
+# Côtés (px) des miniatures générées
+AVATAR_SIZES = (32, 64, 128, 256)
+DEFAULT_AVATAR_SIZE = 128
+
+AVATAR_MEDIA_TYPE = "image/webp"
+AVATAR_QUALITY = 80
+
+# Au-delà, refus (bombe de décompression : 2 MB de PNG peuvent décrire
+# des centaines de mégapixels)
+MAX_SOURCE_PIXELS = 40_000_000
+
+# Avatars d'avant les miniatures : fichier brut <user_id><ext>
+LEGACY_EXTENSIONS = (".jpg", ".png", ".gif")
+
+
+class InvalidAvatar(ValueError):
+    """Image illisible ou trop grande."""
+
+
+def snap_size(size: Optional[int]) -> int:
+    """Plus petite taille générée couvrant `size` (la plus grande sinon)."""
+    if size is None:
+        return DEFAULT_AVATAR_SIZE
+    for candidate in AVATAR_SIZES:
+        if candidate >= size:
+            return candidate
+    return AVATAR_SIZES[-1]
+
+
+def render_thumbnails(content: bytes) -> dict[int, bytes]:
+    """
+    Décode l'image et l'encode en WebP carré à chaque taille.
+
+    Raises:
+        InvalidAvatar: contenu illisible ou image trop grande
+    """
+    try:
+        image = Image.open(io.BytesIO(content))
+        if image.width * image.height > MAX_SOURCE_PIXELS:
+            raise InvalidAvatar("Image trop grande")
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidAvatar("Image illisible") from e
+
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    thumbnails = {}
+    for size in sorted(AVATAR_SIZES, reverse=True):
+        # Réduction en cascade : chaque taille part de la précédente
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=AVATAR_QUALITY, method=4)
+        thumbnails[size] = buffer.getvalue()
+    return thumbnails
+
+
+def _user_dir(user_id: uuid.UUID) -> Path:
+    return AVATAR_DIR / str(user_id)
+
+
+def store_avatar(user_id: uuid.UUID, content: bytes) -> str:
+    """
+    Génère et écrit les miniatures, supprime les précédentes.
+
+    Returns:
+        Version (à publier dans l'URL de l'avatar)
+    """
+    thumbnails = render_thumbnails(content)
+    digest = hashlib.sha256()
+    for size in AVATAR_SIZES:
+        digest.update(thumbnails[size])
+    version = digest.hexdigest()[:16]
+
+    user_dir = _user_dir(user_id)
+    user_dir.mkdir(parents=True, exist_ok=True)
+    for size, data in thumbnails.items():
+        path = user_dir / f"{version}-{size}.webp"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # atomique : jamais de fichier partiel servi
+
+    for path in user_dir.iterdir():
+        if not path.name.startswith(f"{version}-"):
+            path.unlink(missing_ok=True)
+    for ext in LEGACY_EXTENSIONS:
+        (AVATAR_DIR / f"{user_id}{ext}").unlink(missing_ok=True)
+    return version
+
+
+def find_avatar(user_id: uuid.UUID, size: int) -> Optional[tuple[Path, str]]:
+    """
+    Miniature de cette taille (déjà arrondie par snap_size).
+
+    Un avatar brut d'avant les miniatures est converti au passage.
+
+    Returns:
+        (chemin, version), ou None si l'utilisateur n'a pas d'avatar
+    """
+    user_dir = _user_dir(user_id)
+    if user_dir.is_dir():
+        for path in user_dir.glob(f"*-{size}.webp"):
+            return path, path.name.split("-", 1)[0]
+
+    for ext in LEGACY_EXTENSIONS:
+        legacy = AVATAR_DIR / f"{user_id}{ext}"
+        if legacy.exists():
+            try:
+                version = store_avatar(user_id, legacy.read_bytes())
+            except InvalidAvatar:
+                return None
+            return _user_dir(user_id) / f"{version}-{size}.webp", version
+    return None
+
+
+def avatar_url(user_id: uuid.UUID, version: str) -> str:
+    """URL publiée de l'avatar (versionnée)."""
+    return f"/api/users/{user_id}/avatar?v={version}"
@@ -0,0 +1,82 @@
+"""
+Écritures en masse natives (INSERT multi-lignes, ON CONFLICT DO UPDATE).
+
+Les imports par lot écrivent une table en une instruction (par tranche de
+MAX_BIND_PARAMS paramètres) au lieu d'un objet ORM par ligne. Les
+dialectes PostgreSQL (production) et SQLite (tests) partagent la même
+syntaxe ON CONFLICT.
+
+Ces écritures contournent l'ORM : l'appelant journalise les changements
+(record_changes) et invalide les réponses en cache (mark_changed).
+"""
+
+from typing import Any, Iterable
+
+from sqlalchemy import insert as core_insert
+from sqlalchemy.orm import Session
+
+# Limite de paramètres liés par instruction (PostgreSQL : 65535)
+MAX_BIND_PARAMS = 32000
+
+
+def _dialect_insert(db: Session, model):
+    """insert() du dialecte courant (supporte on_conflict_do_update)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert non supporté pour {dialect}")
+    return insert(model)
+
+
+def _chunks(rows: list[dict], size: int) -> Iterable[list[dict]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _chunk_size(rows: list[dict]) -> int:
+    return max(1, MAX_BIND_PARAMS // max(1, len(rows[0])))
+
+
+def upsert(
+    db: Session,
+    model,
+    rows: list[dict[str, Any]],
+    key: str,
+    update_columns: Iterable[str],
+) -> dict[Any, Any]:
+    """
+    INSERT ... ON CONFLICT (key) DO UPDATE, multi-lignes.
+
+    Args:
+        model: Modèle ORM cible (colonne `key` unique)
+        rows: Lignes (mêmes clés pour toutes, `key` unique dans le lot)
+        key: Colonne de conflit (ex: "stokt_id")
+        update_columns: Colonnes mises à jour si la ligne existe
+
+    Returns:
+        {valeur de key: id} pour toutes les lignes, créées ou mises à jour
+    """
+    ids = {}
+    if not rows:
+        return ids
+    update_columns = list(update_columns)
+    key_column = getattr(model, key)
+    for chunk in _chunks(rows, _chunk_size(rows)):
+        stmt = _dialect_insert(db, model).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key],
+            set_={column: stmt.excluded[column] for column in update_columns},
+        ).returning(key_column, model.id)
+        ids.update({row_key: row_id for row_key, row_id in db.execute(stmt)})
+    return ids
+
+
+def insert_rows(db: Session, model, rows: list[dict[str, Any]]) -> None:
+    """INSERT multi-lignes sans conflit attendu (journaux, mappings)."""
+    if not rows:
+        return
+    for chunk in _chunks(rows, _chunk_size(rows)):
+        db.execute(core_insert(model).values(chunk))
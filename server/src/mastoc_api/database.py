@@ -1,23 +1,109 @@
 """
 Configuration de la base de données SQLAlchemy.
+
+Deux piles partagent la même base :
+- synchrone (psycopg2) : scripts, démarrage, routers peu sollicités
+  (auth, users), servis dans le pool de threads de Starlette ;
+- asynchrone (asyncpg, aiosqlite en test) : routers de lecture intensive
+  (climbs, holds, faces, annotations, sync). Une requête en attente de la
+  base ne bloque alors aucun thread : la concurrence n'est plus bornée
+  par la taille du pool de threads mais par celle du pool de connexions.
+
+Le moteur asynchrone est créé au premier usage : importer l'application
+(tests, scripts) n'exige pas le pilote asyncpg.
 """
 
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from mastoc_api.config import get_settings
 
 
+# Pilote asynchrone par dialecte
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """URL de la pile asynchrone (postgresql:// -> postgresql+asyncpg://)."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"Pas de pilote asynchrone pour {parsed.get_backend_name()}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+def pool_options(url: str) -> dict:
+    """Réglages du pool de connexions (PostgreSQL ; SQLite garde ses défauts)."""
+    if make_url(url).get_backend_name() != "postgresql":
+        return {}
+    settings = get_settings()
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
 settings = get_settings()
 
 engine = create_engine(
     settings.database_url,
     echo=settings.debug,
     pool_pre_ping=True,
+    **pool_options(settings.database_url),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Moteur asynchrone (créé au premier appel)."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            async_database_url(settings.database_url),
+            echo=settings.debug,
+            pool_pre_ping=True,
+            **pool_options(settings.database_url),
+        )
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Fabrique de sessions asynchrones (créée au premier appel)."""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        # expire_on_commit=False : un attribut lu après commit ne doit pas
+        # déclencher de requête implicite (impossible hors await)
+        _async_sessionmaker = async_sessionmaker(
+            get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker
+
+
+async def dispose_async_engine():
+    """Ferme le pool asynchrone s'il a été créé."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_sessionmaker = None
+
 
 class Base(DeclarativeBase):
     """Base class pour tous les modèles SQLAlchemy."""
@@ -31,3 +117,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency pour obtenir une session DB asynchrone."""
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -11,11 +11,12 @@ import uuid
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from mastoc_api.config import get_settings
-from mastoc_api.database import get_db
+from mastoc_api.database import get_async_db
 from mastoc_api.models import User
+from mastoc_api.principal_cache import Principal, principal_cache
 from mastoc_api.security import decode_token, TokenData
 
 
@@ -28,12 +29,12 @@ class AuthenticatedUser:
     """
     Utilisateur authentifié.
 
-    Peut être soit un utilisateur DB (via JWT) soit un "service account" (via API Key).
+    Peut être soit un utilisateur (via JWT) soit un "service account" (via API Key).
     """
 
     def __init__(
         self,
-        user: Optional[User] = None,
+        user: Optional[Principal] = None,
         is_api_key: bool = False,
         api_key_value: Optional[str] = None
     ):
@@ -62,7 +63,7 @@ class AuthenticatedUser:
 async def get_current_user_optional(
     api_key: Optional[str] = Depends(api_key_header),
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[AuthenticatedUser]:
     """
     Récupère l'utilisateur courant (optionnel).
@@ -71,6 +72,10 @@ async def get_current_user_optional(
     1. API Key (si présente et valide)
     2. JWT Bearer token (si présent et valide)
     3. None (pas authentifié)
+
+    L'utilisateur est un Principal (instantané immuable, voir
+    principal_cache) : un router qui a besoin de l'objet User le relit
+    dans sa session.
     """
     settings = get_settings()
 
@@ -86,15 +91,51 @@ async def get_current_user_optional(
     # 2. Vérifier JWT
     if token:
         token_data = decode_token(token)
-        if token_data:
-            user = db.query(User).filter(User.id == token_data.user_id).first()
-            if user and user.is_active:
-                return AuthenticatedUser(user=user)
+        if token_data and not principal_cache.is_revoked(token_data.jti):
+            principal = await _resolve_principal(token, token_data, db)
+            if principal and principal.is_active:
+                return AuthenticatedUser(user=principal)
 
     # 3. Pas authentifié
     return None
 
 
+async def _resolve_principal(
+    token: str,
+    token_data: TokenData,
+    db: AsyncSession,
+) -> Optional[Principal]:
+    """
+    Principal d'un token valide : claims (chemin rapide), cache, puis base.
+
+    Le chemin rapide (AUTH_TRUST_TOKEN_CLAIMS) exige un token portant
+    is_active, émis après la dernière invalidation de son utilisateur.
+    """
+    if (
+        get_settings().auth_trust_token_claims
+        and token_data.is_active is not None
+        and principal_cache.trusts(token_data.user_id, token_data.issued_at)
+    ):
+        principal_cache.count_fast_path()
+        return Principal(
+            id=token_data.user_id,
+            email=token_data.email,
+            role=token_data.role,
+            is_active=token_data.is_active,
+        )
+
+    key = token_data.jti or token
+    principal = principal_cache.get(key)
+    if principal is None:
+        generation = principal_cache.generation(token_data.user_id)
+        user = await db.get(User, token_data.user_id)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.put(key, principal, generation)
+    return principal
+
+
 async def get_current_user(
     auth_user: Optional[AuthenticatedUser] = Depends(get_current_user_optional)
 ) -> AuthenticatedUser:
@@ -115,9 +156,9 @@ async def get_current_user(
 
 async def get_current_active_user(
     auth_user: AuthenticatedUser = Depends(get_current_user)
-) -> User:
+) -> Principal:
     """
-    Récupère l'utilisateur DB courant (requis).
+    Récupère l'utilisateur courant (requis).
 
     Ne fonctionne qu'avec JWT (pas API Key).
 
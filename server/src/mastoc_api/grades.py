@@ -0,0 +1,63 @@
+"""
+Cotations : correspondance Fontainebleau -> IRCRA.
+
+Les climbs stockent grade_ircra (indexé) ; les filtres de GET /api/climbs
+acceptent une cotation Font ("6A") ou une valeur IRCRA ("15.5"). Chaque
+cotation Font couvre une plage IRCRA dont on garde la borne inférieure
+(mêmes valeurs que le client, cf. level_slider.FONT_GRADES).
+"""
+
+from typing import Optional
+
+FONT_GRADES = [
+    ("4", 12.0),
+    ("4+", 13.25),
+    ("5", 14.25),
+    ("5+", 15.0),
+    ("6A", 15.5),
+    ("6A+", 16.5),
+    ("6B", 17.5),
+    ("6B+", 18.0),
+    ("6C", 18.5),
+    ("6C+", 19.5),
+    ("7A", 20.5),
+    ("7A+", 21.5),
+    ("7B", 22.5),
+    ("7B+", 23.5),
+    ("7C", 24.5),
+    ("8A", 26.5),
+]
+
+
+def _font_index(grade: str) -> int:
+    normalized = grade.strip().upper()
+    for i, (font, _) in enumerate(FONT_GRADES):
+        if font == normalized:
+            return i
+    raise ValueError(f"Unknown grade: {grade}")
+
+
+def grade_lower_bound(grade: str) -> float:
+    """Borne IRCRA inférieure (incluse) d'une cotation Font ou IRCRA."""
+    try:
+        return float(grade)
+    except ValueError:
+        return FONT_GRADES[_font_index(grade)][1]
+
+
+def grade_upper_bound(grade: str) -> tuple[Optional[float], bool]:
+    """
+    Borne IRCRA supérieure d'une cotation Font ou IRCRA.
+
+    Returns:
+        (borne, incluse) : une valeur IRCRA est incluse ; pour une cotation
+        Font, la borne est le début de la cotation suivante (exclue), None
+        pour la plus haute
+    """
+    try:
+        return float(grade), True
+    except ValueError:
+        index = _font_index(grade)
+    if index + 1 < len(FONT_GRADES):
+        return FONT_GRADES[index + 1][1], False
+    return None, False
@@ -0,0 +1,107 @@
+"""
+Requêtes conditionnelles HTTP (ETag / Last-Modified).
+
+Les endpoints de lecture volumineux (setup d'une face, liste de climbs,
+holds) renvoient un ETag fort calculé sur le corps de la réponse. Un
+client qui renvoie cet ETag dans If-None-Match reçoit un 304 sans corps
+tant que les données n'ont pas changé.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from mastoc_api.wire_format import encode_payload
+
+
+def compute_etag(body: bytes) -> str:
+    """ETag fort (entre guillemets) dérivé du contenu."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def format_http_date(dt: datetime) -> str:
+    """Formate une date (UTC naïve ou aware) au format HTTP."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparaison faible (RFC 9110) entre If-None-Match et l'ETag courant."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> bool:
+    """
+    Indique si la requête conditionnelle peut recevoir un 304.
+
+    If-None-Match est prioritaire ; If-Modified-Since n'est consulté
+    qu'en son absence.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    last_modified: Optional[datetime] = None,
+    media_type: str = "application/json",
+    etag: Optional[str] = None,
+) -> Response:
+    """
+    Construit une réponse avec validateurs, ou un 304 si le client est à jour.
+
+    Cache-Control: no-cache autorise le stockage mais impose la
+    revalidation à chaque usage. `etag` évite de rehacher un corps dont
+    l'ETag est déjà connu.
+    """
+    etag = etag or compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_http_date(last_modified)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def conditional_json(
+    request: Request,
+    payload: BaseModel,
+    last_modified: Optional[datetime] = None,
+) -> Response:
+    """
+    Sérialise un modèle Pydantic (format négocié via Accept) et applique
+    conditional_response. L'ETag dépend de la représentation envoyée.
+    """
+    body, media_type = encode_payload(request, payload.model_dump(mode="json"))
+    return conditional_response(request, body, last_modified, media_type=media_type)
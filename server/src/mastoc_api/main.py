@@ -3,15 +3,18 @@ Application FastAPI principale pour mastoc-api.
 """
 
 from contextlib import asynccontextmanager
-from pathlib import Path
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from mastoc_api.config import get_settings
-from mastoc_api.database import Base, engine
+from mastoc_api.database import Base, engine, SessionLocal, dispose_async_engine
 from mastoc_api.auth import verify_api_key
+from mastoc_api.password_hashing import PasswordHashingBusy, password_hasher
+from mastoc_api.tiles import STATIC_DIR
 from mastoc_api.routers import (
     health_router,
     climbs_router,
@@ -23,7 +26,12 @@ from mastoc_api.routers import (
     hold_annotations_router,
 )
 # Import des modèles pour créer les tables
-from mastoc_api.models import Gym, Face, Hold, Climb, User, IdMapping, HoldAnnotation  # noqa: F401
+from mastoc_api.models import (  # noqa: F401
+    Gym, Face, Hold, Climb, ClimbHold, User, IdMapping, HoldAnnotation, ChangeLog,
+    HoldConsensusVote,
+)
+from mastoc_api.models.climb_hold import ensure_climb_holds_built
+from mastoc_api.models.hold_consensus import ensure_consensus_built
 
 
 settings = get_settings()
@@ -34,8 +42,12 @@ async def lifespan(app: FastAPI):
     """Gestion du cycle de vie de l'application."""
     # Création des tables au démarrage
     Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        ensure_consensus_built(db)
+        ensure_climb_holds_built(db)
     yield
-    # Cleanup (si nécessaire)
+    password_hasher.shutdown()
+    await dispose_async_engine()
 
 
 app = FastAPI(
@@ -60,6 +72,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy(request: Request, exc: PasswordHashingBusy):
+    """File bcrypt pleine : le client réessaie plus tard."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Trop de demandes d'authentification, réessayez."},
+        headers={"Retry-After": "1"},
+    )
+
+# Compression des réponses (brotli si brotli-asgi est installé, sinon gzip)
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    BrotliMiddleware = None
+
+if BrotliMiddleware is not None:
+    # Négocie br, avec repli gzip pour les clients qui ne l'acceptent pas
+    app.add_middleware(BrotliMiddleware, minimum_size=1000, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Inclusion des routers
 # Health : public (pour monitoring)
 app.include_router(health_router)
@@ -79,9 +114,8 @@ app.include_router(sync_router, prefix="/api", dependencies=api_dependencies)
 app.include_router(hold_annotations_router, prefix="/api", dependencies=api_dependencies)
 
 # Montage des fichiers statiques (images des murs)
-static_dir = Path(__file__).parent.parent.parent / "static"
-if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+if STATIC_DIR.exists():
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 
 if __name__ == "__main__":
@@ -9,14 +9,17 @@ from mastoc_api.models.gym import Gym
 from mastoc_api.models.face import Face
 from mastoc_api.models.hold import Hold
 from mastoc_api.models.climb import Climb
+from mastoc_api.models.climb_hold import ClimbHold
 from mastoc_api.models.user import User
 from mastoc_api.models.mapping import IdMapping
+from mastoc_api.models.change_log import ChangeLog, ChangeAction, record_change, record_changes
 from mastoc_api.models.hold_annotation import (
     HoldAnnotation,
     HoldGripType,
     HoldCondition,
     HoldRelativeDifficulty,
 )
+from mastoc_api.models.hold_consensus import HoldConsensusVote
 
 __all__ = [
     "DataSource",
@@ -24,10 +27,16 @@ __all__ = [
     "Face",
     "Hold",
     "Climb",
+    "ClimbHold",
     "User",
     "IdMapping",
+    "ChangeLog",
+    "ChangeAction",
+    "record_change",
+    "record_changes",
     "HoldAnnotation",
     "HoldGripType",
     "HoldCondition",
     "HoldRelativeDifficulty",
+    "HoldConsensusVote",
 ]
@@ -0,0 +1,93 @@
+"""
+Modèle ChangeLog (journal des modifications pour la sync incrémentale).
+
+Chaque création, modification ou suppression d'une entité synchronisable
+ajoute une ligne avec un numéro de séquence monotone. Les clients
+conservent le dernier numéro vu (curseur) et ne récupèrent que les
+changements suivants via /api/sync/changes.
+"""
+
+import uuid
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import Integer, String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from mastoc_api.bulk import insert_rows
+from mastoc_api.database import Base
+
+
+class ChangeAction(str, Enum):
+    """Type de modification."""
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class ChangeLog(Base):
+    """Entrée du journal des modifications."""
+
+    __tablename__ = "change_log"
+
+    seq: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        autoincrement=True,
+        comment="Numéro de séquence monotone (curseur)"
+    )
+    entity_type: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="climb, hold_annotation"
+    )
+    entity_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    action: Mapped[str] = mapped_column(String(20), nullable=False)
+    face_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=True,
+        index=True,
+        comment="Face concernée (pour filtrer le flux par mur)"
+    )
+    changed_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<ChangeLog #{self.seq} {self.action} {self.entity_type}:{self.entity_id}>"
+
+
+def record_change(db, entity_type: str, entity_id, action: ChangeAction, face_id=None) -> None:
+    """
+    Ajoute une entrée au journal dans la transaction courante.
+
+    Doit être appelé avant le commit de la modification elle-même pour que
+    l'entrée et la donnée soient visibles atomiquement.
+    """
+    db.add(ChangeLog(
+        entity_type=entity_type,
+        entity_id=str(entity_id),
+        action=action.value,
+        face_id=face_id,
+    ))
+
+
+def record_changes(db, entity_type: str, changes: list[tuple]) -> None:
+    """
+    Variante en masse de record_change : une seule instruction INSERT.
+
+    Args:
+        changes: Liste de (entity_id, ChangeAction, face_id)
+    """
+    now = datetime.utcnow()
+    insert_rows(db, ChangeLog, [
+        {
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "action": action.value,
+            "face_id": face_id,
+            "changed_at": now,
+        }
+        for entity_id, action, face_id in changes
+    ])
@@ -4,18 +4,23 @@ Modèle Climb (bloc d'escalade).
 
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Float, Boolean, Integer, DateTime, Text, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Float, Boolean, Integer, DateTime, Text, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from sqlalchemy.dialects.postgresql import UUID
 
 from mastoc_api.database import Base
 from mastoc_api.models.base import DataSource
+from mastoc_api.models.climb_hold import ClimbHold, parse_holds_list
 
 
 class Climb(Base):
     """Bloc d'escalade."""
 
     __tablename__ = "climbs"
+    __table_args__ = (
+        # Tri et pagination par curseur de GET /api/climbs
+        Index("ix_climbs_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -43,7 +48,7 @@ class Climb(Base):
     holds_list: Mapped[str] = mapped_column(Text, nullable=False)
     mirror_holds_list: Mapped[str | None] = mapped_column(Text)
     grade_font: Mapped[str | None] = mapped_column(String(10))
-    grade_ircra: Mapped[float | None] = mapped_column(Float)
+    grade_ircra: Mapped[float | None] = mapped_column(Float, index=True)
     feet_rule: Mapped[str | None] = mapped_column(String(100))
     description: Mapped[str | None] = mapped_column(Text)
     is_private: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -100,6 +105,19 @@ class Climb(Base):
     )
     created_by: Mapped["User | None"] = relationship(foreign_keys=[created_by_id])
     updated_by: Mapped["User | None"] = relationship(foreign_keys=[updated_by_id])
+    hold_refs: Mapped[list[ClimbHold]] = relationship(cascade="all, delete-orphan")
+
+    @validates("holds_list")
+    def _sync_hold_refs(self, key: str, holds_list: str) -> str:
+        """Tient climb_holds à jour à chaque affectation de holds_list."""
+        existing = {ref.hold_id: ref for ref in self.hold_refs}
+        refs = []
+        for hold_id, hold_type in parse_holds_list(holds_list).items():
+            ref = existing.get(hold_id) or ClimbHold(hold_id=hold_id)
+            ref.hold_type = hold_type
+            refs.append(ref)
+        self.hold_refs = refs
+        return holds_list
 
     def __repr__(self) -> str:
         return f"<Climb {self.name} ({self.grade_font})>"
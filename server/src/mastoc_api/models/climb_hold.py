@@ -0,0 +1,96 @@
+"""
+Modèle ClimbHold (prises d'un climb, forme normalisée de holds_list).
+
+holds_list reste la source de vérité (format "S829279 O828906 T829009") ;
+cette table en est la projection indexée, maintenue à chaque affectation
+de Climb.holds_list, pour filtrer les climbs par ensemble de prises côté
+serveur. Les identifiants de prises sont ceux écrits dans holds_list
+(identifiants Stokt, comme côté client).
+"""
+
+import re
+import uuid
+from sqlalchemy import Integer, String, ForeignKey, Index, select, delete, insert
+from sqlalchemy.orm import Mapped, mapped_column, Session
+from sqlalchemy.dialects.postgresql import UUID
+
+from mastoc_api.database import Base
+
+HOLD_TOKEN = re.compile(r"([SOFT])(\d+)")
+
+
+class ClimbHold(Base):
+    """Prise utilisée par un climb."""
+
+    __tablename__ = "climb_holds"
+    __table_args__ = (
+        # Recherche des climbs par prise
+        Index("ix_climb_holds_hold_climb", "hold_id", "climb_id"),
+    )
+
+    climb_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("climbs.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    hold_id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        comment="Identifiant de prise tel qu'écrit dans holds_list"
+    )
+    hold_type: Mapped[str] = mapped_column(String(1), nullable=False, comment="S, O, F ou T")
+
+    def __repr__(self) -> str:
+        return f"<ClimbHold {self.climb_id} {self.hold_type}{self.hold_id}>"
+
+
+def parse_holds_list(holds_list: str | None) -> dict[int, str]:
+    """
+    Prises d'un holds_list : {hold_id: type}.
+
+    Accepte espaces ou virgules comme séparateurs ; une prise répétée
+    garde son premier type.
+    """
+    holds = {}
+    for hold_type, hold_id in HOLD_TOKEN.findall(holds_list or ""):
+        holds.setdefault(int(hold_id), hold_type)
+    return holds
+
+
+def rebuild_climb_holds(db: Session) -> int:
+    """
+    Recalcule climb_holds depuis les holds_list de tous les climbs (sans commit).
+
+    Returns:
+        Nombre de lignes écrites
+    """
+    from mastoc_api.models.climb import Climb
+
+    db.execute(delete(ClimbHold))
+    rows = [
+        {"climb_id": climb_id, "hold_id": hold_id, "hold_type": hold_type}
+        for climb_id, holds_list in db.execute(select(Climb.id, Climb.holds_list))
+        for hold_id, hold_type in parse_holds_list(holds_list).items()
+    ]
+    for i in range(0, len(rows), 5000):
+        db.execute(insert(ClimbHold), rows[i:i + 5000])
+    return len(rows)
+
+
+def ensure_climb_holds_built(db: Session) -> bool:
+    """
+    Remplit climb_holds s'il est vide alors que des climbs existent
+    (première mise en service de la table). Commit si rempli.
+
+    Returns:
+        True si une reconstruction a eu lieu
+    """
+    from mastoc_api.models.climb import Climb
+
+    if db.execute(select(ClimbHold.climb_id).limit(1)).first() is not None:
+        return False
+    if db.execute(select(Climb.id).limit(1)).first() is None:
+        return False
+    rebuild_climb_holds(db)
+    db.commit()
+    return True
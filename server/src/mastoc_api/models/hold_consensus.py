@@ -0,0 +1,181 @@
+"""
+Modèle HoldConsensusVote (histogrammes de votes matérialisés).
+
+ADR-008 : le consensus d'une prise est la valeur modale de chaque
+dimension. Plutôt que de le recalculer depuis hold_annotations à chaque
+lecture, on maintient par prise et par dimension le nombre de votes de
+chaque valeur, mis à jour dans la transaction de chaque écriture
+d'annotation. Une lecture ne touche que les quelques lignes de la prise,
+quel que soit le nombre d'annotateurs.
+"""
+
+from typing import Iterable, Optional
+from sqlalchemy import Integer, String, ForeignKey, select, delete, func
+from sqlalchemy.orm import Mapped, mapped_column, Session
+
+from mastoc_api.database import Base
+from mastoc_api.models.hold import Hold
+from mastoc_api.models.hold_annotation import HoldAnnotation
+
+ANNOTATION_DIMENSIONS = ("grip_type", "condition", "difficulty")
+
+# Pseudo-dimension comptant les annotateurs (valeur vide)
+ANNOTATORS = "annotators"
+
+
+class HoldConsensusVote(Base):
+    """Nombre de votes pour une valeur d'une dimension d'une prise."""
+
+    __tablename__ = "hold_consensus"
+
+    hold_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("holds.id"),
+        primary_key=True
+    )
+    dimension: Mapped[str] = mapped_column(
+        String(20),
+        primary_key=True,
+        comment="grip_type, condition, difficulty ou annotators"
+    )
+    value: Mapped[str] = mapped_column(String(50), primary_key=True, default="")
+    votes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<HoldConsensusVote hold={self.hold_id} {self.dimension}={self.value}: {self.votes}>"
+
+
+def annotation_votes(annotation: Optional[HoldAnnotation]) -> dict[tuple[str, str], int]:
+    """Votes portés par une annotation : {(dimension, valeur): 1}."""
+    if annotation is None:
+        return {}
+    votes = {(ANNOTATORS, ""): 1}
+    for dimension in ANNOTATION_DIMENSIONS:
+        value = getattr(annotation, dimension)
+        if value:
+            votes[(dimension, value)] = 1
+    return votes
+
+
+def update_consensus(
+    db: Session,
+    hold_id: int,
+    before: dict[tuple[str, str], int],
+    after: dict[tuple[str, str], int],
+) -> None:
+    """
+    Reporte la modification d'une annotation dans l'histogramme de la prise.
+
+    `before`/`after` sont les votes de l'annotation avant et après
+    l'écriture (cf. annotation_votes). À appeler dans la transaction de
+    l'écriture ; la ligne de la prise est verrouillée (FOR UPDATE) pour
+    sérialiser les écritures concurrentes sur une même prise.
+    """
+    deltas = {key: after.get(key, 0) - before.get(key, 0) for key in before.keys() | after.keys()}
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    db.execute(select(Hold.id).where(Hold.id == hold_id).with_for_update())
+    rows = {
+        (row.dimension, row.value): row
+        for row in db.execute(
+            select(HoldConsensusVote).where(HoldConsensusVote.hold_id == hold_id)
+        ).scalars()
+    }
+    for (dimension, value), delta in deltas.items():
+        row = rows.get((dimension, value))
+        if row is None:
+            row = HoldConsensusVote(hold_id=hold_id, dimension=dimension, value=value, votes=0)
+            db.add(row)
+        row.votes += delta
+        if row.votes <= 0:
+            db.delete(row)
+    db.flush()
+
+
+def _raw_votes(db: Session, hold_ids: Optional[Iterable[int]] = None) -> dict[tuple, int]:
+    """Histogrammes recalculés depuis hold_annotations : {(hold, dim, valeur): votes}."""
+    def scoped(query):
+        return query if hold_ids is None else query.where(HoldAnnotation.hold_id.in_(hold_ids))
+
+    counts = {}
+    query = scoped(select(HoldAnnotation.hold_id, func.count()).group_by(HoldAnnotation.hold_id))
+    for hold_id, votes in db.execute(query).all():
+        counts[(hold_id, ANNOTATORS, "")] = votes
+    for dimension in ANNOTATION_DIMENSIONS:
+        column = getattr(HoldAnnotation, dimension)
+        query = scoped(
+            select(HoldAnnotation.hold_id, column, func.count())
+            .where(column.isnot(None), column != "")
+            .group_by(HoldAnnotation.hold_id, column)
+        )
+        for hold_id, value, votes in db.execute(query).all():
+            counts[(hold_id, dimension, value)] = votes
+    return counts
+
+
+def _stored_votes(db: Session, hold_ids: Optional[Iterable[int]] = None) -> dict[tuple, int]:
+    """Histogrammes matérialisés : {(hold, dim, valeur): votes}."""
+    query = select(HoldConsensusVote)
+    if hold_ids is not None:
+        query = query.where(HoldConsensusVote.hold_id.in_(hold_ids))
+    return {
+        (row.hold_id, row.dimension, row.value): row.votes
+        for row in db.execute(query).scalars()
+    }
+
+
+def rebuild_consensus(db: Session, hold_ids: Optional[list[int]] = None) -> int:
+    """
+    Recalcule les histogrammes depuis les annotations brutes (sans commit).
+
+    Args:
+        hold_ids: Prises à recalculer (None = toutes)
+
+    Returns:
+        Nombre de lignes écrites
+    """
+    query = delete(HoldConsensusVote)
+    if hold_ids is not None:
+        query = query.where(HoldConsensusVote.hold_id.in_(hold_ids))
+    db.execute(query)
+    counts = _raw_votes(db, hold_ids)
+    db.add_all(
+        HoldConsensusVote(hold_id=hold_id, dimension=dimension, value=value, votes=votes)
+        for (hold_id, dimension, value), votes in counts.items()
+    )
+    db.flush()
+    return len(counts)
+
+
+def check_consensus(db: Session, hold_ids: Optional[list[int]] = None) -> list[int]:
+    """
+    Compare les histogrammes matérialisés aux annotations brutes.
+
+    Returns:
+        IDs des prises dont l'histogramme est incohérent (triés)
+    """
+    raw = _raw_votes(db, hold_ids)
+    stored = _stored_votes(db, hold_ids)
+    return sorted({
+        key[0] for key in raw.keys() | stored.keys()
+        if raw.get(key, 0) != stored.get(key, 0)
+    })
+
+
+def ensure_consensus_built(db: Session) -> bool:
+    """
+    Construit les histogrammes s'ils sont vides alors que des annotations
+    existent (première mise en service de la table). Commit si construit.
+
+    Returns:
+        True si une reconstruction a eu lieu
+    """
+    if db.execute(select(HoldConsensusVote.hold_id).limit(1)).first() is not None:
+        return False
+    if db.execute(select(HoldAnnotation.id).limit(1)).first() is None:
+        return False
+    rebuild_consensus(db)
+    db.commit()
+    return True
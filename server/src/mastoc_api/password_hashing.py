@@ -0,0 +1,173 @@
+"""
+Pool dédié et borné pour bcrypt.
+
+Un hash bcrypt coûte des dizaines de millisecondes de CPU. Exécuté dans
+le pool de threads partagé de Starlette, une rafale de connexions
+occupait les threads des autres routes. Les routes d'authentification
+attendent désormais leurs hashs dans un pool à part :
+
+- BCRYPT_WORKERS threads (bcrypt libère le GIL pendant le calcul) ;
+- au plus BCRYPT_MAX_PENDING opérations en cours ou en file : au-delà,
+  PasswordHashingBusy (503 + Retry-After côté route) plutôt qu'une file
+  sans fin ;
+- coût BCRYPT_ROUNDS : un hash d'un autre coût est recalculé à la
+  connexion suivante (needs_rehash).
+
+Métriques (durées de hash, de vérification, attente en file, rejets)
+exposées sur /health/password-hashing.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+import bcrypt
+
+from mastoc_api.config import get_settings
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """File du pool bcrypt pleine."""
+
+
+class _Timings:
+    """Compteur, durée totale et maximale d'une opération."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+def hash_password(password: str, rounds: int) -> str:
+    """Hash bcrypt (synchrone, bloquant)."""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def check_password(password: str, hashed: str) -> bool:
+    """Vérifie un mot de passe contre son hash (synchrone, bloquant)."""
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """Coût d'un hash bcrypt ($2b$12$... -> 12), None si illisible."""
+    parts = hashed.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """Exécute bcrypt dans un pool de threads dédié, à file bornée."""
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+        self._hash = _Timings()
+        self._verify = _Timings()
+        self._wait = _Timings()
+        self.pending = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    @property
+    def rounds(self) -> int:
+        return get_settings().bcrypt_rounds
+
+    def _pool(self) -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+        with self._lock:
+            if self._executor is None:
+                settings = get_settings()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.bcrypt_workers, thread_name_prefix="bcrypt"
+                )
+                self._slots = threading.BoundedSemaphore(settings.bcrypt_max_pending)
+            return self._executor, self._slots
+
+    async def _run(self, timings: _Timings, fn: Callable[..., T], *args) -> T:
+        executor, slots = self._pool()
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashingBusy()
+        with self._lock:
+            self.pending += 1
+        submitted = time.perf_counter()
+
+        def timed() -> T:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._wait.add(started - submitted)
+                    timings.add(time.perf_counter() - started)
+
+        try:
+            return await asyncio.wrap_future(executor.submit(timed))
+        finally:
+            with self._lock:
+                self.pending -= 1
+            slots.release()
+
+    async def hash(self, password: str) -> str:
+        """Hash au coût configuré."""
+        return await self._run(self._hash, hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Vérifie un mot de passe."""
+        return await self._run(self._verify, check_password, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True si le hash n'a pas le coût configuré."""
+        return hash_rounds(hashed) != self.rounds
+
+    async def rehash(self, password: str) -> str:
+        """Nouveau hash (mot de passe vérifié, coût changé)."""
+        hashed = await self.hash(password)
+        with self._lock:
+            self.rehashed += 1
+        return hashed
+
+    def shutdown(self) -> None:
+        """Arrête le pool (recréé à la demande)."""
+        with self._lock:
+            executor, self._executor, self._slots = self._executor, None, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        """Métriques du pool."""
+        settings = get_settings()
+        with self._lock:
+            return {
+                "workers": settings.bcrypt_workers,
+                "max_pending": settings.bcrypt_max_pending,
+                "rounds": settings.bcrypt_rounds,
+                "pending": self.pending,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "hash": self._hash.as_dict(),
+                "verify": self._verify.as_dict(),
+                "queue_wait": self._wait.as_dict(),
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,221 @@
+"""
+Cache des utilisateurs authentifiés (résolution des tokens JWT).
+
+Chaque requête authentifiée décodait son token puis relisait l'utilisateur
+en base avant tout travail du handler. Le principal (instantané immuable
+des colonnes d'autorisation) est gardé quelques secondes, indexé par
+l'identifiant du token (claim jti).
+
+Invalidation :
+- un commit qui modifie is_active, role, email ou password_hash d'un
+  utilisateur (désactivation, changement de mot de passe, reset) ou le
+  supprime incrémente sa génération : les principaux en cache sont
+  périmés, et les tokens émis avant ne peuvent plus servir le chemin
+  rapide ;
+- la déconnexion révoque le jti du token jusqu'à son expiration.
+
+Chemin rapide (AUTH_TRUST_TOKEN_CLAIMS) : les tokens d'accès embarquent
+is_active (claim act) et role. Si l'option est activée, un token émis
+après la dernière invalidation de son utilisateur est résolu sans base ni
+cache. L'état est propre au processus : avec plusieurs workers, une
+désactivation n'est vue des autres qu'au plus tard après le TTL (chemin
+base) ou l'expiration du token (chemin rapide).
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from mastoc_api.config import get_settings
+from mastoc_api.models import User
+from mastoc_api.models.base import UserRole
+
+PRINCIPAL_CACHE_MAX_ENTRIES = 10_000
+
+# Clé de Session.info listant les utilisateurs à invalider au commit
+_INVALIDATED_KEY = "principal_cache_invalidated"
+
+# Colonnes de users dont dépend l'autorisation
+AUTH_USER_COLUMNS = ("is_active", "role", "email", "password_hash")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Utilisateur authentifié (colonnes d'autorisation, sans session)."""
+    id: uuid.UUID
+    email: Optional[str]
+    role: str
+    is_active: bool
+
+    @property
+    def is_admin(self) -> bool:
+        """True si l'utilisateur est admin."""
+        return self.role == UserRole.ADMIN.value
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(id=user.id, email=user.email, role=user.role, is_active=user.is_active)
+
+
+@dataclass
+class _Entry:
+    principal: Principal
+    generation: int
+    stored_at: float
+
+
+class PrincipalCache:
+    """Cache LRU à TTL court des principaux, avec révocations."""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._generations: dict[uuid.UUID, int] = {}
+        self._invalidated_at: dict[uuid.UUID, float] = {}
+        self._revoked: dict[str, float] = {}  # jti -> expiration (epoch)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fast_path = 0
+
+    def generation(self, user_id: uuid.UUID) -> int:
+        """Génération courante d'un utilisateur (à lire avant la base)."""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, key: str) -> Optional[Principal]:
+        """Principal frais pour ce token (compte un hit ou un miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                time.monotonic() - entry.stored_at >= self.ttl
+                or entry.generation != self._generations.get(entry.principal.id, 0)
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.principal
+
+    def put(self, key: str, principal: Principal, generation: int) -> None:
+        """
+        Garde le principal lu en base.
+
+        `generation` est celle lue avant la requête : si l'utilisateur a
+        été invalidé entretemps, l'entrée est ignorée.
+        """
+        with self._lock:
+            if generation != self._generations.get(principal.id, 0):
+                return
+            self._entries[key] = _Entry(principal, generation, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def trusts(self, user_id: uuid.UUID, issued_at: Optional[float]) -> bool:
+        """True si un token émis à `issued_at` peut servir le chemin rapide."""
+        if issued_at is None:
+            return False
+        with self._lock:
+            invalidated_at = self._invalidated_at.get(user_id)
+        # iat est à la seconde : même seconde que l'invalidation = méfiance
+        return invalidated_at is None or issued_at > invalidated_at
+
+    def count_fast_path(self) -> None:
+        with self._lock:
+            self.fast_path += 1
+
+    def invalidate_user(self, *user_ids: uuid.UUID) -> None:
+        """Périme les principaux en cache de ces utilisateurs."""
+        now = time.time()
+        # Au-delà de la durée de vie d'un token d'accès, plus aucun token
+        # émis avant l'invalidation n'est valide
+        horizon = now - get_settings().access_token_expire_minutes * 60
+        with self._lock:
+            for user_id in user_ids:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+                self._invalidated_at[user_id] = now
+            for user_id in [key for key, at in self._invalidated_at.items() if at < horizon]:
+                del self._invalidated_at[user_id]
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Révoque un token jusqu'à son expiration (déconnexion)."""
+        now = time.time()
+        with self._lock:
+            self._entries.pop(jti, None)
+            self._revoked[jti] = expires_at
+            # Purge des révocations de tokens déjà expirés
+            for key in [key for key, expiry in self._revoked.items() if expiry <= now]:
+                del self._revoked[key]
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if jti is None:
+            return False
+        with self._lock:
+            return jti in self._revoked
+
+    def clear(self) -> None:
+        """Vide le cache, les révocations et les compteurs."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._invalidated_at.clear()
+            self._revoked.clear()
+            self.hits = self.misses = self.fast_path = 0
+
+    def stats(self) -> dict:
+        """Métriques du cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "fast_path": self.fast_path,
+                "revoked_tokens": len(self._revoked),
+                "invalidated_users": len(self._invalidated_at),
+            }
+
+
+principal_cache = PrincipalCache(ttl=get_settings().auth_cache_ttl)
+
+
+def _auth_changed(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in AUTH_USER_COLUMNS)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    user_ids = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    user_ids |= {
+        obj.id for obj in session.dirty
+        if isinstance(obj, User) and _auth_changed(obj)
+    }
+    if user_ids:
+        session.info.setdefault(_INVALIDATED_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    user_ids = session.info.pop(_INVALIDATED_KEY, None)
+    if user_ids:
+        principal_cache.invalidate_user(*user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_INVALIDATED_KEY, None)
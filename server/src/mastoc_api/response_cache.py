@@ -0,0 +1,232 @@
+"""
+Cache en mémoire des réponses de lecture fréquentes.
+
+Le setup d'une face, la liste des faces, les holds d'une face et les
+premières pages de climbs sont lus bien plus souvent qu'ils ne changent.
+Leur corps sérialisé (avec son ETag) est gardé en mémoire, indexé par
+route, paramètres, format négocié et version des données dont la réponse
+dépend.
+
+Chaque type d'entité ("climb", "face", "hold", "user") a un numéro de
+version. Chaque flush ORM note dans la session les types qu'il modifie
+(les écritures SQL directes, hors ORM, appellent mark_changed) ; les
+versions sont incrémentées après le commit, ce qui rend inaccessibles les
+réponses construites avant lui. Aucune invalidation par motif n'est
+nécessaire : les entrées périmées sortent par l'éviction LRU (taille
+bornée en octets) ou par le TTL, filet de sécurité pour les écritures
+faites par un autre processus (scripts).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from mastoc_api.http_cache import compute_etag, conditional_response
+from mastoc_api.wire_format import encode_payload, wants_columnar
+
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+RESPONSE_CACHE_TTL = 300  # secondes
+
+# Clé de Session.info listant les types d'entités modifiés
+_CHANGED_KEY = "response_cache_changed"
+
+# Tables suivies -> type d'entité
+TRACKED_TABLES = {"climbs": "climb", "faces": "face", "holds": "hold", "users": "user"}
+
+# Seules ces colonnes de users apparaissent dans les réponses en cache
+# (une connexion, qui met à jour last_login, n'invalide rien)
+TRACKED_USER_COLUMNS = ("full_name",)
+
+
+@dataclass
+class CachedResponse:
+    """Corps sérialisé d'une réponse et ses validateurs."""
+    body: bytes
+    media_type: str
+    etag: str
+    last_modified: Optional[datetime]
+    stored_at: float
+
+
+class ResponseCache:
+    """Cache LRU borné en octets, versionné par type d'entité."""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def versions(self, entities: tuple[str, ...]) -> tuple[int, ...]:
+        """Versions courantes des types d'entités donnés."""
+        with self._lock:
+            return tuple(self._versions.get(entity, 0) for entity in entities)
+
+    def bump(self, *entities: str) -> None:
+        """Invalide les réponses dépendant de ces types d'entités."""
+        with self._lock:
+            for entity in entities:
+                self._versions[entity] = self._versions.get(entity, 0) + 1
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        """Entrée fraîche pour la clé (compte un hit ou un miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.stored_at >= self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, entry: CachedResponse) -> None:
+        """Ajoute une entrée et évince les moins récemment utilisées."""
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: tuple) -> None:
+        self._size -= len(self._entries.pop(key).body)
+
+    def clear(self) -> None:
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Métriques du cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "versions": dict(self._versions),
+            }
+
+
+response_cache = ResponseCache()
+
+
+def mark_changed(db: Session, *entities: str) -> None:
+    """
+    Signale que la transaction courante modifie ces types d'entités.
+
+    Appelé automatiquement à chaque flush ORM ; à appeler explicitement
+    après une écriture SQL directe (insert/update en masse). Les versions
+    sont incrémentées au commit (rien en cas de rollback).
+    """
+    db.info.setdefault(_CHANGED_KEY, set()).update(entities)
+
+
+def _changed_entity(obj, created: bool = False) -> Optional[str]:
+    """Type d'entité suivi modifié par l'écriture de `obj` (None sinon)."""
+    entity = TRACKED_TABLES.get(getattr(type(obj), "__tablename__", None))
+    if entity != "user":
+        return entity
+    if created:
+        # Un nouvel utilisateur n'apparaît dans aucune réponse existante
+        return None
+    state = inspect(obj)
+    if any(state.attrs[column].history.has_changes() for column in TRACKED_USER_COLUMNS):
+        return entity
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    changed = {_changed_entity(obj, created=True) for obj in session.new}
+    changed |= {_changed_entity(obj) for obj in session.deleted}
+    changed |= {
+        _changed_entity(obj) for obj in session.dirty
+        if session.is_modified(obj, include_collections=False)
+    }
+    changed.discard(None)
+    if changed:
+        mark_changed(session, *changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        response_cache.bump(*changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
+
+async def cached_json(
+    request: Request,
+    depends_on: tuple[str, ...],
+    build: Callable[[], Awaitable[tuple[Any, Optional[datetime]]]],
+) -> Response:
+    """
+    Réponse JSON servie depuis le cache, ou construite puis mise en cache.
+
+    Args:
+        depends_on: Types d'entités dont dépend la réponse
+        build: Coroutine construisant (modèle Pydantic ou données
+            JSON-compatibles, last_modified) ; une HTTPException levée
+            n'est pas mise en cache
+
+    Les requêtes conditionnelles (If-None-Match) sont traitées comme par
+    conditional_json, sans toucher la base sur un hit.
+    """
+    key = (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        wants_columnar(request),
+        depends_on,
+        response_cache.versions(depends_on),
+    )
+    entry = response_cache.get(key)
+    if entry is None:
+        data, last_modified = await build()
+        if isinstance(data, BaseModel):
+            data = data.model_dump(mode="json")
+        body, media_type = encode_payload(request, data)
+        entry = CachedResponse(
+            body=body,
+            media_type=media_type,
+            etag=compute_etag(body),
+            last_modified=last_modified,
+            stored_at=time.monotonic(),
+        )
+        response_cache.put(key, entry)
+
+    return conditional_response(
+        request, entry.body, entry.last_modified, media_type=entry.media_type, etag=entry.etag
+    )
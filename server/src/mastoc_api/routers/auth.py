@@ -5,6 +5,7 @@ Routes publiques (pas de token requis) :
 - POST /auth/register - Créer un compte
 - POST /auth/login - Se connecter (obtenir JWT)
 - POST /auth/refresh - Renouveler le token
+- POST /auth/logout - Se déconnecter (révoque l'access token fourni)
 - POST /auth/reset-password - Demander reset
 - POST /auth/reset-password/confirm - Confirmer reset
 """
@@ -16,22 +17,25 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, select
 
-from mastoc_api.database import get_db
+from mastoc_api.database import get_async_db, get_db
+from mastoc_api.dependencies import oauth2_scheme
 from mastoc_api.models import User
 from mastoc_api.models.base import UserRole, DataSource
+from mastoc_api.password_hashing import password_hasher
 from mastoc_api.security import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     create_refresh_token,
     decode_refresh_token,
+    decode_token,
     generate_reset_token,
     Token,
 )
 from mastoc_api.config import get_settings
+from mastoc_api.principal_cache import principal_cache
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -89,7 +93,7 @@ class MessageResponse(BaseModel):
 # --- Endpoints ---
 
 @router.post("/register", response_model=RegisterResponse, status_code=201)
-def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Créer un nouveau compte utilisateur mastoc.
 
@@ -97,7 +101,7 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
     - Mot de passe minimum 8 caractères
     """
     # Vérifier email unique
-    existing = db.query(User).filter(User.email == request.email).first()
+    existing = await db.scalar(select(User).where(User.email == request.email))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -105,7 +109,7 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
         )
 
     # Vérifier username unique
-    existing = db.query(User).filter(User.username == request.username).first()
+    existing = await db.scalar(select(User).where(User.username == request.username))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -117,15 +121,14 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
         email=request.email,
         username=request.username,
         full_name=request.full_name,
-        password_hash=get_password_hash(request.password),
+        password_hash=await password_hasher.hash(request.password),
         source=DataSource.MASTOC.value,
         role=UserRole.USER.value,
         is_active=True,
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
 
     return RegisterResponse(
         id=user.id,
@@ -136,23 +139,24 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authentification par email/username + mot de passe.
 
     Retourne un access token et un refresh token.
     Le username peut être l'email ou le username.
+    Un hash d'un autre coût que BCRYPT_ROUNDS est recalculé au passage.
     """
     # Chercher par email ou username
-    user = db.query(User).filter(
+    user = await db.scalar(select(User).where(
         or_(
             User.email == form_data.username,
             User.username == form_data.username
         )
-    ).first()
+    ).limit(1))
 
     if not user:
         raise HTTPException(
@@ -170,7 +174,7 @@ def login(
         )
 
     # Vérifier le mot de passe
-    if not verify_password(form_data.password, user.password_hash):
+    if not await password_hasher.verify(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email/username ou mot de passe incorrect",
@@ -184,9 +188,13 @@ def login(
             detail="Compte désactivé",
         )
 
+    # Coût bcrypt changé : nouveau hash, le mot de passe étant connu
+    if password_hasher.needs_rehash(user.password_hash):
+        user.password_hash = await password_hasher.rehash(form_data.password)
+
     # Mettre à jour last_login
     user.last_login_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
 
     # Créer les tokens
     settings = get_settings()
@@ -194,6 +202,7 @@ def login(
         user_id=user.id,
         email=user.email,
         role=user.role,
+        is_active=user.is_active,
     )
     refresh_token = create_refresh_token(user_id=user.id)
 
@@ -240,6 +249,7 @@ def refresh_token(request: RefreshRequest, db: Session = Depends(get_db)):
         user_id=user.id,
         email=user.email,
         role=user.role,
+        is_active=user.is_active,
     )
     new_refresh_token = create_refresh_token(user_id=user.id)
 
@@ -252,13 +262,17 @@ def refresh_token(request: RefreshRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/logout", response_model=MessageResponse)
-def logout():
+def logout(token: Optional[str] = Depends(oauth2_scheme)):
     """
     Déconnexion.
 
-    Avec JWT stateless, la déconnexion se fait côté client en supprimant le token.
-    Cet endpoint existe pour la cohérence de l'API.
+    Le client supprime ses tokens. Si l'access token est fourni, il est
+    révoqué (et retiré du cache des utilisateurs authentifiés) jusqu'à
+    son expiration, dans ce processus.
     """
+    token_data = decode_token(token) if token else None
+    if token_data and token_data.jti and token_data.expires_at:
+        principal_cache.revoke(token_data.jti, token_data.expires_at)
     return MessageResponse(message="Déconnecté")
 
 
@@ -296,11 +310,14 @@ def request_reset_password(request: ResetPasswordRequest, db: Session = Depends(
 
 
 @router.post("/reset-password/confirm", response_model=MessageResponse)
-def confirm_reset_password(request: ResetPasswordConfirm, db: Session = Depends(get_db)):
+async def confirm_reset_password(
+    request: ResetPasswordConfirm,
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Confirmer le reset de mot de passe avec le token.
     """
-    user = db.query(User).filter(User.reset_token == request.token).first()
+    user = await db.scalar(select(User).where(User.reset_token == request.token))
 
     if not user:
         raise HTTPException(
@@ -315,10 +332,10 @@ def confirm_reset_password(request: ResetPasswordConfirm, db: Session = Depends(
         )
 
     # Mettre à jour le mot de passe
-    user.password_hash = get_password_hash(request.new_password)
+    user.password_hash = await password_hasher.hash(request.new_password)
     user.reset_token = None
     user.reset_token_expires = None
     user.updated_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
 
     return MessageResponse(message="Mot de passe mis à jour")
@@ -2,17 +2,28 @@
 Endpoints pour les climbs (blocs).
 """
 
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from mastoc_api.database import get_db
-from mastoc_api.models import Climb, Face, User
+from mastoc_api.database import get_async_db
+from mastoc_api.models import (
+    Climb, ClimbHold, Face, User, ChangeLog, ChangeAction, record_change,
+)
+from mastoc_api.grades import grade_lower_bound, grade_upper_bound
 from mastoc_api.dependencies import get_current_user_optional, AuthenticatedUser
+from mastoc_api.http_cache import conditional_json
+from mastoc_api.response_cache import cached_json
 
 router = APIRouter(prefix="/climbs", tags=["climbs"])
 
@@ -35,6 +46,16 @@ class ClimbCreate(ClimbBase):
     face_id: UUID
 
 
+class ClimbBatchItem(ClimbCreate):
+    """Climb d'un lot de créations."""
+    client_ref: Optional[str] = None  # identifiant local côté client
+
+
+class ClimbBatchCreate(BaseModel):
+    """Lot de créations (file d'attente hors-ligne du client)."""
+    climbs: list[ClimbBatchItem]
+
+
 class ClimbUpdate(BaseModel):
     """Mise à jour d'un climb."""
     name: Optional[str] = None
@@ -67,18 +88,152 @@ class ClimbResponse(ClimbBase):
         from_attributes = True
 
 
+class ClimbBatchResult(BaseModel):
+    """Résultat d'une création du lot."""
+    client_ref: Optional[str] = None
+    climb: Optional[ClimbResponse] = None
+    error: Optional[str] = None
+
+
+class ClimbBatchResponse(BaseModel):
+    """Résultats d'un lot de créations, dans l'ordre de la requête."""
+    results: list[ClimbBatchResult]
+
+
 class ClimbsListResponse(BaseModel):
     """Liste paginée de climbs."""
     results: list[ClimbResponse]
-    count: int
+    count: Optional[int] = None  # None si with_count=false
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # à passer en `after` pour la page suivante
+
+
+def climb_to_response(climb: Climb) -> ClimbResponse:
+    """Construit la réponse API d'un climb."""
+    return ClimbResponse(
+        id=climb.id,
+        stokt_id=climb.stokt_id,
+        face_id=climb.face_id,
+        setter_id=climb.setter_id,
+        setter_name=climb.setter.full_name if climb.setter else None,
+        name=climb.name,
+        holds_list=climb.holds_list,
+        grade_font=climb.grade_font,
+        grade_ircra=climb.grade_ircra,
+        feet_rule=climb.feet_rule,
+        description=climb.description,
+        is_private=climb.is_private,
+        climbed_by=climb.climbed_by,
+        total_likes=climb.total_likes,
+        source=climb.source,
+        personal_notes=climb.personal_notes,
+        is_project=climb.is_project,
+        created_at=climb.created_at,
+        updated_at=climb.updated_at,
+        synced_at=climb.synced_at,
+    )
+
+
+# --- Pagination ---
+
+# Pages (sans curseur) dont la réponse est gardée dans response_cache
+CACHED_PAGES = 3
+
+COUNT_CACHE_SIZE = 256
+COUNT_CACHE_TTL = 300  # secondes ; filet de sécurité pour les écritures hors API
+
+_count_cache: OrderedDict[tuple, tuple[float, int]] = OrderedDict()
+_count_cache_lock = threading.Lock()
+
+
+async def _cached_count(db: AsyncSession, query, signature: tuple) -> int:
+    """
+    Nombre total de climbs d'un filtre, mis en cache par signature.
+
+    La clé inclut le dernier numéro du journal des modifications : toute
+    création, modification ou suppression de climb invalide les comptes.
+    """
+    last_seq = (await db.execute(select(func.max(ChangeLog.seq)))).scalar()
+    key = (signature, last_seq)
+    now = time.monotonic()
+    with _count_cache_lock:
+        entry = _count_cache.get(key)
+        if entry is not None and now - entry[0] < COUNT_CACHE_TTL:
+            _count_cache.move_to_end(key)
+            return entry[1]
+
+    total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar() or 0
+    with _count_cache_lock:
+        _count_cache[key] = (now, total)
+        _count_cache.move_to_end(key)
+        while len(_count_cache) > COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return total
+
+
+def clear_count_cache() -> None:
+    """Vide le cache des comptes (tests, restauration de base)."""
+    with _count_cache_lock:
+        _count_cache.clear()
+
+
+# Clés de tri (mêmes noms que ClimbFilter.sort_by côté client)
+SORT_KEYS = {
+    "date_created": Climb.created_at,
+    "grade": func.coalesce(Climb.grade_ircra, 0.0),
+    "name": Climb.name,
+    "climbed_by": Climb.climbed_by,
+    "likes": Climb.total_likes,
+}
+
+
+def _sort_value(climb: Climb, sort_by: str):
+    """Valeur de la clé de tri d'un climb (sérialisable en JSON)."""
+    if sort_by == "date_created":
+        return climb.created_at.isoformat()
+    if sort_by == "grade":
+        return climb.grade_ircra or 0.0
+    if sort_by == "name":
+        return climb.name
+    if sort_by == "climbed_by":
+        return climb.climbed_by
+    return climb.total_likes
+
+
+def encode_cursor(climb: Climb, sort_by: str = "date_created") -> str:
+    """Curseur opaque (clé de tri, id) du dernier climb d'une page."""
+    raw = json.dumps([sort_by, _sort_value(climb, sort_by), str(climb.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str = "date_created") -> tuple:
+    """Décode un curseur (valeur de tri, id) ; ValueError s'il est invalide."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_sort, value, climb_id = json.loads(raw)
+        if cursor_sort != sort_by:
+            raise ValueError("cursor sort mismatch")
+        if sort_by == "date_created":
+            value = datetime.fromisoformat(value)
+        return value, UUID(climb_id)
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _parse_hold_ids(holds: str) -> list[int]:
+    """Liste d'identifiants de prises "829279,829528" ; ValueError si invalide."""
+    try:
+        return sorted({int(h) for h in holds.replace(" ", ",").split(",") if h})
+    except ValueError as e:
+        raise ValueError(f"Invalid holds: {holds}") from e
 
 
 # --- Endpoints ---
 
 @router.get("", response_model=ClimbsListResponse)
-def list_climbs(
+async def list_climbs(
+    request: Request,
     face_id: Optional[UUID] = None,
     grade_min: Optional[str] = None,
     grade_max: Optional[str] = None,
@@ -88,82 +243,142 @@ def list_climbs(
     since_created_at: Optional[datetime] = None,
     since_synced_at: Optional[datetime] = None,
     local_only: bool = Query(False, description="Uniquement les climbs créés localement (sans stokt_id)"),
+    holds: Optional[str] = Query(
+        None, description="Identifiants de prises (séparés par des virgules), comme dans holds_list"
+    ),
+    hold_match: Literal["all", "any"] = Query(
+        "all", description="all = toutes les prises, any = au moins une"
+    ),
+    sort_by: Literal["date_created", "grade", "name", "climbed_by", "likes"] = "date_created",
+    sort_desc: bool = False,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=500),
-    db: Session = Depends(get_db),
+    after: Optional[str] = Query(None, description="Curseur next_cursor de la page précédente"),
+    with_count: bool = Query(True, description="Calculer le nombre total de résultats"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Liste les climbs avec filtres.
+    """Liste les climbs avec filtres, triés par (sort_by, id).
+
+    Supporte If-None-Match : une page inchangée renvoie 304.
+
+    grade_min / grade_max acceptent une cotation Font ("6A", plage entière
+    incluse) ou une valeur IRCRA ("15.5"). Le filtre par prises s'appuie
+    sur la table climb_holds.
+
+    Deux modes de pagination : par numéro de page (offset) ou par curseur
+    (`after` = next_cursor de la page précédente, coût constant quelle que
+    soit la profondeur ; `page` est alors ignoré). Le nombre total est mis
+    en cache par filtre et peut être omis (with_count=false).
+
+    Les CACHED_PAGES premières pages sont servies depuis response_cache
+    jusqu'à la prochaine écriture de climb.
 
     Args:
         since_created_at: Retourne uniquement les climbs créés après cette date
         since_synced_at: Retourne uniquement les climbs synchronisés après cette date
         local_only: Si True, retourne uniquement les climbs avec stokt_id=NULL
     """
-    query = select(Climb)
-
-    if face_id:
-        query = query.where(Climb.face_id == face_id)
-    if setter_id:
-        query = query.where(Climb.setter_id == setter_id)
-    if source:
-        query = query.where(Climb.source == source)
-    if search:
-        query = query.where(Climb.name.ilike(f"%{search}%"))
-    if since_created_at:
-        query = query.where(Climb.created_at >= since_created_at)
-    if since_synced_at:
-        query = query.where(Climb.synced_at >= since_synced_at)
-    if local_only:
-        query = query.where(Climb.stokt_id.is_(None))
-
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = db.execute(count_query).scalar() or 0
-
-    # Pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-
-    climbs = db.execute(query).scalars().all()
+    async def build():
+        query = select(Climb)
+
+        if face_id:
+            query = query.where(Climb.face_id == face_id)
+        if setter_id:
+            query = query.where(Climb.setter_id == setter_id)
+        if source:
+            query = query.where(Climb.source == source)
+        if search:
+            query = query.where(Climb.name.ilike(f"%{search}%"))
+        if since_created_at:
+            query = query.where(Climb.created_at >= since_created_at)
+        if since_synced_at:
+            query = query.where(Climb.synced_at >= since_synced_at)
+        if local_only:
+            query = query.where(Climb.stokt_id.is_(None))
+        try:
+            if grade_min:
+                query = query.where(Climb.grade_ircra >= grade_lower_bound(grade_min))
+            if grade_max:
+                upper, inclusive = grade_upper_bound(grade_max)
+                if upper is not None:
+                    query = query.where(
+                        Climb.grade_ircra <= upper if inclusive else Climb.grade_ircra < upper
+                    )
+                else:
+                    query = query.where(Climb.grade_ircra.isnot(None))
+            hold_ids = _parse_hold_ids(holds) if holds else []
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if hold_ids:
+            matching = select(ClimbHold.climb_id).where(ClimbHold.hold_id.in_(hold_ids))
+            if hold_match == "all":
+                matching = matching.group_by(ClimbHold.climb_id).having(
+                    func.count(ClimbHold.hold_id) == len(hold_ids)
+                )
+            query = query.where(Climb.id.in_(matching))
+
+        total = None
+        if with_count:
+            signature = (
+                face_id, setter_id, source, search, since_created_at, since_synced_at,
+                local_only, grade_min, grade_max, tuple(hold_ids), hold_match,
+            )
+            total = await _cached_count(db, query, signature)
 
-    results = []
-    for climb in climbs:
-        resp = ClimbResponse(
-            id=climb.id,
-            stokt_id=climb.stokt_id,
-            face_id=climb.face_id,
-            setter_id=climb.setter_id,
-            setter_name=climb.setter.full_name if climb.setter else None,
-            name=climb.name,
-            holds_list=climb.holds_list,
-            grade_font=climb.grade_font,
-            grade_ircra=climb.grade_ircra,
-            feet_rule=climb.feet_rule,
-            description=climb.description,
-            is_private=climb.is_private,
-            climbed_by=climb.climbed_by,
-            total_likes=climb.total_likes,
-            source=climb.source,
-            personal_notes=climb.personal_notes,
-            is_project=climb.is_project,
-            created_at=climb.created_at,
-            updated_at=climb.updated_at,
-            synced_at=climb.synced_at,
+        # Tri et pagination
+        sort_key = SORT_KEYS[sort_by]
+        if after:
+            try:
+                cursor_value, cursor_id = decode_cursor(after, sort_by)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            position = tuple_(sort_key, Climb.id)
+            cursor = tuple_(cursor_value, cursor_id)
+            query = query.where(position < cursor if sort_desc else position > cursor)
+        else:
+            query = query.offset((page - 1) * page_size)
+        order = (sort_key.desc(), Climb.id.desc()) if sort_desc else (sort_key, Climb.id)
+        query = (
+            query.order_by(*order)
+            .limit(page_size)
+            .options(joinedload(Climb.setter))
         )
-        results.append(resp)
 
-    return ClimbsListResponse(
-        results=results,
-        count=total,
-        page=page,
-        page_size=page_size,
+        climbs = (await db.execute(query)).scalars().all()
+        results = [climb_to_response(climb) for climb in climbs]
+        next_cursor = encode_cursor(climbs[-1], sort_by) if len(climbs) == page_size else None
+
+        last_modified = max(
+            (c.updated_at or c.created_at for c in climbs if c.updated_at or c.created_at),
+            default=None,
+        )
+        payload = ClimbsListResponse(
+            results=results,
+            count=total,
+            page=page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+        )
+        return payload, last_modified
+
+    # Premières pages : servies depuis le cache jusqu'à la prochaine
+    # écriture de climb (ou de nom d'ouvreur)
+    if after is None and page <= CACHED_PAGES:
+        return await cached_json(request, ("climb", "user"), build)
+    return conditional_json(request, *(await build()))
+
+
+async def _load_climb(db: AsyncSession, climb_id: UUID) -> Optional[Climb]:
+    """Climb par ID avec son ouvreur (relu depuis la base), None s'il n'existe pas."""
+    return await db.get(
+        Climb, climb_id, options=[joinedload(Climb.setter)], populate_existing=True
     )
 
 
 @router.get("/{climb_id}", response_model=ClimbResponse)
-def get_climb(climb_id: UUID, db: Session = Depends(get_db)):
+async def get_climb(climb_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Récupère un climb par ID."""
-    climb = db.get(Climb, climb_id)
+    climb = await _load_climb(db, climb_id)
     if not climb:
         raise HTTPException(status_code=404, detail="Climb not found")
 
@@ -192,10 +407,10 @@ def get_climb(climb_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/by-stokt-id/{stokt_id}", response_model=ClimbResponse)
-def get_climb_by_stokt_id(stokt_id: UUID, db: Session = Depends(get_db)):
+async def get_climb_by_stokt_id(stokt_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Récupère un climb par son ID Stokt."""
-    query = select(Climb).where(Climb.stokt_id == stokt_id)
-    climb = db.execute(query).scalar_one_or_none()
+    query = select(Climb).where(Climb.stokt_id == stokt_id).options(joinedload(Climb.setter))
+    climb = (await db.execute(query)).scalar_one_or_none()
     if not climb:
         raise HTTPException(status_code=404, detail="Climb not found")
 
@@ -224,39 +439,20 @@ def get_climb_by_stokt_id(stokt_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.post("", response_model=ClimbResponse, status_code=201)
-def create_climb(
+async def create_climb(
     climb_data: ClimbCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     auth_user: Optional[AuthenticatedUser] = Depends(get_current_user_optional),
 ):
     """Crée un nouveau climb."""
     # Vérifier que la face existe
-    face = db.get(Face, climb_data.face_id)
+    face = await db.get(Face, climb_data.face_id)
     if not face:
         raise HTTPException(status_code=404, detail="Face not found")
 
-    # Traçabilité : qui a créé ce climb
-    created_by_id = None
-    if auth_user and auth_user.user:
-        created_by_id = auth_user.user.id
-
-    climb = Climb(
-        face_id=climb_data.face_id,
-        name=climb_data.name,
-        holds_list=climb_data.holds_list,
-        grade_font=climb_data.grade_font,
-        grade_ircra=climb_data.grade_ircra,
-        feet_rule=climb_data.feet_rule,
-        description=climb_data.description,
-        is_private=climb_data.is_private,
-        source="mastoc",
-        stokt_id=None,  # Pas encore sync
-        created_by_id=created_by_id,
-    )
-
-    db.add(climb)
-    db.commit()
-    db.refresh(climb)
+    climb = await _new_climb(db, climb_data, auth_user)
+    await db.commit()
+    await db.refresh(climb)
 
     return ClimbResponse(
         id=climb.id,
@@ -282,19 +478,104 @@ def create_climb(
     )
 
 
+@router.post("/batch", response_model=ClimbBatchResponse)
+async def create_climbs_batch(
+    data: ClimbBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    auth_user: Optional[AuthenticatedUser] = Depends(get_current_user_optional),
+):
+    """
+    Crée plusieurs climbs en une transaction.
+
+    Utilisé par la file d'attente hors-ligne du client : chaque résultat
+    reprend le client_ref de la requête. Une face inexistante est signalée
+    dans le résultat sans bloquer le reste du lot.
+    """
+    if len(data.climbs) > 500:
+        raise HTTPException(status_code=400, detail="Maximum 500 climbs par requête")
+
+    face_ids = {item.face_id for item in data.climbs}
+    existing = set(
+        (await db.execute(select(Face.id).where(Face.id.in_(face_ids)))).scalars().all()
+    ) if face_ids else set()
+
+    created = []
+    for item in data.climbs:
+        if item.face_id not in existing:
+            created.append((item.client_ref, None))
+            continue
+        created.append((item.client_ref, (await _new_climb(db, item, auth_user)).id))
+    await db.commit()
+
+    # Relecture des climbs créés (valeurs par défaut de la base) en une requête
+    climb_ids = [climb_id for _, climb_id in created if climb_id is not None]
+    climbs = {
+        climb.id: climb
+        for climb in (await db.execute(
+            select(Climb).where(Climb.id.in_(climb_ids))
+            .options(joinedload(Climb.setter))
+            .execution_options(populate_existing=True)
+        )).scalars().all()
+    } if climb_ids else {}
+
+    results = []
+    for client_ref, climb_id in created:
+        if climb_id is None:
+            results.append(ClimbBatchResult(client_ref=client_ref, error="Face not found"))
+        else:
+            climb = climbs[climb_id]
+            results.append(ClimbBatchResult(client_ref=client_ref, climb=climb_to_response(climb)))
+    return ClimbBatchResponse(results=results)
+
+
+async def _new_climb(
+    db: AsyncSession,
+    climb_data: ClimbCreate,
+    auth_user: Optional[AuthenticatedUser],
+) -> Climb:
+    """Ajoute un climb créé par l'app et trace le changement (sans commit)."""
+    # Traçabilité : qui a créé ce climb
+    created_by_id = None
+    if auth_user and auth_user.user:
+        created_by_id = auth_user.user.id
+
+    climb = Climb(
+        face_id=climb_data.face_id,
+        name=climb_data.name,
+        holds_list=climb_data.holds_list,
+        grade_font=climb_data.grade_font,
+        grade_ircra=climb_data.grade_ircra,
+        feet_rule=climb_data.feet_rule,
+        description=climb_data.description,
+        is_private=climb_data.is_private,
+        source="mastoc",
+        stokt_id=None,  # Pas encore sync
+        created_by_id=created_by_id,
+    )
+
+    db.add(climb)
+    await db.flush()
+    record_change(db, "climb", climb.id, ChangeAction.CREATE, face_id=climb.face_id)
+    return climb
+
+
 @router.patch("/{climb_id}", response_model=ClimbResponse)
-def update_climb(
+async def update_climb(
     climb_id: UUID,
     climb_data: ClimbUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     auth_user: Optional[AuthenticatedUser] = Depends(get_current_user_optional),
 ):
     """Met à jour un climb."""
-    climb = db.get(Climb, climb_id)
+    climb = await _load_climb(db, climb_id)
     if not climb:
         raise HTTPException(status_code=404, detail="Climb not found")
 
     update_data = climb_data.model_dump(exclude_unset=True)
+    if "holds_list" in update_data:
+        # Le validateur de holds_list lit hold_refs : à charger avant (hors await,
+        # un chargement paresseux est impossible)
+        await db.refresh(climb, ["hold_refs"])
     for field, value in update_data.items():
         setattr(climb, field, value)
 
@@ -302,9 +583,10 @@ def update_climb(
     if auth_user and auth_user.user:
         climb.updated_by_id = auth_user.user.id
     climb.updated_at = datetime.utcnow()
+    record_change(db, "climb", climb.id, ChangeAction.UPDATE, face_id=climb.face_id)
 
-    db.commit()
-    db.refresh(climb)
+    await db.commit()
+    climb = await _load_climb(db, climb_id)
 
     return ClimbResponse(
         id=climb.id,
@@ -331,9 +613,9 @@ def update_climb(
 
 
 @router.delete("/{climb_id}", status_code=204)
-def delete_climb(
+async def delete_climb(
     climb_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     auth_user: Optional[AuthenticatedUser] = Depends(get_current_user_optional),
 ):
     """
@@ -343,7 +625,7 @@ def delete_climb(
     - API Key : peut tout supprimer
     - JWT : peut supprimer ses propres climbs (created_by_id) ou si admin
     """
-    climb = db.get(Climb, climb_id)
+    climb = await db.get(Climb, climb_id)
     if not climb:
         raise HTTPException(status_code=404, detail="Climb not found")
 
@@ -359,23 +641,25 @@ def delete_climb(
                 detail="Vous ne pouvez supprimer que vos propres climbs"
             )
 
-    db.delete(climb)
-    db.commit()
+    record_change(db, "climb", climb.id, ChangeAction.DELETE, face_id=climb.face_id)
+    await db.delete(climb)
+    await db.commit()
 
 
 @router.patch("/{climb_id}/stokt-id")
-def update_stokt_id(
+async def update_stokt_id(
     climb_id: UUID,
     stokt_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Met à jour le stokt_id d'un climb (après push vers Stokt)."""
-    climb = db.get(Climb, climb_id)
+    climb = await db.get(Climb, climb_id)
     if not climb:
         raise HTTPException(status_code=404, detail="Climb not found")
 
     climb.stokt_id = stokt_id
-    db.commit()
+    record_change(db, "climb", climb.id, ChangeAction.UPDATE, face_id=climb.face_id)
+    await db.commit()
 
     return {"message": "stokt_id updated", "stokt_id": str(stokt_id)}
 
@@ -386,13 +670,13 @@ class DateUpdateRequest(BaseModel):
 
 
 @router.patch("/{climb_id}/date")
-def update_climb_date(
+async def update_climb_date(
     climb_id: UUID,
     data: DateUpdateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Met à jour la date created_at d'un climb."""
-    climb = db.get(Climb, climb_id)
+    climb = await db.get(Climb, climb_id)
     if not climb:
         raise HTTPException(status_code=404, detail="Climb not found")
 
@@ -400,7 +684,8 @@ def update_climb_date(
         # Parser la date ISO
         new_date = datetime.fromisoformat(data.created_at.replace("Z", "+00:00"))
         climb.created_at = new_date
-        db.commit()
+        record_change(db, "climb", climb.id, ChangeAction.UPDATE, face_id=climb.face_id)
+        await db.commit()
         return {"message": "date updated", "created_at": climb.created_at.isoformat()}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format: {e}")
@@ -412,9 +697,9 @@ class BulkDateUpdate(BaseModel):
 
 
 @router.patch("/bulk/dates")
-def bulk_update_dates(
+async def bulk_update_dates(
     data: BulkDateUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Met à jour les dates created_at en masse par stokt_id."""
     updated = 0
@@ -438,7 +723,7 @@ def bulk_update_dates(
 
             # Trouver le climb par stokt_id
             query = select(Climb).where(Climb.stokt_id == stokt_id)
-            climb = db.execute(query).scalar_one_or_none()
+            climb = (await db.execute(query)).scalar_one_or_none()
 
             if not climb:
                 errors += 1
@@ -447,10 +732,11 @@ def bulk_update_dates(
             # Parser et mettre à jour la date
             new_date = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
             climb.created_at = new_date
+            record_change(db, "climb", climb.id, ChangeAction.UPDATE, face_id=climb.face_id)
             updated += 1
 
         except Exception:
             errors += 1
 
-    db.commit()
+    await db.commit()
     return {"updated": updated, "errors": errors, "total": len(data.updates)}
@@ -4,16 +4,27 @@ Endpoints pour les faces (configurations de murs).
 
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from mastoc_api.database import get_db
-from mastoc_api.models import Face, Hold
+from mastoc_api.database import get_async_db
+from mastoc_api.models import Climb, Face, Hold
+from mastoc_api.http_cache import is_not_modified
+from mastoc_api.response_cache import cached_json
+from mastoc_api.tiles import TILE_FORMAT, TILE_MEDIA_TYPE, ensure_pyramid, tile_path
 
 router = APIRouter(prefix="/faces", tags=["faces"])
 
+# Entités dont dépendent les réponses (compteurs de holds et de climbs inclus)
+FACE_DEPENDS_ON = ("face", "hold", "climb")
+
+# Une URL de tuile porte la version de la pyramide : immuable
+TILE_IMMUTABLE = "public, max-age=31536000, immutable"
+
 
 # --- Schemas Pydantic ---
 
@@ -61,6 +72,18 @@ class FaceSetupResponse(BaseModel):
         from_attributes = True
 
 
+class FaceTilesResponse(BaseModel):
+    """Pyramide de tuiles de la photo d'une face."""
+    version: str
+    width: int
+    height: int
+    tile_size: int
+    max_level: int
+    format: str
+    # Gabarit d'URL : {level}, {col}, {row}
+    url_template: str
+
+
 class FaceListResponse(BaseModel):
     """Liste des faces."""
     id: UUID
@@ -78,65 +101,93 @@ class FaceListResponse(BaseModel):
 
 # --- Endpoints ---
 
-@router.get("", response_model=list[FaceListResponse])
-def list_faces(
-    gym_id: Optional[UUID] = None,
-    db: Session = Depends(get_db),
-):
-    """Liste les faces."""
-    query = select(Face)
-    if gym_id:
-        query = query.where(Face.gym_id == gym_id)
+async def _count_by_face(db: AsyncSession, model, face_ids: list[UUID]) -> dict[UUID, int]:
+    """Nombre de lignes de `model` (Hold, Climb) par face, en une requête."""
+    if not face_ids:
+        return {}
+    query = (
+        select(model.face_id, func.count())
+        .where(model.face_id.in_(face_ids))
+        .group_by(model.face_id)
+    )
+    return dict((await db.execute(query)).all())
 
-    faces = db.execute(query).scalars().all()
 
-    results = []
-    for face in faces:
-        results.append(FaceListResponse(
+async def _face_list_responses(db: AsyncSession, faces: list[Face]) -> list[FaceListResponse]:
+    """Réponses liste des faces, compteurs de holds et climbs compris."""
+    face_ids = [face.id for face in faces]
+    holds_count = await _count_by_face(db, Hold, face_ids)
+    climbs_count = await _count_by_face(db, Climb, face_ids)
+    return [
+        FaceListResponse(
             id=face.id,
             stokt_id=face.stokt_id,
             gym_id=face.gym_id,
             picture_path=face.picture_path,
             picture_width=face.picture_width,
             picture_height=face.picture_height,
-            holds_count=len(face.holds),
-            climbs_count=len(face.climbs),
-        ))
+            holds_count=holds_count.get(face.id, 0),
+            climbs_count=climbs_count.get(face.id, 0),
+        )
+        for face in faces
+    ]
+
+
+@router.get("", response_model=list[FaceListResponse])
+async def list_faces(
+    request: Request,
+    gym_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Liste les faces (réponse en cache tant qu'aucune écriture ne la modifie)."""
+    async def build():
+        query = select(Face)
+        if gym_id:
+            query = query.where(Face.gym_id == gym_id)
 
-    return results
+        faces = (await db.execute(query)).scalars().all()
+        results = await _face_list_responses(db, faces)
+        return [face.model_dump(mode="json") for face in results], None
+
+    return await cached_json(request, FACE_DEPENDS_ON, build)
 
 
 @router.get("/{face_id}", response_model=FaceListResponse)
-def get_face(face_id: UUID, db: Session = Depends(get_db)):
+async def get_face(face_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Récupère une face par ID."""
-    face = db.get(Face, face_id)
+    face = await db.get(Face, face_id)
     if not face:
         raise HTTPException(status_code=404, detail="Face not found")
 
-    return FaceListResponse(
-        id=face.id,
-        stokt_id=face.stokt_id,
-        gym_id=face.gym_id,
-        picture_path=face.picture_path,
-        picture_width=face.picture_width,
-        picture_height=face.picture_height,
-        holds_count=len(face.holds),
-        climbs_count=len(face.climbs),
+    return (await _face_list_responses(db, [face]))[0]
+
+
+def hold_setup_response(hold: Hold) -> HoldSetupResponse:
+    """Convertit un Hold en HoldSetupResponse."""
+    # Construire centroid_str à partir de centroid_x, centroid_y
+    centroid_str = ""
+    if hold.centroid_x is not None and hold.centroid_y is not None:
+        centroid_str = f"{hold.centroid_x} {hold.centroid_y}"
+
+    return HoldSetupResponse(
+        id=hold.stokt_id or hold.id,  # Utiliser stokt_id pour compatibilité
+        stokt_id=hold.stokt_id,
+        polygon_str=hold.polygon_str,
+        centroid_x=hold.centroid_x,
+        centroid_y=hold.centroid_y,
+        path_str=hold.path_str,
+        area=hold.area,
+        centroid_str=centroid_str,
+        center_tape_str=hold.center_tape_str or "",
+        right_tape_str=hold.right_tape_str or "",
+        left_tape_str=hold.left_tape_str or "",
     )
 
 
-@router.get("/{face_id}/setup", response_model=FaceSetupResponse)
-def get_face_setup(face_id: UUID, db: Session = Depends(get_db)):
-    """
-    Récupère le setup complet d'une face avec tous ses holds.
-
-    C'est l'endpoint principal pour charger la configuration
-    d'un mur avec toutes les prises et leurs polygones.
-    """
-    face = db.get(Face, face_id)
-    if not face:
-        raise HTTPException(status_code=404, detail="Face not found")
-
+def face_setup_response(
+    face: Face, holds: list[HoldSetupResponse], total_climbs: int
+) -> FaceSetupResponse:
+    """Construit le setup d'une face à partir de ses holds déjà convertis."""
     # Construire la réponse picture
     picture = None
     if face.picture_path:
@@ -146,28 +197,6 @@ def get_face_setup(face_id: UUID, db: Session = Depends(get_db)):
             height=face.picture_height or 0,
         )
 
-    # Construire les holds
-    holds = []
-    for hold in face.holds:
-        # Construire centroid_str à partir de centroid_x, centroid_y
-        centroid_str = ""
-        if hold.centroid_x is not None and hold.centroid_y is not None:
-            centroid_str = f"{hold.centroid_x} {hold.centroid_y}"
-
-        holds.append(HoldSetupResponse(
-            id=hold.stokt_id or hold.id,  # Utiliser stokt_id pour compatibilité
-            stokt_id=hold.stokt_id,
-            polygon_str=hold.polygon_str,
-            centroid_x=hold.centroid_x,
-            centroid_y=hold.centroid_y,
-            path_str=hold.path_str,
-            area=hold.area,
-            centroid_str=centroid_str,
-            center_tape_str=hold.center_tape_str or "",
-            right_tape_str=hold.right_tape_str or "",
-            left_tape_str=hold.left_tape_str or "",
-        ))
-
     # Récupérer les options de pieds
     feet_rules = face.feet_rules_options or []
     if isinstance(feet_rules, dict):
@@ -177,7 +206,7 @@ def get_face_setup(face_id: UUID, db: Session = Depends(get_db)):
         id=face.id,
         stokt_id=face.stokt_id,
         is_active=True,
-        total_climbs=len(face.climbs),
+        total_climbs=total_climbs,
         picture=picture,
         feet_rules_options=feet_rules,
         has_symmetry=face.has_symmetry,
@@ -185,13 +214,128 @@ def get_face_setup(face_id: UUID, db: Session = Depends(get_db)):
     )
 
 
+async def _build_face_setup(db: AsyncSession, face: Face) -> FaceSetupResponse:
+    """Construit le setup complet d'une face."""
+    holds = (await db.execute(
+        select(Hold).where(Hold.face_id == face.id).order_by(Hold.id)
+    )).scalars().all()
+    total_climbs = (await _count_by_face(db, Climb, [face.id])).get(face.id, 0)
+    return face_setup_response(face, [hold_setup_response(hold) for hold in holds], total_climbs)
+
+
+def _face_last_modified(face: Face):
+    """Date de dernière modification connue d'une face."""
+    return face.synced_at or face.created_at
+
+
+@router.get("/{face_id}/setup", response_model=FaceSetupResponse)
+async def get_face_setup(
+    face_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Récupère le setup complet d'une face avec tous ses holds.
+
+    C'est l'endpoint principal pour charger la configuration
+    d'un mur avec toutes les prises et leurs polygones.
+    Supporte If-None-Match (304 si inchangé) ; la réponse sérialisée est
+    gardée en cache jusqu'à la prochaine écriture de face, hold ou climb.
+    """
+    async def build():
+        face = await db.get(Face, face_id)
+        if not face:
+            raise HTTPException(status_code=404, detail="Face not found")
+        return await _build_face_setup(db, face), _face_last_modified(face)
+
+    return await cached_json(request, FACE_DEPENDS_ON, build)
+
+
 @router.get("/by-stokt-id/{stokt_id}/setup", response_model=FaceSetupResponse)
-def get_face_setup_by_stokt_id(stokt_id: UUID, db: Session = Depends(get_db)):
+async def get_face_setup_by_stokt_id(
+    stokt_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)
+):
     """Récupère le setup d'une face par son ID Stokt."""
+    async def build():
+        query = select(Face).where(Face.stokt_id == stokt_id)
+        face = (await db.execute(query)).scalar_one_or_none()
+        if not face:
+            raise HTTPException(status_code=404, detail="Face not found")
+        return await _build_face_setup(db, face), _face_last_modified(face)
+
+    return await cached_json(request, FACE_DEPENDS_ON, build)
+
+
+async def _face_tiles(request: Request, face: Face) -> Response:
+    """Descripteur de pyramide, générée au premier appel."""
+    pyramid = await run_in_threadpool(ensure_pyramid, face.picture_path)
+    if pyramid is None:
+        raise HTTPException(status_code=404, detail="Face picture not found")
+
+    etag = f'"{pyramid.version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    prefix = request.url.path.split("/faces/", 1)[0]
+    url_template = (
+        f"{prefix}/faces/tiles/{pyramid.version}/{{level}}/{{col}}_{{row}}.{TILE_FORMAT}"
+    )
+    body = FaceTilesResponse(
+        version=pyramid.version,
+        width=pyramid.width,
+        height=pyramid.height,
+        tile_size=pyramid.tile_size,
+        max_level=pyramid.max_level,
+        format=pyramid.format,
+        url_template=url_template,
+    )
+    return Response(
+        content=body.model_dump_json(), media_type="application/json", headers=headers
+    )
+
+
+@router.get("/{face_id}/tiles", response_model=FaceTilesResponse)
+async def get_face_tiles(
+    face_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Pyramide de tuiles de la photo d'une face.
+
+    La version change si la photo est remplacée : revalidation par ETag,
+    les tuiles elles-mêmes sont immuables.
+    """
+    face = await db.get(Face, face_id)
+    if not face:
+        raise HTTPException(status_code=404, detail="Face not found")
+    return await _face_tiles(request, face)
+
+
+@router.get("/by-stokt-id/{stokt_id}/tiles", response_model=FaceTilesResponse)
+async def get_face_tiles_by_stokt_id(
+    stokt_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Pyramide de tuiles d'une face par son ID Stokt."""
     query = select(Face).where(Face.stokt_id == stokt_id)
-    face = db.execute(query).scalar_one_or_none()
+    face = (await db.execute(query)).scalar_one_or_none()
     if not face:
         raise HTTPException(status_code=404, detail="Face not found")
+    return await _face_tiles(request, face)
+
 
-    # Réutiliser la logique de get_face_setup
-    return get_face_setup(face.id, db)
+@router.get("/tiles/{version}/{level}/{col}_{row}." + TILE_FORMAT)
+def get_face_tile(
+    request: Request,
+    version: str = Path(..., pattern="^[0-9a-f]{16}$"),
+    level: int = Path(..., ge=0, le=32),
+    col: int = Path(..., ge=0),
+    row: int = Path(..., ge=0),
+):
+    """Tuile d'une pyramide (immuable)."""
+    path = tile_path(version, level, col, row)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Tile not found")
+
+    etag = f'"{version}-{level}-{col}-{row}"'
+    headers = {"ETag": etag, "Cache-Control": TILE_IMMUTABLE}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=TILE_MEDIA_TYPE, headers=headers)
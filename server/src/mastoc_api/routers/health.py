@@ -8,6 +8,9 @@ from sqlalchemy import text
 
 from mastoc_api.database import get_db
 from mastoc_api.config import get_settings
+from mastoc_api.password_hashing import password_hasher
+from mastoc_api.principal_cache import principal_cache
+from mastoc_api.response_cache import response_cache
 
 router = APIRouter(tags=["health"])
 
@@ -32,6 +35,24 @@ def health_check(db: Session = Depends(get_db)):
     }
 
 
+@router.get("/health/cache")
+def cache_stats():
+    """Métriques du cache de réponses (hits, misses, taille, versions)."""
+    return response_cache.stats()
+
+
+@router.get("/health/auth-cache")
+def auth_cache_stats():
+    """Métriques du cache des utilisateurs authentifiés."""
+    return principal_cache.stats()
+
+
+@router.get("/health/password-hashing")
+def password_hashing_stats():
+    """Métriques du pool bcrypt (durées, file, rejets, rehash)."""
+    return password_hasher.stats()
+
+
 @router.get("/")
 def root():
     """Endpoint racine."""
@@ -5,19 +5,29 @@ ADR-008 : Système d'annotations crowd-sourcées avec consensus.
 """
 
 from typing import Optional
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from datetime import datetime, timezone
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from mastoc_api.database import get_db
-from mastoc_api.models import Hold, User, HoldAnnotation
+from mastoc_api.database import get_async_db
+from mastoc_api.models import (
+    Face, Hold, HoldAnnotation, ChangeLog, ChangeAction, record_change,
+    HoldConsensusVote,
+)
+from mastoc_api.models.hold_consensus import (
+    ANNOTATORS, annotation_votes, update_consensus,
+)
 from mastoc_api.dependencies import (
     get_current_user_optional,
     get_current_active_user,
     AuthenticatedUser,
 )
+from mastoc_api.principal_cache import Principal
+from mastoc_api.wire_format import encode_payload
 
 router = APIRouter(prefix="/holds", tags=["hold_annotations"])
 
@@ -76,79 +86,78 @@ class BatchAnnotationsResponse(BaseModel):
     annotations: dict[int, HoldAnnotationsResponse]
 
 
+class WallHoldAnnotations(HoldAnnotationsResponse):
+    """Annotations d'une prise dans l'instantané d'un mur."""
+    hold_stokt_id: Optional[int] = None  # identifiant utilisé par le client
+
+
+class WallAnnotationsResponse(BaseModel):
+    """Annotations de toutes les prises d'un mur (page)."""
+    face_id: UUID
+    annotations: list[WallHoldAnnotations]
+    count: int
+    page: int
+    page_size: int
+    server_time: datetime  # à renvoyer en updated_since au prochain appel
+
+
+class AnnotationWriteItem(AnnotationInput):
+    """Écriture d'annotation dans un lot (création/modification ou suppression)."""
+    hold_id: int
+    delete: bool = False
+
+
+class BulkAnnotationWriteRequest(BaseModel):
+    """Lot d'écritures d'annotations (file d'attente hors-ligne du client)."""
+    items: list[AnnotationWriteItem]
+
+
+class BulkAnnotationWriteResponse(BaseModel):
+    """Résultat d'un lot d'écritures."""
+    applied: int
+    errors: dict[int, str] = {}
+
+
 # --- Helpers ---
 
-def _calculate_consensus(db: Session, hold_id: int) -> ConsensusResponse:
+async def _consensus_by_hold(
+    db: AsyncSession, hold_ids: list[int]
+) -> dict[int, ConsensusResponse]:
     """
-    Calcule le consensus pour une prise.
+    Consensus de plusieurs prises, lu dans les histogrammes matérialisés.
 
-    Le consensus est la valeur modale (la plus fréquente).
-    La confiance = votes_mode / total_votes.
+    Le consensus est la valeur modale (la plus fréquente, la plus petite
+    valeur en cas d'égalité). La confiance = votes_mode / total_votes.
+    Une requête sur la clé primaire de hold_consensus, indépendante du
+    nombre d'annotateurs.
     """
-    # Récupérer toutes les annotations pour cette prise
-    query = select(HoldAnnotation).where(HoldAnnotation.hold_id == hold_id)
-    annotations = db.execute(query).scalars().all()
-
-    if not annotations:
-        return ConsensusResponse()
-
-    total = len(annotations)
-
-    # Calculer le mode pour chaque dimension
-    def get_mode(values: list[str]) -> tuple[Optional[str], int, float]:
-        """Retourne (mode, votes, confidence)."""
-        if not values:
-            return None, 0, 0.0
-        counts = {}
-        for v in values:
-            counts[v] = counts.get(v, 0) + 1
-        if not counts:
-            return None, 0, 0.0
-        mode_val = max(counts, key=counts.get)
-        mode_count = counts[mode_val]
-        confidence = mode_count / len(values) if values else 0.0
-        return mode_val, mode_count, confidence
-
-    grip_types = [a.grip_type for a in annotations if a.grip_type]
-    conditions = [a.condition for a in annotations if a.condition]
-    difficulties = [a.difficulty for a in annotations if a.difficulty]
-
-    grip_mode, grip_votes, grip_conf = get_mode(grip_types)
-    cond_mode, cond_votes, cond_conf = get_mode(conditions)
-    diff_mode, diff_votes, diff_conf = get_mode(difficulties)
-
-    return ConsensusResponse(
-        grip_type=grip_mode,
-        grip_type_votes=grip_votes,
-        grip_type_confidence=round(grip_conf, 2),
-        condition=cond_mode,
-        condition_votes=cond_votes,
-        condition_confidence=round(cond_conf, 2),
-        difficulty=diff_mode,
-        difficulty_votes=diff_votes,
-        difficulty_confidence=round(diff_conf, 2),
-        total_annotators=total,
-    )
-
-
-def _get_user_annotation(
-    db: Session,
-    hold_id: int,
-    user: Optional[User]
-) -> Optional[UserAnnotationResponse]:
-    """Récupère l'annotation de l'utilisateur courant."""
-    if not user:
-        return None
+    consensus = {hold_id: ConsensusResponse() for hold_id in hold_ids}
+    if not hold_ids:
+        return consensus
+
+    histograms: dict[tuple[int, str], dict[str, int]] = {}
+    query = select(HoldConsensusVote).where(HoldConsensusVote.hold_id.in_(hold_ids))
+    for row in (await db.execute(query)).scalars():
+        if row.dimension == ANNOTATORS:
+            consensus[row.hold_id].total_annotators = row.votes
+        else:
+            histograms.setdefault((row.hold_id, row.dimension), {})[row.value] = row.votes
+
+    for (hold_id, dimension), counts in histograms.items():
+        mode_val = min(counts, key=lambda value: (-counts[value], value))
+        setattr(consensus[hold_id], dimension, mode_val)
+        setattr(consensus[hold_id], f"{dimension}_votes", counts[mode_val])
+        setattr(
+            consensus[hold_id],
+            f"{dimension}_confidence",
+            round(counts[mode_val] / sum(counts.values()), 2),
+        )
 
-    query = select(HoldAnnotation).where(
-        HoldAnnotation.hold_id == hold_id,
-        HoldAnnotation.user_id == user.id
-    )
-    annotation = db.execute(query).scalar_one_or_none()
+    return consensus
 
-    if not annotation:
-        return None
 
+def _user_annotation_response(annotation: HoldAnnotation) -> UserAnnotationResponse:
+    """Réponse pour l'annotation d'un utilisateur."""
     return UserAnnotationResponse(
         grip_type=annotation.grip_type,
         condition=annotation.condition,
@@ -159,12 +168,84 @@ def _get_user_annotation(
     )
 
 
+async def _user_annotations_by_hold(
+    db: AsyncSession,
+    hold_ids: list[int],
+    user: Optional[Principal]
+) -> dict[int, UserAnnotationResponse]:
+    """Annotations de l'utilisateur courant pour plusieurs prises (une requête)."""
+    if not user or not hold_ids:
+        return {}
+
+    query = select(HoldAnnotation).where(
+        HoldAnnotation.hold_id.in_(hold_ids),
+        HoldAnnotation.user_id == user.id
+    )
+    return {
+        annotation.hold_id: _user_annotation_response(annotation)
+        for annotation in (await db.execute(query)).scalars().all()
+    }
+
+
+async def _apply_annotation(
+    db: AsyncSession,
+    hold_id: int,
+    user: Principal,
+    data: AnnotationInput,
+) -> HoldAnnotation:
+    """
+    Crée ou modifie l'annotation de l'utilisateur (sans commit).
+
+    En modification, un champ absent est conservé et une chaîne vide
+    l'efface. L'histogramme de consensus de la prise est mis à jour
+    dans la même transaction.
+    """
+    query = select(HoldAnnotation).where(
+        HoldAnnotation.hold_id == hold_id,
+        HoldAnnotation.user_id == user.id
+    )
+    annotation = (await db.execute(query)).scalar_one_or_none()
+    before = annotation_votes(annotation)
+
+    if annotation:
+        # Mise à jour
+        if data.grip_type is not None:
+            annotation.grip_type = data.grip_type if data.grip_type else None
+        if data.condition is not None:
+            annotation.condition = data.condition if data.condition else None
+        if data.difficulty is not None:
+            annotation.difficulty = data.difficulty if data.difficulty else None
+        if data.notes is not None:
+            annotation.notes = data.notes if data.notes else None
+        annotation.updated_at = datetime.utcnow()
+    else:
+        # Création
+        annotation = HoldAnnotation(
+            hold_id=hold_id,
+            user_id=user.id,
+            grip_type=data.grip_type or None,
+            condition=data.condition or None,
+            difficulty=data.difficulty or None,
+            notes=data.notes or None,
+        )
+        db.add(annotation)
+
+    await db.run_sync(update_consensus, hold_id, before, annotation_votes(annotation))
+    return annotation
+
+
+async def _remove_annotation(db: AsyncSession, annotation: HoldAnnotation) -> None:
+    """Supprime une annotation et ses votes du consensus (sans commit)."""
+    await db.run_sync(update_consensus, annotation.hold_id, annotation_votes(annotation), {})
+    await db.delete(annotation)
+
+
 # --- Endpoints ---
 
 @router.get("/{hold_id}/annotations", response_model=HoldAnnotationsResponse)
-def get_hold_annotations(
+async def get_hold_annotations(
     hold_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     auth_user: Optional[AuthenticatedUser] = Depends(get_current_user_optional),
 ):
     """
@@ -174,27 +255,25 @@ def get_hold_annotations(
     (si authentifié par JWT).
     """
     # Vérifier que la prise existe
-    hold = db.get(Hold, hold_id)
+    hold = await db.get(Hold, hold_id)
     if not hold:
         raise HTTPException(status_code=404, detail="Hold not found")
 
-    consensus = _calculate_consensus(db, hold_id)
     user = auth_user.user if auth_user and not auth_user.is_api_key else None
-    user_annotation = _get_user_annotation(db, hold_id, user)
 
     return HoldAnnotationsResponse(
         hold_id=hold_id,
-        consensus=consensus,
-        user_annotation=user_annotation,
+        consensus=(await _consensus_by_hold(db, [hold_id]))[hold_id],
+        user_annotation=(await _user_annotations_by_hold(db, [hold_id], user)).get(hold_id),
     )
 
 
 @router.put("/{hold_id}/annotations", response_model=UserAnnotationResponse)
-def set_hold_annotation(
+async def set_hold_annotation(
     hold_id: int,
     data: AnnotationInput,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_active_user),
 ):
     """
     Crée ou modifie l'annotation de l'utilisateur pour une prise.
@@ -202,42 +281,14 @@ def set_hold_annotation(
     Requiert une authentification JWT.
     """
     # Vérifier que la prise existe
-    hold = db.get(Hold, hold_id)
+    hold = await db.get(Hold, hold_id)
     if not hold:
         raise HTTPException(status_code=404, detail="Hold not found")
 
-    # Chercher annotation existante
-    query = select(HoldAnnotation).where(
-        HoldAnnotation.hold_id == hold_id,
-        HoldAnnotation.user_id == user.id
-    )
-    annotation = db.execute(query).scalar_one_or_none()
-
-    if annotation:
-        # Mise à jour
-        if data.grip_type is not None:
-            annotation.grip_type = data.grip_type if data.grip_type else None
-        if data.condition is not None:
-            annotation.condition = data.condition if data.condition else None
-        if data.difficulty is not None:
-            annotation.difficulty = data.difficulty if data.difficulty else None
-        if data.notes is not None:
-            annotation.notes = data.notes if data.notes else None
-        annotation.updated_at = datetime.utcnow()
-    else:
-        # Création
-        annotation = HoldAnnotation(
-            hold_id=hold_id,
-            user_id=user.id,
-            grip_type=data.grip_type,
-            condition=data.condition,
-            difficulty=data.difficulty,
-            notes=data.notes,
-        )
-        db.add(annotation)
-
-    db.commit()
-    db.refresh(annotation)
+    annotation = await _apply_annotation(db, hold_id, user, data)
+    record_change(db, "hold_annotation", hold_id, ChangeAction.UPDATE, face_id=hold.face_id)
+    await db.commit()
+    await db.refresh(annotation)
 
     return UserAnnotationResponse(
         grip_type=annotation.grip_type,
@@ -250,10 +301,10 @@ def set_hold_annotation(
 
 
 @router.delete("/{hold_id}/annotations", status_code=204)
-def delete_hold_annotation(
+async def delete_hold_annotation(
     hold_id: int,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_active_user),
 ):
     """
     Supprime l'annotation de l'utilisateur pour une prise.
@@ -263,26 +314,31 @@ def delete_hold_annotation(
     query = select(HoldAnnotation).where(
         HoldAnnotation.hold_id == hold_id,
         HoldAnnotation.user_id == user.id
-    )
-    annotation = db.execute(query).scalar_one_or_none()
+    ).options(joinedload(HoldAnnotation.hold))
+    annotation = (await db.execute(query)).scalar_one_or_none()
 
     if not annotation:
         raise HTTPException(status_code=404, detail="Annotation not found")
 
-    db.delete(annotation)
-    db.commit()
+    record_change(
+        db, "hold_annotation", hold_id, ChangeAction.DELETE, face_id=annotation.hold.face_id
+    )
+    await _remove_annotation(db, annotation)
+    await db.commit()
 
 
 @router.post("/annotations/batch", response_model=BatchAnnotationsResponse)
-def get_annotations_batch(
+async def get_annotations_batch(
     data: BatchAnnotationsRequest,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     auth_user: Optional[AuthenticatedUser] = Depends(get_current_user_optional),
 ):
     """
     Récupère les annotations pour plusieurs prises.
 
     Utile pour charger les annotations de toutes les prises d'un mur.
+    Nombre de requêtes constant quel que soit le nombre de prises.
     """
     if len(data.hold_ids) > 1000:
         raise HTTPException(
@@ -292,20 +348,150 @@ def get_annotations_batch(
 
     user = auth_user.user if auth_user and not auth_user.is_api_key else None
 
-    annotations = {}
-    for hold_id in data.hold_ids:
-        # Vérifier que la prise existe
-        hold = db.get(Hold, hold_id)
-        if not hold:
+    requested = set(data.hold_ids)
+    hold_ids = sorted(
+        (await db.execute(select(Hold.id).where(Hold.id.in_(requested)))).scalars().all()
+    ) if requested else []
+    consensus = await _consensus_by_hold(db, hold_ids)
+    user_annotations = await _user_annotations_by_hold(db, hold_ids, user)
+
+    annotations = {
+        hold_id: HoldAnnotationsResponse(
+            hold_id=hold_id,
+            consensus=consensus[hold_id],
+            user_annotation=user_annotations.get(hold_id),
+        )
+        for hold_id in hold_ids
+    }
+
+    payload = BatchAnnotationsResponse(annotations=annotations)
+    body, media_type = encode_payload(request, payload.model_dump(mode="json"))
+    return Response(content=body, media_type=media_type)
+
+
+@router.post("/annotations/bulk", response_model=BulkAnnotationWriteResponse)
+async def write_annotations_bulk(
+    data: BulkAnnotationWriteRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_active_user),
+):
+    """
+    Applique un lot d'écritures d'annotations en une transaction.
+
+    Utilisé par la file d'attente hors-ligne du client. Les éléments sont
+    appliqués dans l'ordre ; une prise inexistante est signalée dans
+    `errors` sans bloquer le reste du lot. Supprimer une annotation
+    absente n'est pas une erreur (les renvois sont idempotents).
+
+    Requiert une authentification JWT.
+    """
+    if len(data.items) > 1000:
+        raise HTTPException(
+            status_code=400,
+            detail="Maximum 1000 éléments par requête"
+        )
+
+    hold_ids = {item.hold_id for item in data.items}
+    hold_faces = dict(
+        (await db.execute(select(Hold.id, Hold.face_id).where(Hold.id.in_(hold_ids)))).all()
+    ) if hold_ids else {}
+
+    applied = 0
+    errors = {}
+    for item in data.items:
+        if item.hold_id not in hold_faces:
+            errors[item.hold_id] = "Hold not found"
             continue
 
-        consensus = _calculate_consensus(db, hold_id)
-        user_annotation = _get_user_annotation(db, hold_id, user)
+        if item.delete:
+            query = select(HoldAnnotation).where(
+                HoldAnnotation.hold_id == item.hold_id,
+                HoldAnnotation.user_id == user.id
+            )
+            annotation = (await db.execute(query)).scalar_one_or_none()
+            if annotation:
+                await _remove_annotation(db, annotation)
+                await db.flush()
+        else:
+            await _apply_annotation(db, item.hold_id, user, item)
+            await db.flush()
+        action = ChangeAction.DELETE if item.delete else ChangeAction.UPDATE
+        record_change(db, "hold_annotation", item.hold_id, action, face_id=hold_faces[item.hold_id])
+        applied += 1
+
+    await db.commit()
+    return BulkAnnotationWriteResponse(applied=applied, errors=errors)
+
+
+@router.get("/annotations/face/{face_id}", response_model=WallAnnotationsResponse)
+async def get_wall_annotations(
+    face_id: UUID,
+    request: Request,
+    updated_since: Optional[datetime] = Query(
+        None, description="Seulement les prises dont les annotations ont changé depuis"
+    ),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+    auth_user: Optional[AuthenticatedUser] = Depends(get_current_user_optional),
+):
+    """
+    Annotations de toutes les prises annotées d'un mur, paginées.
 
-        annotations[hold_id] = HoldAnnotationsResponse(
-            hold_id=hold_id,
-            consensus=consensus,
-            user_annotation=user_annotation,
+    Sans updated_since : instantané complet (prises ayant au moins une
+    annotation). Avec updated_since : prises dont une annotation a été
+    créée, modifiée ou supprimée depuis (consensus éventuellement vide).
+    Le client conserve server_time pour la requête suivante.
+    """
+    server_time = datetime.utcnow()
+    if not await db.get(Face, face_id):
+        raise HTTPException(status_code=404, detail="Face not found")
+
+    if updated_since is None:
+        query = (
+            select(HoldAnnotation.hold_id)
+            .join(Hold, Hold.id == HoldAnnotation.hold_id)
+            .where(Hold.face_id == face_id)
+            .distinct()
+        )
+        hold_ids = sorted((await db.execute(query)).scalars().all())
+    else:
+        if updated_since.tzinfo is not None:
+            updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+        query = select(ChangeLog.entity_id).where(
+            ChangeLog.entity_type == "hold_annotation",
+            ChangeLog.face_id == face_id,
+            ChangeLog.changed_at >= updated_since,
+        ).distinct()
+        hold_ids = sorted(int(v) for v in (await db.execute(query)).scalars().all())
+
+    page_ids = hold_ids[(page - 1) * page_size:page * page_size]
+    stokt_ids: dict[int, Optional[int]] = {}
+    if page_ids:
+        stokt_ids = dict(
+            (await db.execute(select(Hold.id, Hold.stokt_id).where(Hold.id.in_(page_ids)))).all()
         )
 
-    return BatchAnnotationsResponse(annotations=annotations)
+    user = auth_user.user if auth_user and not auth_user.is_api_key else None
+    consensus = await _consensus_by_hold(db, page_ids)
+    user_annotations = await _user_annotations_by_hold(db, page_ids, user)
+    annotations = [
+        WallHoldAnnotations(
+            hold_id=hold_id,
+            hold_stokt_id=stokt_ids.get(hold_id),
+            consensus=consensus[hold_id],
+            user_annotation=user_annotations.get(hold_id),
+        )
+        for hold_id in page_ids
+    ]
+
+    payload = WallAnnotationsResponse(
+        face_id=face_id,
+        annotations=annotations,
+        count=len(hold_ids),
+        page=page,
+        page_size=page_size,
+        server_time=server_time,
+    )
+    body, media_type = encode_payload(request, payload.model_dump(mode="json"))
+    return Response(content=body, media_type=media_type)
@@ -4,13 +4,14 @@ Endpoints pour les holds (prises).
 
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from mastoc_api.database import get_db
+from mastoc_api.database import get_async_db
 from mastoc_api.models import Hold, Face
+from mastoc_api.response_cache import cached_json
 
 router = APIRouter(prefix="/holds", tags=["holds"])
 
@@ -44,37 +45,48 @@ class HoldsListResponse(BaseModel):
 # --- Endpoints ---
 
 @router.get("", response_model=HoldsListResponse)
-def list_holds(
+async def list_holds(
     face_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Liste les holds d'une face."""
-    query = select(Hold).where(Hold.face_id == face_id)
-    holds = db.execute(query).scalars().all()
-
-    results = [
-        HoldResponse(
-            id=h.id,
-            stokt_id=h.stokt_id,
-            face_id=h.face_id,
-            polygon_str=h.polygon_str,
-            centroid_x=h.centroid_x,
-            centroid_y=h.centroid_y,
-            area=h.area,
-            center_tape_str=h.center_tape_str,
-            right_tape_str=h.right_tape_str,
-            left_tape_str=h.left_tape_str,
-        )
-        for h in holds
-    ]
-
-    return HoldsListResponse(results=results, count=len(results))
+    """
+    Liste les holds d'une face (supporte If-None-Match).
+
+    La réponse sérialisée est gardée en cache jusqu'à la prochaine
+    écriture de face ou de hold.
+    """
+    async def build():
+        query = select(Hold).where(Hold.face_id == face_id)
+        holds = (await db.execute(query)).scalars().all()
+
+        results = [
+            HoldResponse(
+                id=h.id,
+                stokt_id=h.stokt_id,
+                face_id=h.face_id,
+                polygon_str=h.polygon_str,
+                centroid_x=h.centroid_x,
+                centroid_y=h.centroid_y,
+                area=h.area,
+                center_tape_str=h.center_tape_str,
+                right_tape_str=h.right_tape_str,
+                left_tape_str=h.left_tape_str,
+            )
+            for h in holds
+        ]
+
+        face = await db.get(Face, face_id)
+        last_modified = (face.synced_at or face.created_at) if face else None
+        return HoldsListResponse(results=results, count=len(results)), last_modified
+
+    return await cached_json(request, ("face", "hold"), build)
 
 
 @router.get("/{hold_id}", response_model=HoldResponse)
-def get_hold(hold_id: int, db: Session = Depends(get_db)):
+async def get_hold(hold_id: int, db: AsyncSession = Depends(get_async_db)):
     """Récupère un hold par ID."""
-    hold = db.get(Hold, hold_id)
+    hold = await db.get(Hold, hold_id)
     if not hold:
         raise HTTPException(status_code=404, detail="Hold not found")
 
@@ -93,10 +105,10 @@ def get_hold(hold_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/by-stokt-id/{stokt_id}", response_model=HoldResponse)
-def get_hold_by_stokt_id(stokt_id: int, db: Session = Depends(get_db)):
+async def get_hold_by_stokt_id(stokt_id: int, db: AsyncSession = Depends(get_async_db)):
     """Récupère un hold par son ID Stokt."""
     query = select(Hold).where(Hold.stokt_id == stokt_id)
-    hold = db.execute(query).scalar_one_or_none()
+    hold = (await db.execute(query)).scalar_one_or_none()
     if not hold:
         raise HTTPException(status_code=404, detail="Hold not found")
 
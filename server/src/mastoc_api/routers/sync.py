@@ -2,15 +2,30 @@
 Endpoints pour la synchronisation Stokt.
 """
 
+import json
+import uuid
 from datetime import datetime
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, joinedload
 from pydantic import BaseModel
 
-from mastoc_api.database import get_db
-from mastoc_api.models import Climb, Face, Hold, User, Gym, IdMapping
+from mastoc_api.database import get_async_db
+from mastoc_api.models import (
+    Climb, ClimbHold, Face, Hold, User, Gym, IdMapping, ChangeLog, ChangeAction,
+    record_change, record_changes,
+)
+from mastoc_api.models.base import UserRole
+from mastoc_api.models.climb_hold import parse_holds_list
+from mastoc_api.bulk import upsert, insert_rows
 from mastoc_api.config import get_settings
+from mastoc_api.response_cache import mark_changed
+from mastoc_api.routers.climbs import ClimbResponse, climb_to_response
+from mastoc_api.routers.faces import face_setup_response, hold_setup_response
 
 router = APIRouter(prefix="/sync", tags=["sync"])
 
@@ -78,12 +93,20 @@ class ImportHoldRequest(BaseModel):
     left_tape_str: str | None = None
 
 
+class BatchImportError(BaseModel):
+    """Ligne rejetée d'un batch import."""
+    index: int  # position dans le lot
+    stokt_id: str
+    error: str
+
+
 class BatchImportResult(BaseModel):
     """Résultat du batch import."""
     created: int
     updated: int
     errors: int
     total: int
+    row_errors: list[BatchImportError] = []
 
 
 class BatchImportHoldsRequest(BaseModel):
@@ -108,31 +131,140 @@ class ImportGymRequest(BaseModel):
     location_string: str | None = None
 
 
+class ChangeEntry(BaseModel):
+    """Entrée du flux de modifications."""
+    seq: int
+    entity_type: str
+    entity_id: str
+    action: str
+    changed_at: datetime
+    climb: ClimbResponse | None = None
+
+
+class ChangesResponse(BaseModel):
+    """Page du flux de modifications."""
+    changes: list[ChangeEntry]
+    cursor: int
+    has_more: bool
+
+
+class ChangeCursorResponse(BaseModel):
+    """Position courante du journal."""
+    cursor: int
+
+
+# Lignes lues par aller-retour curseur, et regroupées par chunk HTTP
+EXPORT_YIELD_PER = 1000
+EXPORT_CHUNK_LINES = 200
+
+
+# Colonnes d'un hold mises à jour par un nouvel import
+HOLD_UPDATE_COLUMNS = (
+    "face_id", "polygon_str", "centroid_x", "centroid_y", "area", "path_str",
+    "center_tape_str", "right_tape_str", "left_tape_str",
+)
+
+
+def _parse_date_created(value: Optional[str]) -> Optional[datetime]:
+    """Date de création Stokt (ISO 8601) ; None si absente ou invalide."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _row_error(index: int, stokt_id, error: str) -> BatchImportError:
+    return BatchImportError(index=index, stokt_id=str(stokt_id), error=error)
+
+
+def _unique_by_stokt_id(items: list, row_errors: list[BatchImportError]) -> list[tuple]:
+    """
+    (position, item) du lot, un seul par stokt_id : la dernière occurrence
+    gagne, les précédentes sont signalées en erreur (un upsert ne peut pas
+    toucher deux fois la même ligne).
+    """
+    last = {item.stokt_id: index for index, item in enumerate(items)}
+    unique = []
+    for index, item in enumerate(items):
+        if last[item.stokt_id] != index:
+            row_errors.append(_row_error(index, item.stokt_id, "Duplicate stokt_id in batch"))
+        else:
+            unique.append((index, item))
+    return unique
+
+
+async def _stokt_id_map(db: AsyncSession, model, stokt_ids) -> dict:
+    """{stokt_id: id} des entités existantes."""
+    if not stokt_ids:
+        return {}
+    query = select(model.stokt_id, model.id).where(model.stokt_id.in_(stokt_ids))
+    return dict((await db.execute(query)).all())
+
+
+async def _existing_stokt_ids(db: AsyncSession, model, stokt_ids: list) -> set:
+    """stokt_ids déjà importés (pour distinguer créations et mises à jour)."""
+    return set(await _stokt_id_map(db, model, stokt_ids))
+
+
+async def _count(db: AsyncSession, model, *criteria) -> int:
+    """Nombre de lignes de `model` (filtrées par `criteria`)."""
+    return await db.scalar(select(func.count()).select_from(model).where(*criteria))
+
+
+def _mappings(entity_type: str, ids: dict, existing, now: datetime) -> list[dict]:
+    """Lignes id_mappings des entités créées par un upsert."""
+    return [
+        {
+            "entity_type": entity_type,
+            "mastoc_id": mastoc_id,
+            "stokt_id": stokt_id,
+            "sync_direction": "stokt_to_mastoc",
+            "synced_at": now,
+        }
+        for stokt_id, mastoc_id in ids.items()
+        if stokt_id not in existing
+    ]
+
+
+def _batch_result(rows: list[dict], existing, row_errors, total: int) -> BatchImportResult:
+    """Compte créations et mises à jour des lignes écrites."""
+    updated = sum(1 for row in rows if row["stokt_id"] in existing)
+    return BatchImportResult(
+        created=len(rows) - updated,
+        updated=updated,
+        errors=len(row_errors),
+        total=total,
+        row_errors=sorted(row_errors, key=lambda e: e.index),
+    )
+
+
 # --- Endpoints ---
 
 @router.get("/stats", response_model=SyncStats)
-def get_sync_stats(db: Session = Depends(get_db)):
+async def get_sync_stats(db: AsyncSession = Depends(get_async_db)):
     """Retourne les statistiques de la base."""
-    total_climbs = db.query(Climb).count()
-    synced_climbs = db.query(Climb).filter(Climb.stokt_id.isnot(None)).count()
+    total_climbs = await _count(db, Climb)
+    synced_climbs = await _count(db, Climb, Climb.stokt_id.isnot(None))
     local_climbs = total_climbs - synced_climbs
 
     return SyncStats(
-        gyms=db.query(Gym).count(),
-        faces=db.query(Face).count(),
-        holds=db.query(Hold).count(),
+        gyms=await _count(db, Gym),
+        faces=await _count(db, Face),
+        holds=await _count(db, Hold),
         climbs=total_climbs,
-        users=db.query(User).count(),
+        users=await _count(db, User),
         climbs_synced=synced_climbs,
         climbs_local=local_climbs,
     )
 
 
 @router.post("/import/user")
-def import_user(data: ImportUserRequest, db: Session = Depends(get_db)):
+async def import_user(data: ImportUserRequest, db: AsyncSession = Depends(get_async_db)):
     """Importe un user depuis Stokt."""
     # Vérifier si déjà importé
-    existing = db.query(User).filter(User.stokt_id == data.stokt_id).first()
+    existing = await db.scalar(select(User).where(User.stokt_id == data.stokt_id))
     if existing:
         return {"id": str(existing.id), "status": "exists"}
 
@@ -143,32 +275,30 @@ def import_user(data: ImportUserRequest, db: Session = Depends(get_db)):
         source="stokt",
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.flush()
 
-    # Log mapping
-    mapping = IdMapping(
+    # Log mapping (même transaction)
+    db.add(IdMapping(
         entity_type="user",
         mastoc_id=user.id,
         stokt_id=data.stokt_id,
         sync_direction="stokt_to_mastoc",
-    )
-    db.add(mapping)
-    db.commit()
+    ))
+    await db.commit()
 
     return {"id": str(user.id), "status": "created"}
 
 
 @router.post("/import/face")
-def import_face(data: ImportFaceRequest, db: Session = Depends(get_db)):
+async def import_face(data: ImportFaceRequest, db: AsyncSession = Depends(get_async_db)):
     """Importe une face depuis Stokt."""
     # Vérifier si déjà importé
-    existing = db.query(Face).filter(Face.stokt_id == data.stokt_id).first()
+    existing = await db.scalar(select(Face).where(Face.stokt_id == data.stokt_id))
     if existing:
         return {"id": str(existing.id), "status": "exists"}
 
     # Trouver le gym
-    gym = db.query(Gym).filter(Gym.stokt_id == data.gym_stokt_id).first()
+    gym = await db.scalar(select(Gym).where(Gym.stokt_id == data.gym_stokt_id))
     if not gym:
         raise HTTPException(status_code=404, detail="Gym not found")
 
@@ -184,22 +314,22 @@ def import_face(data: ImportFaceRequest, db: Session = Depends(get_db)):
         synced_at=datetime.utcnow(),
     )
     db.add(face)
-    db.commit()
-    db.refresh(face)
+    await db.commit()
+    await db.refresh(face)
 
     return {"id": str(face.id), "status": "created"}
 
 
 @router.post("/import/hold")
-def import_hold(data: ImportHoldRequest, db: Session = Depends(get_db)):
+async def import_hold(data: ImportHoldRequest, db: AsyncSession = Depends(get_async_db)):
     """Importe un hold depuis Stokt."""
     # Vérifier si déjà importé
-    existing = db.query(Hold).filter(Hold.stokt_id == data.stokt_id).first()
+    existing = await db.scalar(select(Hold).where(Hold.stokt_id == data.stokt_id))
     if existing:
         return {"id": existing.id, "status": "exists"}
 
     # Trouver la face
-    face = db.query(Face).filter(Face.stokt_id == data.face_stokt_id).first()
+    face = await db.scalar(select(Face).where(Face.stokt_id == data.face_stokt_id))
     if not face:
         raise HTTPException(status_code=404, detail="Face not found")
 
@@ -216,126 +346,113 @@ def import_hold(data: ImportHoldRequest, db: Session = Depends(get_db)):
         left_tape_str=data.left_tape_str,
     )
     db.add(hold)
-    db.commit()
-    db.refresh(hold)
+    await db.commit()
+    await db.refresh(hold)
 
     return {"id": hold.id, "status": "created"}
 
 
 @router.post("/import/holds/batch", response_model=BatchImportResult)
-def import_holds_batch(data: BatchImportHoldsRequest, db: Session = Depends(get_db)):
-    """Importe plusieurs holds en une seule transaction."""
-    created = 0
-    updated = 0
-    errors = 0
-
-    # Pré-charger les faces
-    face_stokt_ids = {h.face_stokt_id for h in data.holds}
-    faces = db.query(Face).filter(Face.stokt_id.in_(face_stokt_ids)).all()
-    face_map = {f.stokt_id: f for f in faces}
-
-    # Pré-charger les holds existants
-    hold_stokt_ids = {h.stokt_id for h in data.holds}
-    existing_holds = db.query(Hold).filter(Hold.stokt_id.in_(hold_stokt_ids)).all()
-    existing_map = {h.stokt_id: h for h in existing_holds}
-
-    for hold_data in data.holds:
-        try:
-            if hold_data.stokt_id in existing_map:
-                updated += 1
-                continue
-
-            face = face_map.get(hold_data.face_stokt_id)
-            if not face:
-                errors += 1
-                continue
-
-            hold = Hold(
-                stokt_id=hold_data.stokt_id,
-                face_id=face.id,
-                polygon_str=hold_data.polygon_str,
-                centroid_x=hold_data.centroid_x,
-                centroid_y=hold_data.centroid_y,
-                area=hold_data.area,
-                path_str=hold_data.path_str,
-                center_tape_str=hold_data.center_tape_str,
-                right_tape_str=hold_data.right_tape_str,
-                left_tape_str=hold_data.left_tape_str,
-            )
-            db.add(hold)
-            created += 1
-
-        except Exception:
-            errors += 1
-
-    db.commit()
-    return BatchImportResult(created=created, updated=updated, errors=errors, total=len(data.holds))
+async def import_holds_batch(
+    data: BatchImportHoldsRequest, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Importe plusieurs holds : un INSERT ... ON CONFLICT DO UPDATE.
+
+    Un hold déjà importé (même stokt_id) voit sa géométrie mise à jour.
+    """
+    row_errors: list[BatchImportError] = []
+    items = _unique_by_stokt_id(data.holds, row_errors)
+
+    face_map = await _stokt_id_map(db, Face, {h.face_stokt_id for _, h in items})
+    existing = await _existing_stokt_ids(db, Hold, [h.stokt_id for _, h in items])
+
+    rows = []
+    for index, hold_data in items:
+        face_id = face_map.get(hold_data.face_stokt_id)
+        if face_id is None:
+            row_errors.append(_row_error(index, hold_data.stokt_id, "Face not found"))
+            continue
+        rows.append({
+            "stokt_id": hold_data.stokt_id,
+            "face_id": face_id,
+            "polygon_str": hold_data.polygon_str,
+            "centroid_x": hold_data.centroid_x,
+            "centroid_y": hold_data.centroid_y,
+            "area": hold_data.area,
+            "path_str": hold_data.path_str,
+            "center_tape_str": hold_data.center_tape_str,
+            "right_tape_str": hold_data.right_tape_str,
+            "left_tape_str": hold_data.left_tape_str,
+        })
+
+    await db.run_sync(upsert, Hold, rows, "stokt_id", HOLD_UPDATE_COLUMNS)
+    if rows:
+        mark_changed(db, "hold")
+    await db.commit()
+    return _batch_result(rows, existing, row_errors, len(data.holds))
 
 
 @router.post("/import/users/batch", response_model=BatchImportResult)
-def import_users_batch(data: BatchImportUsersRequest, db: Session = Depends(get_db)):
-    """Importe plusieurs users en une seule transaction."""
-    created = 0
-    updated = 0
-    errors = 0
-
-    # Pré-charger les users existants
-    user_stokt_ids = {u.stokt_id for u in data.users}
-    existing_users = db.query(User).filter(User.stokt_id.in_(user_stokt_ids)).all()
-    existing_map = {u.stokt_id: u for u in existing_users}
-
-    for user_data in data.users:
-        try:
-            if user_data.stokt_id in existing_map:
-                updated += 1
-                continue
-
-            user = User(
-                stokt_id=user_data.stokt_id,
-                full_name=user_data.full_name,
-                avatar_path=user_data.avatar_path,
-                source="stokt",
-            )
-            db.add(user)
-            created += 1
-
-        except Exception:
-            errors += 1
-
-    db.commit()
-    return BatchImportResult(created=created, updated=updated, errors=errors, total=len(data.users))
+async def import_users_batch(
+    data: BatchImportUsersRequest, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Importe plusieurs users : un INSERT ... ON CONFLICT DO UPDATE, puis
+    les mappings des users créés en un INSERT.
+    """
+    row_errors: list[BatchImportError] = []
+    items = _unique_by_stokt_id(data.users, row_errors)
+    existing = await _existing_stokt_ids(db, User, [u.stokt_id for _, u in items])
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "stokt_id": user_data.stokt_id,
+            "full_name": user_data.full_name,
+            "avatar_path": user_data.avatar_path,
+            "source": "stokt",
+            "is_active": True,
+            "role": UserRole.USER.value,
+            "created_at": now,
+        }
+        for _, user_data in items
+    ]
+
+    ids = await db.run_sync(upsert, User, rows, "stokt_id", ("full_name", "avatar_path"))
+    await db.run_sync(insert_rows, IdMapping, _mappings("user", ids, existing, now))
+    if rows:
+        mark_changed(db, "user")
+    await db.commit()
+    return _batch_result(rows, existing, row_errors, len(data.users))
 
 
 @router.post("/import/climb")
-def import_climb(data: ImportClimbRequest, db: Session = Depends(get_db)):
+async def import_climb(data: ImportClimbRequest, db: AsyncSession = Depends(get_async_db)):
     """Importe un climb depuis Stokt."""
     # Vérifier si déjà importé
-    existing = db.query(Climb).filter(Climb.stokt_id == data.stokt_id).first()
+    existing = await db.scalar(select(Climb).where(Climb.stokt_id == data.stokt_id))
     if existing:
         # Optionnel : mettre à jour les stats
         existing.climbed_by = data.climbed_by
         existing.total_likes = data.total_likes
         existing.synced_at = datetime.utcnow()
-        db.commit()
+        record_change(db, "climb", existing.id, ChangeAction.UPDATE, face_id=existing.face_id)
+        await db.commit()
         return {"id": str(existing.id), "status": "updated"}
 
     # Trouver la face
-    face = db.query(Face).filter(Face.stokt_id == data.face_stokt_id).first()
+    face = await db.scalar(select(Face).where(Face.stokt_id == data.face_stokt_id))
     if not face:
         raise HTTPException(status_code=404, detail="Face not found")
 
     # Trouver le setter (optionnel)
     setter = None
     if data.setter_stokt_id:
-        setter = db.query(User).filter(User.stokt_id == data.setter_stokt_id).first()
+        setter = await db.scalar(select(User).where(User.stokt_id == data.setter_stokt_id))
 
-    # Parser date_created si fourni
-    created_at = None
-    if data.date_created:
-        try:
-            created_at = datetime.fromisoformat(data.date_created.replace("Z", "+00:00"))
-        except ValueError:
-            created_at = None
+    created_at = _parse_date_created(data.date_created)
 
     climb = Climb(
         stokt_id=data.stokt_id,
@@ -355,107 +472,100 @@ def import_climb(data: ImportClimbRequest, db: Session = Depends(get_db)):
         synced_at=datetime.utcnow(),
     )
     db.add(climb)
-    db.commit()
-    db.refresh(climb)
+    await db.flush()
+    record_change(db, "climb", climb.id, ChangeAction.CREATE, face_id=climb.face_id)
 
-    # Log mapping
-    mapping = IdMapping(
+    # Log mapping (même transaction)
+    db.add(IdMapping(
         entity_type="climb",
         mastoc_id=climb.id,
         stokt_id=data.stokt_id,
         sync_direction="stokt_to_mastoc",
-    )
-    db.add(mapping)
-    db.commit()
+    ))
+    await db.commit()
 
     return {"id": str(climb.id), "status": "created"}
 
 
 @router.post("/import/climbs/batch", response_model=BatchImportResult)
-def import_climbs_batch(data: BatchImportClimbsRequest, db: Session = Depends(get_db)):
-    """Importe plusieurs climbs en une seule transaction."""
-    created = 0
-    updated = 0
-    errors = 0
-
-    # Pré-charger les faces et users pour éviter les requêtes N+1
-    face_stokt_ids = {c.face_stokt_id for c in data.climbs}
-    faces = db.query(Face).filter(Face.stokt_id.in_(face_stokt_ids)).all()
-    face_map = {f.stokt_id: f for f in faces}
-
-    setter_stokt_ids = {c.setter_stokt_id for c in data.climbs if c.setter_stokt_id}
-    users = db.query(User).filter(User.stokt_id.in_(setter_stokt_ids)).all()
-    user_map = {u.stokt_id: u for u in users}
-
-    # Pré-charger les climbs existants
-    climb_stokt_ids = {c.stokt_id for c in data.climbs}
-    existing_climbs = db.query(Climb).filter(Climb.stokt_id.in_(climb_stokt_ids)).all()
-    existing_map = {c.stokt_id: c for c in existing_climbs}
-
-    for climb_data in data.climbs:
-        try:
-            # Vérifier si déjà importé
-            if climb_data.stokt_id in existing_map:
-                existing = existing_map[climb_data.stokt_id]
-                existing.climbed_by = climb_data.climbed_by
-                existing.total_likes = climb_data.total_likes
-                existing.synced_at = datetime.utcnow()
-                updated += 1
-                continue
-
-            # Trouver la face
-            face = face_map.get(climb_data.face_stokt_id)
-            if not face:
-                errors += 1
-                continue
-
-            # Trouver le setter
-            setter = user_map.get(climb_data.setter_stokt_id) if climb_data.setter_stokt_id else None
-
-            # Parser date_created si fourni
-            created_at = None
-            if climb_data.date_created:
-                try:
-                    created_at = datetime.fromisoformat(climb_data.date_created.replace("Z", "+00:00"))
-                except ValueError:
-                    created_at = None
-
-            climb = Climb(
-                stokt_id=climb_data.stokt_id,
-                face_id=face.id,
-                setter_id=setter.id if setter else None,
-                name=climb_data.name,
-                holds_list=climb_data.holds_list,
-                grade_font=climb_data.grade_font,
-                grade_ircra=climb_data.grade_ircra,
-                feet_rule=climb_data.feet_rule,
-                description=climb_data.description,
-                is_private=climb_data.is_private,
-                climbed_by=climb_data.climbed_by,
-                total_likes=climb_data.total_likes,
-                source="stokt",
-                created_at=created_at if created_at else datetime.utcnow(),
-                synced_at=datetime.utcnow(),
-            )
-            db.add(climb)
-            created += 1
-
-        except Exception:
-            errors += 1
-
-    db.commit()
-    return BatchImportResult(
-        created=created,
-        updated=updated,
-        errors=errors,
-        total=len(data.climbs),
+async def import_climbs_batch(
+    data: BatchImportClimbsRequest, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Importe plusieurs climbs en une transaction, une instruction par table.
+
+    climbs : INSERT ... ON CONFLICT DO UPDATE (un climb déjà importé ne
+    voit que ses stats mises à jour) ; puis climb_holds, id_mappings des
+    climbs créés et journal des modifications, chacun en un INSERT.
+    """
+    row_errors: list[BatchImportError] = []
+    items = _unique_by_stokt_id(data.climbs, row_errors)
+
+    face_map = await _stokt_id_map(db, Face, {c.face_stokt_id for _, c in items})
+    setter_map = await _stokt_id_map(
+        db, User, {c.setter_stokt_id for _, c in items if c.setter_stokt_id}
     )
+    # Climbs existants : leur face reste celle déjà enregistrée
+    existing = dict((await db.execute(
+        select(Climb.stokt_id, Climb.face_id)
+        .where(Climb.stokt_id.in_([c.stokt_id for _, c in items]))
+    )).all())
+
+    now = datetime.utcnow()
+    rows = []
+    for index, climb_data in items:
+        face_id = existing.get(climb_data.stokt_id) or face_map.get(climb_data.face_stokt_id)
+        if face_id is None:
+            row_errors.append(_row_error(index, climb_data.stokt_id, "Face not found"))
+            continue
+        rows.append({
+            "id": uuid.uuid4(),
+            "stokt_id": climb_data.stokt_id,
+            "face_id": face_id,
+            "setter_id": setter_map.get(climb_data.setter_stokt_id),
+            "name": climb_data.name,
+            "holds_list": climb_data.holds_list,
+            "grade_font": climb_data.grade_font,
+            "grade_ircra": climb_data.grade_ircra,
+            "feet_rule": climb_data.feet_rule,
+            "description": climb_data.description,
+            "is_private": climb_data.is_private,
+            "climbed_by": climb_data.climbed_by,
+            "total_likes": climb_data.total_likes,
+            "source": "stokt",
+            "created_at": _parse_date_created(climb_data.date_created) or now,
+            "synced_at": now,
+        })
+
+    ids = await db.run_sync(
+        upsert, Climb, rows, "stokt_id", ("climbed_by", "total_likes", "synced_at")
+    )
+
+    created = [row for row in rows if row["stokt_id"] not in existing]
+    await db.run_sync(insert_rows, ClimbHold, [
+        {"climb_id": ids[row["stokt_id"]], "hold_id": hold_id, "hold_type": hold_type}
+        for row in created
+        for hold_id, hold_type in parse_holds_list(row["holds_list"]).items()
+    ])
+    await db.run_sync(insert_rows, IdMapping, _mappings("climb", ids, existing, now))
+    await db.run_sync(record_changes, "climb", [
+        (
+            ids[row["stokt_id"]],
+            ChangeAction.UPDATE if row["stokt_id"] in existing else ChangeAction.CREATE,
+            row["face_id"],
+        )
+        for row in rows
+    ])
+    if rows:
+        mark_changed(db, "climb")
+    await db.commit()
+    return _batch_result(rows, existing, row_errors, len(data.climbs))
 
 
 @router.post("/import/gym")
-def import_gym(data: ImportGymRequest, db: Session = Depends(get_db)):
+async def import_gym(data: ImportGymRequest, db: AsyncSession = Depends(get_async_db)):
     """Importe un gym depuis Stokt."""
-    existing = db.query(Gym).filter(Gym.stokt_id == data.stokt_id).first()
+    existing = await db.scalar(select(Gym).where(Gym.stokt_id == data.stokt_id))
     if existing:
         return {"id": str(existing.id), "status": "exists"}
 
@@ -466,7 +576,176 @@ def import_gym(data: ImportGymRequest, db: Session = Depends(get_db)):
         source="stokt",
     )
     db.add(gym)
-    db.commit()
-    db.refresh(gym)
+    await db.commit()
+    await db.refresh(gym)
 
     return {"id": str(gym.id), "status": "created"}
+
+
+@router.get("/changes", response_model=ChangesResponse)
+async def get_changes(
+    cursor: int = Query(0, ge=0, description="Dernier numéro de séquence déjà appliqué"),
+    limit: int = Query(500, ge=1, le=2000),
+    face_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Retourne les modifications postérieures au curseur.
+
+    Plusieurs modifications d'une même entité dans la page sont fusionnées
+    en une seule entrée (la plus récente). Pour les créations et mises à
+    jour, l'état courant du climb est inclus ; un climb supprimé depuis
+    est renvoyé comme tombstone (action "delete", climb null). Les autres
+    entités (ex: hold_annotation) sont signalées sans contenu.
+    Le client rejoue la page puis passe `cursor` à l'appel suivant.
+    """
+    query = select(ChangeLog).where(ChangeLog.seq > cursor)
+    if face_id:
+        query = query.where(ChangeLog.face_id == face_id)
+    query = query.order_by(ChangeLog.seq).limit(limit + 1)
+
+    entries = (await db.execute(query)).scalars().all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    next_cursor = entries[-1].seq if entries else cursor
+
+    # Garder la dernière entrée par entité
+    latest: dict[tuple[str, str], ChangeLog] = {}
+    for entry in entries:
+        latest[(entry.entity_type, entry.entity_id)] = entry
+    collapsed = sorted(latest.values(), key=lambda e: e.seq)
+
+    # Charger les climbs concernés en une requête
+    climb_ids = [
+        UUID(e.entity_id) for e in collapsed
+        if e.entity_type == "climb" and e.action != ChangeAction.DELETE.value
+    ]
+    climbs = {}
+    if climb_ids:
+        climb_query = (
+            select(Climb)
+            .where(Climb.id.in_(climb_ids))
+            .options(selectinload(Climb.setter))
+        )
+        climbs = {str(c.id): c for c in (await db.execute(climb_query)).scalars().all()}
+
+    changes = []
+    for entry in collapsed:
+        climb = climbs.get(entry.entity_id)
+        action = entry.action
+        if entry.entity_type == "climb" and climb is None:
+            action = ChangeAction.DELETE.value
+        changes.append(ChangeEntry(
+            seq=entry.seq,
+            entity_type=entry.entity_type,
+            entity_id=entry.entity_id,
+            action=action,
+            changed_at=entry.changed_at,
+            climb=climb_to_response(climb) if climb else None,
+        ))
+
+    return ChangesResponse(changes=changes, cursor=next_cursor, has_more=has_more)
+
+
+@router.get("/changes/head", response_model=ChangeCursorResponse)
+async def get_changes_head(db: AsyncSession = Depends(get_async_db)):
+    """
+    Retourne le numéro de séquence courant du journal.
+
+    À lire avant une sync complète : le rejeu ultérieur depuis ce curseur
+    couvre toutes les modifications faites pendant le téléchargement.
+    """
+    head = (await db.execute(select(func.max(ChangeLog.seq)))).scalar()
+    return ChangeCursorResponse(cursor=head or 0)
+
+
+def _ndjson(record_type: str, payload: dict) -> str:
+    """Une ligne NDJSON typée."""
+    return json.dumps({"type": record_type, **payload}, default=str) + "\n"
+
+
+async def _export_face_lines(db: AsyncSession, face: Face, cursor: int) -> AsyncIterator[str]:
+    """Lignes de l'export d'une face, lues par lots depuis un curseur serveur."""
+    climbs_filter = Climb.face_id == face.id
+    total_climbs = (await db.execute(select(func.count()).where(climbs_filter))).scalar()
+    counts = {"holds": 0, "setters": 0, "climbs": 0}
+
+    yield _ndjson("snapshot", {"face_id": str(face.id), "cursor": cursor})
+    header = face_setup_response(face, [], total_climbs).model_dump(mode="json", exclude={"holds"})
+    yield _ndjson("face", header)
+
+    holds = await db.stream_scalars(
+        select(Hold).where(Hold.face_id == face.id).order_by(Hold.id)
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+    )
+    async for hold in holds:
+        counts["holds"] += 1
+        yield _ndjson("hold", hold_setup_response(hold).model_dump(mode="json"))
+
+    setters = await db.stream(
+        select(User.id, User.full_name)
+        .where(User.id.in_(select(Climb.setter_id).where(climbs_filter)))
+        .order_by(User.id)
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+    )
+    async for setter_id, full_name in setters:
+        counts["setters"] += 1
+        yield _ndjson("setter", {"id": str(setter_id), "full_name": full_name})
+
+    climbs = await db.stream_scalars(
+        select(Climb).where(climbs_filter)
+        .options(joinedload(Climb.setter))
+        .order_by(Climb.created_at, Climb.id)
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+    )
+    async for climb in climbs:
+        counts["climbs"] += 1
+        yield _ndjson("climb", climb_to_response(climb).model_dump(mode="json"))
+        # Ne pas garder en session les climbs déjà envoyés
+        db.expunge(climb)
+
+    yield _ndjson("end", {"counts": counts})
+
+
+async def _chunked(
+    lines: AsyncIterator[str], size: int = EXPORT_CHUNK_LINES
+) -> AsyncIterator[bytes]:
+    """Regroupe les lignes en chunks HTTP."""
+    buffer = []
+    async for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield "".join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+@router.get("/export/face/{face_id}")
+async def export_face(face_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """
+    Export complet d'une face en NDJSON (une ligne JSON par entité).
+
+    Lignes, dans l'ordre : "snapshot" (curseur du journal), "face",
+    "hold"*, "setter"*, "climb"*, puis "end" avec le nombre de lignes de
+    chaque type (un flux sans "end" est tronqué). Les lignes sont lues par
+    lots de EXPORT_YIELD_PER depuis un curseur serveur et envoyées au fil
+    de l'eau : la mémoire ne dépend pas de la taille de la face.
+
+    L'export est lu dans une seule transaction (REPEATABLE READ sous
+    PostgreSQL) : `cursor` est la position du journal à cet instant, le
+    client rejoue /sync/changes depuis ce curseur pour rattraper les
+    modifications faites pendant le téléchargement.
+    """
+    if db.bind.dialect.name == "postgresql":
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    cursor = (await db.execute(select(func.max(ChangeLog.seq)))).scalar() or 0
+    face = await db.get(Face, face_id)
+    if not face:
+        raise HTTPException(status_code=404, detail="Face not found")
+
+    return StreamingResponse(
+        _chunked(_export_face_lines(db, face, cursor)),
+        media_type="application/x-ndjson",
+    )
@@ -6,6 +6,7 @@ Routes protégées par JWT :
 - PATCH /users/me - Modifier son profil
 - POST /users/me/avatar - Upload avatar
 - GET /users/{id} - Profil public d'un utilisateur
+- GET /users/{id}/avatar?size= - Miniature de l'avatar (public)
 - GET /users - Liste des utilisateurs (admin)
 """
 
@@ -13,15 +14,23 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
-import os
-from pathlib import Path
 
-from mastoc_api.database import get_db
+from mastoc_api.avatars import (
+    AVATAR_MEDIA_TYPE,
+    InvalidAvatar,
+    avatar_url,
+    find_avatar,
+    snap_size,
+    store_avatar,
+)
+from mastoc_api.database import get_async_db, get_db
 from mastoc_api.models import User
 from mastoc_api.models.base import UserRole
 from mastoc_api.dependencies import (
@@ -29,14 +38,15 @@ from mastoc_api.dependencies import (
     get_admin_user,
     AuthenticatedUser,
 )
-from mastoc_api.security import get_password_hash
+from mastoc_api.http_cache import is_not_modified
+from mastoc_api.principal_cache import Principal
+from mastoc_api.password_hashing import password_hasher
 
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-# Dossier pour les avatars
-AVATAR_DIR = Path("/tmp/mastoc_avatars")
-AVATAR_DIR.mkdir(exist_ok=True)
+# Avatar demandé avec sa version courante : immuable
+AVATAR_IMMUTABLE = "public, max-age=31536000, immutable"
 
 
 # --- Schemas ---
@@ -93,15 +103,28 @@ class MessageResponse(BaseModel):
     message: str
 
 
+def _load_current_user(db: Session, principal: Principal) -> User:
+    """Utilisateur connecté, relu dans la session du router."""
+    user = db.get(User, principal.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Utilisateur non trouvé.",
+        )
+    return user
+
+
 # --- Endpoints ---
 
 @router.get("/me", response_model=UserProfile)
 def get_current_user_profile(
-    current_user: User = Depends(get_current_active_user)
+    principal: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
 ):
     """
     Récupère le profil de l'utilisateur connecté.
     """
+    current_user = _load_current_user(db, principal)
     return UserProfile(
         id=current_user.id,
         email=current_user.email,
@@ -118,12 +141,14 @@ def get_current_user_profile(
 @router.patch("/me", response_model=UserProfile)
 def update_current_user_profile(
     update_data: UpdateProfile,
-    current_user: User = Depends(get_current_active_user),
+    principal: Principal = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """
     Met à jour le profil de l'utilisateur connecté.
     """
+    current_user = _load_current_user(db, principal)
+
     # Vérifier unicité du username si modifié
     if update_data.username and update_data.username != current_user.username:
         existing = db.query(User).filter(User.username == update_data.username).first()
@@ -156,15 +181,20 @@ def update_current_user_profile(
 
 
 @router.post("/me/password", response_model=MessageResponse)
-def change_password(
+async def change_password(
     data: ChangePassword,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Changer son mot de passe.
     """
-    from mastoc_api.security import verify_password
+    current_user = await db.get(User, principal.id)
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Utilisateur non trouvé.",
+        )
 
     if not current_user.password_hash:
         raise HTTPException(
@@ -172,15 +202,15 @@ def change_password(
             detail="Ce compte n'a pas de mot de passe. Utilisez 'Mot de passe oublié'."
         )
 
-    if not verify_password(data.current_password, current_user.password_hash):
+    if not await password_hasher.verify(data.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Mot de passe actuel incorrect"
         )
 
-    current_user.password_hash = get_password_hash(data.new_password)
+    current_user.password_hash = await password_hasher.hash(data.new_password)
     current_user.updated_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
 
     return MessageResponse(message="Mot de passe mis à jour")
 
@@ -188,7 +218,7 @@ def change_password(
 @router.post("/me/avatar", response_model=MessageResponse)
 async def upload_avatar(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_active_user),
+    principal: Principal = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -196,6 +226,9 @@ async def upload_avatar(
 
     Formats acceptés : JPG, PNG, GIF
     Taille max : 2 MB
+
+    L'image est convertie en miniatures WebP (voir avatars) ; le
+    fichier d'origine n'est pas conservé.
     """
     # Vérifier le type
     if file.content_type not in ["image/jpeg", "image/png", "image/gif"]:
@@ -214,29 +247,18 @@ async def upload_avatar(
             detail="Fichier trop volumineux. Maximum 2 MB."
         )
 
-    # Déterminer l'extension
-    ext = {
-        "image/jpeg": ".jpg",
-        "image/png": ".png",
-        "image/gif": ".gif",
-    }.get(file.content_type, ".jpg")
-
-    # Sauvegarder
-    avatar_filename = f"{current_user.id}{ext}"
-    avatar_path = AVATAR_DIR / avatar_filename
-
-    # Supprimer l'ancien avatar si existe
-    if current_user.avatar_path:
-        old_path = AVATAR_DIR / current_user.avatar_path.split("/")[-1]
-        if old_path.exists():
-            old_path.unlink()
-
-    # Écrire le nouveau
-    with open(avatar_path, "wb") as f:
-        f.write(content)
-
-    # Mettre à jour le chemin en DB
-    current_user.avatar_path = f"/api/users/{current_user.id}/avatar"
+    # Miniatures : décodage et réencodage hors de la boucle d'événements
+    try:
+        version = await run_in_threadpool(store_avatar, principal.id, content)
+    except InvalidAvatar:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Image illisible ou trop grande."
+        )
+
+    # Mettre à jour le chemin en DB (URL versionnée)
+    current_user = _load_current_user(db, principal)
+    current_user.avatar_path = avatar_url(current_user.id, version)
     current_user.updated_at = datetime.utcnow()
     db.commit()
 
@@ -267,32 +289,35 @@ def get_user_public_profile(
 
 
 @router.get("/{user_id}/avatar")
-def get_user_avatar(user_id: UUID, db: Session = Depends(get_db)):
+def get_user_avatar(
+    user_id: UUID,
+    request: Request,
+    size: Optional[int] = Query(None, ge=1, le=1024, description="Côté affiché (px)"),
+    v: Optional[str] = Query(None, description="Version (URL publiée)"),
+):
     """
     Télécharge l'avatar d'un utilisateur.
+
+    Sert la plus petite miniature couvrant `size` (px). Demandé avec la
+    version courante (?v=, URL publiée dans avatar_path), l'avatar est
+    immuable : Cache-Control long. Sans version : revalidation par ETag.
     """
-    user = db.get(User, user_id)
-    if not user:
+    found = find_avatar(user_id, snap_size(size))
+    if found is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Utilisateur non trouvé"
+            detail="Avatar non trouvé"
         )
 
-    # Chercher le fichier avatar
-    for ext in [".jpg", ".png", ".gif"]:
-        avatar_path = AVATAR_DIR / f"{user_id}{ext}"
-        if avatar_path.exists():
-            media_type = {
-                ".jpg": "image/jpeg",
-                ".png": "image/png",
-                ".gif": "image/gif",
-            }.get(ext, "image/jpeg")
-            return FileResponse(avatar_path, media_type=media_type)
-
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Avatar non trouvé"
-    )
+    path, version = found
+    etag = f'"{version}-{snap_size(size)}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": AVATAR_IMMUTABLE if v == version else "no-cache",
+    }
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=AVATAR_MEDIA_TYPE, headers=headers)
 
 
 @router.get("", response_model=UsersListResponse)
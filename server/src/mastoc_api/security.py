@@ -6,11 +6,11 @@ from datetime import datetime, timedelta
 from typing import Optional
 import uuid
 
-import bcrypt
 from jose import JWTError, jwt
 from pydantic import BaseModel
 
 from mastoc_api.config import get_settings
+from mastoc_api.password_hashing import check_password, hash_password
 
 # Algorithme JWT
 ALGORITHM = "HS256"
@@ -21,6 +21,10 @@ class TokenData(BaseModel):
     user_id: uuid.UUID
     email: Optional[str] = None
     role: str = "user"
+    jti: Optional[str] = None  # identifiant du token (absent des anciens tokens)
+    is_active: Optional[bool] = None  # claim act (absent des anciens tokens)
+    issued_at: Optional[float] = None  # epoch
+    expires_at: Optional[float] = None  # epoch
 
 
 class Token(BaseModel):
@@ -32,24 +36,25 @@ class Token(BaseModel):
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Vérifie un mot de passe contre son hash."""
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+    """
+    Vérifie un mot de passe contre son hash (bloquant).
+
+    Les routes passent par password_hasher (pool dédié).
+    """
+    return check_password(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash un mot de passe."""
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    """Hash un mot de passe au coût configuré (bloquant, scripts)."""
+    return hash_password(password, get_settings().bcrypt_rounds)
 
 
 def create_access_token(
     user_id: uuid.UUID,
     email: str,
     role: str,
-    expires_delta: Optional[timedelta] = None
+    expires_delta: Optional[timedelta] = None,
+    is_active: bool = True,
 ) -> str:
     """
     Crée un token JWT d'accès.
@@ -59,6 +64,8 @@ def create_access_token(
         email: Email de l'utilisateur
         role: Rôle (user/admin)
         expires_delta: Durée de validité (optionnel)
+        is_active: État du compte à l'émission (claim act, chemin rapide
+            de l'authentification)
 
     Returns:
         Token JWT encodé
@@ -74,7 +81,9 @@ def create_access_token(
         "sub": str(user_id),
         "email": email,
         "role": role,
+        "act": is_active,
         "type": "access",
+        "jti": uuid.uuid4().hex,
         "exp": expire,
         "iat": datetime.utcnow(),
     }
@@ -120,7 +129,11 @@ def decode_token(token: str) -> Optional[TokenData]:
         return TokenData(
             user_id=uuid.UUID(user_id_str),
             email=payload.get("email"),
-            role=payload.get("role", "user")
+            role=payload.get("role", "user"),
+            jti=payload.get("jti"),
+            is_active=payload.get("act"),
+            issued_at=payload.get("iat"),
+            expires_at=payload.get("exp"),
         )
     except JWTError:
         return None
@@ -0,0 +1,158 @@
+"""
+Pyramide de tuiles des photos de murs (disposition Deep Zoom).
+
+Une photo de face (plusieurs Mo, des dizaines de mégapixels) était
+téléchargée entière puis décodée en pleine résolution par chaque
+visionneuse. Elle est découpée une fois en tuiles JPEG de TILE_SIZE px,
+à tous les niveaux de résolution : le niveau max_level est l'image
+d'origine, chaque niveau inférieur divise les côtés par deux, jusqu'au
+niveau 0 (1x1 px). Un client ne charge que les tuiles du niveau et de la
+zone affichés.
+
+La pyramide est rangée sous STATIC_DIR/tiles/<version>/, la version étant
+dérivée du chemin, de la taille et de la date de la photo : une URL de
+tuile ne change jamais de contenu. info.json, écrit en dernier, marque
+une pyramide complète.
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+STATIC_DIR = Path(__file__).parent.parent.parent / "static"
+
+TILE_SIZE = 256
+TILE_FORMAT = "jpg"
+TILE_MEDIA_TYPE = "image/jpeg"
+TILE_QUALITY = 85
+
+# Photos de murs : bien au-delà de la limite par défaut de Pillow
+MAX_SOURCE_PIXELS = 200_000_000
+
+_build_locks: dict[str, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+
+
+@dataclass(frozen=True)
+class TilePyramid:
+    """Description d'une pyramide générée."""
+    version: str
+    width: int
+    height: int
+    tile_size: int
+    max_level: int
+    format: str
+
+    def level_size(self, level: int) -> tuple[int, int]:
+        """Dimensions de l'image au niveau donné."""
+        scale = 2 ** (self.max_level - level)
+        return max(1, math.ceil(self.width / scale)), max(1, math.ceil(self.height / scale))
+
+    def grid(self, level: int) -> tuple[int, int]:
+        """(colonnes, lignes) de tuiles au niveau donné."""
+        width, height = self.level_size(level)
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+
+def tiles_root() -> Path:
+    return STATIC_DIR / "tiles"
+
+
+def pyramid_version(source: Path, picture_path: str) -> str:
+    """Version d'une pyramide : change si la photo est remplacée."""
+    stat = source.stat()
+    key = f"{picture_path}:{stat.st_size}:{stat.st_mtime_ns}:{TILE_SIZE}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def tile_path(version: str, level: int, col: int, row: int) -> Path:
+    """Fichier d'une tuile."""
+    return tiles_root() / version / str(level) / f"{col}_{row}.{TILE_FORMAT}"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _save_tile(image: Image.Image, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    image.save(tmp, "JPEG", quality=TILE_QUALITY)
+    os.replace(tmp, path)
+
+
+def build_pyramid(source: Path, version: str) -> TilePyramid:
+    """Découpe la photo en tuiles à tous les niveaux."""
+    Image.MAX_IMAGE_PIXELS = MAX_SOURCE_PIXELS
+    with Image.open(source) as original:
+        image = original.convert("RGB")
+
+    pyramid = TilePyramid(
+        version=version,
+        width=image.width,
+        height=image.height,
+        tile_size=TILE_SIZE,
+        max_level=math.ceil(math.log2(max(image.width, image.height, 1))),
+        format=TILE_FORMAT,
+    )
+    for level in range(pyramid.max_level, -1, -1):
+        size = pyramid.level_size(level)
+        if image.size != size:
+            # Chaque niveau part du précédent (moitié)
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        cols, rows = pyramid.grid(level)
+        for col in range(cols):
+            for row in range(rows):
+                box = (
+                    col * TILE_SIZE,
+                    row * TILE_SIZE,
+                    min((col + 1) * TILE_SIZE, size[0]),
+                    min((row + 1) * TILE_SIZE, size[1]),
+                )
+                _save_tile(image.crop(box), tile_path(version, level, col, row))
+
+    _write_atomic(tiles_root() / version / "info.json", json.dumps(asdict(pyramid)).encode())
+    return pyramid
+
+
+def _load_info(version: str) -> Optional[TilePyramid]:
+    info = tiles_root() / version / "info.json"
+    if not info.exists():
+        return None
+    return TilePyramid(**json.loads(info.read_text()))
+
+
+def ensure_pyramid(picture_path: str) -> Optional[TilePyramid]:
+    """
+    Pyramide d'une photo de STATIC_DIR, générée au premier appel.
+
+    Bloquant (plusieurs secondes pour une grande photo) : à appeler hors
+    de la boucle d'événements.
+
+    Returns:
+        La pyramide, ou None si la photo n'est pas sous STATIC_DIR
+    """
+    root = STATIC_DIR.resolve()
+    source = (root / picture_path).resolve()
+    if not source.is_relative_to(root) or not source.is_file():
+        return None
+
+    version = pyramid_version(source, picture_path)
+    pyramid = _load_info(version)
+    if pyramid is not None:
+        return pyramid
+
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(version, threading.Lock())
+    with lock:
+        # Une autre requête a pu la générer pendant l'attente
+        return _load_info(version) or build_pyramid(source, version)
@@ -0,0 +1,65 @@
+"""
+Format de transfert compact (JSON colonnaire) pour les réponses volumineuses.
+
+Les listes d'objets homogènes (climbs, holds) répètent chaque nom de clé
+pour chaque ligne. En format colonnaire, une liste de dicts partageant les
+mêmes clés devient :
+
+    {"__columns__": ["id", "name", ...], "__rows__": [[...], [...]]}
+
+Le format est opt-in : le client l'annonce via
+`Accept: application/vnd.mastoc.columnar+json`. Sinon la réponse reste
+en JSON standard.
+"""
+
+import json
+from typing import Any
+
+from fastapi import Request
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.mastoc.columnar+json"
+JSON_MEDIA_TYPE = "application/json"
+
+# En dessous, le gain ne compense pas la structure supplémentaire
+MIN_COLUMNAR_ROWS = 2
+
+
+def wants_columnar(request: Request) -> bool:
+    """True si le client accepte le format colonnaire."""
+    return COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def to_columnar(value: Any) -> Any:
+    """Convertit récursivement les listes de dicts homogènes en colonnes."""
+    if isinstance(value, dict):
+        return {k: to_columnar(v) for k, v in value.items()}
+
+    if isinstance(value, list):
+        if (
+            len(value) >= MIN_COLUMNAR_ROWS
+            and all(isinstance(item, dict) for item in value)
+        ):
+            columns = list(value[0].keys())
+            if all(list(item.keys()) == columns for item in value):
+                return {
+                    "__columns__": columns,
+                    "__rows__": [
+                        [to_columnar(item[c]) for c in columns] for item in value
+                    ],
+                }
+        return [to_columnar(item) for item in value]
+
+    return value
+
+
+def encode_payload(request: Request, data: Any) -> tuple[bytes, str]:
+    """
+    Encode des données JSON-compatibles selon le format négocié.
+
+    Returns:
+        (corps, media_type)
+    """
+    if wants_columnar(request):
+        body = json.dumps(to_columnar(data), separators=(",", ":"))
+        return body.encode(), COLUMNAR_MEDIA_TYPE
+    return json.dumps(data, separators=(",", ":")).encode(), JSON_MEDIA_TYPE
@@ -3,27 +3,54 @@ Configuration des tests pytest pour mastoc-api.
 """
 
 import os
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from mastoc_api.database import Base, get_db
+# Coût bcrypt minimal : les tests ne mesurent pas la robustesse des hashs
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+# Base de donnees SQLite (fichier temporaire) pour les tests : partagee par
+# la pile synchrone (pysqlite) et la pile asynchrone (aiosqlite). Fixee
+# avant l'import de l'application, dont le moteur synchrone (lifespan) se
+# connecte sinon au PostgreSQL par defaut
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="mastoc-tests-"), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{_DB_PATH}"
+os.environ.setdefault("DATABASE_URL", SQLALCHEMY_DATABASE_URL)
+
+from mastoc_api.database import Base, get_async_db, get_db
 from mastoc_api.main import app
 from mastoc_api.config import get_settings
+from mastoc_api.principal_cache import principal_cache
+from mastoc_api.response_cache import response_cache
+from mastoc_api.routers.climbs import clear_count_cache
 
 
-# Base de donnees SQLite en memoire pour les tests
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    poolclass=NullPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool : chaque TestClient a sa propre boucle d'evenements, une
+# connexion aiosqlite ne doit pas lui survivre
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{_DB_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _fast_sqlite(dbapi_connection, connection_record):
+    """Pas de fsync (base jetable)."""
+    dbapi_connection.execute("PRAGMA synchronous=OFF")
+
 
 # Session partagee pour les tests (permet aux fixtures de partager les donnees)
 _test_db = None
@@ -42,6 +69,12 @@ def override_get_db():
             db.close()
 
 
+async def override_get_async_db():
+    """Surcharge pour utiliser la DB de test (pile asynchrone)."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Cree une DB fraiche pour chaque test."""
@@ -49,6 +82,9 @@ def db_session():
     # Nettoyer settings cache
     os.environ.pop("API_KEY", None)
     get_settings.cache_clear()
+    clear_count_cache()
+    response_cache.clear()
+    principal_cache.clear()
 
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
@@ -71,6 +107,7 @@ def db(db_session):
 def client(db_session):
     """Client de test avec DB fraiche."""
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -5,24 +5,11 @@ Tests pour l'authentification par API Key.
 import os
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
-from mastoc_api.database import Base, get_db
+from mastoc_api.database import Base, get_async_db, get_db
 from mastoc_api.main import app
 from mastoc_api.config import get_settings
-
-
-# Base de données SQLite en mémoire pour les tests
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from tests.conftest import TestingSessionLocal, engine, override_get_async_db
 
 
 def override_get_db():
@@ -41,6 +28,7 @@ def client_no_auth():
     get_settings.cache_clear()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     Base.metadata.create_all(bind=engine)
     with TestClient(app) as c:
         yield c
@@ -56,6 +44,7 @@ def client_with_auth():
     get_settings.cache_clear()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     Base.metadata.create_all(bind=engine)
     with TestClient(app) as c:
         yield c
@@ -26,7 +26,10 @@ def _setup_gym_face(client):
     return face_id, face_stokt_id
 
 
-def _create_climb(client, face_stokt_id, name="Test Bloc", grade_font="6A"):
+def _create_climb(
+    client, face_stokt_id, name="Test Bloc", grade_font="6A",
+    holds_list="S1,S2,O3,T4", grade_ircra=15.0, climbed_by=0,
+):
     """Helper pour créer un climb."""
     climb_stokt_id = str(uuid.uuid4())
     response = client.post(
@@ -35,9 +38,10 @@ def _create_climb(client, face_stokt_id, name="Test Bloc", grade_font="6A"):
             "stokt_id": climb_stokt_id,
             "face_stokt_id": face_stokt_id,
             "name": name,
-            "holds_list": "S1,S2,O3,T4",
+            "holds_list": holds_list,
             "grade_font": grade_font,
-            "grade_ircra": 15.0,
+            "grade_ircra": grade_ircra,
+            "climbed_by": climbed_by,
         }
     )
     return response.json()["id"], climb_stokt_id
@@ -83,6 +87,153 @@ def test_list_climbs_pagination(client):
     assert len(data["results"]) == 2
 
 
+def test_list_climbs_keyset_pagination(client):
+    """Test pagination par curseur : mêmes climbs que par pages, sans doublon."""
+    face_id, face_stokt_id = _setup_gym_face(client)
+    for i in range(5):
+        _create_climb(client, face_stokt_id, f"Bloc {i}")
+
+    by_page = []
+    for page in (1, 2, 3):
+        response = client.get("/api/climbs", params={"page": page, "page_size": 2})
+        by_page += [c["id"] for c in response.json()["results"]]
+
+    by_cursor = []
+    params = {"page_size": 2, "with_count": "false"}
+    while True:
+        data = client.get("/api/climbs", params=params).json()
+        assert data["count"] is None
+        by_cursor += [c["id"] for c in data["results"]]
+        if not data["next_cursor"]:
+            break
+        params["after"] = data["next_cursor"]
+
+    assert len(by_cursor) == 5
+    assert by_cursor == by_page
+
+
+def test_list_climbs_invalid_cursor(client):
+    """Test curseur invalide."""
+    response = client.get("/api/climbs", params={"after": "pas-un-curseur"})
+    assert response.status_code == 400
+
+
+def test_list_climbs_count_follows_writes(client):
+    """Test le compte mis en cache est invalidé par une création."""
+    face_id, face_stokt_id = _setup_gym_face(client)
+    _create_climb(client, face_stokt_id, "Bloc A")
+    assert client.get("/api/climbs").json()["count"] == 1
+
+    _create_climb(client, face_stokt_id, "Bloc B")
+    assert client.get("/api/climbs").json()["count"] == 2
+
+
+def test_list_climbs_setter_name(client, db_session):
+    """Test setter_name renseigné (chargement joint des ouvreurs)."""
+    from mastoc_api.models import Climb, User
+
+    face_id, face_stokt_id = _setup_gym_face(client)
+    climb_id, _ = _create_climb(client, face_stokt_id, "Bloc A")
+    setter = User(id=uuid.uuid4(), full_name="Ouvreur Test")
+    db_session.add(setter)
+    db_session.get(Climb, uuid.UUID(climb_id)).setter_id = setter.id
+    db_session.commit()
+    db_session.expire_all()
+
+    data = client.get("/api/climbs").json()
+    assert data["results"][0]["setter_name"] == "Ouvreur Test"
+
+
+def _names(response):
+    return [c["name"] for c in response.json()["results"]]
+
+
+def test_list_climbs_grade_filter(client):
+    """Test filtre de grade : cotation Font (plage entière) ou IRCRA."""
+    face_id, face_stokt_id = _setup_gym_face(client)
+    _create_climb(client, face_stokt_id, "Facile", grade_font="5", grade_ircra=14.5)
+    _create_climb(client, face_stokt_id, "Moyen", grade_font="6A", grade_ircra=16.0)
+    _create_climb(client, face_stokt_id, "Dur", grade_font="7A", grade_ircra=21.0)
+
+    response = client.get("/api/climbs", params={"grade_min": "6A", "grade_max": "6A"})
+    assert _names(response) == ["Moyen"]
+    assert response.json()["count"] == 1
+
+    response = client.get("/api/climbs", params={"grade_min": "15", "sort_by": "grade"})
+    assert _names(response) == ["Moyen", "Dur"]
+
+    response = client.get("/api/climbs", params={"grade_max": "8A"})
+    assert len(_names(response)) == 3
+
+    response = client.get("/api/climbs", params={"grade_min": "9Z"})
+    assert response.status_code == 400
+
+
+def test_list_climbs_sort(client):
+    """Test tri serveur et pagination par curseur sur une clé de tri."""
+    face_id, face_stokt_id = _setup_gym_face(client)
+    for name, climbed_by in (("B", 5), ("A", 20), ("C", 5)):
+        _create_climb(client, face_stokt_id, name, climbed_by=climbed_by)
+
+    response = client.get("/api/climbs", params={"sort_by": "name"})
+    assert _names(response) == ["A", "B", "C"]
+
+    params = {"sort_by": "climbed_by", "sort_desc": "true", "page_size": 1}
+    names = []
+    while True:
+        data = client.get("/api/climbs", params=params).json()
+        names += [c["name"] for c in data["results"]]
+        if not data["next_cursor"]:
+            break
+        params["after"] = data["next_cursor"]
+    assert names[0] == "A"
+    assert sorted(names[1:]) == ["B", "C"]
+
+    # Curseur d'un autre tri refusé
+    params["sort_by"] = "name"
+    assert client.get("/api/climbs", params=params).status_code == 400
+
+
+def test_list_climbs_hold_filter(client):
+    """Test filtre par prises (toutes / au moins une) via climb_holds."""
+    face_id, face_stokt_id = _setup_gym_face(client)
+    climb_id, _ = _create_climb(client, face_stokt_id, "AB", holds_list="S10 O11 T12")
+    _create_climb(client, face_stokt_id, "A", holds_list="S10 O13 T14")
+    _create_climb(client, face_stokt_id, "Autre", holds_list="S20 T21")
+
+    response = client.get("/api/climbs", params={"holds": "10,11"})
+    assert _names(response) == ["AB"]
+    assert response.json()["count"] == 1
+
+    response = client.get("/api/climbs", params={"holds": "11,13", "hold_match": "any"})
+    assert sorted(_names(response)) == ["A", "AB"]
+
+    # Modifier holds_list met à jour l'index des prises
+    client.patch(f"/api/climbs/{climb_id}", json={"holds_list": "S20 T12"})
+    response = client.get("/api/climbs", params={"holds": "10,11"})
+    assert _names(response) == []
+    response = client.get("/api/climbs", params={"holds": "20"})
+    assert sorted(_names(response)) == ["AB", "Autre"]
+
+    assert client.get("/api/climbs", params={"holds": "x"}).status_code == 400
+
+
+def test_climb_holds_rebuild(client, db_session):
+    """Test reconstruction de climb_holds depuis holds_list."""
+    from mastoc_api.models import ClimbHold
+    from mastoc_api.models.climb_hold import ensure_climb_holds_built
+
+    face_id, face_stokt_id = _setup_gym_face(client)
+    _create_climb(client, face_stokt_id, "A", holds_list="S1 O2 O2 T3")
+    assert db_session.query(ClimbHold).count() == 3
+
+    db_session.query(ClimbHold).delete()
+    db_session.commit()
+    assert ensure_climb_holds_built(db_session) is True
+    assert db_session.query(ClimbHold).count() == 3
+    assert ensure_climb_holds_built(db_session) is False
+
+
 def test_get_climb_by_id(client):
     """Test récupération climb par ID."""
     face_id, face_stokt_id = _setup_gym_face(client)
@@ -259,3 +410,50 @@ def test_bulk_update_dates_partial_errors(client):
     data = response.json()
     assert data["updated"] == 1
     assert data["errors"] == 1
+
+
+def test_list_climbs_conditional(client):
+    """Test ETag sur une page de climbs : 304 puis 200 après modification."""
+    face_id, face_stokt_id = _setup_gym_face(client)
+    climb_id, _ = _create_climb(client, face_stokt_id, "Bloc A")
+
+    first = client.get("/api/climbs")
+    etag = first.headers["etag"]
+    assert "last-modified" in first.headers
+
+    response = client.get("/api/climbs", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    client.patch(f"/api/climbs/{climb_id}", json={"name": "Bloc A bis"})
+    response = client.get("/api/climbs", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["results"][0]["name"] == "Bloc A bis"
+
+
+def test_create_climbs_batch(client):
+    """Test création en lot : résultats dans l'ordre, face inconnue signalée."""
+    face_id, _ = _setup_gym_face(client)
+
+    response = client.post(
+        "/api/climbs/batch",
+        json={"climbs": [
+            {"client_ref": "a", "face_id": face_id, "name": "Bloc A", "holds_list": "S1 T2"},
+            {"client_ref": "b", "face_id": str(uuid.uuid4()), "name": "Bloc B", "holds_list": "S1 T2"},
+            {"client_ref": "c", "face_id": face_id, "name": "Bloc C", "holds_list": "S3 T4"},
+        ]}
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["client_ref"] for r in results] == ["a", "b", "c"]
+    assert results[0]["climb"]["name"] == "Bloc A"
+    assert results[0]["climb"]["source"] == "mastoc"
+    assert results[1]["climb"] is None
+    assert results[1]["error"] == "Face not found"
+
+    listing = client.get("/api/climbs").json()
+    assert listing["count"] == 2
+
+    changes = client.get("/api/sync/changes").json()["changes"]
+    assert [c["entity_id"] for c in changes if c["action"] == "create"] == [
+        results[0]["climb"]["id"], results[2]["climb"]["id"]
+    ]
@@ -0,0 +1,69 @@
+"""
+Tests de la configuration des deux piles de base de données.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mastoc_api import database
+from mastoc_api.database import async_database_url, pool_options
+
+
+def test_async_database_url_postgresql():
+    """postgresql:// passe sur asyncpg, identifiants conservés."""
+    url = async_database_url("postgresql://user:secret@db:5432/mastoc")
+    assert url == "postgresql+asyncpg://user:secret@db:5432/mastoc"
+
+
+def test_async_database_url_explicit_driver():
+    """Un pilote synchrone explicite est remplacé."""
+    url = async_database_url("postgresql+psycopg2://user:secret@db/mastoc")
+    assert url == "postgresql+asyncpg://user:secret@db/mastoc"
+
+
+def test_async_database_url_sqlite():
+    """SQLite (tests) passe sur aiosqlite."""
+    assert async_database_url("sqlite:////tmp/test.db") == "sqlite+aiosqlite:////tmp/test.db"
+
+
+def test_async_database_url_unsupported():
+    """Dialecte sans pilote asynchrone connu."""
+    with pytest.raises(ValueError):
+        async_database_url("mysql://user@db/mastoc")
+
+
+def test_pool_options():
+    """Pool réglé pour PostgreSQL uniquement."""
+    options = pool_options("postgresql://user@db/mastoc")
+    assert set(options) == {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"}
+    assert pool_options("sqlite:////tmp/test.db") == {}
+
+
+def test_import_does_not_create_async_engine():
+    """Importer l'application ne charge pas le pilote asynchrone (asyncpg)."""
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    code = (
+        "import sys, mastoc_api.main, mastoc_api.database as d; "
+        "assert d._async_engine is None; "
+        "assert 'asyncpg' not in sys.modules"
+    )
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+async def test_async_engine_created_once_and_disposed(monkeypatch):
+    """Moteur asynchrone créé au premier usage, réutilisé, libéré à l'arrêt."""
+    monkeypatch.setattr(database.settings, "database_url", "sqlite:///:memory:")
+    monkeypatch.setattr(database, "_async_engine", None)
+    monkeypatch.setattr(database, "_async_sessionmaker", None)
+
+    engine = database.get_async_engine()
+    assert database.get_async_engine() is engine
+    assert database.get_async_sessionmaker().kw["bind"] is engine
+
+    await database.dispose_async_engine()
+    assert database._async_engine is None
@@ -183,3 +183,174 @@ class TestGetFaceSetupByStoktId:
 
         data = response.json()
         assert len(data["holds"]) == 5
+
+
+class TestFaceSetupConditional:
+    """Tests ETag / If-None-Match sur le setup d'une face."""
+
+    def test_setup_has_validators(self, client, api_key_header, test_face, test_holds):
+        """La réponse porte un ETag fort et Last-Modified."""
+        response = client.get(f"/api/faces/{test_face.id}/setup", headers=api_key_header)
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert "last-modified" in response.headers
+
+    def test_setup_not_modified(self, client, api_key_header, test_face, test_holds):
+        """If-None-Match avec l'ETag courant renvoie 304 sans corps."""
+        first = client.get(f"/api/faces/{test_face.id}/setup", headers=api_key_header)
+        etag = first.headers["etag"]
+
+        response = client.get(
+            f"/api/faces/{test_face.id}/setup",
+            headers={**api_key_header, "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_setup_etag_changes_with_holds(
+        self, client, api_key_header, db_session, test_face, test_holds
+    ):
+        """Un hold modifié change l'ETag : le client reçoit 200."""
+        etag = client.get(
+            f"/api/faces/{test_face.id}/setup", headers=api_key_header
+        ).headers["etag"]
+
+        test_holds[0].polygon_str = "0,0 10,0 10,10"
+        db_session.commit()
+
+        response = client.get(
+            f"/api/faces/{test_face.id}/setup",
+            headers={**api_key_header, "If-None-Match": etag},
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_by_stokt_id_setup_not_modified(self, client, api_key_header, test_face, test_holds):
+        """Le setup par stokt_id supporte aussi If-None-Match."""
+        url = f"/api/faces/by-stokt-id/{test_face.stokt_id}/setup"
+        etag = client.get(url, headers=api_key_header).headers["etag"]
+
+        response = client.get(url, headers={**api_key_header, "If-None-Match": etag})
+        assert response.status_code == 304
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch, test_face):
+    """Dossier statique temporaire contenant la photo de la face (1000x1500)."""
+    from PIL import Image
+
+    from mastoc_api import tiles
+
+    monkeypatch.setattr(tiles, "STATIC_DIR", tmp_path)
+    picture = tmp_path / test_face.picture_path
+    picture.parent.mkdir(parents=True)
+    Image.new("RGB", (1000, 1500), (120, 80, 40)).save(picture, "JPEG")
+    return tmp_path
+
+
+class TestFaceTiles:
+    """Tests pour la pyramide de tuiles (GET /api/faces/{id}/tiles)."""
+
+    def test_tiles_descriptor(self, client, api_key_header, test_face, static_dir):
+        """Descripteur : dimensions, niveaux, gabarit d'URL."""
+        response = client.get(f"/api/faces/{test_face.id}/tiles", headers=api_key_header)
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["width"], data["height"]) == (1000, 1500)
+        assert data["tile_size"] == 256
+        assert data["max_level"] == 11  # ceil(log2(1500))
+        assert data["url_template"] == (
+            f"/api/faces/tiles/{data['version']}/{{level}}/{{col}}_{{row}}.jpg"
+        )
+        assert response.headers["etag"] == f'"{data["version"]}"'
+
+    def test_tiles_not_modified(self, client, api_key_header, test_face, static_dir):
+        """Descripteur inchangé : 304."""
+        first = client.get(f"/api/faces/{test_face.id}/tiles", headers=api_key_header)
+        response = client.get(
+            f"/api/faces/{test_face.id}/tiles",
+            headers={**api_key_header, "If-None-Match": first.headers["etag"]},
+        )
+        assert response.status_code == 304
+
+    def test_tiles_by_stokt_id(self, client, api_key_header, test_face, static_dir):
+        """Même pyramide par ID Stokt."""
+        by_id = client.get(f"/api/faces/{test_face.id}/tiles", headers=api_key_header)
+        response = client.get(
+            f"/api/faces/by-stokt-id/{test_face.stokt_id}/tiles", headers=api_key_header
+        )
+        assert response.status_code == 200
+        assert response.json()["version"] == by_id.json()["version"]
+
+    def test_tile_content(self, client, api_key_header, test_face, static_dir):
+        """Tuiles : pleine taille au centre, tronquées au bord, immuables."""
+        import io
+
+        from PIL import Image
+
+        data = client.get(f"/api/faces/{test_face.id}/tiles", headers=api_key_header).json()
+        url = data["url_template"]
+
+        response = client.get(url.format(level=11, col=0, row=0), headers=api_key_header)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        assert "immutable" in response.headers["cache-control"]
+        assert Image.open(io.BytesIO(response.content)).size == (256, 256)
+
+        # Dernière colonne au niveau max : 1000 - 3 * 256 = 232 px
+        response = client.get(url.format(level=11, col=3, row=5), headers=api_key_header)
+        assert Image.open(io.BytesIO(response.content)).size == (232, 1500 - 5 * 256)
+
+        # Niveau 9 : 250x375, une seule colonne
+        response = client.get(url.format(level=9, col=0, row=1), headers=api_key_header)
+        assert Image.open(io.BytesIO(response.content)).size == (250, 375 - 256)
+
+        response = client.get(
+            url.format(level=11, col=0, row=0),
+            headers={**api_key_header, "If-None-Match": f'"{data["version"]}-11-0-0"'},
+        )
+        assert response.status_code == 304
+
+    def test_tile_out_of_grid(self, client, api_key_header, test_face, static_dir):
+        """Tuile hors de la grille : 404."""
+        data = client.get(f"/api/faces/{test_face.id}/tiles", headers=api_key_header).json()
+        response = client.get(
+            data["url_template"].format(level=11, col=4, row=0), headers=api_key_header
+        )
+        assert response.status_code == 404
+
+    def test_tile_invalid_version(self, client, api_key_header):
+        """Version mal formée (traversée de chemin) : refusée."""
+        response = client.get("/api/faces/tiles/..%2F..%2Fetc/0/0_0.jpg", headers=api_key_header)
+        assert response.status_code in (404, 422)
+        response = client.get("/api/faces/tiles/nothex/0/0_0.jpg", headers=api_key_header)
+        assert response.status_code == 422
+
+    def test_tiles_missing_picture(self, client, api_key_header, test_face, tmp_path, monkeypatch):
+        """Photo absente du dossier statique : 404."""
+        from mastoc_api import tiles
+
+        monkeypatch.setattr(tiles, "STATIC_DIR", tmp_path)
+        response = client.get(f"/api/faces/{test_face.id}/tiles", headers=api_key_header)
+        assert response.status_code == 404
+
+    def test_pyramid_version_changes_with_picture(self, test_face, static_dir):
+        """Photo remplacée : nouvelle version, l'ancienne pyramide reste valide."""
+        from PIL import Image
+
+        from mastoc_api.tiles import ensure_pyramid
+
+        first = ensure_pyramid(test_face.picture_path)
+        assert ensure_pyramid(test_face.picture_path) == first
+
+        Image.new("RGB", (600, 400)).save(static_dir / test_face.picture_path, "JPEG")
+        second = ensure_pyramid(test_face.picture_path)
+        assert second.version != first.version
+        assert (second.width, second.height, second.max_level) == (600, 400, 10)
+
+    def test_pyramid_rejects_outside_static(self, static_dir):
+        """Chemin hors du dossier statique : pas de pyramide."""
+        from mastoc_api.tiles import ensure_pyramid
+
+        assert ensure_pyramid("../../etc/passwd") is None
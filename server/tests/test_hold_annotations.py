@@ -8,25 +8,18 @@ import os
 import uuid
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
-from mastoc_api.database import Base, get_db
+from mastoc_api.database import Base, get_async_db, get_db
 from mastoc_api.main import app
 from mastoc_api.config import get_settings
-from mastoc_api.models import Gym, Face, Hold, User, HoldAnnotation
-from mastoc_api.models.base import UserRole
-
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+from mastoc_api.models import Gym, Face, Hold, User, HoldAnnotation, HoldConsensusVote
+from mastoc_api.models.hold_consensus import (
+    check_consensus, rebuild_consensus, ensure_consensus_built,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from mastoc_api.models.base import UserRole
+from tests.conftest import TestingSessionLocal, engine, override_get_async_db
 
 
 _test_db = None
@@ -67,6 +60,7 @@ def client(db_session):
     os.environ.pop("API_KEY", None)
     get_settings.cache_clear()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -414,3 +408,284 @@ def test_batch_annotations_nonexistent_holds(client, api_key_header):
     assert response.status_code == 200
     data = response.json()
     assert len(data["annotations"]) == 0
+
+
+def test_batch_annotations_constant_queries(
+    client, db_session, test_face, user_token, second_user_token, api_key_header
+):
+    """Le batch calcule le consensus en un nombre constant de requêtes."""
+    holds = [
+        Hold(stokt_id=900000 + i, face_id=test_face.id, polygon_str="0,0 1,0 1,1",
+             centroid_x=0.0, centroid_y=0.0, area=1.0)
+        for i in range(30)
+    ]
+    db_session.add_all(holds)
+    db_session.commit()
+    for hold in holds:
+        client.put(
+            f"/api/holds/{hold.id}/annotations",
+            headers={"Authorization": f"Bearer {user_token}"},
+            json={"grip_type": "plat", "condition": "ok"}
+        )
+    client.put(
+        f"/api/holds/{holds[0].id}/annotations",
+        headers={"Authorization": f"Bearer {second_user_token}"},
+        json={"grip_type": "plat", "difficulty": "dure"}
+    )
+
+    hold_ids = [hold.id for hold in holds]
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", count)
+    try:
+        response = client.post(
+            "/api/holds/annotations/batch",
+            headers={"Authorization": f"Bearer {user_token}"},
+            json={"hold_ids": hold_ids + [999999]}
+        )
+    finally:
+        event.remove(Engine, "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    annotations = response.json()["annotations"]
+    assert len(annotations) == 30
+    first = annotations[str(hold_ids[0])]
+    assert first["consensus"]["total_annotators"] == 2
+    assert first["consensus"]["grip_type_votes"] == 2
+    assert first["consensus"]["difficulty"] == "dure"
+    assert first["consensus"]["condition_confidence"] == 1.0
+    assert first["user_annotation"]["grip_type"] == "plat"
+    # auth + existence des prises + totaux + modes + annotations utilisateur
+    assert len(statements) <= 8
+
+
+def test_batch_consensus_tie_is_deterministic(
+    client, test_hold, user_token, second_user_token, api_key_header
+):
+    """En cas d'égalité, la plus petite valeur l'emporte."""
+    for token, grip_type in ((user_token, "reglette"), (second_user_token, "plat")):
+        client.put(
+            f"/api/holds/{test_hold.id}/annotations",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"grip_type": grip_type}
+        )
+
+    response = client.post(
+        "/api/holds/annotations/batch",
+        headers=api_key_header,
+        json={"hold_ids": [test_hold.id]}
+    )
+    consensus = response.json()["annotations"][str(test_hold.id)]["consensus"]
+    assert consensus["grip_type"] == "plat"
+    assert consensus["grip_type_confidence"] == 0.5
+
+
+# === Tests consensus matérialisé ===
+
+def test_consensus_table_follows_writes(
+    client, db_session, test_hold, user_token, second_user_token
+):
+    """Les histogrammes restent cohérents après créations, modifications et suppressions."""
+    user_auth = {"Authorization": f"Bearer {user_token}"}
+    second_auth = {"Authorization": f"Bearer {second_user_token}"}
+    hold_id = test_hold.id
+
+    client.put(f"/api/holds/{hold_id}/annotations", headers=user_auth,
+               json={"grip_type": "plat", "condition": "ok"})
+    client.put(f"/api/holds/{hold_id}/annotations", headers=second_auth,
+               json={"grip_type": "plat"})
+    client.put(f"/api/holds/{hold_id}/annotations", headers=user_auth,
+               json={"grip_type": "bac", "condition": ""})
+    client.post("/api/holds/annotations/bulk", headers=second_auth,
+                json={"items": [{"hold_id": hold_id, "difficulty": "dure"}]})
+
+    assert check_consensus(db_session) == []
+    votes = {
+        (row.dimension, row.value): row.votes
+        for row in db_session.query(HoldConsensusVote).filter_by(hold_id=hold_id)
+    }
+    assert votes == {
+        ("annotators", ""): 2,
+        ("grip_type", "bac"): 1,
+        ("grip_type", "plat"): 1,
+        ("difficulty", "dure"): 1,
+    }
+
+    client.delete(f"/api/holds/{hold_id}/annotations", headers=user_auth)
+    client.post("/api/holds/annotations/bulk", headers=second_auth,
+                json={"items": [{"hold_id": hold_id, "delete": True}]})
+
+    assert check_consensus(db_session) == []
+    assert db_session.query(HoldConsensusVote).count() == 0
+
+
+def test_consensus_rebuild_and_check(client, db_session, test_hold, user_token, api_key_header):
+    """La vérification détecte un écart, la reconstruction le corrige."""
+    client.put(
+        f"/api/holds/{test_hold.id}/annotations",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"grip_type": "pince"}
+    )
+    db_session.query(HoldConsensusVote).delete()
+    db_session.commit()
+    assert check_consensus(db_session) == [test_hold.id]
+
+    assert ensure_consensus_built(db_session) is True
+    assert check_consensus(db_session) == []
+    assert ensure_consensus_built(db_session) is False
+
+    response = client.get(f"/api/holds/{test_hold.id}/annotations", headers=api_key_header)
+    assert response.json()["consensus"]["grip_type"] == "pince"
+
+    assert rebuild_consensus(db_session, [test_hold.id]) == 2
+
+
+# === Tests écritures en lot ===
+
+def test_bulk_write_requires_jwt(client, api_key_header, test_hold):
+    """Les écritures en lot requièrent JWT."""
+    response = client.post(
+        "/api/holds/annotations/bulk",
+        headers=api_key_header,
+        json={"items": [{"hold_id": test_hold.id, "grip_type": "bac"}]}
+    )
+    assert response.status_code == 401
+
+
+def test_bulk_write_set_and_delete(client, db_session, test_face, test_hold, user_token):
+    """Un lot crée, modifie et supprime ; les prises inconnues sont signalées."""
+    other = Hold(
+        stokt_id=829002,
+        face_id=test_face.id,
+        polygon_str="0,0 10,0 10,10",
+        centroid_x=5.0,
+        centroid_y=5.0,
+        area=50.0,
+    )
+    db_session.add(other)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {user_token}"}
+    client.put(
+        f"/api/holds/{other.id}/annotations",
+        headers=headers,
+        json={"grip_type": "plat"}
+    )
+
+    response = client.post(
+        "/api/holds/annotations/bulk",
+        headers=headers,
+        json={"items": [
+            {"hold_id": test_hold.id, "grip_type": "bac", "condition": "ok"},
+            {"hold_id": test_hold.id, "condition": ""},
+            {"hold_id": other.id, "delete": True},
+            {"hold_id": 999999, "grip_type": "bac"},
+        ]}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["applied"] == 3
+    assert data["errors"] == {"999999": "Hold not found"}
+
+    annotation = client.get(
+        f"/api/holds/{test_hold.id}/annotations", headers=headers
+    ).json()["user_annotation"]
+    assert annotation["grip_type"] == "bac"
+    assert annotation["condition"] is None
+    deleted = client.get(
+        f"/api/holds/{other.id}/annotations", headers=headers
+    ).json()
+    assert deleted["user_annotation"] is None
+
+
+def test_bulk_write_delete_missing_is_idempotent(client, test_hold, user_token):
+    """Supprimer une annotation absente n'est pas une erreur."""
+    response = client.post(
+        "/api/holds/annotations/bulk",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"items": [{"hold_id": test_hold.id, "delete": True}]}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"applied": 1, "errors": {}}
+
+
+# === Tests annotations d'un mur ===
+
+def test_wall_annotations_snapshot_and_delta(client, test_face, test_hold, user_token, api_key_header):
+    """Instantané complet puis delta via updated_since (suppressions incluses)."""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    client.put(
+        f"/api/holds/{test_hold.id}/annotations",
+        headers=headers,
+        json={"grip_type": "bac"}
+    )
+
+    response = client.get(
+        f"/api/holds/annotations/face/{test_face.id}",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 1
+    assert data["annotations"][0]["hold_stokt_id"] == 829001
+    assert data["annotations"][0]["consensus"]["grip_type"] == "bac"
+    assert data["annotations"][0]["user_annotation"]["grip_type"] == "bac"
+    since = data["server_time"]
+
+    delta = client.get(
+        f"/api/holds/annotations/face/{test_face.id}",
+        headers=api_key_header,
+        params={"updated_since": since},
+    ).json()
+    assert delta["count"] == 0
+
+    client.delete(f"/api/holds/{test_hold.id}/annotations", headers=headers)
+    delta = client.get(
+        f"/api/holds/annotations/face/{test_face.id}",
+        headers=api_key_header,
+        params={"updated_since": since},
+    ).json()
+    assert delta["count"] == 1
+    assert delta["annotations"][0]["hold_id"] == test_hold.id
+    assert delta["annotations"][0]["consensus"]["total_annotators"] == 0
+
+
+def test_wall_annotations_pagination(client, db_session, test_face, user_token, api_key_header):
+    """Les prises annotées sont paginées par id."""
+    holds = []
+    for i in range(3):
+        hold = Hold(
+            stokt_id=830000 + i,
+            face_id=test_face.id,
+            polygon_str="0,0 10,0 10,10",
+            centroid_x=5.0,
+            centroid_y=5.0,
+            area=50.0,
+        )
+        db_session.add(hold)
+        holds.append(hold)
+    db_session.commit()
+    client.post(
+        "/api/holds/annotations/bulk",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"items": [{"hold_id": h.id, "condition": "ok"} for h in holds]}
+    )
+
+    page = client.get(
+        f"/api/holds/annotations/face/{test_face.id}",
+        headers=api_key_header,
+        params={"page": 2, "page_size": 2},
+    ).json()
+    assert page["count"] == 3
+    assert [a["hold_id"] for a in page["annotations"]] == [max(h.id for h in holds)]
+
+
+def test_wall_annotations_face_not_found(client, api_key_header):
+    """Mur inexistant."""
+    response = client.get(
+        f"/api/holds/annotations/face/{uuid.uuid4()}",
+        headers=api_key_header,
+    )
+    assert response.status_code == 404
@@ -217,3 +217,12 @@ def test_hold_response_empty_tape_fields(client, api_key_header, test_holds_with
     assert data.get("center_tape_str") is None or data.get("center_tape_str") == ""
     assert data.get("right_tape_str") is None or data.get("right_tape_str") == ""
     assert data.get("left_tape_str") is None or data.get("left_tape_str") == ""
+
+
+def test_list_holds_not_modified(client, api_key_header, test_face, test_holds):
+    """Test If-None-Match sur la liste des holds."""
+    url = f"/api/holds?face_id={test_face.id}"
+    etag = client.get(url, headers=api_key_header).headers["etag"]
+
+    response = client.get(url, headers={**api_key_header, "If-None-Match": f'"other", {etag}'})
+    assert response.status_code == 304
@@ -5,23 +5,13 @@ Tests pour l'authentification JWT (register, login, refresh, etc.).
 import os
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
-from mastoc_api.database import Base, get_db
+from mastoc_api.database import Base, get_async_db, get_db
 from mastoc_api.main import app
 from mastoc_api.config import get_settings
-
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from mastoc_api.models import User
+from mastoc_api.principal_cache import principal_cache
+from tests.conftest import TestingSessionLocal, engine, override_get_async_db
 
 
 def override_get_db():
@@ -37,8 +27,10 @@ def client():
     """Client de test avec DB fraîche (dev mode, pas d'API Key)."""
     os.environ.pop("API_KEY", None)
     get_settings.cache_clear()
+    principal_cache.clear()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     Base.metadata.create_all(bind=engine)
     with TestClient(app) as c:
         yield c
@@ -312,3 +304,145 @@ def test_change_password_wrong_current(client):
         }
     )
     assert response.status_code == 400
+
+
+# === Cache des utilisateurs authentifiés ===
+
+def _login(client) -> str:
+    client.post("/api/auth/register", json={
+        "email": "test@example.com",
+        "username": "testuser",
+        "password": "password123",
+        "full_name": "Test User"
+    })
+    response = client.post("/api/auth/login", data={
+        "username": "testuser",
+        "password": "password123"
+    })
+    return response.json()["access_token"]
+
+
+def _deactivate(username: str):
+    with TestingSessionLocal() as db:
+        user = db.query(User).filter(User.username == username).one()
+        user.is_active = False
+        db.commit()
+
+
+def test_principal_cached_between_requests(client):
+    """Le token n'est résolu en base qu'une fois."""
+    headers = {"Authorization": f"Bearer {_login(client)}"}
+
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+    stats = client.get("/health/auth-cache").json()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+
+def test_deactivation_invalidates_cached_principal(client):
+    """Un compte désactivé est refusé malgré le principal en cache."""
+    headers = {"Authorization": f"Bearer {_login(client)}"}
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+    _deactivate("testuser")
+
+    assert client.get("/api/users/me", headers=headers).status_code == 401
+
+
+def test_password_change_invalidates_cached_principal(client):
+    """Le changement de mot de passe force une relecture en base."""
+    headers = {"Authorization": f"Bearer {_login(client)}"}
+    client.post("/api/users/me/password", headers=headers, json={
+        "current_password": "password123",
+        "new_password": "newpassword456"
+    })
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+    stats = client.get("/health/auth-cache").json()
+    assert (stats["misses"], stats["hits"]) == (2, 0)
+
+
+def test_logout_revokes_token(client):
+    """Le token fourni à la déconnexion n'est plus accepté."""
+    token = _login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+
+    assert client.get("/api/users/me", headers=headers).status_code == 401
+    assert client.post("/api/auth/logout").status_code == 200  # sans token
+
+
+def test_trusted_claims_fast_path(client):
+    """Claims de confiance : pas de résolution, sauf après invalidation."""
+    os.environ["AUTH_TRUST_TOKEN_CLAIMS"] = "true"
+    get_settings.cache_clear()
+    try:
+        headers = {"Authorization": f"Bearer {_login(client)}"}
+        assert client.get("/api/users/me", headers=headers).status_code == 200
+        stats = client.get("/health/auth-cache").json()
+        assert (stats["fast_path"], stats["misses"]) == (1, 0)
+
+        # Token émis avant la désactivation : plus de confiance
+        _deactivate("testuser")
+        assert client.get("/api/users/me", headers=headers).status_code == 401
+    finally:
+        os.environ.pop("AUTH_TRUST_TOKEN_CLAIMS", None)
+        get_settings.cache_clear()
+
+
+# === Pool bcrypt ===
+
+def test_password_hash_rounds_parsing():
+    """Coût lu dans le hash bcrypt."""
+    from mastoc_api.password_hashing import hash_password, hash_rounds
+
+    assert hash_rounds(hash_password("password123", 4)) == 4
+    assert hash_rounds("pas-un-hash") is None
+
+
+def test_login_rehashes_on_cost_change(client):
+    """Un hash d'un autre coût est recalculé à la connexion."""
+    _login(client)
+    os.environ["BCRYPT_ROUNDS"] = "5"
+    get_settings.cache_clear()
+    try:
+        response = client.post("/api/auth/login", data={
+            "username": "testuser",
+            "password": "password123"
+        })
+        assert response.status_code == 200
+        with TestingSessionLocal() as db:
+            user = db.query(User).filter(User.username == "testuser").one()
+            assert user.password_hash.startswith("$2b$05$")
+
+        stats = client.get("/health/password-hashing").json()
+        assert stats["rehashed"] == 1
+        assert stats["rounds"] == 5
+        assert stats["verify"]["count"] >= 2
+    finally:
+        os.environ["BCRYPT_ROUNDS"] = "4"
+        get_settings.cache_clear()
+
+
+def test_login_rejected_when_hash_queue_full(client):
+    """File bcrypt pleine : 503 + Retry-After, sans attendre."""
+    from mastoc_api.password_hashing import password_hasher
+
+    _login(client)
+    os.environ["BCRYPT_MAX_PENDING"] = "0"
+    get_settings.cache_clear()
+    password_hasher.shutdown()
+    try:
+        response = client.post("/api/auth/login", data={
+            "username": "testuser",
+            "password": "password123"
+        })
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+    finally:
+        os.environ.pop("BCRYPT_MAX_PENDING", None)
+        get_settings.cache_clear()
+        password_hasher.shutdown()
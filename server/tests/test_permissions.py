@@ -11,25 +11,13 @@ Couvre les scenarios:
 import os
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
-from mastoc_api.database import Base, get_db
+from mastoc_api.database import Base, get_async_db, get_db
 from mastoc_api.main import app
 from mastoc_api.config import get_settings
 from mastoc_api.models import User
 from mastoc_api.models.base import UserRole
-
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from tests.conftest import TestingSessionLocal, engine, override_get_async_db
 
 
 _test_db = None
@@ -70,6 +58,7 @@ def client_dev_mode(db_session):
     os.environ.pop("API_KEY", None)
     get_settings.cache_clear()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -82,6 +71,7 @@ def client_prod_mode(db_session):
     os.environ["API_KEY"] = "secret-api-key-12345"
     get_settings.cache_clear()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -0,0 +1,161 @@
+"""
+Tests du cache de réponses (setup, faces, holds, premières pages de climbs).
+"""
+
+import time
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from mastoc_api.models import User
+from mastoc_api.response_cache import CachedResponse, ResponseCache, response_cache
+
+
+def _setup_face(client):
+    """Crée gym + face + 2 holds, retourne (face_id, face_stokt_id)."""
+    gym_stokt_id = str(uuid.uuid4())
+    face_stokt_id = str(uuid.uuid4())
+    client.post("/api/sync/import/gym", json={"stokt_id": gym_stokt_id, "display_name": "Gym"})
+    face_id = client.post("/api/sync/import/face", json={
+        "stokt_id": face_stokt_id,
+        "gym_stokt_id": gym_stokt_id,
+        "picture_path": "images/face.jpg",
+    }).json()["id"]
+    for stokt_id in (1, 2):
+        client.post("/api/sync/import/hold", json={
+            "stokt_id": stokt_id, "face_stokt_id": face_stokt_id, "polygon_str": "0,0 1,1",
+        })
+    return face_id, face_stokt_id
+
+
+class _Statements:
+    """Compte les requêtes SQL exécutées dans un bloc with (toutes piles)."""
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(Engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def test_setup_served_from_cache(client, db_session):
+    """Un setup déjà servi ne touche plus la base, ETag compris."""
+    face_id, _ = _setup_face(client)
+    url = f"/api/faces/{face_id}/setup"
+    first = client.get(url)
+
+    with _Statements() as statements:
+        second = client.get(url)
+        not_modified = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+
+    assert statements.count == 0
+    assert second.content == first.content
+    assert not_modified.status_code == 304
+    stats = client.get("/health/cache").json()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_writes_invalidate_dependent_responses(client):
+    """Une création de climb invalide setup, faces et climbs mais pas les holds."""
+    face_id, _ = _setup_face(client)
+    setup = client.get(f"/api/faces/{face_id}/setup").json()
+    faces = client.get("/api/faces").json()
+    client.get("/api/climbs", params={"face_id": face_id})
+    client.get("/api/holds", params={"face_id": face_id})
+    assert setup["total_climbs"] == 0
+
+    client.post("/api/climbs", json={"face_id": face_id, "name": "Bloc", "holds_list": "S1 T2"})
+
+    assert client.get(f"/api/faces/{face_id}/setup").json()["total_climbs"] == 1
+    assert client.get("/api/faces").json()[0]["climbs_count"] == faces[0]["climbs_count"] + 1
+    assert client.get("/api/climbs", params={"face_id": face_id}).json()["count"] == 1
+
+    hits = response_cache.hits
+    client.get("/api/holds", params={"face_id": face_id})
+    assert response_cache.hits == hits + 1
+
+
+def test_hold_import_invalidates_holds(client):
+    """Un import de hold invalide la liste des holds."""
+    face_id, face_stokt_id = _setup_face(client)
+    assert client.get("/api/holds", params={"face_id": face_id}).json()["count"] == 2
+
+    client.post("/api/sync/import/hold", json={
+        "stokt_id": 3, "face_stokt_id": face_stokt_id, "polygon_str": "0,0 1,1",
+    })
+    assert client.get("/api/holds", params={"face_id": face_id}).json()["count"] == 3
+
+
+def test_deep_pages_not_cached(client):
+    """Seules les premières pages (sans curseur) sont mises en cache."""
+    face_id, _ = _setup_face(client)
+    client.get("/api/climbs", params={"page": 10})
+    client.get("/api/climbs", params={"page": 10})
+    assert response_cache.stats()["entries"] == 0
+
+    client.get("/api/climbs", params={"page": 1})
+    assert response_cache.stats()["entries"] == 1
+
+
+def test_only_user_rename_invalidates(db_session):
+    """Seul un changement de nom d'utilisateur change la version "user"."""
+    user = User(id=uuid.uuid4(), full_name="Ouvreur")
+    db_session.add(user)
+    db_session.commit()
+    version = response_cache.versions(("user",))
+
+    user.updated_at = user.created_at
+    db_session.commit()
+    assert response_cache.versions(("user",)) == version
+
+    user.full_name = "Ouvreuse"
+    db_session.commit()
+    assert response_cache.versions(("user",)) != version
+
+
+def test_rollback_keeps_version(db_session):
+    """Une écriture annulée n'invalide rien."""
+    version = response_cache.versions(("user",))
+    user = User(id=uuid.uuid4(), full_name="Ouvreur")
+    db_session.add(user)
+    db_session.flush()
+    user.full_name = "Autre"
+    db_session.flush()
+    db_session.rollback()
+    assert response_cache.versions(("user",)) == version
+
+
+def test_lru_eviction_by_size():
+    """Le cache est borné en octets et évince les entrées les moins récentes."""
+    cache = ResponseCache(max_bytes=100, ttl=60)
+
+    def entry(size):
+        return CachedResponse(b"x" * size, "application/json", '"e"', None, time.monotonic())
+
+    cache.put("a", entry(40))
+    cache.put("b", entry(40))
+    assert cache.get("a") is not None  # "a" devient le plus récent
+    cache.put("c", entry(40))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["bytes"] == 80
+    assert stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+
+
+def test_ttl_expiry():
+    """Une entrée plus vieille que le TTL n'est plus servie."""
+    cache = ResponseCache(max_bytes=100, ttl=60)
+    cache.put("a", CachedResponse(b"x", "application/json", '"e"', None, time.monotonic() - 61))
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
@@ -258,3 +258,282 @@ def test_import_climb_update(client):
     # Toujours 1 seul climb
     stats = client.get("/api/sync/stats").json()
     assert stats["climbs"] == 1
+
+
+def _setup_face(client):
+    """Helper pour créer gym + face, retourne (face_id, face_stokt_id)."""
+    gym_stokt_id = str(uuid.uuid4())
+    face_stokt_id = str(uuid.uuid4())
+    client.post(
+        "/api/sync/import/gym",
+        json={"stokt_id": gym_stokt_id, "display_name": "Test Gym"}
+    )
+    response = client.post(
+        "/api/sync/import/face",
+        json={
+            "stokt_id": face_stokt_id,
+            "gym_stokt_id": gym_stokt_id,
+            "picture_path": "images/face.jpg",
+        }
+    )
+    return response.json()["id"], face_stokt_id
+
+
+def test_changes_empty(client):
+    """Test flux de modifications vide."""
+    response = client.get("/api/sync/changes")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["changes"] == []
+    assert data["cursor"] == 0
+    assert data["has_more"] is False
+
+    head = client.get("/api/sync/changes/head").json()
+    assert head["cursor"] == 0
+
+
+def test_changes_create_update_delete(client):
+    """Test create/update/delete apparaissent dans le flux avec tombstone."""
+    face_id, _ = _setup_face(client)
+
+    created = client.post(
+        "/api/climbs",
+        json={"face_id": face_id, "name": "Bloc A", "holds_list": "S1 T2"}
+    ).json()
+    other = client.post(
+        "/api/climbs",
+        json={"face_id": face_id, "name": "Bloc B", "holds_list": "S3 T4"}
+    ).json()
+
+    data = client.get("/api/sync/changes").json()
+    assert [c["action"] for c in data["changes"]] == ["create", "create"]
+    assert data["changes"][0]["climb"]["name"] == "Bloc A"
+    cursor = data["cursor"]
+    assert cursor == client.get("/api/sync/changes/head").json()["cursor"]
+
+    client.patch(f"/api/climbs/{created['id']}", json={"name": "Bloc A bis"})
+    client.delete(f"/api/climbs/{other['id']}")
+
+    data = client.get(f"/api/sync/changes?cursor={cursor}").json()
+    by_id = {c["entity_id"]: c for c in data["changes"]}
+    assert by_id[created["id"]]["action"] == "update"
+    assert by_id[created["id"]]["climb"]["name"] == "Bloc A bis"
+    assert by_id[other["id"]]["action"] == "delete"
+    assert by_id[other["id"]]["climb"] is None
+
+    # Rien de nouveau après le dernier curseur
+    data = client.get(f"/api/sync/changes?cursor={data['cursor']}").json()
+    assert data["changes"] == []
+
+
+def test_changes_collapse_and_pagination(client):
+    """Test fusion des modifications d'une même entité et pagination."""
+    face_id, _ = _setup_face(client)
+    climb = client.post(
+        "/api/climbs",
+        json={"face_id": face_id, "name": "Bloc", "holds_list": "S1 T2"}
+    ).json()
+    for i in range(3):
+        client.patch(f"/api/climbs/{climb['id']}", json={"name": f"Bloc v{i}"})
+
+    # Page complète : une seule entrée pour le climb
+    data = client.get("/api/sync/changes").json()
+    assert len(data["changes"]) == 1
+    assert data["changes"][0]["climb"]["name"] == "Bloc v2"
+
+    # Pagination : limit=2 sur 4 entrées
+    page1 = client.get("/api/sync/changes?limit=2").json()
+    assert page1["has_more"] is True
+    page2 = client.get(f"/api/sync/changes?cursor={page1['cursor']}&limit=2").json()
+    assert page2["has_more"] is False
+    assert page2["cursor"] > page1["cursor"]
+
+
+def test_changes_created_deleted_is_tombstone(client):
+    """Test un climb créé puis supprimé dans la même page devient tombstone."""
+    face_id, _ = _setup_face(client)
+    climb = client.post(
+        "/api/climbs",
+        json={"face_id": face_id, "name": "Ephémère", "holds_list": "S1 T2"}
+    ).json()
+    client.delete(f"/api/climbs/{climb['id']}")
+
+    data = client.get("/api/sync/changes").json()
+    assert len(data["changes"]) == 1
+    assert data["changes"][0]["action"] == "delete"
+
+
+def test_changes_from_import(client):
+    """Test les imports Stokt alimentent le flux."""
+    face_id, face_stokt_id = _setup_face(client)
+    climbs = [
+        {
+            "stokt_id": str(uuid.uuid4()),
+            "face_stokt_id": face_stokt_id,
+            "name": f"Import {i}",
+            "holds_list": "S1 T2",
+        }
+        for i in range(3)
+    ]
+    client.post("/api/sync/import/climbs/batch", json={"climbs": climbs})
+
+    data = client.get(f"/api/sync/changes?face_id={face_id}").json()
+    assert len(data["changes"]) == 3
+    assert all(c["action"] == "create" for c in data["changes"])
+
+    other = client.get(f"/api/sync/changes?face_id={uuid.uuid4()}").json()
+    assert other["changes"] == []
+
+
+def _read_ndjson(response):
+    """Décode un corps NDJSON en liste de dicts."""
+    import json
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_export_face_ndjson(client):
+    """Test export NDJSON d'une face : snapshot, face, holds, setters, climbs, end."""
+    face_id, face_stokt_id = _setup_face(client)
+    setter_id = str(uuid.uuid4())
+    client.post("/api/sync/import/user", json={"stokt_id": setter_id, "full_name": "Ouvreur"})
+    for stokt_id in (11, 12):
+        client.post("/api/sync/import/hold", json={
+            "stokt_id": stokt_id, "face_stokt_id": face_stokt_id, "polygon_str": "0,0 1,1",
+        })
+    climbs = [
+        {
+            "stokt_id": str(uuid.uuid4()),
+            "face_stokt_id": face_stokt_id,
+            "setter_stokt_id": setter_id if i == 0 else None,
+            "name": f"Bloc {i}",
+            "holds_list": "S11 T12",
+        }
+        for i in range(3)
+    ]
+    client.post("/api/sync/import/climbs/batch", json={"climbs": climbs})
+    head = client.get("/api/sync/changes/head").json()["cursor"]
+
+    response = client.get(f"/api/sync/export/face/{face_id}")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = _read_ndjson(response)
+
+    assert [line["type"] for line in lines] == (
+        ["snapshot", "face", "hold", "hold", "setter"] + ["climb"] * 3 + ["end"]
+    )
+    assert lines[0] == {"type": "snapshot", "face_id": face_id, "cursor": head}
+    assert lines[1]["id"] == face_id
+    assert lines[1]["total_climbs"] == 3
+    assert "holds" not in lines[1]
+    assert {line["id"] for line in lines[2:4]} == {11, 12}
+    assert lines[4]["full_name"] == "Ouvreur"
+    assert {line["name"] for line in lines[5:8]} == {"Bloc 0", "Bloc 1", "Bloc 2"}
+    assert lines[-1]["counts"] == {"holds": 2, "setters": 1, "climbs": 3}
+
+
+def test_export_face_not_found(client):
+    """Test export d'une face inconnue."""
+    response = client.get(f"/api/sync/export/face/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+
+def test_climbs_batch_upsert(client, db_session):
+    """Test batch climbs : créations, mises à jour de stats, erreurs par ligne."""
+    from sqlalchemy import event, select, func
+    from sqlalchemy.engine import Engine
+    from mastoc_api.models import Climb, ClimbHold, IdMapping, ChangeLog
+
+    _, face_stokt_id = _setup_face(client)
+    setter_id = str(uuid.uuid4())
+    client.post("/api/sync/import/users/batch", json={
+        "users": [{"stokt_id": setter_id, "full_name": "Ouvreur"}]
+    })
+    climbs = [
+        {
+            "stokt_id": str(uuid.uuid4()),
+            "face_stokt_id": face_stokt_id,
+            "setter_stokt_id": setter_id,
+            "name": f"Bloc {i}",
+            "holds_list": "S1 O2 T3",
+            "date_created": "2025-01-02T10:00:00Z",
+        }
+        for i in range(50)
+    ]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(Engine, "before_cursor_execute", listener)
+    try:
+        result = client.post("/api/sync/import/climbs/batch", json={"climbs": climbs}).json()
+    finally:
+        event.remove(Engine, "before_cursor_execute", listener)
+
+    assert (result["created"], result["updated"], result["errors"]) == (50, 0, 0)
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 4  # climbs, climb_holds, id_mappings, change_log
+
+    # Réimport : stats mises à jour, un nouveau, un doublon, une face inconnue
+    climbs[0]["climbed_by"] = 12
+    climbs[0]["name"] = "Renommé"
+    new = {**climbs[1], "stokt_id": str(uuid.uuid4())}
+    unknown_face = {**climbs[1], "stokt_id": str(uuid.uuid4()), "face_stokt_id": str(uuid.uuid4())}
+    result = client.post("/api/sync/import/climbs/batch", json={
+        "climbs": [climbs[1], climbs[0], new, unknown_face, climbs[1]]
+    }).json()
+
+    assert (result["created"], result["updated"], result["errors"], result["total"]) == (1, 2, 2, 5)
+    assert [(e["index"], e["error"]) for e in result["row_errors"]] == [
+        (0, "Duplicate stokt_id in batch"), (3, "Face not found"),
+    ]
+
+    db_session.expire_all()
+    first = db_session.execute(
+        select(Climb).where(Climb.stokt_id == uuid.UUID(climbs[0]["stokt_id"]))
+    ).scalar_one()
+    assert first.climbed_by == 12
+    assert first.name == "Bloc 0"  # seules les stats sont mises à jour
+    assert first.setter.full_name == "Ouvreur"
+    assert first.created_at.year == 2025
+    assert first.is_benchmark is False
+    assert {ref.hold_id for ref in first.hold_refs} == {1, 2, 3}
+    assert db_session.execute(select(func.count()).select_from(ClimbHold)).scalar() == 51 * 3
+    mappings = db_session.execute(
+        select(func.count()).select_from(IdMapping).where(IdMapping.entity_type == "climb")
+    ).scalar()
+    assert mappings == 51
+    actions = db_session.execute(select(ChangeLog.action)).scalars().all()
+    assert actions.count("create") == 51
+    assert actions.count("update") == 2
+
+
+def test_holds_and_users_batch_upsert(client, db_session):
+    """Test batch holds et users : une ligne existante est mise à jour."""
+    from sqlalchemy import select
+    from mastoc_api.models import Hold, User, IdMapping
+
+    _, face_stokt_id = _setup_face(client)
+    holds = [
+        {"stokt_id": i, "face_stokt_id": face_stokt_id, "polygon_str": "0,0 1,1"}
+        for i in range(3)
+    ]
+    assert client.post("/api/sync/import/holds/batch", json={"holds": holds}).json()["created"] == 3
+
+    holds[0]["polygon_str"] = "0,0 2,2"
+    result = client.post("/api/sync/import/holds/batch", json={"holds": holds[:1]}).json()
+    assert (result["created"], result["updated"]) == (0, 1)
+
+    user_id = str(uuid.uuid4())
+    users = [{"stokt_id": user_id, "full_name": "Avant"}]
+    assert client.post("/api/sync/import/users/batch", json={"users": users}).json()["created"] == 1
+    users[0]["full_name"] = "Après"
+    result = client.post("/api/sync/import/users/batch", json={"users": users}).json()
+    assert (result["created"], result["updated"]) == (0, 1)
+
+    db_session.expire_all()
+    assert db_session.execute(select(Hold).where(Hold.stokt_id == 0)).scalar_one().polygon_str == "0,0 2,2"
+    user = db_session.execute(select(User).where(User.stokt_id == uuid.UUID(user_id))).scalar_one()
+    assert user.full_name == "Après"
+    assert user.is_active is True
+    assert len(db_session.execute(
+        select(IdMapping).where(IdMapping.mastoc_id == user.id)
+    ).scalars().all()) == 1
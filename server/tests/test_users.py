@@ -7,11 +7,26 @@ Ce fichier couvre les tests additionnels pour une couverture complete.
 
 import io
 import pytest
+from PIL import Image
 
+from mastoc_api import avatars
 from mastoc_api.models import User
 from mastoc_api.models.base import UserRole
 
 
+@pytest.fixture(autouse=True)
+def avatar_dir(tmp_path, monkeypatch):
+    """Avatars dans un dossier temporaire."""
+    monkeypatch.setattr(avatars, "AVATAR_DIR", tmp_path / "avatars")
+    return tmp_path / "avatars"
+
+
+def _image_bytes(width: int, height: int, fmt: str = "PNG", color=(200, 30, 30)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
 @pytest.fixture
 def auth_token(client):
     """Cree un utilisateur et retourne son token."""
@@ -108,15 +123,8 @@ def test_update_profile_no_auth(client):
 
 def test_upload_avatar_success(client, auth_token):
     """Upload d'avatar reussi."""
-    # Creer une image PNG minimale valide
-    png_data = (
-        b'\x89PNG\r\n\x1a\n'  # PNG signature
-        b'\x00\x00\x00\rIHDR'  # IHDR chunk
-        b'\x00\x00\x00\x01\x00\x00\x00\x01'  # 1x1 pixels
-        b'\x08\x02\x00\x00\x00\x90wS\xde'  # bit depth, color type, etc.
-        b'\x00\x00\x00\x0cIDATx\x9cc\xf8\x0f\x00\x00\x01\x01\x00\x05\x18\xd8N'
-        b'\x00\x00\x00\x00IEND\xaeB`\x82'  # IEND chunk
-    )
+    # Image PNG minimale valide (decodee pour generer les miniatures)
+    png_data = _image_bytes(1, 1)
 
     response = client.post(
         "/api/users/me/avatar",
@@ -161,6 +169,78 @@ def test_upload_avatar_no_auth(client):
     assert response.status_code == 401
 
 
+def test_upload_avatar_unreadable_image(client, auth_token):
+    """Contenu qui n'est pas une image."""
+    response = client.post(
+        "/api/users/me/avatar",
+        headers={"Authorization": f"Bearer {auth_token}"},
+        files={"file": ("avatar.png", io.BytesIO(b"pas une image"), "image/png")}
+    )
+    assert response.status_code == 400
+
+
+def test_avatar_thumbnails(client, auth_token):
+    """Miniature WebP à la taille demandée, immuable avec la version."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post(
+        "/api/users/me/avatar",
+        headers=headers,
+        files={"file": ("avatar.jpg", io.BytesIO(_image_bytes(800, 600, "JPEG")), "image/jpeg")}
+    )
+    avatar_path = client.get("/api/users/me", headers=headers).json()["avatar_path"]
+    assert "?v=" in avatar_path
+
+    response = client.get(f"{avatar_path}&size=48")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert "immutable" in response.headers["cache-control"]
+    assert Image.open(io.BytesIO(response.content)).size == (64, 64)
+
+    # Sans version : revalidation, 304 sur ETag connu
+    url = avatar_path.split("?")[0]
+    response = client.get(url, params={"size": 48})
+    assert response.headers["cache-control"] == "no-cache"
+    not_modified = client.get(
+        url, params={"size": 48}, headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert not_modified.status_code == 304
+
+    # Taille au-delà de la plus grande miniature
+    large = client.get(url, params={"size": 1000})
+    assert Image.open(io.BytesIO(large.content)).size == (256, 256)
+
+
+def test_avatar_reupload_replaces_thumbnails(client, auth_token, avatar_dir):
+    """Un nouvel avatar change de version et remplace les fichiers."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    paths = []
+    for color in ((200, 30, 30), (30, 30, 200)):
+        client.post(
+            "/api/users/me/avatar",
+            headers=headers,
+            files={"file": ("a.png", io.BytesIO(_image_bytes(100, 80, color=color)), "image/png")}
+        )
+        paths.append(client.get("/api/users/me", headers=headers).json()["avatar_path"])
+
+    assert paths[0] != paths[1]
+    user_dir = next(avatar_dir.iterdir())
+    assert len(list(user_dir.iterdir())) == len(avatars.AVATAR_SIZES)
+
+
+def test_legacy_avatar_converted(client, auth_token, avatar_dir):
+    """Un avatar brut d'avant les miniatures est converti à la lecture."""
+    user_id = client.get(
+        "/api/users/me", headers={"Authorization": f"Bearer {auth_token}"}
+    ).json()["id"]
+    avatar_dir.mkdir(parents=True)
+    (avatar_dir / f"{user_id}.png").write_bytes(_image_bytes(50, 50))
+
+    response = client.get(f"/api/users/{user_id}/avatar", params={"size": 32})
+    assert response.status_code == 200
+    assert Image.open(io.BytesIO(response.content)).size == (32, 32)
+    assert not (avatar_dir / f"{user_id}.png").exists()
+
+
 # === Tests Get User by ID ===
 
 def test_get_user_by_id_success(client, auth_token):
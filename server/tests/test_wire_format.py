@@ -0,0 +1,76 @@
+"""
+Tests pour la compression et le format colonnaire.
+"""
+
+import gzip
+import uuid
+
+from mastoc_api.wire_format import COLUMNAR_MEDIA_TYPE, to_columnar
+
+
+def _import_climbs(client, count=5):
+    """Helper : gym + face + climbs importés."""
+    gym_stokt_id = str(uuid.uuid4())
+    face_stokt_id = str(uuid.uuid4())
+    client.post("/api/sync/import/gym", json={"stokt_id": gym_stokt_id, "display_name": "Gym"})
+    client.post(
+        "/api/sync/import/face",
+        json={"stokt_id": face_stokt_id, "gym_stokt_id": gym_stokt_id, "picture_path": "f.jpg"},
+    )
+    climbs = [
+        {
+            "stokt_id": str(uuid.uuid4()),
+            "face_stokt_id": face_stokt_id,
+            "name": f"Bloc {i}",
+            "holds_list": "S829279 O828906 O828907 O828908 T829009",
+            "grade_font": "6A",
+            "description": "Un bloc de test assez long pour dépasser le seuil",
+        }
+        for i in range(count)
+    ]
+    client.post("/api/sync/import/climbs/batch", json={"climbs": climbs})
+
+
+def test_to_columnar():
+    """Les listes de dicts homogènes deviennent colonnes + lignes."""
+    data = {"results": [{"a": 1, "b": "x"}, {"a": 2, "b": "y"}], "count": 2}
+    assert to_columnar(data) == {
+        "results": {"__columns__": ["a", "b"], "__rows__": [[1, "x"], [2, "y"]]},
+        "count": 2,
+    }
+
+
+def test_to_columnar_keeps_heterogeneous_lists():
+    """Une liste non homogène reste inchangée."""
+    data = [{"a": 1}, {"b": 2}]
+    assert to_columnar(data) == data
+
+
+def test_climbs_default_is_plain_json(client):
+    """Sans Accept spécifique, la réponse reste en JSON standard."""
+    _import_climbs(client)
+    response = client.get("/api/climbs")
+    assert response.headers["content-type"].startswith("application/json")
+    assert isinstance(response.json()["results"], list)
+
+
+def test_climbs_columnar(client):
+    """Accept colonnaire : les résultats arrivent en colonnes."""
+    _import_climbs(client)
+    response = client.get("/api/climbs", headers={"Accept": COLUMNAR_MEDIA_TYPE})
+    assert response.headers["content-type"].startswith(COLUMNAR_MEDIA_TYPE)
+    results = response.json()["results"]
+    assert "name" in results["__columns__"]
+    assert len(results["__rows__"]) == 5
+
+
+def test_climbs_gzip(client):
+    """Les réponses volumineuses sont compressées si le client accepte gzip."""
+    _import_climbs(client, count=30)
+    response = client.get("/api/climbs", headers={"Accept-Encoding": "gzip"})
+    assert response.headers.get("content-encoding") in ("gzip", "br")
+    assert len(response.json()["results"]) == 30
+
+    raw = client.get("/api/climbs", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    assert len(gzip.compress(raw.content)) < len(raw.content)